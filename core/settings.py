@@ -215,6 +215,10 @@ CRISPY_TEMPLATE_PACK = "tailwind"
 
 MAPBOX_ACCESS_TOKEN = env("MAPBOX_ACCESS_TOKEN")
 
+# Day and trip maps: "folium" renders map HTML on the server, "leaflet" draws
+# GeoJSON in the browser
+MAP_RENDERER = env("MAP_RENDERER", default="folium")
+
 # DJANGO-Q
 # Environment-specific configuration will be set below in respective sections
 
@@ -283,6 +287,9 @@ DATE_INPUT_FORMATS = [
 GOOGLE_PLACES_API_KEY = env("GOOGLE_PLACES_API_KEY", default="")
 UNSPLASH_ACCESS_KEY = env("UNSPLASH_ACCESS_KEY", default="")
 
+# Load airport/station tables at startup so forked workers share them
+PRELOAD_DATASETS = env.bool("PRELOAD_DATASETS", default=False)
+
 # DJANGO-DBBACKUP with Django Storages
 STORAGES = {
     "default": {
@@ -432,6 +439,13 @@ elif ENVIRONMENT == "prod":
                 "schedule_type": "W",  # Weekly
                 "repeats": -1,
             },
+            {
+                "func": "trips.tasks.prune_geocode_store",
+                "name": "Prune Geocode Store",
+                "schedule_type": "C",  # Cron
+                "cron": "0 4 * * *",  # Every day at 4 AM
+                "repeats": -1,
+            },
             {
                 "func": "trips.tasks.backup_database",
                 "name": "Database Backup",
@@ -12,6 +12,9 @@ python manage.py compilemessages
 echo "Building production css files..."
 python manage.py tailwind build
 
+echo "Compiling datasets..."
+python manage.py compile_datasets
+
 echo "Collecting static files..."
 python manage.py collectstatic --no-input
 
@@ -15,6 +15,27 @@ htmx.on("htmx:oobAfterSwap", (e) => {
   }
 })
 
+// Keep the address spinner visible for at least a second, so fast (cached)
+// geocoding responses don't just flash it
+const MIN_ADDRESS_SPINNER_MS = 1000
+let addressSearchStartedAt = 0
+
+htmx.on("htmx:beforeRequest", (e) => {
+  if (e.detail.target?.id == "address-results") {
+    addressSearchStartedAt = Date.now()
+  }
+})
+
+htmx.on("htmx:afterRequest", (e) => {
+  const spinner = document.getElementById("address-spinner")
+  if (e.detail.target?.id != "address-results" || !spinner) return
+  const remaining = MIN_ADDRESS_SPINNER_MS - (Date.now() - addressSearchStartedAt)
+  if (remaining > 0) {
+    spinner.classList.add("htmx-request")
+    setTimeout(() => spinner.classList.remove("htmx-request"), remaining)
+  }
+})
+
 // Show success/error messages from HTMX triggers
 document.body.addEventListener("showMessage", (e) => {
   const { type, message } = e.detail
@@ -0,0 +1,65 @@
+// Draw day and trip maps from the GeoJSON endpoints (trips/geojson.py).
+// The endpoints answer with an ETag, so the browser revalidates and gets an
+// empty 304 while a map is unchanged.
+const MAP_TILES = "https://{s}.basemaps.cartocdn.com/light_all/{z}/{x}/{y}{r}.png"
+const MAP_ATTRIBUTION = '&copy; <a href="https://www.openstreetmap.org/copyright">OpenStreetMap</a> contributors &copy; <a href="https://carto.com/attributions">CARTO</a>'
+const MAP_COLORS = {
+  experience: "#22c55e",
+  meal: "#f97316",
+  stay: "#0ea5e9",
+  arrival: "#dc2626",
+  departure: "#dc2626",
+  transfer: "#6b7280",
+  stay_transfer: "#0ea5e9",
+  main_transfer: "#dc2626",
+}
+
+const geojsonOptions = {
+  pointToLayer: (feature, latlng) => L.circleMarker(latlng, {
+    radius: 7,
+    color: MAP_COLORS[feature.properties.kind],
+    fillOpacity: 0.8,
+  }),
+  style: (feature) => ({
+    color: MAP_COLORS[feature.properties.kind],
+    weight: 3,
+    dashArray: feature.properties.kind == "main_transfer" ? "6 6" : null,
+  }),
+  onEachFeature: (feature, layer) => layer.bindTooltip(feature.properties.name),
+}
+
+function drawGeojsonMap(element) {
+  if (element.dataset.mapReady) return
+  element.dataset.mapReady = "true"
+
+  const map = L.map(element)
+  L.tileLayer(MAP_TILES, { subdomains: "abcd", attribution: MAP_ATTRIBUTION }).addTo(map)
+
+  fetch(element.dataset.geojsonMap, { credentials: "same-origin" })
+    .then((response) => response.json())
+    .then((data) => {
+      if (element.dataset.layers == "day") {
+        // One toggleable layer per day
+        const layers = {}
+        for (const feature of data.features) {
+          const label = `${element.dataset.dayLabel} ${feature.properties.day}`
+          layers[label] ??= L.geoJSON(null, geojsonOptions).addTo(map)
+          layers[label].addData(feature)
+        }
+        L.control.layers(null, layers, { collapsed: false }).addTo(map)
+      } else {
+        L.geoJSON(data, geojsonOptions).addTo(map)
+      }
+
+      if (data.bbox) {
+        const [west, south, east, north] = data.bbox
+        map.fitBounds([[south, west], [north, east]], { padding: [20, 20], maxZoom: 16 })
+      } else {
+        map.setView([0, 0], 2)
+      }
+    })
+}
+
+htmx.onLoad((root) => {
+  root.querySelectorAll("[data-geojson-map]").forEach(drawGeojsonMap)
+})
@@ -1,6 +1,16 @@
 """Trips app test fixtures and configuration"""
 
 import pytest
+from django.core.cache import cache
+
+
+@pytest.fixture(autouse=True)
+def clear_fragment_cache():
+    """
+    Start every test with an empty cache: rows rolled back by a test reuse
+    their ids, so cached fragments and versions would leak into the next one.
+    """
+    cache.clear()
 
 
 @pytest.fixture
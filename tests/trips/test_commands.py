@@ -276,3 +276,126 @@ class TestGeocodeStationsCommand:
             assert "DRY RUN" in output
             assert "Found 15 stations without coordinates" in output
             assert "... and 5 more" in output  # 15 - 10 = 5
+
+
+class TestCompileDatasetsCommand:
+    """Test compile_datasets management command"""
+
+    @patch("trips.management.commands.compile_datasets.compile_dataset")
+    def test_compiles_all_datasets(self, mock_compile):
+        mock_compile.side_effect = lambda name: (Path(f"{name}.bin"), 3)
+        out = StringIO()
+
+        call_command("compile_datasets", stdout=out)
+
+        assert [c.args[0] for c in mock_compile.call_args_list] == [
+            "airports",
+            "stations",
+        ]
+        assert "airports: 3 rows -> airports.bin" in out.getvalue()
+
+    @patch("trips.management.commands.compile_datasets.compile_dataset")
+    def test_compiles_selected_dataset(self, mock_compile):
+        mock_compile.return_value = (Path("stations.bin"), 3)
+
+        call_command("compile_datasets", "--dataset", "stations", stdout=StringIO())
+
+        mock_compile.assert_called_once_with("stations")
+
+
+class TestBenchmarkSearchCommand:
+    """Test benchmark_search management command"""
+
+    def test_benchmark_search(self):
+        out = StringIO()
+        call_command("benchmark_search", "--repeat", "1", "--query", "rome", stdout=out)
+
+        output = out.getvalue()
+        assert "Airports:" in output
+        assert "Stations:" in output
+        assert "linear scan:" in output
+        assert "speedup:" in output
+
+    def test_scan_airports_respects_limit(self):
+        from trips.management.commands.benchmark_search import scan_airports
+
+        airports = [{"iata_code": "AAA", "name": "A", "city": "A"}] * 5
+        assert len(scan_airports(airports, "a", limit=3)) == 3
+        assert scan_airports(airports, "z") == []
+
+    def test_scan_stations_respects_limit(self):
+        from trips.management.commands.benchmark_search import scan_stations
+
+        stations = [{"name": "Roma", "country": "IT"}] * 5
+        assert len(scan_stations(stations, "it", limit=3)) == 3
+        assert scan_stations(stations, "z") == []
+
+
+class TestBenchmarkRouteCommand:
+    """Test benchmark_route management command"""
+
+    def test_benchmark_route(self):
+        out = StringIO()
+        call_command("benchmark_route", "--stops", "60", "--repeat", "1", stdout=out)
+
+        output = out.getvalue()
+        assert "60 stops:" in output
+        assert "distance matrix:" in output
+        assert "after 2-opt" in output
+
+    def test_random_stops_are_reproducible(self):
+        from trips.management.commands.benchmark_route import random_stops
+
+        latitudes, longitudes = random_stops(50)
+        assert len(latitudes) == len(longitudes) == 50
+        assert random_stops(50) == (latitudes, longitudes)
+
+
+class TestBenchmarkTripDaysCommand:
+    """Test benchmark_trip_days management command"""
+
+    def test_benchmark_trip_days(self):
+        from trips.models import Trip
+
+        out = StringIO()
+        call_command("benchmark_trip_days", "--days", "20", "--repeat", "2", stdout=out)
+
+        output = out.getvalue()
+        assert "20 days trip:" in output
+        assert "status only:" in output
+        assert "shorten by a week:" in output
+        assert output.count(", 20 days") == 4
+        assert not Trip.objects.exists()
+
+
+class TestBenchmarkTripImageCommand:
+    """Test benchmark_trip_image management command"""
+
+    def test_benchmark_trip_image(self):
+        out = StringIO()
+        call_command(
+            "benchmark_trip_image", "--megapixels", "1", "--repeat", "1", stdout=out
+        )
+
+        output = out.getvalue()
+        assert "1 MP photo: 1154x865" in output
+        assert "full decode:" in output
+        assert "draft decode:" in output
+        assert output.count("ms/MP, peak +") == 2
+
+    def test_measure(self, tmp_path):
+        from trips.management.commands.benchmark_trip_image import (
+            draft_decode,
+            full_decode,
+            measure,
+            photo_jpeg,
+        )
+
+        size, content = photo_jpeg(1)
+        path = tmp_path / "photo.jpg"
+        path.write_bytes(content)
+
+        for func in (full_decode, draft_decode):
+            seconds, peak_mb = measure(func, path, 1)
+            assert seconds > 0
+            assert peak_mb >= 0
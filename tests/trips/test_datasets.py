@@ -0,0 +1,153 @@
+"""Tests for the columnar airport and station tables"""
+
+import os
+from unittest.mock import patch
+
+import pytest
+
+from trips.datasets import (
+    ColumnarTable,
+    file_digest,
+    file_signature,
+    freeze_shared_memory,
+)
+
+ROWS = [
+    {"code": "fco", "name": "Fiumicino", "country": "IT", "lat": 41.8},
+    {"code": "CDG", "name": "Charles de Gaulle", "country": "FR", "lat": 49.0},
+    {"code": "", "name": "Heliport", "country": "IT", "lat": 0.5},
+    {"code": "FCO", "name": "Duplicate", "country": "IT", "lat": 1.0},
+]
+
+
+@pytest.fixture
+def table():
+    return ColumnarTable(
+        ROWS,
+        text_columns=("code", "name"),
+        category_columns=("country",),
+        float_columns=("lat",),
+        key_column="code",
+        normalize_key=str.upper,
+    )
+
+
+class TestColumnarTable:
+    def test_rows_read_back_as_dicts(self, table):
+        assert len(table) == 4
+        assert table[0] == ROWS[0]
+        assert table[-1] == ROWS[-1]
+        assert list(table) == ROWS
+        assert table[1:3] == ROWS[1:3]
+
+    def test_index_out_of_range(self, table):
+        with pytest.raises(IndexError):
+            table[4]
+
+    def test_columns_are_compact(self, table):
+        assert table.column("lat").values.typecode == "d"
+        assert len(table.column("lat")) == 4
+        assert len(table.column("name")) == 4
+        countries = table.column("country")
+        assert len(countries) == 4
+        assert countries.labels == ["IT", "FR"]
+        assert countries[2] is countries[0]
+
+    def test_non_ascii_text(self):
+        table = ColumnarTable([{"name": "Málaga"}, {"name": "Zürich"}], ("name",))
+        assert [row["name"] for row in table] == ["Málaga", "Zürich"]
+
+    def test_lookup(self, table):
+        # First row wins on duplicate keys, empty keys are not indexed
+        assert table.lookup("Fco")["name"] == "Fiumicino"
+        assert table.lookup("cdg")["name"] == "Charles de Gaulle"
+        assert table.lookup("") is None
+        assert table.lookup("XXX") is None
+
+    def test_lookup_without_key_column(self):
+        table = ColumnarTable(ROWS, text_columns=("code",))
+        assert table.lookup("FCO") is None
+
+
+@patch("trips.datasets.gc")
+def test_freeze_shared_memory(mock_gc):
+    freeze_shared_memory()
+
+    mock_gc.collect.assert_called_once()
+    mock_gc.freeze.assert_called_once()
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "table.csv"
+    path.write_text("code,name")
+    return path
+
+
+class TestBinaryTables:
+    def test_save_and_open_round_trip(self, table, source, tmp_path):
+        path = tmp_path / "table.bin"
+        table.save(path, source)
+
+        opened = ColumnarTable.open(path, source, normalize_key=str.upper)
+
+        assert list(opened) == ROWS
+        assert opened.lookup("cdg")["name"] == "Charles de Gaulle"
+        assert opened.lookup("") is None
+        # Buffers are views over the mapped file, nothing was parsed
+        assert isinstance(opened.column("name").blob, memoryview)
+        assert isinstance(opened.column("lat").values, memoryview)
+
+    def test_round_trip_without_key_column(self, source, tmp_path):
+        path = tmp_path / "table.bin"
+        ColumnarTable([], text_columns=("name",)).save(path, source)
+
+        opened = ColumnarTable.open(path, source)
+
+        assert len(opened) == 0
+        assert opened.lookup("x") is None
+
+    def test_open_rejects_stale_or_invalid_files(self, table, source, tmp_path):
+        path = tmp_path / "table.bin"
+        assert ColumnarTable.open(path, source) is None
+
+        path.write_bytes(b"")
+        assert ColumnarTable.open(path, source) is None
+
+        path.write_bytes(b"not a table")
+        assert ColumnarTable.open(path, source) is None
+
+        table.save(path, source)
+        source.write_text("code,name,country")
+        assert ColumnarTable.open(path, source) is None
+
+        source.unlink()
+        assert ColumnarTable.open(path, source) is None
+
+        source.write_text("code,name")
+        table.save(path, source)
+        with patch("trips.datasets.FORMAT_VERSION", 99):
+            assert ColumnarTable.open(path, source) is None
+
+    def test_source_hashed_only_when_its_signature_changed(
+        self, table, source, tmp_path
+    ):
+        path = tmp_path / "table.bin"
+        table.save(path, source)
+
+        with patch("trips.datasets.file_digest") as mock_digest:
+            assert ColumnarTable.open(path, source) is not None
+        mock_digest.assert_not_called()
+
+        # Touched but not changed: hashed again, still up to date
+        size, mtime_ns = file_signature(source)
+        os.utime(source, ns=(mtime_ns + 10**9, mtime_ns + 10**9))
+        assert file_signature(source) == [size, mtime_ns + 10**9]
+        assert ColumnarTable.open(path, source) is not None
+
+    def test_file_digest_changes_with_content(self, tmp_path):
+        path = tmp_path / "data.csv"
+        path.write_text("a")
+        first = file_digest(path)
+        path.write_text("b")
+        assert file_digest(path) != first
@@ -0,0 +1,149 @@
+"""Tests for the whole-trip enrichment job"""
+
+from unittest.mock import patch
+
+import pytest
+from django.core.cache import cache
+
+from tests.trips.factories import ExperienceFactory, StayFactory, TripFactory
+from trips.enrichment import (
+    ENRICH_TRIP_MAX_ATTEMPTS,
+    enqueue_trip_enrichment,
+    enrich_trip_places,
+    get_enrichment_progress,
+    lookup_place,
+    unenriched_places,
+)
+from trips.models import Event, Stay
+from trips.places import PlacesError, PlacesRateLimited
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def trip():
+    """A trip with one stay and three events to enrich"""
+    trip = TripFactory()
+    trip.days.update(stay=StayFactory(name="Hotel Roma", address="Via Roma 1"))
+    for name in ("Colosseum", "Pantheon", "Trevi"):
+        ExperienceFactory(trip=trip, name=name, address=f"{name} address")
+    return trip
+
+
+def fake_enrich_place(name, address, wait=False):
+    if name == "Trevi":
+        raise PlacesError("Could not find a matching place.")
+    return {
+        "place_id": f"id {name}",
+        "website": f"https://{name.lower().replace(' ', '')}.example.com",
+        "phone_number": "+39 06 123456",
+        "opening_hours": None,
+    }
+
+
+class TestUnenrichedPlaces:
+    def test_skips_enriched_and_incomplete(self, trip):
+        Event.objects.filter(name="Colosseum").update(enriched=True)
+        Event.objects.filter(name="Pantheon").update(address="")
+
+        places = unenriched_places(trip)
+
+        assert sorted(place.name for place in places) == ["Hotel Roma", "Trevi"]
+
+
+class TestEnqueueTripEnrichment:
+    @patch("trips.enrichment.async_task")
+    def test_enqueue_once_while_running(self, mock_async_task, trip):
+        assert enqueue_trip_enrichment(trip) is True
+        assert enqueue_trip_enrichment(trip) is False
+
+        mock_async_task.assert_called_once_with(
+            "trips.tasks.enrich_trip", trip.pk, task_name=f"enrich trip {trip.pk}"
+        )
+        assert get_enrichment_progress(trip.pk)["finished"] is False
+
+    @patch("trips.enrichment.async_task")
+    def test_enqueue_again_once_finished(self, mock_async_task, trip):
+        with patch("trips.enrichment.enrich_place", side_effect=fake_enrich_place):
+            enrich_trip_places(trip)
+
+        assert enqueue_trip_enrichment(trip) is True
+        mock_async_task.assert_called_once()
+
+
+class TestLookupPlace:
+    @patch("trips.enrichment.time.sleep")
+    def test_retries_when_rate_limited(self, mock_sleep):
+        with patch(
+            "trips.enrichment.enrich_place",
+            side_effect=[PlacesRateLimited("API Error"), {"place_id": "id"}],
+        ) as mock_enrich:
+            assert lookup_place("Colosseum", "Roma") == {"place_id": "id"}
+
+        mock_sleep.assert_called_once_with(1)
+        # The background job waits for a free request slot
+        mock_enrich.assert_called_with("Colosseum", "Roma", wait=True)
+
+    @patch("trips.enrichment.time.sleep")
+    def test_gives_up(self, mock_sleep):
+        with (
+            patch(
+                "trips.enrichment.enrich_place",
+                side_effect=PlacesRateLimited("API Error"),
+            ) as mock_enrich,
+            pytest.raises(PlacesRateLimited),
+        ):
+            lookup_place("Colosseum", "Roma")
+
+        assert mock_enrich.call_count == ENRICH_TRIP_MAX_ATTEMPTS
+
+
+class TestEnrichTripPlaces:
+    @patch("trips.enrichment.enrich_place", side_effect=fake_enrich_place)
+    def test_enrich_trip(self, mock_enrich, trip):
+        progress = enrich_trip_places(trip)
+
+        assert progress == {
+            "total": 4,
+            "done": 4,
+            "enriched": 3,
+            "failed": 1,
+            "finished": True,
+        }
+        assert get_enrichment_progress(trip.pk) == progress
+        stay = Stay.objects.get()
+        assert stay.enriched is True
+        assert stay.place_id == "id Hotel Roma"
+        assert stay.website == "https://hotelroma.example.com"
+        assert set(
+            Event.objects.filter(enriched=True).values_list("place_id", flat=True)
+        ) == {"id Colosseum", "id Pantheon"}
+        assert Event.objects.get(name="Trevi").enriched is False
+
+    @patch("trips.enrichment.enrich_place", side_effect=fake_enrich_place)
+    def test_fixed_number_of_queries(
+        self, mock_enrich, trip, django_assert_num_queries
+    ):
+        for name in ("Spanish Steps", "Vatican Museums", "Borghese Gallery"):
+            ExperienceFactory(trip=trip, name=name, address=f"{name} address")
+
+        # stays and events to enrich, then one bulk_update per model
+        with django_assert_num_queries(4):
+            progress = enrich_trip_places(trip)
+
+        assert progress["enriched"] == 6
+
+    @patch("trips.enrichment.enrich_place")
+    def test_nothing_to_enrich(self, mock_enrich):
+        progress = enrich_trip_places(TripFactory())
+
+        assert progress["total"] == 0
+        assert progress["finished"] is True
+        mock_enrich.assert_not_called()
@@ -892,6 +892,84 @@ class TestFlightMainTransferForm:
         assert not hasattr(form, "prefilled_from_arrival")
 
 
+class TestMainTransferNearbySuggestions:
+    @pytest.fixture
+    def trip(self):
+        trip = TripFactory(start_date=date(2026, 5, 1), end_date=date(2026, 5, 2))
+        first_day, last_day = trip.days.all()
+        first_day.stay = StayFactory(latitude=41.9, longitude=12.5)
+        first_day.save()
+        last_day.stay = StayFactory(latitude=45.4862, longitude=9.2045)
+        last_day.save()
+        return trip
+
+    def test_arrival_suggests_airports_near_first_stay(self, trip):
+        from trips.forms import FlightMainTransferForm
+        from trips.models import MainTransfer
+
+        form = FlightMainTransferForm(
+            trip=trip, initial={"direction": MainTransfer.Direction.ARRIVAL}
+        )
+
+        suggestions = form.nearby_suggestions
+        assert suggestions["field_type"] == "destination"
+        assert [a["iata_code"] for a in suggestions["results"][:2]] == ["CIA", "FCO"]
+
+    def test_departure_suggests_stations_near_last_stay(self, trip):
+        from trips.forms import TrainMainTransferForm
+        from trips.models import MainTransfer
+
+        form = TrainMainTransferForm(
+            trip=trip, initial={"direction": MainTransfer.Direction.DEPARTURE}
+        )
+
+        suggestions = form.nearby_suggestions
+        assert suggestions["field_type"] == "origin"
+        assert suggestions["results"][0]["name"] == "Milano Centrale"
+
+    @patch("trips.forms.get_trip_stay_coordinates")
+    def test_no_suggestions_when_editing_or_bound(self, mock_coordinates, trip):
+        from trips.forms import FlightMainTransferForm
+
+        transfer = MainTransferFactory(trip=trip)
+
+        assert (
+            FlightMainTransferForm(instance=transfer, trip=trip).nearby_suggestions
+            is None
+        )
+        assert FlightMainTransferForm({}, trip=trip).nearby_suggestions is None
+        assert FlightMainTransferForm().nearby_suggestions is None
+        mock_coordinates.assert_not_called()
+
+    def test_no_suggestions_when_prefilled_from_arrival(self, trip):
+        from trips.forms import FlightMainTransferForm
+        from trips.models import MainTransfer
+
+        MainTransferFactory(
+            trip=trip,
+            type=MainTransfer.Type.PLANE,
+            direction=MainTransfer.Direction.ARRIVAL,
+        )
+        form = FlightMainTransferForm(
+            trip=trip, initial={"direction": MainTransfer.Direction.DEPARTURE}
+        )
+
+        assert form.nearby_suggestions is None
+
+    @patch("trips.forms.nearest_airports", return_value=[])
+    def test_no_suggestions_without_stay_coordinates_or_results(self, mock_nearest):
+        from trips.forms import CarMainTransferForm, FlightMainTransferForm
+
+        trip = TripFactory()
+        assert FlightMainTransferForm(trip=trip).nearby_suggestions is None
+        mock_nearest.assert_not_called()
+
+        with patch("trips.forms.get_trip_stay_coordinates", return_value=(0.0, 0.0)):
+            assert FlightMainTransferForm(trip=trip).nearby_suggestions is None
+            assert CarMainTransferForm(trip=trip).nearby_suggestions is None
+        mock_nearest.assert_called_once_with(0.0, 0.0)
+
+
 class TestTrainMainTransferForm:
     def test_populate_from_existing_instance(self):
         """Test form populates fields from existing MainTransfer instance"""
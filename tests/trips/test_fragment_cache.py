@@ -0,0 +1,239 @@
+"""Tests for the dependency-tracked cache of day, event and transfer fragments"""
+
+from datetime import date, time
+from unittest.mock import patch
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from tests.trips.factories import (
+    EventFactory,
+    MainTransferFactory,
+    SimpleTransferFactory,
+    StayFactory,
+    StayTransferFactory,
+    TripFactory,
+)
+from trips.fragment_cache import (
+    day_fragment_key,
+    day_fragment_version,
+    invalidate_instance_fragments,
+    transfers_fragment_version,
+)
+from trips.models import Event
+from trips.stays import assign_stay
+from trips.tasks import geocode_pending_locations
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def trip():
+    return TripFactory(start_date=date(2026, 5, 1), end_date=date(2026, 5, 3))
+
+
+@pytest.fixture
+def days(trip):
+    return list(trip.days.all())
+
+
+@pytest.fixture
+def event(days):
+    return EventFactory(
+        day=days[0], name="Colosseum", start_time=time(9), end_time=time(10)
+    )
+
+
+def versions(days):
+    return [day_fragment_version(day) for day in days]
+
+
+def event_queries(client, url, **extra):
+    """Response of a GET and the SQL of the queries reading events"""
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url, **extra)
+    return response, [
+        query["sql"] for query in queries if 'FROM "trips_event"' in query["sql"]
+    ]
+
+
+class TestFragmentDependencies:
+    def test_stable_until_invalidated(self, trip, days):
+        before = versions(days)
+        assert versions(days) == before
+
+        invalidate_instance_fragments(trip)
+
+        assert all(old != new for old, new in zip(before, versions(days), strict=True))
+
+    def test_event_saved(self, days, event):
+        first, second, third = versions(days)
+
+        event.name = "Colosseum by night"
+        event.save()
+
+        assert versions(days) != [first, second, third]
+        assert versions(days)[1:] == [second, third]
+
+    def test_event_moved(self, days, event):
+        first, second, third = versions(days)
+
+        event.day = days[1]
+        event.save()
+
+        new_first, new_second, new_third = versions(days)
+        assert new_first != first
+        assert new_second != second
+        assert new_third == third
+
+    def test_event_deleted(self, days, event):
+        before = versions(days)
+
+        event.delete()
+
+        assert versions(days)[0] != before[0]
+        assert versions(days)[1:] == before[1:]
+
+    def test_simple_transfer_saved(self, days, event):
+        to_event = EventFactory(day=days[0], start_time=time(11), end_time=time(12))
+        before = versions(days)
+
+        SimpleTransferFactory(from_event=event, to_event=to_event)
+
+        assert versions(days)[0] != before[0]
+        assert versions(days)[1:] == before[1:]
+
+    def test_stay_transfer_saved(self, days):
+        rome = StayFactory(day=days[0])
+        florence = StayFactory(day=days[1])
+        before = versions(days)
+
+        StayTransferFactory(
+            from_stay=rome, to_stay=florence, from_day=days[0], to_day=days[1]
+        )
+
+        assert versions(days)[:2] != before[:2]
+        assert versions(days)[2] == before[2]
+
+    def test_stay_saved(self, days):
+        stay = StayFactory(day=days[0])
+        before = versions(days)
+
+        stay.name = "Hotel Roma"
+        stay.save()
+
+        # Every day shows its neighbours' stays
+        assert all(old != new for old, new in zip(before, versions(days), strict=True))
+
+    def test_stay_assigned(self, trip, days):
+        before = versions(days)
+
+        assign_stay(trip, StayFactory(), days[1:])
+
+        assert all(old != new for old, new in zip(before, versions(days), strict=True))
+
+    def test_main_transfer_saved(self, trip, days):
+        before = versions(days)
+        transfers_before = transfers_fragment_version(trip)
+
+        MainTransferFactory(trip=trip)
+
+        assert transfers_fragment_version(trip) != transfers_before
+        assert versions(days) == before
+
+    @patch("geocoder.mapbox")
+    def test_geocoding_resolved(self, mock_geocoder, days, event):
+        mock_geocoder.return_value.latlng = [41.890251, 12.492373]
+        Event.objects.filter(pk=event.pk).update(
+            address="Colosseum",
+            city="Roma",
+            geocoding_pending=True,
+            geocoding_query="colosseum, roma",
+        )
+        before = versions(days)
+
+        geocode_pending_locations("Colosseum, Roma")
+
+        assert versions(days)[0] != before[0]
+        assert versions(days)[1:] == before[1:]
+
+
+class TestDayCardCache:
+    def test_cache_hit(self, client, days, event):
+        client.force_login(days[0].trip.author)
+        url = reverse("trips:day-detail", args=[days[0].pk])
+
+        response, queries = event_queries(client, url, data={"view": "list"})
+        assert queries
+        assert "Colosseum" in response.content.decode()
+
+        response, queries = event_queries(client, url, data={"view": "list"})
+        assert queries == []
+        assert "Colosseum" in response.content.decode()
+
+    def test_event_changed(self, client, days, event):
+        client.force_login(days[0].trip.author)
+        url = reverse("trips:day-detail", args=[days[0].pk])
+        client.get(url, data={"view": "list"})
+
+        event.name = "Colosseum by night"
+        event.save()
+        response, queries = event_queries(client, url, data={"view": "list"})
+
+        assert queries
+        assert "Colosseum by night" in response.content.decode()
+
+    def test_trip_page_fills_the_cache(self, client, days, event):
+        client.force_login(days[0].trip.author)
+        client.get(reverse("trips:trip-detail", args=[days[0].trip.pk]))
+
+        response, queries = event_queries(
+            client,
+            reverse("trips:day-detail", args=[days[0].pk]),
+            data={"view": "list"},
+            headers={"HX-Request": "true"},
+        )
+
+        assert queries == []
+        content = response.content.decode()
+        assert "Colosseum" in content
+        # Messages are swapped in fresh on every response
+        assert 'id="messages"' in content
+
+    def test_map_view_not_cached(self, client, days, event):
+        client.force_login(days[0].trip.author)
+
+        client.get(reverse("trips:day-detail", args=[days[0].pk]), data={"view": "map"})
+
+        assert not cache.has_key(day_fragment_key(days[0]))
+
+
+class TestEventAndTransfersCache:
+    def test_single_event(self, client, days, event):
+        client.force_login(days[0].trip.author)
+        url = reverse("trips:single-event", args=[event.pk])
+
+        with CaptureQueriesContext(connection) as first:
+            client.get(url)
+        with CaptureQueriesContext(connection) as second:
+            response = client.get(url)
+
+        assert len(second) < len(first)
+        assert f'id="event-{event.pk}"' in response.content.decode()
+
+    def test_main_transfers_changed(self, client, trip):
+        transfer = MainTransferFactory(
+            trip=trip, type=3, direction=1, origin_address="Via Roma 1"
+        )
+        client.force_login(trip.author)
+        url = reverse("trips:main-transfers-section", args=[trip.pk])
+        client.get(url)
+
+        transfer.origin_address = "Via Milano 2"
+        transfer.save()
+        response = client.get(url)
+
+        assert "Via Milano 2" in response.content.decode()
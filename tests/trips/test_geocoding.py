@@ -0,0 +1,116 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from django.core.cache import cache
+from django.test import override_settings
+from django.utils import timezone
+
+from trips.fragment_cache import day_fragment_version
+from trips.geocoding import (
+    enqueue_geocoding_job,
+    expire_stale_geocoding,
+    geocode_job_key,
+    geocode_job_timeout,
+    normalize_address,
+    schedule_geocoding,
+)
+from trips.models import Event
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+class TestNormalizeAddress:
+    def test_normalize_address(self):
+        assert normalize_address("  Via Roma   1,\tMILANO ") == "via roma 1, milano"
+
+    def test_job_key_same_for_equivalent_addresses(self):
+        assert geocode_job_key("Via Roma 1, Milano") == geocode_job_key(
+            " via  roma 1, MILANO"
+        )
+        assert geocode_job_key("Via Roma 1") != geocode_job_key("Via Roma 2")
+
+
+class TestEnqueueGeocodingJob:
+    @patch("trips.geocoding.async_task")
+    def test_enqueue_once_per_address(self, mock_async_task):
+        assert enqueue_geocoding_job("Via Roma 1, Milano") is True
+        assert enqueue_geocoding_job("via roma 1,  milano") is False
+
+        mock_async_task.assert_called_once_with(
+            "trips.tasks.geocode_pending_locations",
+            "Via Roma 1, Milano",
+            task_name="geocode via roma 1, milano",
+        )
+        assert cache.get(geocode_job_key("Via Roma 1, Milano")) is True
+
+    @override_settings(Q_CLUSTER={"timeout": 90, "retry": 120, "max_attempts": 3})
+    @patch("trips.geocoding.cache.add", return_value=True)
+    @patch("trips.geocoding.async_task")
+    def test_marker_outlives_the_retry_window(self, mock_async_task, mock_cache_add):
+        assert geocode_job_timeout() == 450
+
+        enqueue_geocoding_job("Via Roma 1, Milano")
+
+        mock_cache_add.assert_called_once_with(
+            geocode_job_key("Via Roma 1, Milano"), True, 450
+        )
+
+    @patch("trips.geocoding.async_task")
+    def test_schedule_runs_on_commit(
+        self, mock_async_task, django_capture_on_commit_callbacks
+    ):
+        with django_capture_on_commit_callbacks(execute=True) as callbacks:
+            schedule_geocoding("Colosseum, Roma")
+            mock_async_task.assert_not_called()
+
+        assert len(callbacks) == 1
+        mock_async_task.assert_called_once()
+
+    @pytest.mark.parametrize("address", ["", "   ", None])
+    @patch("trips.geocoding.async_task")
+    def test_schedule_skips_empty_address(
+        self, mock_async_task, address, django_capture_on_commit_callbacks
+    ):
+        with django_capture_on_commit_callbacks(execute=True) as callbacks:
+            schedule_geocoding(address)
+
+        assert callbacks == []
+        mock_async_task.assert_not_called()
+
+
+class TestExpireStaleGeocoding:
+    def test_gives_up_after_the_job_window(self, event_factory):
+        event = event_factory()
+        Event.objects.filter(pk=event.pk).update(
+            geocoding_pending=True,
+            geocoding_query="colosseum, roma",
+            geocoding_requested_at=timezone.now() - timedelta(hours=1),
+        )
+        version = day_fragment_version(event.day)
+
+        assert expire_stale_geocoding(Event.objects.all()) == 1
+
+        event.refresh_from_db()
+        assert event.geocoding_pending is False
+        assert event.geocoding_query == ""
+        assert event.geocoding_requested_at is None
+        assert day_fragment_version(event.day) != version
+
+    def test_keeps_rows_within_the_job_window(self, event_factory):
+        event = event_factory()
+        Event.objects.filter(pk=event.pk).update(
+            geocoding_pending=True, geocoding_requested_at=timezone.now()
+        )
+
+        assert expire_stale_geocoding(Event.objects.all()) == 0
+
+        event.refresh_from_db()
+        assert event.geocoding_pending is True
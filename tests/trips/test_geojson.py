@@ -0,0 +1,190 @@
+"""Tests for the GeoJSON of day and trip maps"""
+
+from datetime import date, time
+
+import pytest
+
+from tests.trips.factories import (
+    EventFactory,
+    MainTransferFactory,
+    MealFactory,
+    SimpleTransferFactory,
+    StayFactory,
+    StayTransferFactory,
+    TripFactory,
+)
+from trips.geojson import day_geojson, feature_collection, trip_geojson
+from trips.models import Event, MainTransfer, Stay
+
+pytestmark = pytest.mark.django_db
+
+
+def kinds(collection):
+    return [
+        (feature["properties"]["kind"], feature["properties"]["day"])
+        for feature in collection["features"]
+    ]
+
+
+@pytest.fixture
+def trip():
+    """Three days: two nights in one stay, one in another"""
+    trip = TripFactory(start_date=date(2026, 5, 1), end_date=date(2026, 5, 3))
+    first, second, third = trip.days.all()
+    rome = StayFactory(name="Rome", latitude=41.9, longitude=12.5, day=first)
+    second.stay = rome
+    second.save()
+    StayFactory(name="Florence", latitude=43.77, longitude=11.25, day=third)
+    return trip
+
+
+def test_feature_collection_empty():
+    collection = feature_collection([])
+    assert collection == {"type": "FeatureCollection", "bbox": None, "features": []}
+
+
+class TestDayGeojson:
+    def test_events_and_stay(self, trip):
+        day = trip.days.first()
+        EventFactory(
+            trip=trip, day=day, name="Colosseo", latitude=41.89, longitude=12.49
+        )
+        MealFactory(trip=trip, day=day, latitude=41.91, longitude=12.47)
+        missing = EventFactory(trip=trip, day=day)
+        Event.objects.filter(pk=missing.pk).update(latitude=None, longitude=None)
+
+        collection = day_geojson(day)
+
+        assert kinds(collection) == [("experience", 1), ("meal", 1), ("stay", 1)]
+        colosseo = collection["features"][0]
+        assert colosseo["geometry"] == {"type": "Point", "coordinates": [12.49, 41.89]}
+        assert colosseo["properties"]["name"] == "Colosseo"
+        assert collection["bbox"] == [12.47, 41.89, 12.5, 41.91]
+
+    def test_next_day_stay_and_stay_transfer(self, trip):
+        second = trip.days.get(number=2)
+        third = trip.days.get(number=3)
+        StayTransferFactory(
+            from_stay=second.stay, to_stay=third.stay, from_day=second, to_day=third
+        )
+
+        collection = day_geojson(second)
+
+        assert kinds(collection) == [
+            ("stay", 2),
+            ("stay", 2),
+            ("stay_transfer", 2),
+        ]
+        assert collection["features"][1]["properties"]["next_day"] is True
+        line = collection["features"][2]["geometry"]
+        assert line == {
+            "type": "LineString",
+            "coordinates": [[12.5, 41.9], [11.25, 43.77]],
+        }
+
+    def test_simple_transfer(self, trip):
+        day = trip.days.first()
+        start = EventFactory(
+            trip=trip,
+            day=day,
+            latitude=41.89,
+            longitude=12.49,
+            start_time=time(9, 0),
+            end_time=time(10, 0),
+        )
+        end = EventFactory(
+            trip=trip,
+            day=day,
+            latitude=41.9,
+            longitude=12.45,
+            start_time=time(11, 0),
+            end_time=time(12, 0),
+        )
+        SimpleTransferFactory(from_event=start, to_event=end, day=day, trip=trip)
+
+        collection = day_geojson(day)
+
+        assert ("transfer", 1) in kinds(collection)
+
+    def test_transfers_without_coordinates(self, trip):
+        first, second, third = trip.days.all()
+        transfer = SimpleTransferFactory(from_event__trip=trip, from_event__day=first)
+        Event.objects.filter(pk=transfer.to_event_id).update(
+            latitude=None, longitude=None
+        )
+        Stay.objects.filter(pk=third.stay_id).update(latitude=None, longitude=None)
+        StayTransferFactory(
+            from_stay=second.stay, to_stay=third.stay, from_day=second, to_day=third
+        )
+
+        assert "transfer" not in dict(kinds(day_geojson(first)))
+        assert "stay_transfer" not in dict(kinds(day_geojson(second)))
+
+    def test_main_transfers_on_first_and_last_day(self, trip):
+        MainTransferFactory(trip=trip, direction=MainTransfer.Direction.ARRIVAL)
+        MainTransferFactory(trip=trip, direction=MainTransfer.Direction.DEPARTURE)
+
+        first = kinds(day_geojson(trip.days.get(number=1)))
+        middle = kinds(day_geojson(trip.days.get(number=2)))
+        last = kinds(day_geojson(trip.days.get(number=3)))
+
+        assert first[-2:] == [("arrival", 1), ("main_transfer", 1)]
+        assert "arrival" not in dict(middle)
+        assert "departure" not in dict(middle)
+        assert last[-2:] == [("departure", 3), ("main_transfer", 3)]
+
+    def test_main_transfer_without_coordinates(self, trip):
+        MainTransferFactory(
+            trip=trip,
+            direction=MainTransfer.Direction.ARRIVAL,
+            destination_latitude=None,
+            destination_longitude=None,
+        )
+        MainTransferFactory(
+            trip=trip,
+            direction=MainTransfer.Direction.DEPARTURE,
+            destination_latitude=None,
+            destination_longitude=None,
+        )
+
+        # No arrival marker, a departure marker but no journey line
+        assert kinds(day_geojson(trip.days.get(number=1))) == [("stay", 1)]
+        assert kinds(day_geojson(trip.days.get(number=3))) == [
+            ("stay", 3),
+            ("departure", 3),
+        ]
+
+
+class TestTripGeojson:
+    def test_every_day_tagged(self, trip):
+        EventFactory(
+            trip=trip, day=trip.days.get(number=2), latitude=41.89, longitude=12.49
+        )
+        MainTransferFactory(trip=trip, direction=MainTransfer.Direction.DEPARTURE)
+
+        collection = trip_geojson(trip)
+
+        assert kinds(collection)[:5] == [
+            ("stay", 1),
+            ("experience", 2),
+            ("stay", 2),
+            ("stay", 3),
+            ("departure", 3),
+        ]
+
+    def test_query_count_does_not_grow_with_days(self, django_assert_max_num_queries):
+        long_trip = TripFactory(start_date=date(2026, 6, 1), end_date=date(2026, 6, 20))
+        for day in long_trip.days.all():
+            EventFactory(trip=long_trip, day=day, latitude=41.9, longitude=12.5)
+
+        # Days with stays, events, simple/stay/main transfers
+        with django_assert_max_num_queries(5):
+            collection = trip_geojson(long_trip)
+
+        assert len(collection["features"]) == 20
+
+    def test_empty_trip(self):
+        trip = TripFactory()
+        trip.days.all().delete()
+
+        assert trip_geojson(trip)["features"] == []
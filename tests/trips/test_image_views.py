@@ -96,3 +96,31 @@ class TestSearchTripImages:
         response = client.get(reverse("trips:search-images"))
 
         assert response.status_code == 405
+
+
+class TestTripImageStatus:
+    """Tests for trip_image_status polling view"""
+
+    def test_pending(self, client, user_factory, trip_factory):
+        """Test polling continues while the Unsplash cover is ingested"""
+        user = user_factory()
+        trip = trip_factory(
+            author=user,
+            image_metadata={"source": "unsplash", "unsplash_id": "a", "pending": True},
+        )
+        client.force_login(user)
+
+        response = client.get(reverse("trips:trip-image-status", args=[trip.pk]))
+
+        assert response.status_code == 204
+
+    def test_ingested(self, client, user_factory, trip_factory):
+        """Test polling stops and the page reloads once the cover is ready"""
+        user = user_factory()
+        trip = trip_factory(author=user, image_metadata={"source": "unsplash"})
+        client.force_login(user)
+
+        response = client.get(reverse("trips:trip-image-status", args=[trip.pk]))
+
+        assert response.status_code == 286
+        assert response.headers["HX-Refresh"] == "true"
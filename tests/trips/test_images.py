@@ -0,0 +1,392 @@
+"""Tests for the background ingestion and renditions of trip covers"""
+
+from io import BytesIO
+from unittest.mock import patch
+
+import pytest
+from django.core.files.base import ContentFile
+from django.urls import reverse
+from PIL import Image
+
+from tests.trips.factories import TripFactory
+from trips.images import (
+    IMAGE_FORMATS,
+    IMAGE_RENDITIONS,
+    create_image_renditions,
+    delete_image_renditions,
+    ingest_unsplash_photo,
+    pending_unsplash_metadata,
+    rendition_name,
+    schedule_image_processing,
+)
+from trips.models import Trip
+
+pytestmark = pytest.mark.django_db
+
+PHOTO = {"id": "photo123", "links": {"download_location": "https://example.com"}}
+METADATA = {
+    "source": "unsplash",
+    "unsplash_id": "photo123",
+    "photographer": "Test Photographer",
+}
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+@pytest.fixture
+def trip():
+    return TripFactory(image_metadata=pending_unsplash_metadata("photo123"))
+
+
+def jpeg_bytes(size=(30, 20)):
+    output = BytesIO()
+    if size == (30, 20):
+        image = Image.new("RGB", size, "white")
+    else:
+        # Detailed enough for the encoders not to shrink it to nothing
+        image = Image.effect_noise(size, 64).convert("RGB")
+    image.save(output, format="JPEG", quality=90)
+    return output.getvalue()
+
+
+@pytest.fixture
+def covered_trip():
+    """A trip with a stored 1600x1067 cover"""
+    trip = TripFactory(image_metadata={"source": "upload"})
+    trip.image.save("cover.jpg", ContentFile(jpeg_bytes((1600, 1067))))
+    return trip
+
+
+class TestPendingCover:
+    def test_placeholder_while_pending(self, trip):
+        assert trip.image_pending
+        assert trip.get_image_url is None
+        assert not trip.needs_attribution
+
+
+class TestPendingUnsplashMetadata:
+    def test_previous_cover_kept(self):
+        previous = {"source": "upload", "renditions": {"card": {}}}
+
+        metadata = pending_unsplash_metadata("photo123", previous)
+
+        assert metadata["unsplash_id"] == "photo123"
+        assert metadata["previous"] == previous
+
+    def test_picked_again_while_pending(self):
+        previous = {"source": "upload"}
+        first = pending_unsplash_metadata("photo123", previous)
+
+        metadata = pending_unsplash_metadata("photo456", first)
+
+        assert metadata["unsplash_id"] == "photo456"
+        assert metadata["previous"] == previous
+
+
+class TestScheduleImageProcessing:
+    @patch("trips.images.async_task")
+    def test_enqueued_on_commit(
+        self, mock_async_task, trip, django_capture_on_commit_callbacks
+    ):
+        with django_capture_on_commit_callbacks(execute=True):
+            schedule_image_processing(trip, "Paris")
+            mock_async_task.assert_not_called()
+
+        mock_async_task.assert_called_once_with(
+            "trips.tasks.ingest_trip_image",
+            trip.pk,
+            "photo123",
+            "Paris",
+            task_name=f"trip {trip.pk} image photo123",
+        )
+
+    @patch("trips.images.async_task")
+    def test_nothing_pending(self, mock_async_task, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            schedule_image_processing(TripFactory(), "Paris")
+
+        mock_async_task.assert_not_called()
+
+    @patch("trips.images.async_task")
+    def test_renditions_enqueued(
+        self, mock_async_task, covered_trip, django_capture_on_commit_callbacks
+    ):
+        with django_capture_on_commit_callbacks(execute=True):
+            schedule_image_processing(covered_trip)
+
+        mock_async_task.assert_called_once_with(
+            "trips.tasks.render_trip_image",
+            covered_trip.pk,
+            covered_trip.image.name,
+            task_name=f"trip {covered_trip.pk} renditions",
+        )
+
+    @patch("trips.images.async_task")
+    def test_renditions_already_created(
+        self, mock_async_task, covered_trip, django_capture_on_commit_callbacks
+    ):
+        create_image_renditions(covered_trip.pk, covered_trip.image.name)
+        covered_trip.refresh_from_db()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            schedule_image_processing(covered_trip)
+
+        mock_async_task.assert_not_called()
+
+
+@patch("trips.images.get_unsplash_photo", return_value=PHOTO)
+@patch("trips.images.download_unsplash_photo")
+class TestIngestUnsplashPhoto:
+    def test_ingest(self, mock_download, mock_photo, trip):
+        mock_download.return_value = (jpeg_bytes(), METADATA)
+
+        assert ingest_unsplash_photo(trip.pk, "photo123", "Paris") is True
+
+        mock_photo.assert_called_once_with("photo123", "Paris")
+        trip.refresh_from_db()
+        renditions = trip.image_metadata.pop("renditions")
+        assert trip.image_metadata == METADATA
+        assert set(renditions) == set(IMAGE_RENDITIONS)
+        assert trip.image.name.endswith(".jpg")
+        assert trip.get_image_url == trip.image.url
+        assert trip.needs_attribution
+
+    def test_selection_replaced(self, mock_download, mock_photo, trip):
+        Trip.objects.filter(pk=trip.pk).update(
+            image_metadata=pending_unsplash_metadata("photo456")
+        )
+
+        assert ingest_unsplash_photo(trip.pk, "photo123") is False
+
+        mock_photo.assert_not_called()
+        trip.refresh_from_db()
+        assert trip.image_metadata["unsplash_id"] == "photo456"
+
+    def test_download_failed(self, mock_download, mock_photo, trip):
+        mock_download.return_value = (None, None)
+
+        assert ingest_unsplash_photo(trip.pk, "photo123") is False
+
+        trip.refresh_from_db()
+        assert trip.image_metadata == {}
+        assert not trip.image
+
+    def test_download_failed_keeps_previous_cover(
+        self, mock_download, mock_photo, covered_trip, media_root
+    ):
+        image_name = covered_trip.image.name
+        create_image_renditions(covered_trip.pk, image_name)
+        covered_trip.refresh_from_db()
+        previous = covered_trip.image_metadata
+        Trip.objects.filter(pk=covered_trip.pk).update(
+            image_metadata=pending_unsplash_metadata("photo123", previous)
+        )
+        mock_download.return_value = (None, None)
+
+        assert ingest_unsplash_photo(covered_trip.pk, "photo123") is False
+
+        covered_trip.refresh_from_db()
+        assert covered_trip.image_metadata == previous
+        assert covered_trip.image.name == image_name
+        assert covered_trip.get_image_url is not None
+        assert len(stored_renditions(media_root, image_name)) == 6
+
+    def test_photo_not_found(self, mock_download, mock_photo, trip):
+        mock_photo.return_value = None
+
+        assert ingest_unsplash_photo(trip.pk, "photo123") is False
+
+        mock_download.assert_not_called()
+        trip.refresh_from_db()
+        assert not trip.image_pending
+
+    def test_upload_during_download(self, mock_download, mock_photo, trip, media_root):
+        def upload_then_download(photo_data):
+            Trip.objects.filter(pk=trip.pk).update(image_metadata={"source": "upload"})
+            return jpeg_bytes(), METADATA
+
+        mock_download.side_effect = upload_then_download
+
+        assert ingest_unsplash_photo(trip.pk, "photo123") is False
+
+        trip.refresh_from_db()
+        assert trip.image_metadata == {"source": "upload"}
+        # The downloaded file is not left behind
+        assert not [path for path in media_root.rglob("*") if path.is_file()]
+
+
+class TestCreateImageRenditions:
+    def test_renditions(self, covered_trip, media_root):
+        assert create_image_renditions(covered_trip.pk, covered_trip.image.name) == 6
+
+        covered_trip.refresh_from_db()
+        renditions = covered_trip.image_metadata["renditions"]
+        assert covered_trip.image_metadata["source"] == "upload"
+        for rendition, width in IMAGE_RENDITIONS.items():
+            assert renditions[rendition]["width"] == width
+            for image_format in IMAGE_FORMATS:
+                name = renditions[rendition][image_format]
+                assert name == rendition_name(
+                    covered_trip.image.name, rendition, image_format
+                )
+                with Image.open(media_root / name) as img:
+                    assert img.format == image_format.upper()
+                    assert img.size == (width, renditions[rendition]["height"])
+
+    def test_card_smaller_than_cover(self, covered_trip, media_root):
+        create_image_renditions(covered_trip.pk, covered_trip.image.name)
+
+        covered_trip.refresh_from_db()
+        card = covered_trip.image_metadata["renditions"]["card"]
+        cover_size = covered_trip.image.size
+        for image_format in IMAGE_FORMATS:
+            assert (media_root / card[image_format]).stat().st_size < cover_size / 4
+
+    def test_never_upscaled(self, media_root):
+        trip = TripFactory()
+        trip.image.save("small.jpg", ContentFile(jpeg_bytes()))
+
+        create_image_renditions(trip.pk, trip.image.name)
+
+        trip.refresh_from_db()
+        renditions = trip.image_metadata["renditions"]
+        assert {rendition["width"] for rendition in renditions.values()} == {30}
+
+    def test_created_again(self, covered_trip, media_root):
+        create_image_renditions(covered_trip.pk, covered_trip.image.name)
+        create_image_renditions(covered_trip.pk, covered_trip.image.name)
+
+        # Renditions are replaced, not stored under new names
+        files = [path for path in media_root.rglob("*") if path.is_file()]
+        assert len(files) == 7
+
+    def test_cover_already_replaced(self, covered_trip, media_root):
+        assert create_image_renditions(covered_trip.pk, "trips/old.jpg") == 0
+
+        covered_trip.refresh_from_db()
+        assert "renditions" not in covered_trip.image_metadata
+
+    def test_cover_replaced_while_rendering(self, covered_trip, media_root):
+        def replace_cover(image_name, rendition, image_format):
+            Trip.objects.filter(pk=covered_trip.pk).update(
+                image="trips/new.jpg", image_metadata={"source": "upload"}
+            )
+            return f"{rendition}.{image_format}"
+
+        with patch("trips.images.rendition_name", side_effect=replace_cover):
+            assert (
+                create_image_renditions(covered_trip.pk, covered_trip.image.name) == 0
+            )
+
+        covered_trip.refresh_from_db()
+        assert covered_trip.image_metadata == {"source": "upload"}
+        # Only the cover is left, the renditions are removed
+        files = [path for path in media_root.rglob("*") if path.is_file()]
+        assert len(files) == 1
+
+
+def stored_renditions(media_root, image_name):
+    names = [
+        rendition_name(image_name, rendition, image_format)
+        for rendition in IMAGE_RENDITIONS
+        for image_format in IMAGE_FORMATS
+    ]
+    return [name for name in names if (media_root / name).exists()]
+
+
+class TestDeleteImageRenditions:
+    def test_deleted(self, covered_trip, media_root):
+        create_image_renditions(covered_trip.pk, covered_trip.image.name)
+
+        assert delete_image_renditions(covered_trip.image.name) == 6
+        assert delete_image_renditions(covered_trip.image.name) == 0
+        assert delete_image_renditions("") == 0
+
+        assert not stored_renditions(media_root, covered_trip.image.name)
+        assert (media_root / covered_trip.image.name).exists()
+
+    @patch("trips.images.get_unsplash_photo", return_value=PHOTO)
+    @patch("trips.images.download_unsplash_photo")
+    def test_replaced_by_unsplash_photo(
+        self, mock_download, mock_photo, covered_trip, media_root
+    ):
+        old_image = covered_trip.image.name
+        create_image_renditions(covered_trip.pk, old_image)
+        Trip.objects.filter(pk=covered_trip.pk).update(
+            image_metadata=pending_unsplash_metadata("photo123")
+        )
+        mock_download.return_value = (jpeg_bytes(), METADATA)
+
+        assert ingest_unsplash_photo(covered_trip.pk, "photo123") is True
+
+        covered_trip.refresh_from_db()
+        assert not stored_renditions(media_root, old_image)
+        assert len(stored_renditions(media_root, covered_trip.image.name)) == 6
+
+    def test_trip_deleted(
+        self, covered_trip, media_root, django_capture_on_commit_callbacks
+    ):
+        create_image_renditions(covered_trip.pk, covered_trip.image.name)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            covered_trip.delete()
+
+        assert not stored_renditions(media_root, covered_trip.image.name)
+
+    @patch("geocoder.mapbox")
+    def test_cover_cleared(
+        self,
+        mock_geocoder,
+        client,
+        covered_trip,
+        media_root,
+        django_capture_on_commit_callbacks,
+    ):
+        mock_geocoder.return_value.latlng = [48.8566, 2.3522]
+        old_image = covered_trip.image.name
+        create_image_renditions(covered_trip.pk, old_image)
+        client.force_login(covered_trip.author)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response = client.post(
+                reverse("trips:trip-update", args=[covered_trip.pk]),
+                {
+                    "title": covered_trip.title,
+                    "destination": "Paris",
+                    "start_date": covered_trip.start_date,
+                    "end_date": covered_trip.end_date,
+                    "image-clear": "on",
+                },
+            )
+
+        assert response.status_code == 204
+        covered_trip.refresh_from_db()
+        assert not covered_trip.image
+        assert not stored_renditions(media_root, old_image)
+
+
+class TestTripPicture:
+    def test_sources_rendered(self, client, covered_trip):
+        create_image_renditions(covered_trip.pk, covered_trip.image.name)
+        client.force_login(covered_trip.author)
+
+        response = client.get(reverse("trips:trip-detail", args=[covered_trip.pk]))
+
+        content = response.content.decode()
+        assert '<source type="image/avif"' in content
+        assert '<source type="image/webp"' in content
+        assert f'src="{covered_trip.image.url}"' in content
+
+    def test_placeholder_without_cover(self, client):
+        trip = TripFactory()
+        client.force_login(trip.author)
+
+        response = client.get(reverse("trips:trip-detail", args=[trip.pk]))
+
+        content = response.content.decode()
+        assert "<source" not in content
+        assert "img/trip_generic_detail.jpg" in content
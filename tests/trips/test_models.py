@@ -4,10 +4,13 @@ from unittest.mock import patch
 
 import pytest
 from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
 
 from trips.models import (
     Event,
     Experience,
+    GeocodeResult,
     Meal,
     SimpleTransfer,
     Stay,
@@ -254,6 +257,56 @@ class TestDayModel:
         assert last_day.number == 4
         assert last_day.date == date.today() + timedelta(days=3)
 
+    def test_days_untouched_when_dates_unchanged(
+        self, trip_factory, django_assert_num_queries
+    ):
+        """Test saves that keep the dates do not touch the days"""
+        trip = trip_factory(
+            start_date=date.today(), end_date=date.today() + timedelta(days=2)
+        )
+        trip = type(trip).objects.get(pk=trip.pk)
+
+        trip.title = "Renamed"
+        with django_assert_num_queries(1):
+            trip.save()
+        with django_assert_num_queries(1):
+            trip.save(update_fields=["status"])
+
+        assert trip.days.count() == 3
+
+    def test_days_follow_dates_after_refresh(self, trip_factory):
+        """Test refresh_from_db resets the stored dates"""
+        trip = trip_factory(
+            start_date=date.today(), end_date=date.today() + timedelta(days=2)
+        )
+        type(trip).objects.filter(pk=trip.pk).update(title="Renamed")
+        trip.refresh_from_db(fields=["title"])
+        trip.end_date = date.today() + timedelta(days=1)
+        trip.save()
+        trip.refresh_from_db()
+
+        assert trip._saved_dates == (trip.start_date, trip.end_date)
+        assert trip.days.count() == 2
+
+    def test_days_shifted_in_bulk(self, trip_factory, django_assert_num_queries):
+        """Test a date change costs the same queries for any trip length"""
+        trip = trip_factory(start_date=date(2026, 1, 1), end_date=date(2026, 3, 31))
+        trip = type(trip).objects.get(pk=trip.pk)
+
+        # Drop the first 10 days, renumber the rest, add 10 at the end:
+        # save, select days, one delete (collector select and cascades),
+        # one bulk_update and one bulk_create
+        trip.start_date = date(2026, 1, 11)
+        trip.end_date = date(2026, 4, 10)
+        with django_assert_num_queries(9):
+            trip.save()
+
+        days = list(trip.days.all())
+        assert len(days) == 90
+        assert [day.number for day in days] == list(range(1, 91))
+        assert days[0].date == date(2026, 1, 11)
+        assert days[-1].date == date(2026, 4, 10)
+
 
 class TestLinkModel:
     def test_factory(self, user_factory, trip_factory, link_factory):
@@ -289,7 +342,13 @@ class TestEventModel:
         assert event.day.trip == trip
 
     @patch("geocoder.mapbox")
-    def test_save_updates_coordinates(self, mock_geocoder, user_factory, trip_factory):
+    def test_save_updates_coordinates(
+        self,
+        mock_geocoder,
+        user_factory,
+        trip_factory,
+        django_capture_on_commit_callbacks,
+    ):
         # Setup mock response
         mock_geocoder.return_value.latlng = [45.4773, 9.1815]
 
@@ -299,15 +358,18 @@ class TestEventModel:
 
         mock_geocoder.reset_mock()
 
-        event = Event.objects.create(
-            day=day,
-            name="Test Event",
-            start_time="10:00",
-            end_time="11:00",
-            address="Milan, Italy",
-        )
+        with django_capture_on_commit_callbacks(execute=True):
+            event = Event.objects.create(
+                day=day,
+                name="Test Event",
+                start_time="10:00",
+                end_time="11:00",
+                address="Milan, Italy",
+            )
 
-        # Verify the coordinates were set from the mock response
+        # Coordinates are resolved by the background job
+        event.refresh_from_db()
+        assert event.geocoding_pending is False
         assert event.latitude == 45.4773
         assert event.longitude == 9.1815
         mock_geocoder.assert_called_once_with(
@@ -424,15 +486,18 @@ class TestEventModel:
         assert event.trip == trip2
 
     @patch("geocoder.mapbox")
-    def test_event_geocoding_on_save(self, mock_geocoder, event_factory):
+    def test_event_geocoding_on_save(
+        self, mock_geocoder, event_factory, django_capture_on_commit_callbacks
+    ):
         mock_geocoder.return_value.latlng = [41.890251, 12.492373]  # Colosseum
-        event = event_factory(
-            address="Colosseum", city="Roma", latitude=None, longitude=None
-        )
-        event.save()
+        with django_capture_on_commit_callbacks(execute=True):
+            event = event_factory(
+                address="Colosseum", city="Roma", latitude=None, longitude=None
+            )
         mock_geocoder.assert_called_once_with(
             "Colosseum, Roma", access_token=settings.MAPBOX_ACCESS_TOKEN
         )
+        event.refresh_from_db()
         assert event.latitude == 41.890251
         assert event.longitude == 12.492373
 
@@ -505,6 +570,158 @@ class TestMealModel:
         assert experience.type == Meal.Type.LUNCH
 
 
+class TestGeocodeResultModel:
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        cache.clear()
+        yield
+        cache.clear()
+
+    def test_store_and_lookup_normalized_query(self):
+        GeocodeResult.objects.store_latlng("Via Roma 1,  MILANO", [45.4642, 9.19])
+
+        assert GeocodeResult.objects.lookup_latlng(" via roma 1, milano") == (
+            45.4642,
+            9.19,
+        )
+        entry = GeocodeResult.objects.get()
+        assert str(entry) == "via roma 1, milano (Mapbox)"
+        assert GeocodeResult.objects.stats() == {"hits": 1, "misses": 0, "size": 1}
+
+    def test_lookup_refreshes_stale_last_use_only(self, django_assert_num_queries):
+        GeocodeResult.objects.store_latlng("Via Roma 1", [45.4642, 9.19])
+
+        with django_assert_num_queries(1):
+            GeocodeResult.objects.lookup_latlng("Via Roma 1")
+        assert GeocodeResult.objects.get().hits == 0
+
+        stale = timezone.now() - GeocodeResult.objects.LAST_USED_RESOLUTION
+        GeocodeResult.objects.update(last_used_at=stale - timedelta(minutes=1))
+        with django_assert_num_queries(2):
+            GeocodeResult.objects.lookup_latlng("Via Roma 1")
+
+        entry = GeocodeResult.objects.get()
+        assert entry.hits == 1
+        assert entry.last_used_at > stale
+        assert GeocodeResult.objects.stats()["hits"] == 2
+
+    def test_lookup_miss_and_expired_entry(self):
+        GeocodeResult.objects.store_latlng("Via Roma 1", [45.4642, 9.19])
+        GeocodeResult.objects.update(
+            created_at=timezone.now() - GeocodeResult.objects.STORE_TTL
+        )
+
+        assert GeocodeResult.objects.lookup_latlng("Via Roma 1") is None
+        assert GeocodeResult.objects.lookup_latlng("Via Milano 2") is None
+        assert GeocodeResult.objects.stats()["misses"] == 2
+
+    def test_store_updates_existing_entry(self):
+        GeocodeResult.objects.store_latlng("Via Roma 1", [1, 1])
+        GeocodeResult.objects.store_latlng("via roma 1", [2, 2])
+
+        assert GeocodeResult.objects.count() == 1
+        assert GeocodeResult.objects.lookup_latlng("Via Roma 1") == (2, 2)
+
+    def test_providers_are_kept_apart(self):
+        GeocodeResult.objects.store_latlng("Colosseum, Roma", [41.89, 12.49])
+
+        assert (
+            GeocodeResult.objects.lookup(
+                GeocodeResult.Provider.NOMINATIM, "Colosseum, Roma"
+            )
+            is None
+        )
+
+    def test_evicts_least_recently_used_over_limit(self, monkeypatch):
+        monkeypatch.setattr(GeocodeResult.objects, "MAX_ENTRIES", 2)
+        GeocodeResult.objects.store_latlng("first", [1, 1])
+        GeocodeResult.objects.store_latlng("second", [2, 2])
+        GeocodeResult.objects.filter(query="first").update(
+            last_used_at=timezone.now() + timedelta(minutes=1)
+        )
+
+        GeocodeResult.objects.store_latlng("third", [3, 3])
+        # Storing never evicts, the scheduled task does
+        assert GeocodeResult.objects.count() == 3
+
+        assert GeocodeResult.objects.evict() == 1
+        assert set(GeocodeResult.objects.values_list("query", flat=True)) == {
+            "first",
+            "third",
+        }
+
+    def test_evicts_expired_entries(self):
+        GeocodeResult.objects.store_latlng("old", [1, 1])
+        GeocodeResult.objects.update(
+            created_at=timezone.now() - GeocodeResult.objects.STORE_TTL
+        )
+
+        GeocodeResult.objects.store_latlng("new", [2, 2])
+
+        assert GeocodeResult.objects.evict() == 1
+        assert list(GeocodeResult.objects.values_list("query", flat=True)) == ["new"]
+
+    def test_counter_recovers_from_evicted_cache_key(self):
+        with patch("trips.models.cache.incr", side_effect=ValueError):
+            GeocodeResult.objects.lookup_latlng("missing")
+
+        assert cache.get(GeocodeResult.objects.MISSES_KEY) == 1
+
+    @patch("trips.models.schedule_geocoding")
+    def test_stay_save_uses_stored_coordinates(self, mock_schedule, stay_factory):
+        GeocodeResult.objects.store_latlng("Colosseum, Roma", [41.89, 12.49])
+
+        stay = stay_factory(address="Colosseum", city="Roma", latitude=None)
+
+        assert (stay.latitude, stay.longitude) == (41.89, 12.49)
+        assert stay.geocoding_pending is False
+        mock_schedule.assert_not_called()
+
+    @patch("trips.models.schedule_geocoding")
+    def test_event_save_uses_stored_coordinates(self, mock_schedule, event_factory):
+        GeocodeResult.objects.store_latlng("Colosseum, Roma", [41.89, 12.49])
+
+        event = event_factory(address="Colosseum", city="Roma", latitude=None)
+
+        assert (event.latitude, event.longitude) == (41.89, 12.49)
+        assert event.geocoding_pending is False
+        assert event.geocoding_requested_at is None
+        mock_schedule.assert_not_called()
+
+    @patch("trips.models.schedule_geocoding")
+    def test_pending_row_keyed_by_normalized_address(self, mock_schedule, stay_factory):
+        stay = stay_factory(address="  COLOSSEUM", city="Roma", latitude=None)
+
+        assert stay.geocoding_pending is True
+        assert stay.geocoding_query == "colosseum, roma"
+        assert stay.geocoding_requested_at is not None
+        mock_schedule.assert_called_once_with("  COLOSSEUM, Roma")
+
+    @patch("trips.models.schedule_geocoding")
+    def test_main_transfer_save_uses_stored_coordinates(
+        self, mock_schedule, trip_factory
+    ):
+        from trips.models import MainTransfer
+
+        GeocodeResult.objects.store_latlng("Piazza Duomo, Milano", [45.46, 9.19])
+        GeocodeResult.objects.store_latlng("Via Roma 123, Milano", [45.47, 9.18])
+
+        transfer = MainTransfer.objects.create(
+            trip=trip_factory(),
+            type=MainTransfer.Type.CAR,
+            direction=MainTransfer.Direction.ARRIVAL,
+            origin_address="Piazza Duomo, Milano",
+            destination_address="Via Roma 123, Milano",
+            start_time="10:00",
+            end_time="12:00",
+        )
+
+        assert (transfer.origin_latitude, transfer.origin_longitude) == (45.46, 9.19)
+        assert transfer.destination_latitude == 45.47
+        assert transfer.geocoding_pending is False
+        mock_schedule.assert_not_called()
+
+
 class TestStayModel:
     def test_factory(self, user_factory, trip_factory, stay_factory):
         """Test stay model factory"""
@@ -522,18 +739,27 @@ class TestStayModel:
         assert stay.days.first().trip == trip
 
     @patch("geocoder.mapbox")
-    def test_save_updates_coordinates(self, mock_geocoder, user_factory, trip_factory):
+    def test_save_updates_coordinates(
+        self,
+        mock_geocoder,
+        user_factory,
+        trip_factory,
+        django_capture_on_commit_callbacks,
+    ):
         mock_geocoder.return_value.latlng = [45.4773, 9.1815]
 
-        stay = Stay.objects.create(
-            name="Grand Hotel Milano",
-            check_in="14:00",
-            check_out="11:00",
-            phone_number="+393334445566",
-            address="Via Example 123",
-            city="Milan",
-        )
+        with django_capture_on_commit_callbacks(execute=True):
+            stay = Stay.objects.create(
+                name="Grand Hotel Milano",
+                check_in="14:00",
+                check_out="11:00",
+                phone_number="+393334445566",
+                address="Via Example 123",
+                city="Milan",
+            )
 
+        stay.refresh_from_db()
+        assert stay.geocoding_pending is False
         assert stay.latitude == 45.4773
         assert stay.longitude == 9.1815
         mock_geocoder.assert_called_once_with(
@@ -616,34 +842,41 @@ class TestStayModel:
         assert stay.longitude is None
 
     @patch("geocoder.mapbox")
-    def test_stay_geocoding_on_save(self, mock_geocoder, stay_factory):
+    def test_stay_geocoding_on_save(
+        self, mock_geocoder, stay_factory, django_capture_on_commit_callbacks
+    ):
         mock_geocoder.return_value.latlng = [41.890251, 12.492373]  # Colosseum
-        stay = stay_factory(
-            address="Colosseum", city="Roma", latitude=None, longitude=None
-        )
-        stay.save()
+        with django_capture_on_commit_callbacks(execute=True):
+            stay = stay_factory(
+                address="Colosseum", city="Roma", latitude=None, longitude=None
+            )
         mock_geocoder.assert_called_once_with(
             "Colosseum, Roma", access_token=settings.MAPBOX_ACCESS_TOKEN
         )
+        stay.refresh_from_db()
         assert stay.latitude == 41.890251
         assert stay.longitude == 12.492373
 
     @patch("geocoder.mapbox")
-    def test_stay_geocoding_without_city(self, mock_geocoder):
+    def test_stay_geocoding_without_city(
+        self, mock_geocoder, django_capture_on_commit_callbacks
+    ):
         """Test geocoding uses only address when city is empty"""
         mock_geocoder.return_value.latlng = [45.4642, 9.1900]
 
-        stay = Stay.objects.create(
-            name="Hotel Test",
-            address="Via Roma 123",
-            city="",  # Empty city
-            latitude=None,
-            longitude=None,
-        )
+        with django_capture_on_commit_callbacks(execute=True):
+            stay = Stay.objects.create(
+                name="Hotel Test",
+                address="Via Roma 123",
+                city="",  # Empty city
+                latitude=None,
+                longitude=None,
+            )
 
         mock_geocoder.assert_called_once_with(
             "Via Roma 123", access_token=settings.MAPBOX_ACCESS_TOKEN
         )
+        stay.refresh_from_db()
         assert stay.latitude == 45.4642
         assert stay.longitude == 9.1900
 
@@ -968,7 +1201,9 @@ class TestMainTransferModel:
         assert transfer.type == MainTransfer.Type.CAR
 
     @patch("geocoder.mapbox")
-    def test_main_transfer_car_geocoding_origin(self, mock_geocoder, trip_factory):
+    def test_main_transfer_car_geocoding_origin(
+        self, mock_geocoder, trip_factory, django_capture_on_commit_callbacks
+    ):
         """Test that car transfers geocode origin_address"""
         from trips.models import MainTransfer
 
@@ -976,19 +1211,22 @@ class TestMainTransferModel:
 
         trip = trip_factory()
 
-        transfer = MainTransfer.objects.create(
-            trip=trip,
-            type=MainTransfer.Type.CAR,
-            direction=MainTransfer.Direction.ARRIVAL,
-            origin_name="",
-            destination_name="",
-            origin_address="Piazza Duomo, Milano",
-            destination_address="Via Roma 123, Milano",
-            destination_latitude=45.4773,
-            destination_longitude=9.1815,
-            start_time="10:00",
-            end_time="12:00",
-        )
+        with django_capture_on_commit_callbacks(execute=True):
+            transfer = MainTransfer.objects.create(
+                trip=trip,
+                type=MainTransfer.Type.CAR,
+                direction=MainTransfer.Direction.ARRIVAL,
+                origin_name="",
+                destination_name="",
+                origin_address="Piazza Duomo, Milano",
+                destination_address="Via Roma 123, Milano",
+                destination_latitude=45.4773,
+                destination_longitude=9.1815,
+                start_time="10:00",
+                end_time="12:00",
+            )
+
+        transfer.refresh_from_db()
 
         # Check that geocoding was called for origin
         assert transfer.origin_latitude == 45.4642
@@ -999,7 +1237,7 @@ class TestMainTransferModel:
 
     @patch("geocoder.mapbox")
     def test_main_transfer_other_geocoding_destination(
-        self, mock_geocoder, trip_factory
+        self, mock_geocoder, trip_factory, django_capture_on_commit_callbacks
     ):
         """Test that other transfers geocode destination_address"""
         from trips.models import MainTransfer
@@ -1008,19 +1246,22 @@ class TestMainTransferModel:
 
         trip = trip_factory()
 
-        transfer = MainTransfer.objects.create(
-            trip=trip,
-            type=MainTransfer.Type.OTHER,
-            direction=MainTransfer.Direction.DEPARTURE,
-            origin_name="",
-            destination_name="",
-            origin_address="Piazza Duomo, Milano",
-            origin_latitude=45.4642,
-            origin_longitude=9.1900,
-            destination_address="Via Roma 123, Milano",
-            start_time="14:00",
-            end_time="16:00",
-        )
+        with django_capture_on_commit_callbacks(execute=True):
+            transfer = MainTransfer.objects.create(
+                trip=trip,
+                type=MainTransfer.Type.OTHER,
+                direction=MainTransfer.Direction.DEPARTURE,
+                origin_name="",
+                destination_name="",
+                origin_address="Piazza Duomo, Milano",
+                origin_latitude=45.4642,
+                origin_longitude=9.1900,
+                destination_address="Via Roma 123, Milano",
+                start_time="14:00",
+                end_time="16:00",
+            )
+
+        transfer.refresh_from_db()
 
         # Check that geocoding was called for destination
         assert transfer.destination_latitude == 45.4773
@@ -0,0 +1,194 @@
+"""Tests for the per-user cache of trip list and home fragments"""
+
+import pytest
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from tests.trips.factories import (
+    EventFactory,
+    MainTransferFactory,
+    StayFactory,
+    TripFactory,
+)
+from trips.models import Trip
+from trips.page_cache import invalidate_user_pages, pages_version
+from trips.utils import home_fragments_cached
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def trip():
+    return TripFactory(title="Rome weekend")
+
+
+def trip_queries(client, url, **extra):
+    """Response of a GET and the SQL of the queries reading trips"""
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url, **extra)
+    return response, [
+        query["sql"] for query in queries if 'FROM "trips_trip"' in query["sql"]
+    ]
+
+
+class TestPagesVersion:
+    def test_stable_until_invalidated(self, trip):
+        version = pages_version(trip.author_id)
+        assert pages_version(trip.author_id) == version
+
+        invalidate_user_pages(trip.author_id)
+
+        assert pages_version(trip.author_id) != version
+
+    def test_trip_saved(self, trip):
+        version = pages_version(trip.author_id)
+
+        trip.title = "Rome long weekend"
+        trip.save()
+
+        assert pages_version(trip.author_id) != version
+
+    def test_trip_deleted(self, trip):
+        version = pages_version(trip.author_id)
+
+        trip.delete()
+
+        assert pages_version(trip.author_id) != version
+
+    def test_profile_saved(self, trip):
+        other_trip = TripFactory()
+        version = pages_version(trip.author_id)
+        other_version = pages_version(other_trip.author_id)
+
+        trip.author.profile.trip_sort_preference = "name_asc"
+        trip.author.profile.save()
+
+        assert pages_version(trip.author_id) != version
+        assert pages_version(other_trip.author_id) == other_version
+
+
+class TestTripListCache:
+    def test_cache_hit(self, client, trip):
+        client.force_login(trip.author)
+        url = reverse("trips:trip-list")
+
+        response, queries = trip_queries(client, url)
+        assert len(queries) == 2
+        assert "Rome weekend" in response.content.decode()
+
+        response, queries = trip_queries(client, url)
+        assert queries == []
+        assert "Rome weekend" in response.content.decode()
+
+    def test_htmx_partial_shares_the_fragment(self, client, trip):
+        client.force_login(trip.author)
+        url = reverse("trips:trip-list")
+        client.get(url)
+
+        response, queries = trip_queries(client, url, headers={"HX-Request": "true"})
+
+        assert queries == []
+        assert "Rome weekend" in response.content.decode()
+
+    def test_trip_changed(self, client, trip):
+        client.force_login(trip.author)
+        url = reverse("trips:trip-list")
+        client.get(url)
+
+        trip.title = "Rome long weekend"
+        trip.save()
+        response, queries = trip_queries(client, url)
+
+        assert len(queries) == 2
+        assert "Rome long weekend" in response.content.decode()
+
+    def test_cached_per_language(self, client, trip):
+        client.force_login(trip.author)
+
+        client.get(reverse("trips:trip-list"), headers={"Accept-Language": "en"})
+
+        version = pages_version(trip.author_id)
+        assert cache.get(make_template_fragment_key("trip-list", [version, "en"]))
+        assert not cache.get(make_template_fragment_key("trip-list", [version, "it"]))
+
+    def test_cached_per_user(self, client, trip):
+        other_trip = TripFactory(title="Paris getaway")
+        client.force_login(trip.author)
+        client.get(reverse("trips:trip-list"))
+
+        client.force_login(other_trip.author)
+        response = client.get(reverse("trips:trip-list"))
+
+        content = response.content.decode()
+        assert "Paris getaway" in content
+        assert "Rome weekend" not in content
+
+
+class TestHomeCache:
+    def test_other_trips_cached(self, client, trip):
+        TripFactory(author=trip.author, title="Paris getaway")
+        client.force_login(trip.author)
+        url = reverse("trips:home")
+
+        response, queries = trip_queries(client, url)
+        assert len(queries) == 2
+
+        response, queries = trip_queries(client, url)
+        # Only the shown trip, its days and events are not cached
+        assert len(queries) == 1
+        content = response.content.decode()
+        assert "Rome weekend" in content
+        assert "Paris getaway" in content
+
+    def test_hit_skips_trip_detail(self, client, trip, django_assert_num_queries):
+        days = list(trip.days.all())
+        trip.days.update(stay=StayFactory())
+        EventFactory(day=days[0], name="Colosseum")
+        MainTransferFactory(trip=trip)
+        client.force_login(trip.author)
+        url = reverse("trips:home")
+        client.get(url)
+
+        # Session, user, profile, shown trip, its days and unpaired events
+        with django_assert_num_queries(6):
+            response = client.get(url)
+
+        content = response.content.decode()
+        assert "Rome weekend" in content
+        assert "Colosseum" in content
+
+    def test_day_changed(self, client, trip):
+        event = EventFactory(day=trip.days.first(), name="Colosseum")
+        client.force_login(trip.author)
+        url = reverse("trips:home")
+        client.get(url)
+
+        event.name = "Colosseum by night"
+        event.save()
+        response = client.get(url)
+
+        assert "Colosseum by night" in response.content.decode()
+
+    def test_map_view_not_from_cache(self, trip):
+        assert not home_fragments_cached(trip.author, trip, show_map=True)
+
+    def test_archived_favourite_without_transfers(self, client, trip):
+        Trip.objects.filter(pk=trip.pk).update(status=Trip.Status.ARCHIVED)
+        trip.author.profile.fav_trip = trip
+        trip.author.profile.save()
+        client.force_login(trip.author)
+
+        client.get(reverse("trips:home"))
+
+        trip.refresh_from_db()
+        assert home_fragments_cached(trip.author, trip, show_map=False)
@@ -0,0 +1,186 @@
+"""Tests for the cached Google Places client"""
+
+from unittest.mock import Mock, patch
+
+import pytest
+import requests
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+
+from tests.trips.factories import ExperienceFactory, StayFactory, TripFactory
+from trips.places import (
+    DETAILS_CACHE_TIMEOUT,
+    PLACE_ID_CACHE_TIMEOUT,
+    PLACES_REQUESTS_PER_SECOND,
+    PLACES_RETRY_AFTER,
+    PlacesError,
+    PlacesRateLimited,
+    claim_places_slot,
+    enrich_place,
+    find_place_id,
+    place_details,
+    wait_for_places_slot,
+)
+
+DETAILS = {
+    "websiteUri": "https://example.com",
+    "internationalPhoneNumber": "+39 06 123456",
+}
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def places_api():
+    with (
+        override_settings(GOOGLE_PLACES_API_KEY="test_key"),
+        patch("trips.places.requests.post") as mock_post,
+        patch("trips.places.requests.get") as mock_get,
+    ):
+        mock_post.return_value.json.return_value = {"places": [{"id": "place_1"}]}
+        mock_get.return_value.json.return_value = DETAILS
+        yield mock_post, mock_get
+
+
+class TestFindPlaceId:
+    def test_cached_by_normalized_query(self, places_api):
+        mock_post, _ = places_api
+
+        assert find_place_id("Hotel Roma  Via Roma 1") == "place_1"
+        assert find_place_id(" hotel roma via ROMA 1") == "place_1"
+
+        assert mock_post.call_count == 1
+
+    def test_ttl(self, places_api):
+        with patch("trips.places.cache.set") as mock_set:
+            find_place_id("Hotel Roma")
+
+        assert mock_set.call_args.args[1:] == ("place_1", PLACE_ID_CACHE_TIMEOUT)
+
+    def test_no_match_not_cached(self, places_api):
+        mock_post, _ = places_api
+        mock_post.return_value.json.return_value = {"places": []}
+
+        for _attempt in range(2):
+            with pytest.raises(PlacesError, match="Could not find a matching place"):
+                find_place_id("Nowhere")
+
+        assert mock_post.call_count == 2
+
+    def test_rate_limited(self, places_api):
+        mock_post, _ = places_api
+        exception = requests.HTTPError("429")
+        exception.response = Mock(status_code=429, text="Quota exceeded")
+        mock_post.return_value.raise_for_status.side_effect = exception
+
+        with pytest.raises(PlacesRateLimited, match="API Error: Quota exceeded"):
+            find_place_id("Hotel Roma")
+
+
+class TestWaitForPlacesSlot:
+    @patch("trips.places.time.sleep")
+    @patch("trips.places.time.time", return_value=1000.0)
+    def test_requests_are_spaced(self, mock_time, mock_sleep):
+        for _request in range(3):
+            wait_for_places_slot()
+
+        interval = 1 / PLACES_REQUESTS_PER_SECOND
+        delays = [call.args[0] for call in mock_sleep.call_args_list]
+        assert delays == pytest.approx([interval, 2 * interval])
+
+    @patch("trips.places.time.sleep")
+    @patch("trips.places.time.time", return_value=1000.0)
+    def test_background_lookup_waits(self, mock_time, mock_sleep, places_api):
+        for _slot in range(PLACES_REQUESTS_PER_SECOND):
+            claim_places_slot()
+
+        enrich_place("Hotel Roma", "Via Roma 1", wait=True)
+
+        assert mock_sleep.call_count == 2
+
+
+class TestClaimPlacesSlot:
+    @patch("trips.places.time.sleep")
+    @patch("trips.places.time.time", return_value=1000.0)
+    def test_never_sleeps(self, mock_time, mock_sleep):
+        for _slot in range(PLACES_REQUESTS_PER_SECOND):
+            claim_places_slot()
+
+        with pytest.raises(PlacesRateLimited) as excinfo:
+            claim_places_slot()
+
+        assert excinfo.value.retry_after == PLACES_RETRY_AFTER
+        mock_sleep.assert_not_called()
+
+    @patch("trips.places.time.time", return_value=1000.0)
+    def test_web_lookup_gives_up(self, mock_time, places_api):
+        mock_post, _ = places_api
+        for _slot in range(PLACES_REQUESTS_PER_SECOND):
+            claim_places_slot()
+
+        with pytest.raises(PlacesRateLimited):
+            enrich_place("Hotel Roma", "Via Roma 1")
+
+        mock_post.assert_not_called()
+
+
+class TestPlaceDetails:
+    def test_cached(self, places_api):
+        _, mock_get = places_api
+
+        assert place_details("place_1") == DETAILS
+        assert place_details("place_1") == DETAILS
+
+        assert mock_get.call_count == 1
+
+    def test_ttl(self, places_api):
+        with patch("trips.places.cache.set") as mock_set:
+            place_details("place_1")
+
+        assert mock_set.call_args.args[1:] == (DETAILS, DETAILS_CACHE_TIMEOUT)
+
+
+class TestEnrichPlace:
+    def test_enrich_place(self, places_api):
+        assert enrich_place("Hotel Roma", "Via Roma 1") == {
+            "place_id": "place_1",
+            "website": "https://example.com",
+            "phone_number": "+39 06 123456",
+            "opening_hours": None,
+        }
+
+    def test_no_api_key_even_when_cached(self, places_api):
+        enrich_place("Hotel Roma", "Via Roma 1")
+
+        with override_settings(GOOGLE_PLACES_API_KEY=""):
+            with pytest.raises(PlacesError, match="API key is not configured"):
+                enrich_place("Hotel Roma", "Via Roma 1")
+
+    @pytest.mark.django_db
+    def test_views_share_the_cache(self, client, places_api):
+        """Enriching the same place as a stay then as an event costs a
+        single search and details round-trip"""
+        mock_post, mock_get = places_api
+        trip = TripFactory()
+        stay = StayFactory(name="Hotel Roma", address="Via Roma 1")
+        trip.days.update(stay=stay)
+        event = ExperienceFactory(
+            day=trip.days.first(), trip=trip, name="Hotel Roma", address="Via Roma 1"
+        )
+        client.force_login(trip.author)
+
+        for url in (
+            reverse("trips:enrich-stay", args=[stay.pk]),
+            reverse("trips:enrich-event", args=[event.pk]),
+        ):
+            response = client.post(url)
+            assert response.context["enriched_data"]["place_id"] == "place_1"
+
+        assert mock_post.call_count == 1
+        assert mock_get.call_count == 1
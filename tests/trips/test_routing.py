@@ -0,0 +1,187 @@
+"""Tests for the day route optimizer"""
+
+import datetime
+import random
+
+import numpy as np
+import pytest
+
+from tests.trips.factories import EventFactory, StayFactory, TripFactory
+from trips.models import Event
+from trips.routing import (
+    apply_day_route,
+    haversine_matrix,
+    nearest_neighbor_route,
+    optimize_route,
+    propose_day_route,
+    route_length,
+    two_opt,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+def line_matrix(positions):
+    """Distance matrix of points on a line, handy to reason about routes"""
+    points = np.asarray(positions, dtype=float)
+    return np.abs(points[:, None] - points[None, :])
+
+
+class TestHaversineMatrix:
+    def test_known_distance(self):
+        # Roma Termini - Milano Centrale, about 477 km
+        matrix = haversine_matrix([41.9009, 45.4862], [12.5019, 9.2045])
+
+        assert matrix.shape == (2, 2)
+        assert matrix[0, 0] == matrix[1, 1] == 0
+        assert matrix[0, 1] == matrix[1, 0]
+        assert 470 < matrix[0, 1] < 485
+
+    def test_antipodes(self):
+        matrix = haversine_matrix([0, 0], [0, 180])
+
+        assert matrix[0, 1] == pytest.approx(np.pi * 6371.0088)
+
+
+class TestRouteHeuristics:
+    def test_nearest_neighbor_visits_every_node(self):
+        matrix = line_matrix([0, 5, 1, 4, 2, 3, 6])
+
+        assert nearest_neighbor_route(matrix, 0, 6) == [0, 2, 4, 5, 3, 1, 6]
+
+    def test_nearest_neighbor_round_trip(self):
+        matrix = line_matrix([0, 2, 1])
+
+        assert nearest_neighbor_route(matrix, 0, 0) == [0, 2, 1, 0]
+
+    def test_two_opt_removes_crossing(self):
+        matrix = line_matrix([0, 1, 2, 3, 4])
+        route = two_opt(matrix, [0, 3, 2, 1, 4])
+
+        assert route == [0, 1, 2, 3, 4]
+        assert route_length(matrix, route) == 4
+
+    def test_two_opt_keeps_ends(self):
+        matrix = line_matrix([5, 1, 2, 0])
+        route = two_opt(matrix, [0, 2, 1, 3])
+
+        assert route[0] == 0
+        assert route[-1] == 3
+
+    def test_optimize_many_stops(self):
+        """2-opt never makes the nearest-neighbor route longer"""
+        rng = random.Random(1)
+        latitudes = [41.9 + rng.uniform(-0.1, 0.1) for _ in range(80)]
+        longitudes = [12.5 + rng.uniform(-0.1, 0.1) for _ in range(80)]
+        matrix = haversine_matrix(latitudes, longitudes)
+
+        nn_route = nearest_neighbor_route(matrix, 0, 79)
+        route = optimize_route(matrix, 0, 79)
+
+        assert sorted(route) == list(range(80))
+        assert route[0] == 0
+        assert route[-1] == 79
+        assert route_length(matrix, route) <= route_length(matrix, nn_route)
+        assert route_length(matrix, route) < route_length(matrix, range(80))
+
+
+@pytest.fixture
+def day():
+    trip = TripFactory(
+        start_date=datetime.date(2026, 5, 1), end_date=datetime.date(2026, 5, 2)
+    )
+    return trip.days.first()
+
+
+def add_event(day, name, longitude, hour):
+    return EventFactory(
+        trip=day.trip,
+        day=day,
+        name=name,
+        latitude=41.9,
+        longitude=longitude,
+        start_time=datetime.time(hour, 0),
+        end_time=datetime.time(hour, 30),
+    )
+
+
+class TestProposeDayRoute:
+    def test_orders_events_from_the_stay(self, day):
+        far = add_event(day, "Far", 12.53, 9)
+        near = add_event(day, "Near", 12.51, 10)
+        middle = add_event(day, "Middle", 12.52, 11)
+        StayFactory(latitude=41.9, longitude=12.50, day=day)
+        day.refresh_from_db()
+
+        route = propose_day_route(day)
+
+        assert route["events"] == [near, middle, far]
+        assert route["start"] == route["end"] == day.stay
+        assert route["proposed_km"] < route["current_km"]
+
+    def test_ends_at_next_day_stay(self, day):
+        west = add_event(day, "West", 12.40, 9)
+        east = add_event(day, "East", 12.60, 10)
+        StayFactory(latitude=41.9, longitude=12.50, day=day)
+        next_stay = StayFactory(latitude=41.9, longitude=12.70, day=day.next_day)
+        day.refresh_from_db()
+
+        route = propose_day_route(day)
+
+        assert route["events"] == [west, east]
+        assert route["end"] == next_stay
+
+    def test_without_stay_skips_ungeocoded_events(self, day):
+        a = add_event(day, "A", 12.50, 9)
+        c = add_event(day, "C", 12.52, 10)
+        b = add_event(day, "B", 12.51, 11)
+        missing = add_event(day, "Missing", 12.55, 12)
+        Event.objects.filter(pk=missing.pk).update(latitude=None, longitude=None)
+
+        route = propose_day_route(day)
+
+        assert route["start"] is None
+        assert route["end"] is None
+        assert route["events"] in ([a, b, c], [c, b, a])
+        assert route["proposed_km"] == pytest.approx(1.66, abs=0.01)
+
+
+class TestApplyDayRoute:
+    def test_events_take_the_existing_slots(self, day):
+        first = add_event(day, "First", 12.50, 9)
+        second = add_event(day, "Second", 12.51, 14)
+
+        apply_day_route(day, [second.pk, first.pk])
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        assert second.start_time == datetime.time(9, 0)
+        assert second.end_time == datetime.time(9, 30)
+        assert first.start_time == datetime.time(14, 0)
+        assert first.end_time == datetime.time(14, 30)
+
+    def test_single_transaction(self, day, django_assert_max_num_queries):
+        events = [add_event(day, str(i), 12.5 + i / 100, 8 + i) for i in range(6)]
+
+        # Savepoint, select for update, bulk update, release
+        with django_assert_max_num_queries(4):
+            apply_day_route(day, [event.pk for event in reversed(events)])
+
+        assert list(day.events.values_list("name", flat=True)) == [
+            "5",
+            "4",
+            "3",
+            "2",
+            "1",
+            "0",
+        ]
+
+    def test_rejects_other_events(self, day):
+        event = add_event(day, "Mine", 12.50, 9)
+        other = add_event(day.next_day, "Other", 12.51, 10)
+
+        with pytest.raises(ValueError):
+            apply_day_route(day, [event.pk, other.pk])
+
+        other.refresh_from_db()
+        assert other.start_time == datetime.time(10, 0)
@@ -0,0 +1,132 @@
+"""Tests for the in-memory airport and station search indexes"""
+
+import pytest
+
+from trips.search_index import TextIndex, fold_text
+
+AIRPORTS = [
+    {"iata_code": "CIA", "name": "Ciampino Airport", "city": "Rome"},
+    {"iata_code": "ROM", "name": "Fake Airport", "city": "Elsewhere"},
+    {"iata_code": "FCO", "name": "Leonardo da Vinci–Fiumicino Airport", "city": "Rome"},
+    {"iata_code": "RMA", "name": "Roma Airport", "city": "Roma"},
+    {"iata_code": "XRO", "name": "Aeroporto Bromley", "city": "Bromley"},
+    {"iata_code": "", "name": "Heliport", "city": "Nowhere"},
+]
+
+
+@pytest.fixture
+def index():
+    return TextIndex(
+        AIRPORTS,
+        fields=("iata_code", "name", "city"),
+        exact_fields=("iata_code",),
+        display_field="name",
+    )
+
+
+def codes(results):
+    return [airport["iata_code"] for airport in results]
+
+
+STATIONS = [
+    {"name": "Málaga María Zambrano", "country": "ES"},
+    {"name": "Vélez-Málaga", "country": "ES"},
+    {"name": "Malaga", "country": "IT"},
+    {"name": "Roma Termini", "country": "IT"},
+    {"name": "Roma", "country": "SE"},
+    {"name": "Romanshorn", "country": "CH"},
+    {"name": "Bromma", "country": "SE"},
+]
+
+
+@pytest.fixture
+def station_index():
+    return TextIndex(STATIONS, fields=("name",), group_field="country")
+
+
+def names(results):
+    return [station["name"] for station in results]
+
+
+def test_fold_text():
+    assert fold_text("Vélez-Málaga") == "velez malaga"
+    assert fold_text("  Straße_Nord ") == "strasse nord"
+
+
+class TestTextIndex:
+    def test_exact_code_ranks_before_prefix_and_substring(self, index):
+        # ROM is an exact code, Roma/Rome are prefixes, Bromley a substring
+        assert codes(index.search("rom")) == ["ROM", "RMA", "CIA", "FCO", "XRO"]
+
+    def test_positions_ordered_by_static_rank(self, index):
+        # Shorter display names rank first, ties keep dataset order
+        assert list(index._order[:2]) == [5, 1]
+        assert index.source is AIRPORTS
+
+    def test_empty_records(self):
+        assert TextIndex([], fields=("name",)).search("rome") == []
+
+    def test_whole_word_ranks_before_partial_prefix(self, index):
+        assert codes(index.search("roma")) == ["RMA"]
+        assert codes(index.search("rome")) == ["CIA", "FCO"]
+
+    def test_matches_words_split_on_punctuation(self, index):
+        assert codes(index.search("Fiumicino")) == ["FCO"]
+
+    def test_two_letter_query_uses_bigram_postings(self, index):
+        assert codes(index.search("mp")) == ["CIA"]
+
+    def test_single_letter_query(self, index):
+        assert codes(index.search("x", limit=5)) == ["XRO"]
+
+    def test_substring_not_found(self, index):
+        assert index.search("zzz") == []
+        # Every bigram exists but never together in one record
+        assert index.search("xrma") == []
+        # Candidates share every bigram but not the full substring
+        assert index.search("romar") == []
+
+    def test_limit(self, index):
+        assert len(index.search("a", limit=2)) == 2
+        assert index.search("rome", limit=0) == []
+        assert index.search("   ") == []
+
+
+class TestStationIndex:
+    def test_accents_are_ignored(self, station_index):
+        assert names(station_index.search("malaga")) == [
+            "Malaga",
+            "Vélez-Málaga",
+            "Málaga María Zambrano",
+        ]
+        assert names(station_index.search("VÉLEZ")) == ["Vélez-Málaga"]
+
+    def test_whole_word_then_prefix_then_substring(self, station_index):
+        assert names(station_index.search("roma")) == [
+            "Roma",
+            "Roma Termini",
+            "Romanshorn",
+        ]
+        assert names(station_index.search("rom")) == [
+            "Roma",
+            "Romanshorn",
+            "Roma Termini",
+            "Bromma",
+        ]
+
+    def test_multi_word_query(self, station_index):
+        assert names(station_index.search("roma term")) == ["Roma Termini"]
+        assert names(station_index.search("maria zambrano")) == [
+            "Málaga María Zambrano"
+        ]
+
+    def test_country_filter(self, station_index):
+        assert names(station_index.search("roma", group="se")) == ["Roma"]
+        assert names(station_index.search("malaga", group="ES")) == [
+            "Vélez-Málaga",
+            "Málaga María Zambrano",
+        ]
+        assert station_index.search("malaga", group="FR") == []
+
+    def test_country_is_not_searched(self, station_index):
+        assert station_index.search("se") == []
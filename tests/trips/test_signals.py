@@ -1,7 +1,10 @@
 from datetime import date, timedelta
+from unittest.mock import patch
 
 import pytest
 
+from trips.map_cache import map_version
+
 pytestmark = pytest.mark.django_db
 
 
@@ -40,3 +43,46 @@ class TestStaySignals:
         assert stay2.days.count() == 1
         assert stay1.days.first() == day1
         assert stay2.days.first() == day2
+
+
+class TestMapCacheSignals:
+    def test_event_save_and_delete(self, trip_factory, event_factory):
+        trip = trip_factory()
+        version = map_version(trip.pk)
+
+        event = event_factory(trip=trip)
+        saved = map_version(trip.pk)
+        event.delete()
+
+        assert len({version, saved, map_version(trip.pk)}) == 3
+
+    def test_main_transfer_save(self, trip_factory, main_transfer_factory):
+        trip = trip_factory()
+        version = map_version(trip.pk)
+
+        main_transfer_factory(trip=trip)
+
+        assert map_version(trip.pk) != version
+
+    def test_stay_save_and_delete(self, trip_factory, stay_factory):
+        first_trip = trip_factory()
+        second_trip = trip_factory()
+        stay = stay_factory(day=first_trip.days.first())
+        second_day = second_trip.days.first()
+        second_day.stay = stay
+        second_day.save()
+        versions = (map_version(first_trip.pk), map_version(second_trip.pk))
+
+        stay.save()
+        saved = (map_version(first_trip.pk), map_version(second_trip.pk))
+        stay.delete()
+        deleted = (map_version(first_trip.pk), map_version(second_trip.pk))
+
+        assert versions[0] != saved[0] != deleted[0]
+        assert versions[1] != saved[1] != deleted[1]
+
+    def test_stay_without_days(self, stay_factory):
+        with patch("trips.models.invalidate_trip_maps") as mock_invalidate:
+            stay_factory()
+
+        mock_invalidate.assert_not_called()
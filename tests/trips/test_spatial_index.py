@@ -0,0 +1,81 @@
+"""Tests for the nearest-neighbour index over airports and stations"""
+
+import math
+import random
+
+import pytest
+
+from trips.spatial_index import SpatialIndex, _distance_km, _unit_vector
+
+PLACES = [
+    {"name": "Roma Termini", "latitude": 41.9009, "longitude": 12.5019},
+    {"name": "Roma Tiburtina", "latitude": 41.9106, "longitude": 12.5306},
+    {"name": "Fiumicino", "latitude": 41.8003, "longitude": 12.2389},
+    {"name": "Milano Centrale", "latitude": 45.4862, "longitude": 9.2045},
+    {"name": "Suva", "latitude": -18.1416, "longitude": 179.9},
+    {"name": "Taveuni", "latitude": -16.69, "longitude": -179.88},
+]
+
+
+@pytest.fixture
+def index():
+    return SpatialIndex(PLACES, cell_km=10)
+
+
+def names(results):
+    return [place["name"] for place in results]
+
+
+class TestSpatialIndex:
+    def test_nearest_first_with_distance(self, index):
+        results = index.nearest(41.9, 12.5, k=2)
+
+        assert names(results) == ["Roma Termini", "Roma Tiburtina"]
+        assert results[0]["distance_km"] == 0.2
+        # Records are copied, the source is never modified
+        assert "distance_km" not in PLACES[0]
+
+    def test_radius_limits_results(self, index):
+        assert names(index.nearest(41.9, 12.5, k=5, max_km=10)) == [
+            "Roma Termini",
+            "Roma Tiburtina",
+        ]
+        assert names(index.nearest(41.9, 12.5, k=5, max_km=30)) == [
+            "Roma Termini",
+            "Roma Tiburtina",
+            "Fiumicino",
+        ]
+        assert index.nearest(0, 0, max_km=500) == []
+
+    def test_across_the_antimeridian(self, index):
+        assert names(index.nearest(-16.8, -179.9, k=2, max_km=300)) == [
+            "Taveuni",
+            "Suva",
+        ]
+
+    def test_where_filters_indexed_records(self):
+        index = SpatialIndex(PLACES, where=lambda place: "Roma" not in place["name"])
+
+        assert names(index.nearest(41.9, 12.5, k=1)) == ["Fiumicino"]
+
+    def test_no_results_for_zero_k(self, index):
+        assert index.nearest(41.9, 12.5, k=0) == []
+
+    def test_matches_brute_force(self):
+        rng = random.Random(8)
+        points = [
+            {"latitude": rng.uniform(35, 60), "longitude": rng.uniform(-10, 30)}
+            for _ in range(2000)
+        ]
+        index = SpatialIndex(points, cell_km=20)
+
+        for _ in range(25):
+            lat, lon = rng.uniform(35, 60), rng.uniform(-10, 30)
+            query = _unit_vector(lat, lon)
+            expected = sorted(
+                (math.dist(query, _unit_vector(p["latitude"], p["longitude"])), row)
+                for row, p in enumerate(points)
+            )
+            expected = [row for chord, row in expected if _distance_km(chord) <= 150]
+            positions = [row for _, row in index.nearest_positions(lat, lon, 5, 150)]
+            assert positions == expected[:5]
@@ -0,0 +1,156 @@
+"""Tests for the assignment of stays to days"""
+
+from datetime import date
+
+import pytest
+
+from tests.trips.factories import StayFactory, TripFactory
+from trips.models import StayTransfer
+from trips.stays import assign_stay, reassign_stay, repair_stay_transfers
+from trips.timeline import build_timeline
+from trips.utils import trip_detail_queryset
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def trip():
+    """Five days: Rome for the first two, Florence for the last three"""
+    trip = TripFactory(start_date=date(2026, 5, 1), end_date=date(2026, 5, 5))
+    days = list(trip.days.all())
+    rome = StayFactory(name="Rome")
+    florence = StayFactory(name="Florence")
+    assign_stay(trip, rome, days[:2])
+    assign_stay(trip, florence, days[2:])
+    StayTransfer.objects.create(from_stay=rome, to_stay=florence)
+    return trip
+
+
+def stays_by_number(trip):
+    return [day.stay.name if day.stay else None for day in trip.days.all()]
+
+
+def transfer_days(trip):
+    transfer = StayTransfer.objects.get(trip=trip)
+    return transfer.from_day.number, transfer.to_day.number
+
+
+class TestAssignStay:
+    def test_single_update(self, trip, django_assert_num_queries):
+        siena = StayFactory(name="Siena")
+
+        # savepoint, update, days and transfers of the trip, release
+        with django_assert_num_queries(5):
+            updated = assign_stay(trip, siena, trip.days.filter(number__gte=4))
+
+        assert updated == 2
+        assert stays_by_number(trip) == ["Rome", "Rome", "Florence", "Siena", "Siena"]
+
+    def test_date_range(self, trip):
+        rome = trip.days.first().stay
+
+        assign_stay(
+            trip,
+            rome,
+            trip.days.filter(date__range=(date(2026, 5, 3), date(2026, 5, 3))),
+        )
+
+        assert stays_by_number(trip) == ["Rome", "Rome", "Rome", "Florence", "Florence"]
+        assert transfer_days(trip) == (3, 4)
+
+    def test_only_days_of_the_trip(self, trip):
+        other_day = TripFactory().days.first()
+
+        assert assign_stay(trip, StayFactory(), [other_day]) == 0
+        other_day.refresh_from_db()
+        assert other_day.stay is None
+
+    def test_transfer_deleted_when_stays_not_consecutive(self, trip):
+        assign_stay(trip, None, [trip.days.get(number=3)])
+
+        assert stays_by_number(trip) == ["Rome", "Rome", None, "Florence", "Florence"]
+        assert not StayTransfer.objects.filter(trip=trip).exists()
+
+    def test_transfer_deleted_when_stay_has_no_days(self, trip):
+        rome = trip.days.first().stay
+
+        assign_stay(trip, rome, trip.days.all())
+
+        assert not StayTransfer.objects.filter(trip=trip).exists()
+
+
+class TestReassignStay:
+    def test_moves_all_days(self, trip):
+        rome = trip.days.first().stay
+        florence = trip.days.last().stay
+
+        assert reassign_stay(trip, florence, rome) == 3
+        assert stays_by_number(trip) == ["Rome"] * 5
+        assert not StayTransfer.objects.filter(trip=trip).exists()
+
+
+class TestRepairStayTransfers:
+    def test_nothing_to_repair(self, trip):
+        assert repair_stay_transfers(trip) == (0, 0)
+
+    def test_counts(self, trip):
+        rome = trip.days.first().stay
+        assign_stay(trip, rome, [trip.days.get(number=3)])
+        # Put the transfer back on its old days
+        StayTransfer.objects.filter(trip=trip).update(
+            from_day=trip.days.get(number=2), to_day=trip.days.get(number=3)
+        )
+
+        assert repair_stay_transfers(trip) == (1, 0)
+        assert transfer_days(trip) == (3, 4)
+
+
+class TestStayVisitedTwice:
+    """Rome, Florence, then back to Rome"""
+
+    @pytest.fixture
+    def trip(self):
+        trip = TripFactory(start_date=date(2026, 5, 1), end_date=date(2026, 5, 5))
+        days = list(trip.days.all())
+        rome = StayFactory(name="Rome")
+        florence = StayFactory(name="Florence")
+        assign_stay(trip, rome, days[:2] + days[3:])
+        assign_stay(trip, florence, [days[2]])
+        StayTransfer.objects.create(
+            from_stay=rome, to_stay=florence, from_day=days[1], to_day=days[2]
+        )
+        StayTransfer.objects.create(
+            from_stay=florence, to_stay=rome, from_day=days[2], to_day=days[3]
+        )
+        return trip
+
+    def legs(self, trip):
+        return [
+            (transfer.from_day.number, transfer.to_day.number)
+            for transfer in StayTransfer.objects.filter(trip=trip)
+        ]
+
+    def test_one_transfer_per_leg(self, trip):
+        assert repair_stay_transfers(trip) == (0, 0)
+        assert self.legs(trip) == [(2, 3), (3, 4)]
+
+    def test_legs_follow_the_days(self, trip):
+        florence = trip.days.get(number=3).stay
+
+        assign_stay(trip, florence, [trip.days.get(number=4)])
+
+        assert stays_by_number(trip) == ["Rome", "Rome", "Florence", "Florence", "Rome"]
+        assert self.legs(trip) == [(2, 3), (4, 5)]
+
+    def test_transfer_out_on_its_own_day(self, trip):
+        timeline = build_timeline(trip_detail_queryset().get(pk=trip.pk))
+
+        outgoing = [entry.transfer_out for entry in timeline]
+
+        assert [transfer is not None for transfer in outgoing] == [
+            False,
+            True,
+            True,
+            False,
+            False,
+        ]
@@ -0,0 +1,329 @@
+from datetime import date, timedelta
+from unittest.mock import patch
+
+import pytest
+import time_machine
+from django.core.cache import cache
+from django.utils import timezone
+
+from tests.trips.factories import StayFactory, TripFactory
+from trips.enrichment import enqueue_trip_enrichment, get_enrichment_progress
+from trips.geocoding import geocode_job_key
+from trips.models import Event, GeocodeResult, MainTransfer, Stay, Trip
+from trips.page_cache import pages_version
+from trips.tasks import (
+    check_trips_status,
+    enrich_trip,
+    geocode_pending_locations,
+    ingest_trip_image,
+    prune_geocode_store,
+    render_trip_image,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+class TestGeocodePendingLocations:
+    @patch("trips.geocoding.async_task")
+    @patch("geocoder.mapbox")
+    def test_resolves_every_row_sharing_the_address(
+        self, mock_geocoder, mock_async_task, event_factory, stay_factory
+    ):
+        mock_geocoder.return_value.latlng = [41.890251, 12.492373]
+        stay = stay_factory()
+        event = event_factory()
+        other = event_factory()
+        Stay.objects.filter(pk=stay.pk).update(
+            address="Colosseum",
+            city="Roma",
+            geocoding_pending=True,
+            geocoding_query="colosseum, roma",
+        )
+        Event.objects.filter(pk=event.pk).update(
+            address="  colosseum",
+            city="ROMA",
+            geocoding_pending=True,
+            geocoding_query="colosseum, roma",
+        )
+        Event.objects.filter(pk=other.pk).update(
+            address="Pantheon",
+            city="Roma",
+            geocoding_pending=True,
+            geocoding_query="pantheon, roma",
+        )
+        cache.set(geocode_job_key("Colosseum, Roma"), True)
+
+        result = geocode_pending_locations("Colosseum, Roma")
+
+        assert result == "Geocoded 'Colosseum, Roma': 2 rows resolved"
+        mock_geocoder.assert_called_once()
+        assert cache.get(geocode_job_key("Colosseum, Roma")) is None
+        stay.refresh_from_db()
+        event.refresh_from_db()
+        other.refresh_from_db()
+        assert (stay.latitude, stay.longitude) == (41.890251, 12.492373)
+        assert (event.latitude, event.longitude) == (41.890251, 12.492373)
+        assert stay.geocoding_pending is False
+        assert event.geocoding_pending is False
+        assert event.geocoding_query == ""
+        assert event.geocoding_requested_at is None
+        assert other.geocoding_pending is True
+
+    @patch("geocoder.mapbox")
+    def test_uses_and_fills_geocode_store(self, mock_geocoder, stay_factory):
+        mock_geocoder.return_value.latlng = [41.890251, 12.492373]
+        stay = stay_factory()
+        Stay.objects.filter(pk=stay.pk).update(
+            address="Colosseum", city="Roma", geocoding_pending=True
+        )
+
+        geocode_pending_locations("Colosseum, Roma")
+        geocode_pending_locations("Colosseum, Roma")
+
+        mock_geocoder.assert_called_once()
+        assert GeocodeResult.objects.lookup_latlng("colosseum, roma") == (
+            41.890251,
+            12.492373,
+        )
+
+    @patch("geocoder.mapbox")
+    def test_failure_clears_pending_state(self, mock_geocoder, stay_factory):
+        mock_geocoder.return_value.latlng = None
+        stay = stay_factory()
+        Stay.objects.filter(pk=stay.pk).update(
+            address="Nowhere",
+            city="",
+            latitude=1,
+            longitude=1,
+            geocoding_pending=True,
+            geocoding_query="nowhere",
+        )
+
+        result = geocode_pending_locations("Nowhere")
+
+        assert result == "Geocoding failed for 'Nowhere': 1 rows cleared"
+        stay.refresh_from_db()
+        assert stay.latitude is None
+        assert stay.geocoding_pending is False
+
+    @patch("geocoder.mapbox")
+    def test_main_transfer_waits_for_other_address(self, mock_geocoder, trip_factory):
+        mock_geocoder.return_value.latlng = [45.4642, 9.1900]
+        transfer = MainTransfer.objects.create(
+            trip=trip_factory(),
+            type=MainTransfer.Type.CAR,
+            direction=MainTransfer.Direction.ARRIVAL,
+            origin_address="Piazza Duomo, Milano",
+            destination_address="Via Roma 123, Milano",
+            start_time="10:00",
+            end_time="12:00",
+        )
+        assert transfer.geocoding_pending is True
+        assert transfer.origin_geocoding_query == "piazza duomo, milano"
+        # The other address stays pending even once its dedupe marker is gone
+        cache.delete(geocode_job_key("Via Roma 123, Milano"))
+
+        geocode_pending_locations("Piazza Duomo, Milano")
+
+        transfer.refresh_from_db()
+        assert transfer.origin_latitude == 45.4642
+        assert transfer.destination_latitude is None
+        assert transfer.geocoding_pending is True
+        assert transfer.geocoding_requested_at is not None
+
+        mock_geocoder.return_value.latlng = [45.4773, 9.1815]
+        geocode_pending_locations("Via Roma 123, Milano")
+
+        transfer.refresh_from_db()
+        assert transfer.destination_latitude == 45.4773
+        assert transfer.geocoding_pending is False
+        assert transfer.geocoding_requested_at is None
+
+    @patch("geocoder.mapbox")
+    def test_main_transfer_other_address_untouched(
+        self, mock_geocoder, main_transfer_factory
+    ):
+        mock_geocoder.return_value.latlng = [45.4642, 9.1900]
+        transfer = main_transfer_factory()
+        MainTransfer.objects.filter(pk=transfer.pk).update(geocoding_pending=True)
+
+        result = geocode_pending_locations("Somewhere else")
+
+        assert result == "Geocoded 'Somewhere else': 0 rows resolved"
+        transfer.refresh_from_db()
+        assert transfer.geocoding_pending is True
+
+    @patch("geocoder.mapbox", side_effect=Exception("Mapbox down"))
+    def test_error_is_raised(self, mock_geocoder):
+        with pytest.raises(Exception, match="Mapbox down"):
+            geocode_pending_locations("Colosseum, Roma")
+
+
+class TestPruneGeocodeStore:
+    def test_prunes_expired_entries(self):
+        GeocodeResult.objects.store_latlng("old", [1, 1])
+        GeocodeResult.objects.update(
+            created_at=timezone.now() - GeocodeResult.objects.STORE_TTL
+        )
+        GeocodeResult.objects.store_latlng("new", [2, 2])
+
+        assert prune_geocode_store() == "Deleted 1 geocode store entries"
+        assert list(GeocodeResult.objects.values_list("query", flat=True)) == ["new"]
+
+
+class TestCheckTripsStatus:
+    TODAY = date(2026, 6, 15)
+
+    def make_trip(self, start_in, length=3, status=Trip.Status.NOT_STARTED):
+        """Trip starting start_in days from TODAY, stored with a given status"""
+        start = self.TODAY + timedelta(days=start_in)
+        trip = TripFactory(start_date=start, end_date=start + timedelta(days=length))
+        Trip.objects.filter(pk=trip.pk).update(status=status)
+        return trip
+
+    def status(self, trip):
+        return Trip.objects.values_list("status", flat=True).get(pk=trip.pk)
+
+    @time_machine.travel(TODAY, tick=False)
+    def test_first_run_sets_every_status(self):
+        far = self.make_trip(30, status=Trip.Status.IMPENDING)
+        soon = self.make_trip(3)
+        ongoing = self.make_trip(-1)
+        ended = self.make_trip(-10, status=Trip.Status.IN_PROGRESS)
+        archived = self.make_trip(-10, status=Trip.Status.ARCHIVED)
+
+        result = check_trips_status()
+
+        assert self.status(far) == Trip.Status.NOT_STARTED
+        assert self.status(soon) == Trip.Status.IMPENDING
+        assert self.status(ongoing) == Trip.Status.IN_PROGRESS
+        assert self.status(ended) == Trip.Status.COMPLETED
+        assert self.status(archived) == Trip.Status.ARCHIVED
+        assert result == (
+            "4 trips checked, 4 trips modified "
+            "(1 -> 2: 1, 1 -> 3: 1, 2 -> 1: 1, 3 -> 4: 1)"
+        )
+
+    def test_boundaries(self):
+        impending = self.make_trip(6)
+        not_yet = self.make_trip(7)
+        starts_today = self.make_trip(0)
+        ends_today = self.make_trip(-3, status=Trip.Status.IN_PROGRESS)
+
+        with time_machine.travel(self.TODAY, tick=False):
+            check_trips_status()
+
+        assert self.status(impending) == Trip.Status.IMPENDING
+        assert self.status(not_yet) == Trip.Status.NOT_STARTED
+        assert self.status(starts_today) == Trip.Status.IN_PROGRESS
+        assert self.status(ends_today) == Trip.Status.IN_PROGRESS
+
+    def test_next_runs_only_check_crossed_boundaries(self):
+        with time_machine.travel(self.TODAY, tick=False):
+            becomes_impending = self.make_trip(7)
+            starts = self.make_trip(1, status=Trip.Status.IMPENDING)
+            ends = self.make_trip(-3, status=Trip.Status.IN_PROGRESS)
+            untouched = self.make_trip(20)
+            assert check_trips_status() == "4 trips checked, 0 trips modified"
+            # Wrong status, but no boundary crossed by the next run
+            Trip.objects.filter(pk=untouched.pk).update(status=Trip.Status.COMPLETED)
+
+        with time_machine.travel(self.TODAY + timedelta(days=1), tick=False):
+            result = check_trips_status()
+
+        assert result == (
+            "3 trips checked, 3 trips modified (1 -> 2: 1, 2 -> 3: 1, 3 -> 4: 1)"
+        )
+        assert self.status(becomes_impending) == Trip.Status.IMPENDING
+        assert self.status(starts) == Trip.Status.IN_PROGRESS
+        assert self.status(ends) == Trip.Status.COMPLETED
+        assert self.status(untouched) == Trip.Status.COMPLETED
+
+    def test_set_based_without_saving_trips(self, django_assert_num_queries):
+        trips = [self.make_trip(offset) for offset in range(-20, 20)]
+
+        # count, transitions and update, whatever the number of trips
+        with time_machine.travel(self.TODAY, tick=False):
+            with django_assert_num_queries(5):
+                result = check_trips_status()
+
+        assert result.startswith(f"{len(trips)} trips checked, 27 trips modified")
+
+    @time_machine.travel(TODAY, tick=False)
+    def test_invalidates_authors_pages(self):
+        soon = self.make_trip(3)
+        unchanged = self.make_trip(30)
+        soon_version = pages_version(soon.author_id)
+        unchanged_version = pages_version(unchanged.author_id)
+
+        check_trips_status()
+
+        assert pages_version(soon.author_id) != soon_version
+        assert pages_version(unchanged.author_id) == unchanged_version
+
+
+class TestEnrichTrip:
+    @patch("trips.enrichment.enrich_place")
+    def test_summary(self, mock_enrich_place):
+        mock_enrich_place.return_value = {
+            "place_id": "place_1",
+            "website": "",
+            "phone_number": "",
+            "opening_hours": None,
+        }
+        trip = TripFactory()
+        trip.days.update(stay=StayFactory())
+
+        assert enrich_trip(trip.pk) == (
+            f"Trip {trip.pk}: 1 of 1 places enriched, 0 failed"
+        )
+
+    @patch("trips.enrichment.async_task")
+    def test_error_finishes_the_job(self, mock_async_task):
+        trip = TripFactory()
+        trip_id = trip.pk
+        enqueue_trip_enrichment(trip)
+        trip.delete()
+
+        with pytest.raises(Trip.DoesNotExist):
+            enrich_trip(trip_id)
+
+        progress = get_enrichment_progress(trip_id)
+        assert progress["finished"] is True
+        assert progress["error"] is True
+
+
+class TestIngestTripImage:
+    @patch("trips.tasks.ingest_unsplash_photo", return_value=True)
+    def test_ingested(self, mock_ingest):
+        assert ingest_trip_image(1, "photo123", "Paris") == (
+            "Trip 1: Unsplash photo photo123 ingested"
+        )
+        mock_ingest.assert_called_once_with(1, "photo123", "Paris")
+
+    @patch("trips.tasks.ingest_unsplash_photo", return_value=False)
+    def test_not_ingested(self, mock_ingest):
+        assert ingest_trip_image(1, "photo123") == (
+            "Trip 1: Unsplash photo photo123 not ingested"
+        )
+
+
+class TestRenderTripImage:
+    @patch("trips.tasks.create_image_renditions", return_value=6)
+    def test_rendered(self, mock_render):
+        assert render_trip_image(1, "trips/trip_1.jpg") == (
+            "Trip 1: 6 renditions of trips/trip_1.jpg stored"
+        )
+        mock_render.assert_called_once_with(1, "trips/trip_1.jpg")
+
+    @patch("trips.tasks.create_image_renditions", side_effect=OSError("broken"))
+    def test_error_raised(self, mock_render):
+        with pytest.raises(OSError):
+            render_trip_image(1, "trips/trip_1.jpg")
@@ -7,6 +7,7 @@ from tests.trips.factories import (
     StayFactory,
     TripFactory,
 )
+from trips.models import Event
 from trips.templatetags.trip_tags import (
     event_bg_color,
     event_border_color,
@@ -16,6 +17,8 @@ from trips.templatetags.trip_tags import (
     format_duration,
     format_opening_hours,
     has_different_stay,
+    has_pending_geocoding,
+    image_sources,
     is_first_day_of_stay,
     is_first_day_of_trip,
     is_last_day,
@@ -153,6 +156,24 @@ class TestStayChecks:
         day.stay = None
         assert not is_first_day_of_stay(day)
 
+    def test_has_pending_geocoding(self, trip_with_stays):
+        """Test has_pending_geocoding checks the day's stay and events"""
+        day = trip_with_stays.days.first()
+        event = EventFactory(day=day)
+        assert not has_pending_geocoding(day)
+
+        Event.objects.filter(pk=event.pk).update(geocoding_pending=True)
+        assert has_pending_geocoding(day)
+
+    def test_has_pending_geocoding_stay(self, trip_with_stays):
+        """Test has_pending_geocoding is True while the stay is pending"""
+        day = trip_with_stays.days.first()
+        day.stay.geocoding_pending = True
+        assert has_pending_geocoding(day)
+
+        day.stay = None
+        assert not has_pending_geocoding(day)
+
 
 class TestEventFormatting:
     """Tests for event-related template tags"""
@@ -572,3 +593,61 @@ class TestIsLastDayEdgeCases:
         day.trip = original_trip
 
         assert result is False
+
+
+class TestImageSources:
+    def renditions(self, widths):
+        return {
+            name: {
+                "width": width,
+                "avif": f"trips/cover.{name}.avif",
+                "webp": f"trips/cover.{name}.webp",
+            }
+            for name, width in widths.items()
+        }
+
+    def test_one_source_per_format(self):
+        trip = TripFactory(
+            image="trips/cover.jpg",
+            image_metadata={
+                "source": "upload",
+                "renditions": self.renditions({"hero": 1200, "thumb": 320}),
+            },
+        )
+
+        assert image_sources(trip) == [
+            {
+                "type": "image/avif",
+                "srcset": "/media/trips/cover.thumb.avif 320w, "
+                "/media/trips/cover.hero.avif 1200w",
+            },
+            {
+                "type": "image/webp",
+                "srcset": "/media/trips/cover.thumb.webp 320w, "
+                "/media/trips/cover.hero.webp 1200w",
+            },
+        ]
+
+    def test_same_width_listed_once(self):
+        trip = TripFactory(
+            image="trips/cover.jpg",
+            image_metadata={"renditions": self.renditions({"thumb": 30, "card": 30})},
+        )
+
+        assert image_sources(trip)[0]["srcset"] == "/media/trips/cover.thumb.avif 30w"
+
+    def test_no_renditions(self):
+        trip = TripFactory(image="trips/cover.jpg", image_metadata={"source": "upload"})
+
+        assert image_sources(trip) == []
+
+    def test_pending_cover(self):
+        trip = TripFactory(
+            image="trips/cover.jpg",
+            image_metadata={
+                "pending": True,
+                "renditions": self.renditions({"thumb": 320}),
+            },
+        )
+
+        assert image_sources(trip) == []
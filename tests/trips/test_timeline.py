@@ -0,0 +1,110 @@
+"""Tests for the trip timeline"""
+
+from datetime import date
+
+import pytest
+
+from tests.trips.factories import StayFactory, TripFactory
+from trips.models import StayTransfer
+from trips.templatetags.trip_tags import (
+    is_first_day_of_stay,
+    is_first_day_of_trip,
+    is_last_day,
+    next_day,
+    prev_day,
+    stay_transfer_in,
+    stay_transfer_out,
+)
+from trips.timeline import Timeline, build_timeline
+from trips.utils import trip_detail_queryset
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def trip():
+    """Four days: two nights in Rome, one in Florence, the last without stay"""
+    trip = TripFactory(start_date=date(2026, 5, 1), end_date=date(2026, 5, 4))
+    days = list(trip.days.all())
+    rome = StayFactory(name="Rome", day=days[0])
+    days[1].stay = rome
+    days[1].save()
+    florence = StayFactory(name="Florence", day=days[2])
+    StayTransfer.objects.create(from_stay=rome, to_stay=florence)
+    return trip_detail_queryset().get(pk=trip.pk)
+
+
+class TestTimeline:
+    def test_neighbours(self, trip):
+        timeline = build_timeline(trip)
+        first, second, third, fourth = timeline
+
+        assert len(timeline) == 4
+        assert first.is_first and not first.is_last
+        assert fourth.is_last and not fourth.is_first
+        assert first.prev_day is None
+        assert first.next_day == second.day
+        assert third.prev_day == second.day
+        assert fourth.next_day is None
+
+    def test_stay_runs_and_transfers(self, trip):
+        first, second, third, fourth = build_timeline(trip)
+
+        assert [entry.stay_starts for entry in (first, second, third, fourth)] == [
+            True,
+            False,
+            True,
+            False,
+        ]
+        assert [entry.stay_ends for entry in (first, second, third, fourth)] == [
+            False,
+            True,
+            True,
+            False,
+        ]
+        assert first.transfer_out is None
+        assert second.transfer_out.to_stay.name == "Florence"
+        assert third.transfer_in == second.transfer_out
+        assert third.transfer_out is None
+
+    def test_one_query_for_the_whole_trip(self, trip, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            timeline = build_timeline(trip)
+            transfer = list(timeline)[1].transfer_out
+            assert str(transfer) == "Rome → Florence"
+
+    def test_no_stays_no_query(self, django_assert_num_queries):
+        trip = trip_detail_queryset().get(pk=TripFactory().pk)
+
+        with django_assert_num_queries(0):
+            timeline = build_timeline(trip)
+
+        assert all(entry.transfer_out is None for entry in timeline)
+
+    def test_empty(self):
+        assert list(Timeline([])) == []
+
+
+class TestTimelineFilters:
+    """The day filters and properties read the timeline when it is attached"""
+
+    def test_navigation(self, trip, django_assert_num_queries):
+        first, second, third, fourth = build_timeline(trip)
+
+        with django_assert_num_queries(0):
+            assert next_day(first.day) == second.day
+            assert prev_day(first.day) is None
+            assert first.day.next_day == second.day
+            assert second.day.prev_day == first.day
+            assert is_first_day_of_trip(first.day) is True
+            assert is_last_day(fourth.day) is True
+            assert is_first_day_of_stay(second.day) is False
+            assert is_first_day_of_stay(third.day) is True
+
+    def test_stay_transfers(self, trip, django_assert_num_queries):
+        first, second, third, fourth = build_timeline(trip)
+
+        with django_assert_num_queries(0):
+            assert stay_transfer_out(first.day) is None
+            assert stay_transfer_out(second.day) == third.transfer_in
+            assert stay_transfer_in(third.day) == second.transfer_out
@@ -6,140 +6,89 @@ from unittest.mock import patch
 import pytest
 from django.core.files.uploadedfile import InMemoryUploadedFile, SimpleUploadedFile
 from django.urls import reverse
+from PIL import Image
+
+from trips.models import Trip
 
 pytestmark = pytest.mark.django_db
 
 
+def jpeg_bytes():
+    """A valid JPEG, accepted by the form's ImageField"""
+    output = BytesIO()
+    Image.new("RGB", (30, 20), "white").save(output, format="JPEG")
+    return output.getvalue()
+
+
 class TestTripCreateImageHandling:
     """Tests for image handling in trip_create view"""
 
-    @patch("trips.views.process_trip_image")
-    @patch("trips.views.download_unsplash_photo")
-    @patch("trips.views.search_unsplash_photos")
+    @patch("trips.images.async_task")
     def test_create_with_unsplash_photo_success(
-        self, mock_search, mock_download, mock_process, client, user_factory
+        self, mock_async_task, client, user_factory, django_capture_on_commit_callbacks
     ):
-        """Test creating trip with Unsplash photo selection - full success path"""
+        """Test creating trip with Unsplash photo selection - ingested in background"""
         user = user_factory()
         client.force_login(user)
 
-        # Mock successful Unsplash search
-        mock_search.return_value = [
-            {
-                "id": "photo123",
-                "urls": {"regular": "https://example.com/photo.jpg"},
-                "user": {
-                    "name": "Test Photographer",
-                    "profile": "https://unsplash.com/@test",
-                },
-                "links": {
-                    "html": "https://unsplash.com/photos/photo123",
-                    "download_location": "https://api.unsplash.com/download",
+        with django_capture_on_commit_callbacks(execute=True):
+            response = client.post(
+                reverse("trips:trip-create"),
+                {
+                    "title": "Test Trip",
+                    "destination": "Paris",
+                    "description": "Test",
+                    "selected_photo_id": "photo123",
                 },
-            }
-        ]
-
-        # Mock successful download
-        mock_download.return_value = (
-            b"fake_image_data",
-            {"source": "unsplash", "photographer": "Test Photographer"},
-        )
-
-        # Mock successful processing
-        fake_file = InMemoryUploadedFile(
-            BytesIO(b"processed"),
-            "ImageField",
-            "test.jpg",
-            "image/jpeg",
-            1024,
-            None,
-        )
-        mock_process.return_value = fake_file
-
-        response = client.post(
-            reverse("trips:trip-create"),
-            {
-                "title": "Test Trip",
-                "destination": "Paris",
-                "description": "Test",
-                "selected_photo_id": "photo123",
-            },
-        )
+            )
 
-        # Should succeed
+        # Should succeed without downloading the photo in the request
         assert response.status_code in [200, 204, 302]
-        mock_search.assert_called_once_with("Paris", per_page=10)
-        mock_download.assert_called_once()
-        mock_process.assert_called_once()
+        trip = Trip.objects.get(title="Test Trip")
+        assert trip.image_pending
+        assert trip.image_metadata["unsplash_id"] == "photo123"
+        mock_async_task.assert_called_once_with(
+            "trips.tasks.ingest_trip_image",
+            trip.pk,
+            "photo123",
+            "Paris",
+            task_name=f"trip {trip.pk} image photo123",
+        )
 
 
 class TestTripUpdateImageHandling:
     """Tests for image handling in trip_update view"""
 
-    @patch("trips.views.process_trip_image")
-    @patch("trips.views.download_unsplash_photo")
-    @patch("trips.views.search_unsplash_photos")
+    @patch("trips.images.async_task")
     def test_update_with_unsplash_photo_success(
         self,
-        mock_search,
-        mock_download,
-        mock_process,
+        mock_async_task,
         client,
         trip_factory,
         user_factory,
+        django_capture_on_commit_callbacks,
     ):
-        """Test updating trip with Unsplash photo selection - full success path"""
+        """Test updating trip with Unsplash photo selection - ingested in background"""
         user = user_factory()
         trip = trip_factory(author=user, destination="Paris")
         client.force_login(user)
 
-        # Mock successful Unsplash search
-        mock_search.return_value = [
-            {
-                "id": "photo456",
-                "urls": {"regular": "https://example.com/photo.jpg"},
-                "user": {
-                    "name": "Test Photographer",
-                    "profile": "https://unsplash.com/@test",
+        with django_capture_on_commit_callbacks(execute=True):
+            response = client.post(
+                reverse("trips:trip-update", kwargs={"pk": trip.pk}),
+                {
+                    "title": trip.title,
+                    "destination": trip.destination,
+                    "description": trip.description or "",
+                    "selected_photo_id": "photo456",
                 },
-                "links": {
-                    "html": "https://unsplash.com/photos/photo456",
-                    "download_location": "https://api.unsplash.com/download",
-                },
-            }
-        ]
-
-        # Mock successful download
-        mock_download.return_value = (
-            b"fake_image_data",
-            {"source": "unsplash", "photographer": "Test Photographer"},
-        )
-
-        # Mock successful processing
-        fake_file = InMemoryUploadedFile(
-            BytesIO(b"processed"),
-            "ImageField",
-            "test.jpg",
-            "image/jpeg",
-            1024,
-            None,
-        )
-        mock_process.return_value = fake_file
-
-        response = client.post(
-            reverse("trips:trip-update", kwargs={"pk": trip.pk}),
-            {
-                "title": trip.title,
-                "destination": trip.destination,
-                "description": trip.description or "",
-                "selected_photo_id": "photo456",
-            },
-        )
+            )
 
         assert response.status_code in [200, 204, 302]
-        mock_search.assert_called_once_with("Paris", per_page=10)
-        mock_download.assert_called_once()
-        mock_process.assert_called_once()
+        trip.refresh_from_db()
+        assert trip.image_pending
+        assert trip.image_metadata["unsplash_id"] == "photo456"
+        mock_async_task.assert_called_once()
 
 
 class TestTripFileUpload:
@@ -227,38 +176,23 @@ class TestTripFileUpload:
         assert response.status_code in [200, 204, 302]
 
     @patch("trips.views.process_trip_image")
-    @patch("trips.views.download_unsplash_photo")
-    @patch("trips.views.search_unsplash_photos")
+    @patch("trips.images.async_task")
     def test_create_file_upload_overrides_unsplash(
-        self, mock_search, mock_download, mock_process, client, user_factory
+        self,
+        mock_async_task,
+        mock_process,
+        client,
+        user_factory,
+        settings,
+        tmp_path,
+        django_capture_on_commit_callbacks,
     ):
         """Test that file upload overrides Unsplash selection in trip_create"""
+        settings.MEDIA_ROOT = tmp_path
         user = user_factory()
         client.force_login(user)
 
-        # Mock Unsplash search
-        mock_search.return_value = [
-            {
-                "id": "photo123",
-                "urls": {"regular": "https://example.com/photo.jpg"},
-                "user": {
-                    "name": "Test Photographer",
-                    "profile": "https://unsplash.com/@test",
-                },
-                "links": {
-                    "html": "https://unsplash.com/photos/photo123",
-                    "download_location": "https://api.unsplash.com/download",
-                },
-            }
-        ]
-
-        # Mock Unsplash download
-        mock_download.return_value = (
-            b"unsplash_data",
-            {"source": "unsplash", "photographer": "Test Photographer"},
-        )
-
-        # Mock image processing - should be called twice (Unsplash + file upload)
+        # Mock image processing of the file upload
         processed_file = InMemoryUploadedFile(
             BytesIO(b"processed_upload"),
             "ImageField",
@@ -271,65 +205,55 @@ class TestTripFileUpload:
 
         # Create uploaded file
         uploaded = SimpleUploadedFile(
-            "test.jpg", b"file_content", content_type="image/jpeg"
+            "test.jpg", jpeg_bytes(), content_type="image/jpeg"
         )
 
         # Post with BOTH selected_photo_id AND file upload
-        response = client.post(
-            reverse("trips:trip-create"),
-            data={
-                "title": "Test Trip",
-                "destination": "Paris",
-                "description": "Test",
-                "selected_photo_id": "photo123",
-            },
-            files={"image": uploaded},
-        )
+        with django_capture_on_commit_callbacks(execute=True):
+            response = client.post(
+                reverse("trips:trip-create"),
+                data={
+                    "title": "Test Trip",
+                    "destination": "Paris",
+                    "description": "Test",
+                    "selected_photo_id": "photo123",
+                    "image": uploaded,
+                },
+            )
 
         assert response.status_code in [200, 204, 302]
-        # process_trip_image should be called for file upload (overriding Unsplash)
-        assert mock_process.call_count >= 1
+        # The uploaded file replaces the Unsplash selection, only its
+        # renditions are left to create
+        mock_process.assert_called_once()
+        trip = Trip.objects.get(author=user)
+        assert trip.image_metadata == {"source": "upload"}
+        mock_async_task.assert_called_once_with(
+            "trips.tasks.render_trip_image",
+            trip.pk,
+            trip.image.name,
+            task_name=f"trip {trip.pk} renditions",
+        )
 
     @patch("trips.views.process_trip_image")
-    @patch("trips.views.download_unsplash_photo")
-    @patch("trips.views.search_unsplash_photos")
+    @patch("trips.images.async_task")
     def test_update_file_upload_overrides_unsplash(
         self,
-        mock_search,
-        mock_download,
+        mock_async_task,
         mock_process,
         client,
         trip_factory,
         user_factory,
+        settings,
+        tmp_path,
+        django_capture_on_commit_callbacks,
     ):
         """Test that file upload overrides Unsplash selection in trip_update"""
+        settings.MEDIA_ROOT = tmp_path
         user = user_factory()
         trip = trip_factory(author=user, destination="Paris")
         client.force_login(user)
 
-        # Mock Unsplash search
-        mock_search.return_value = [
-            {
-                "id": "photo456",
-                "urls": {"regular": "https://example.com/photo.jpg"},
-                "user": {
-                    "name": "Test Photographer",
-                    "profile": "https://unsplash.com/@test",
-                },
-                "links": {
-                    "html": "https://unsplash.com/photos/photo456",
-                    "download_location": "https://api.unsplash.com/download",
-                },
-            }
-        ]
-
-        # Mock Unsplash download
-        mock_download.return_value = (
-            b"unsplash_data",
-            {"source": "unsplash", "photographer": "Test Photographer"},
-        )
-
-        # Mock image processing
+        # Mock image processing of the file upload
         processed_file = InMemoryUploadedFile(
             BytesIO(b"processed_upload"),
             "ImageField",
@@ -342,21 +266,31 @@ class TestTripFileUpload:
 
         # Create uploaded file
         uploaded = SimpleUploadedFile(
-            "test.jpg", b"file_content", content_type="image/jpeg"
+            "test.jpg", jpeg_bytes(), content_type="image/jpeg"
         )
 
         # Post with BOTH selected_photo_id AND file upload
-        response = client.post(
-            reverse("trips:trip-update", kwargs={"pk": trip.pk}),
-            data={
-                "title": trip.title,
-                "destination": trip.destination,
-                "description": trip.description or "",
-                "selected_photo_id": "photo456",
-            },
-            files={"image": uploaded},
-        )
+        with django_capture_on_commit_callbacks(execute=True):
+            response = client.post(
+                reverse("trips:trip-update", kwargs={"pk": trip.pk}),
+                data={
+                    "title": trip.title,
+                    "destination": trip.destination,
+                    "description": trip.description or "",
+                    "selected_photo_id": "photo456",
+                    "image": uploaded,
+                },
+            )
 
         assert response.status_code in [200, 204, 302]
-        # process_trip_image should be called for file upload (overriding Unsplash)
-        assert mock_process.call_count >= 1
+        # The uploaded file replaces the Unsplash selection, only its
+        # renditions are left to create
+        mock_process.assert_called_once()
+        trip = Trip.objects.get(author=user)
+        assert trip.image_metadata == {"source": "upload"}
+        mock_async_task.assert_called_once_with(
+            "trips.tasks.render_trip_image",
+            trip.pk,
+            trip.image.name,
+            task_name=f"trip {trip.pk} renditions",
+        )
@@ -1,4 +1,3 @@
-import time as time_module
 from datetime import date, time
 from unittest.mock import MagicMock, patch
 
@@ -10,16 +9,23 @@ from django.core.cache import cache
 from tests.test import TestCase
 from tests.trips.factories import (
     EventFactory,
+    MainTransferFactory,
     MealFactory,
     StayFactory,
     TripFactory,
 )
+from trips.datasets import ColumnarTable
+from trips.models import Event, Stay, Trip
 from trips.utils import (
+    NOMINATIM_RATE_LIMIT_KEY,
+    UNSPLASH_SEARCH_PER_PAGE,
+    acquire_nominatim_token,
     annotate_event_overlaps,
     can_add_simple_transfer,
     can_add_stay_transfer,
     convert_google_opening_hours,
     create_day_map,
+    create_trip_map,
     download_unsplash_photo,
     generate_cache_key,
     geocode_location,
@@ -28,49 +34,28 @@ from trips.utils import (
     get_next_day_stay,
     get_next_events,
     get_trips,
+    get_unsplash_photo,
     process_trip_image,
-    rate_limit_check,
     search_unsplash_photos,
     select_best_result,
+    unsplash_search_cache_key,
     validate_stay_transfer,
 )
 
 
-class TestRateLimitCheck(TestCase):
-    @patch("trips.utils.time.sleep")
-    @patch("trips.utils.cache.get")
-    @patch("trips.utils.cache.set")
-    def test_rate_limit_check_no_wait(self, mock_cache_set, mock_cache_get, mock_sleep):
-        mock_cache_get.return_value = (
-            time_module.time() - 2
-        )  # Last request was 2 seconds ago
-        rate_limit_check()
-        mock_sleep.assert_not_called()
-        mock_cache_set.assert_called_once()
-
-    @patch("trips.utils.time.sleep")
-    @patch("trips.utils.cache.get")
-    @patch("trips.utils.cache.set")
-    def test_rate_limit_check_with_wait(
-        self, mock_cache_set, mock_cache_get, mock_sleep
-    ):
-        mock_cache_get.return_value = (
-            time_module.time() - 0.5
-        )  # Last request was 0.5 seconds ago
-        rate_limit_check()
-        mock_sleep.assert_called_once_with(pytest.approx(0.5, abs=0.01))
-        mock_cache_set.assert_called_once()
-
-    @patch("trips.utils.time.sleep")
-    @patch("trips.utils.cache.get")
-    @patch("trips.utils.cache.set")
-    def test_rate_limit_check_first_request(
-        self, mock_cache_set, mock_cache_get, mock_sleep
-    ):
-        mock_cache_get.return_value = 0  # No previous request
-        rate_limit_check()
-        mock_sleep.assert_not_called()
-        mock_cache_set.assert_called_once()
+class TestAcquireNominatimToken(TestCase):
+    def setUp(self):
+        cache.delete(NOMINATIM_RATE_LIMIT_KEY)
+
+    def test_acquire_nominatim_token_once_per_window(self):
+        assert acquire_nominatim_token() is True
+        assert acquire_nominatim_token() is False
+
+    @patch("trips.utils.cache.add")
+    def test_acquire_nominatim_token_uses_atomic_add(self, mock_cache_add):
+        mock_cache_add.return_value = True
+        acquire_nominatim_token()
+        mock_cache_add.assert_called_once_with(NOMINATIM_RATE_LIMIT_KEY, True, 1)
 
 
 pytestmark = pytest.mark.django_db
@@ -413,6 +398,49 @@ class TestGetTrips(TestCase):
         context = get_trips(self.user)
         self.assertEqual(context["latest_trip"].pk, not_started.pk)
 
+    @time_machine.travel("2026-01-15")
+    def test_get_trips_fav_before_in_progress(self):
+        """Test the favourite trip is shown even with a trip in progress."""
+        fav_trip = TripFactory(
+            author=self.user,
+            status=1,
+            start_date=date(2026, 3, 1),
+            end_date=date(2026, 3, 10),
+        )
+        in_progress_trip = TripFactory(
+            author=self.user,
+            status=3,
+            start_date=date(2026, 1, 10),
+            end_date=date(2026, 1, 20),
+        )
+        self.user.profile.fav_trip = fav_trip
+        self.user.profile.save()
+
+        context = get_trips(self.user)
+        self.assertEqual(context["fav_trip"], fav_trip)
+        self.assertIsNone(context["latest_trip"])
+        self.assertEqual(list(context["other_trips"]), [in_progress_trip])
+
+    def test_get_trips_single_trip_query(self):
+        """Test the shown trip and its prefetch are fetched only once."""
+        for status in (1, 2, 3, 4):
+            trip = TripFactory(author=self.user)
+            Trip.objects.filter(pk=trip.pk).update(status=status)
+
+        user = type(self.user).objects.get(pk=self.user.pk)
+        # profile, shown trip, then its days, events and main transfers
+        with self.assertNumQueries(5):
+            context = get_trips(user)
+
+        self.assertEqual(context["latest_trip"].status, 3)
+
+    def test_get_trips_no_profile(self):
+        """Test get_trips without a profile returns an empty context."""
+        self.user.profile.delete()
+        user = type(self.user).objects.get(pk=self.user.pk)
+
+        self.assertEqual(get_trips(user), {})
+
     def test_get_trips_excludes_archived(self):
         """Test archived trips are excluded from latest and others."""
         TripFactory(author=self.user, status=5)  # ARCHIVED
@@ -515,7 +543,7 @@ class TestCreateDayMap(TestCase):
         map_html = create_day_map(day.events.all(), None, None)
         self.assertIsNone(map_html)
 
-    @patch("trips.models.geocoder.mapbox")
+    @patch("geocoder.mapbox")
     def test_create_day_map_with_stay_no_location(self, mock_mapbox):
         """Test map creation with a stay that has no location."""
         mock_g = MagicMock()
@@ -539,6 +567,66 @@ class TestCreateDayMap(TestCase):
         self.assertNotIn(stay_no_location.name, map_html)
 
 
+class TestDayMapCache(TestCase):
+    """Test the content-addressed cache of rendered day maps"""
+
+    def setUp(self):
+        cache.clear()
+        self.trip = TripFactory()
+        self.day = self.trip.days.first()
+        self.stay = StayFactory(day=self.day, latitude=41.9, longitude=12.5)
+        self.day.refresh_from_db()
+        self.event = MealFactory(
+            trip=self.trip, day=self.day, name="Dinner", latitude=41.89, longitude=12.49
+        )
+
+    def day_map(self):
+        return create_day_map(self.day.events.all(), self.day.stay, None, day=self.day)
+
+    def test_repeat_views_skip_folium(self):
+        first = self.day_map()
+
+        with patch("trips.utils.folium.Map") as mock_map:
+            second = self.day_map()
+
+        mock_map.assert_not_called()
+        assert second == first
+
+    def test_changed_coordinates_render_a_new_map(self):
+        self.day_map()
+        Event.objects.filter(pk=self.event.pk).update(latitude=45.46, longitude=9.19)
+
+        with patch("trips.utils._render_day_map", return_value="new") as mock_render:
+            assert self.day_map() == "new"
+
+        mock_render.assert_called_once()
+        markers = mock_render.call_args.args[0]
+        assert markers["events"] == [["Dinner", 45.46, 9.19, 3]]
+        assert markers["stay"] == [self.stay.name, 41.9, 12.5]
+
+    def test_event_save_invalidates_trip_maps(self):
+        self.day_map()
+        self.event.notes = "Book a table"
+        self.event.save()
+
+        with patch("trips.utils._render_day_map", return_value="new") as mock_render:
+            assert self.day_map() == "new"
+        mock_render.assert_called_once()
+
+    def test_nothing_with_coordinates(self):
+        Event.objects.filter(pk=self.event.pk).update(latitude=None, longitude=None)
+
+        assert create_day_map(self.day.events.all(), None, None) is None
+
+    def test_other_trips_keep_their_maps(self):
+        self.day_map()
+        MealFactory(trip=TripFactory())
+
+        with patch("trips.utils._render_day_map") as mock_render:
+            self.day_map()
+        mock_render.assert_not_called()
+
+
 class TestConvertGoogleOpeningHours(TestCase):
     def test_convert_google_opening_hours_valid_data(self):
         google_hours = {
@@ -705,6 +793,67 @@ class TestUnsplashAPI(TestCase):
 
         self.assertIsNone(photos)
 
+    @patch("django.conf.settings.UNSPLASH_ACCESS_KEY", "test_key")
+    @patch("trips.utils.requests.get")
+    def test_get_unsplash_photo_from_search_cache(self, mock_get):
+        """Test that a photo picked from the image search needs no request"""
+        photo = {"id": "abc123", "urls": {}, "user": {}, "links": {}}
+        cache.set(
+            unsplash_search_cache_key("Paris", UNSPLASH_SEARCH_PER_PAGE, "landscape"),
+            [photo],
+        )
+
+        self.assertEqual(get_unsplash_photo("abc123", "Paris"), photo)
+        mock_get.assert_not_called()
+
+    @patch("django.conf.settings.UNSPLASH_ACCESS_KEY", "test_key")
+    @patch("trips.utils.requests.get")
+    def test_get_unsplash_photo_fetched(self, mock_get):
+        """Test that a photo missing from the cache is fetched by id"""
+        cache.set(
+            unsplash_search_cache_key("Paris", UNSPLASH_SEARCH_PER_PAGE, "landscape"),
+            [{"id": "other", "urls": {}, "user": {}, "links": {}}],
+        )
+        mock_get.return_value.json.return_value = {
+            "id": "abc123",
+            "urls": {
+                "regular": "https://example.com/regular.jpg",
+                "small": "https://example.com/small.jpg",
+                "thumb": "https://example.com/thumb.jpg",
+            },
+            "user": {
+                "name": "John Doe",
+                "username": "johndoe",
+                "links": {"html": "https://unsplash.com/@johndoe"},
+            },
+            "links": {
+                "html": "https://unsplash.com/photos/abc123",
+                "download_location": "https://api.unsplash.com/photos/abc123/download",
+            },
+        }
+
+        photo = get_unsplash_photo("abc123", "Paris")
+
+        self.assertEqual(photo["user"]["profile"], "https://unsplash.com/@johndoe")
+        self.assertEqual(
+            mock_get.call_args.args[0], "https://api.unsplash.com/photos/abc123"
+        )
+
+    @patch("django.conf.settings.UNSPLASH_ACCESS_KEY", "test_key")
+    @patch("trips.utils.requests.get")
+    def test_get_unsplash_photo_api_error(self, mock_get):
+        """Test photo lookup error handling"""
+        import requests
+
+        mock_get.side_effect = requests.RequestException("API Error")
+
+        self.assertIsNone(get_unsplash_photo("abc123"))
+
+    @patch("django.conf.settings.UNSPLASH_ACCESS_KEY", "")
+    def test_get_unsplash_photo_no_api_key(self):
+        """Test photo lookup without API key configured"""
+        self.assertIsNone(get_unsplash_photo("abc123"))
+
     @patch("django.conf.settings.UNSPLASH_ACCESS_KEY", "test_key")
     @patch("trips.utils.requests.get")
     def test_download_unsplash_photo_success(self, mock_get):
@@ -945,6 +1094,112 @@ class TestImageProcessing(TestCase):
         self.assertLessEqual(processed_img.width, 1200)
         self.assertLessEqual(processed_img.height, 800)
 
+    def test_process_trip_image_exif_orientation(self):
+        """Test that the EXIF orientation is applied instead of a blind rotation"""
+        from io import BytesIO
+
+        from PIL import ExifTags, Image
+
+        # Stored sideways, a quarter turn clockwise shows a 600x900 portrait
+        img = Image.new("RGB", (900, 600), color="red")
+        img.paste("blue", (300, 0, 600, 600))
+        exif = Image.Exif()
+        exif[ExifTags.Base.Orientation] = 6
+        img_io = BytesIO()
+        img.save(img_io, "JPEG", exif=exif)
+
+        processed = process_trip_image(img_io.getvalue())
+
+        processed_img = Image.open(processed)
+        # Upright portrait cropped to landscape around its center
+        self.assertEqual(processed_img.size, (600, 400))
+        red, green, blue = processed_img.getpixel((300, 200))
+        self.assertGreater(blue, 200)
+        self.assertLess(red, 50)
+        self.assertNotIn(ExifTags.Base.Orientation, processed_img.getexif())
+
+    def test_process_trip_image_draft_decoding(self):
+        """Test that large JPEGs are decoded at a reduced scale"""
+        from io import BytesIO
+        from unittest.mock import patch
+
+        from PIL import Image
+        from PIL.JpegImagePlugin import JpegImageFile
+
+        img = Image.new("RGB", (4800, 3200), color="green")
+        img_io = BytesIO()
+        img.save(img_io, "JPEG")
+
+        with patch.object(
+            JpegImageFile, "draft", autospec=True, side_effect=JpegImageFile.draft
+        ) as mock_draft:
+            processed = process_trip_image(img_io.getvalue())
+
+        mock_draft.assert_called_once()
+        self.assertEqual(Image.open(processed).size, (1200, 800))
+
+    def test_process_trip_image_pixel_cap(self):
+        """Test that images with too many pixels are rejected before decoding"""
+        from io import BytesIO
+        from unittest.mock import patch
+
+        from PIL import Image
+
+        img = Image.new("RGB", (400, 300), color="green")
+        img_io = BytesIO()
+        img.save(img_io, "JPEG")
+
+        with (
+            patch("trips.utils.TRIP_IMAGE_MAX_PIXELS", 100_000),
+            patch("trips.utils.logger.warning") as mock_warning,
+            patch.object(Image.Image, "load") as mock_load,
+        ):
+            self.assertIsNone(process_trip_image(img_io.getvalue()))
+
+        mock_load.assert_not_called()
+        self.assertIn("400x300", mock_warning.call_args[0][0])
+
+    def test_process_trip_image_temporary_file(self):
+        """Test that the processed image is written to a temporary file"""
+        import os
+        from io import BytesIO
+
+        from django.core.files.uploadedfile import TemporaryUploadedFile
+        from PIL import Image
+
+        img = Image.new("RGB", (800, 600), color="red")
+        img_io = BytesIO()
+        img.save(img_io, "JPEG")
+
+        processed = process_trip_image(img_io.getvalue())
+
+        self.assertIsInstance(processed, TemporaryUploadedFile)
+        self.assertEqual(
+            processed.size, os.path.getsize(processed.temporary_file_path())
+        )
+        self.assertEqual(processed.name, "unsplash_photo.jpg")
+        processed.close()
+
+    def test_process_trip_image_png_upload_renamed(self):
+        """Test that a PNG upload is stored under a .jpg name, as JPEG data"""
+        from io import BytesIO
+
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from PIL import Image
+
+        img = Image.new("RGB", (800, 600), color="green")
+        img_io = BytesIO()
+        img.save(img_io, "PNG")
+        uploaded_file = SimpleUploadedFile(
+            "holiday.photo.png", img_io.getvalue(), content_type="image/png"
+        )
+
+        processed = process_trip_image(uploaded_file)
+
+        self.assertEqual(processed.name, "holiday.photo.jpg")
+        self.assertEqual(Image.open(processed).format, "JPEG")
+        processed.close()
+
 
 class TestCSVFunctions(TestCase):
     """Test CSV loading and search functions for airports and stations"""
@@ -955,7 +1210,7 @@ class TestCSVFunctions(TestCase):
 
         airports = load_airports()
 
-        self.assertIsInstance(airports, list)
+        self.assertIsInstance(airports, ColumnarTable)
         self.assertGreater(len(airports), 0)
 
         # Check first airport structure
@@ -976,7 +1231,7 @@ class TestCSVFunctions(TestCase):
 
         stations = load_train_stations()
 
-        self.assertIsInstance(stations, list)
+        self.assertIsInstance(stations, ColumnarTable)
         self.assertGreater(len(stations), 0)
 
         # Check first station structure
@@ -1002,6 +1257,35 @@ class TestCSVFunctions(TestCase):
         # Should find Rome Fiumicino
         self.assertTrue(any("FCO" in r["iata_code"] for r in results))
 
+    def test_search_airports_ranks_exact_code_first(self):
+        """Test an exact IATA code ranks before name and city matches"""
+        from trips.utils import search_airports
+
+        results = search_airports("fco", limit=5)
+
+        self.assertEqual(results[0]["iata_code"], "FCO")
+
+    def test_search_airports_prefix_before_substring(self):
+        """Test prefix matches rank before substring matches"""
+        from trips.utils import search_airports
+
+        results = search_airports("Milan", limit=3)
+
+        for r in results:
+            words = f"{r['name']} {r['city']}".lower().replace("-", " ").split()
+            self.assertTrue(any(word.startswith("milan") for word in words))
+
+    def test_airport_index_rebuilt_when_airports_reload(self):
+        """Test the index follows a reloaded airports cache"""
+        import trips.utils
+        from trips.utils import get_airport_index
+
+        index = get_airport_index()
+        self.assertIs(get_airport_index(), index)
+
+        trips.utils._AIRPORTS_CACHE = None
+        self.assertIsNot(get_airport_index(), index)
+
     def test_search_airports_by_city(self):
         """Test searching airports by city name"""
         from trips.utils import search_airports
@@ -1037,6 +1321,42 @@ class TestCSVFunctions(TestCase):
         self.assertIsInstance(results, list)
         self.assertGreater(len(results), 0)
 
+    def test_search_train_stations_ignores_accents(self):
+        """Test unaccented queries find accented station names"""
+        from trips.utils import search_train_stations
+
+        results = search_train_stations("malaga", limit=5)
+
+        self.assertTrue(any("Málaga" in station["name"] for station in results))
+
+    def test_search_train_stations_exact_name_first(self):
+        """Test an exact station name ranks before longer names"""
+        from trips.utils import search_train_stations
+
+        results = search_train_stations("roma", limit=5)
+
+        self.assertEqual(results[0]["name"].lower(), "roma")
+
+    def test_search_train_stations_country_filter(self):
+        """Test results can be restricted to one country"""
+        from trips.utils import search_train_stations
+
+        results = search_train_stations("roma", limit=10, country="IT")
+
+        self.assertGreater(len(results), 0)
+        self.assertTrue(all(station["country"] == "IT" for station in results))
+
+    def test_station_index_rebuilt_when_stations_reload(self):
+        """Test the index follows a reloaded stations cache"""
+        import trips.utils
+        from trips.utils import get_station_index
+
+        index = get_station_index()
+        self.assertIs(get_station_index(), index)
+
+        trips.utils._STATIONS_CACHE = None
+        self.assertIsNot(get_station_index(), index)
+
     def test_search_train_stations_limit(self):
         """Test search train stations respects limit"""
         from trips.utils import search_train_stations
@@ -1064,6 +1384,13 @@ class TestCSVFunctions(TestCase):
         self.assertEqual(airport["iata_code"], "FCO")
         self.assertIn("Rome", airport["name"] + airport["city"])
 
+    def test_get_airport_by_iata_case_insensitive(self):
+        """Test IATA lookup ignores case and never matches an empty code"""
+        from trips.utils import get_airport_by_iata
+
+        self.assertEqual(get_airport_by_iata("fco")["iata_code"], "FCO")
+        self.assertIsNone(get_airport_by_iata(""))
+
     def test_get_airport_by_iata_not_found(self):
         """Test getting non-existent airport returns None"""
         from trips.utils import get_airport_by_iata
@@ -1085,6 +1412,113 @@ class TestCSVFunctions(TestCase):
         self.assertIsNotNone(station)
         self.assertEqual(station["id"], first_id)
 
+    def test_get_station_by_id_accepts_int(self):
+        """Test station lookup accepts numeric ids"""
+        from trips.utils import get_station_by_id
+
+        self.assertEqual(get_station_by_id(23644)["name"], "Málaga Aeropuerto")
+
+    @patch("trips.utils.freeze_shared_memory")
+    def test_preload_datasets(self, mock_freeze):
+        """Test preloading builds both indexes and freezes them"""
+        import trips.utils
+        from trips.utils import preload_datasets
+
+        preload_datasets()
+
+        self.assertIsNotNone(trips.utils._AIRPORT_INDEX)
+        self.assertIsNotNone(trips.utils._STATION_INDEX)
+        self.assertIsNotNone(trips.utils._AIRPORT_SPATIAL_INDEX)
+        self.assertIsNotNone(trips.utils._STATION_SPATIAL_INDEX)
+        mock_freeze.assert_called_once()
+
+    def test_nearest_airports(self):
+        """Test the nearest airports are found, only those with an IATA code"""
+        from trips.utils import nearest_airports
+
+        results = nearest_airports(41.9, 12.5, limit=2)
+
+        self.assertEqual([a["iata_code"] for a in results], ["CIA", "FCO"])
+        self.assertLess(results[0]["distance_km"], results[1]["distance_km"])
+
+    def test_nearest_train_stations(self):
+        """Test the nearest stations are found within the radius"""
+        from trips.utils import nearest_train_stations
+
+        results = nearest_train_stations(41.9, 12.5, limit=3)
+
+        self.assertEqual(results[0]["name"], "Roma Termini")
+        self.assertTrue(all(s["distance_km"] <= 30 for s in results))
+        self.assertEqual(nearest_train_stations(0.0, -30.0), [])
+
+    def test_spatial_indexes_rebuilt_when_datasets_reload(self):
+        """Test the spatial indexes follow reloaded datasets"""
+        import trips.utils
+        from trips.utils import get_airport_spatial_index, get_station_spatial_index
+
+        airports = get_airport_spatial_index()
+        stations = get_station_spatial_index()
+        self.assertIs(get_airport_spatial_index(), airports)
+        self.assertIs(get_station_spatial_index(), stations)
+
+        trips.utils._AIRPORTS_CACHE = None
+        trips.utils._STATIONS_CACHE = None
+        self.assertIsNot(get_airport_spatial_index(), airports)
+        self.assertIsNot(get_station_spatial_index(), stations)
+
+    def test_is_iata_code(self):
+        """Test IATA code validation"""
+        from trips.utils import is_iata_code
+
+        self.assertTrue(is_iata_code("FCO"))
+        self.assertFalse(is_iata_code("\\N"))
+        self.assertFalse(is_iata_code(""))
+
+    @patch("trips.utils.preload_datasets")
+    def test_app_ready_preloads_datasets_when_enabled(self, mock_preload):
+        """Test the app config preloads the tables only when configured"""
+        from django.apps import apps
+
+        config = apps.get_app_config("trips")
+        config.ready()
+        mock_preload.assert_not_called()
+
+        with self.settings(PRELOAD_DATASETS=True):
+            config.ready()
+        mock_preload.assert_called_once()
+
+    @patch("trips.utils.preload_datasets")
+    def test_app_ready_skips_preload_for_other_commands(self, mock_preload):
+        """Test the tables are not preloaded for migrate and the like"""
+        from django.apps import apps
+
+        config = apps.get_app_config("trips")
+        with (
+            self.settings(PRELOAD_DATASETS=True),
+            patch("sys.argv", ["manage.py", "migrate"]),
+        ):
+            config.ready()
+        mock_preload.assert_not_called()
+
+    def test_needs_preloaded_datasets(self):
+        """Test only web servers and the task cluster preload the tables"""
+        from trips.apps import needs_preloaded_datasets
+
+        self.assertTrue(needs_preloaded_datasets(["/usr/bin/granian", "core.wsgi"]))
+        self.assertTrue(needs_preloaded_datasets(["manage.py", "runserver"]))
+        self.assertTrue(needs_preloaded_datasets(["manage.py", "qcluster"]))
+        self.assertFalse(needs_preloaded_datasets(["manage.py", "migrate"]))
+        self.assertFalse(needs_preloaded_datasets(["manage.py"]))
+        self.assertFalse(
+            needs_preloaded_datasets(["/usr/bin/django-admin", "compile_datasets"])
+        )
+        self.assertFalse(
+            needs_preloaded_datasets(
+                ["/venv/lib/python3.13/site-packages/django/__main__.py", "shell"]
+            )
+        )
+        self.assertTrue(needs_preloaded_datasets([]))
+
     def test_get_station_by_id_not_found(self):
         """Test getting non-existent station returns None"""
         from trips.utils import get_station_by_id
@@ -1094,6 +1528,77 @@ class TestCSVFunctions(TestCase):
         self.assertIsNone(station)
 
 
+class TestTripStayCoordinates(TestCase):
+    def test_first_and_last_geocoded_stay(self):
+        """Test the first/last stay with coordinates is picked by day number"""
+        from trips.utils import get_trip_stay_coordinates
+
+        trip = TripFactory(start_date=date(2026, 5, 1), end_date=date(2026, 5, 3))
+        days = list(trip.days.all())
+        first = StayFactory(latitude=41.9, longitude=12.5)
+        last = StayFactory(latitude=45.46, longitude=9.19)
+        ungeocoded = StayFactory()
+        Stay.objects.filter(pk=ungeocoded.pk).update(latitude=None, longitude=None)
+        days[0].stay = first
+        days[0].save()
+        days[1].stay = last
+        days[1].save()
+        days[-1].stay = ungeocoded
+        days[-1].save()
+
+        self.assertEqual(get_trip_stay_coordinates(trip), (41.9, 12.5))
+        self.assertEqual(get_trip_stay_coordinates(trip, last=True), (45.46, 9.19))
+
+    def test_no_geocoded_stay(self):
+        """Test None is returned when no stay has coordinates"""
+        from trips.utils import get_trip_stay_coordinates
+
+        self.assertIsNone(get_trip_stay_coordinates(TripFactory()))
+
+
+class TestCreateTripMap(TestCase):
+    """Test the trip overview map"""
+
+    def test_one_layer_per_day_with_locations(self):
+        trip = TripFactory(start_date=date(2026, 5, 1), end_date=date(2026, 5, 3))
+        days = list(trip.days.all())
+        EventFactory(
+            trip=trip, day=days[0], name="Colosseo", latitude=41.89, longitude=12.49
+        )
+        StayFactory(day=days[1], latitude=41.9, longitude=12.5)
+        EventFactory(trip=trip, day=days[2], latitude=None, longitude=None)
+
+        trip_map = create_trip_map(trip)
+
+        assert "Day 1 - 01/05" in trip_map
+        assert "Day 2 - 02/05" in trip_map
+        # The last day has nothing with coordinates
+        assert "Day 3 - 03/05" not in trip_map
+        assert "Colosseo" in trip_map
+        assert "Arrival and departure" not in trip_map
+
+    def test_main_transfers_layer(self):
+        trip = TripFactory()
+        MainTransferFactory(trip=trip, direction=1, type=1)
+        departure = MainTransferFactory(trip=trip, direction=2, type=2)
+
+        trip_map = create_trip_map(trip)
+
+        assert "Arrival and departure" in trip_map
+        assert f"Departure: {departure.origin_name}" in trip_map
+
+    def test_main_transfer_without_coordinates(self):
+        trip = TripFactory()
+        MainTransferFactory(
+            trip=trip, direction=2, origin_latitude=None, origin_longitude=None
+        )
+
+        assert create_trip_map(trip) is None
+
+    def test_nothing_to_show(self):
+        assert create_trip_map(TripFactory()) is None
+
+
 class TestMapWithMainTransfers(TestCase):
     """Test create_day_map integration with main transfers"""
 
@@ -131,3 +131,42 @@ def test_load_train_stations_handles_invalid_data(tmp_path):
     finally:
         settings.BASE_DIR = original_base_dir
         trips.utils._STATIONS_CACHE = None
+
+
+def test_load_dataset_uses_compiled_table_until_csv_changes(tmp_path, settings):
+    """Test the compiled binary is used, and ignored once the CSV changes"""
+    from trips.utils import compile_dataset, load_dataset
+
+    csv_dir = tmp_path / "trips" / "data"
+    csv_dir.mkdir(parents=True)
+    csv_file = csv_dir / "airports_simple.csv"
+    fieldnames = ["iata_code", "name", "city", "latitude", "longitude"]
+    row = {
+        "iata_code": "FCO",
+        "name": "Fiumicino",
+        "city": "Rome",
+        "latitude": "41.8",
+        "longitude": "12.2",
+    }
+
+    def write_rows(rows):
+        with open(csv_file, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(rows)
+
+    write_rows([row])
+    settings.BASE_DIR = tmp_path
+
+    path, rows = compile_dataset("airports")
+    assert (path, rows) == (csv_dir / "airports_simple.bin", 1)
+
+    airports = load_dataset("airports")
+    assert isinstance(airports.column("name").blob, memoryview)
+    assert airports.lookup("fco")["latitude"] == 41.8
+
+    # A newer CSV makes the compiled table stale: parse the CSV instead
+    write_rows([row, {**row, "iata_code": "CIA", "name": "Ciampino"}])
+    airports = load_dataset("airports")
+    assert len(airports) == 2
+    assert isinstance(airports.column("name").blob, bytes)
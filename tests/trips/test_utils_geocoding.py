@@ -1,37 +1,47 @@
-import time
 from unittest.mock import patch
 
 import pytest
 from django.core.cache import cache
 
 from tests.test import TestCase
-from trips.utils import generate_cache_key, geocode_location
+from trips.models import GeocodeResult
+from trips.utils import (
+    NOMINATIM_RATE_LIMIT_KEY,
+    GeocodingRateLimited,
+    acquire_nominatim_token,
+    generate_cache_key,
+    geocode_location,
+)
 
 pytestmark = pytest.mark.django_db
 
 
-class RateLimitCheckTests(TestCase):
-    def test_rate_limit_check_waits_if_called_too_soon(self):
-        """Should sleep if called within 1 second of last request."""
+@pytest.fixture(autouse=True)
+def release_nominatim_token():
+    """Every test starts with the Nominatim token available"""
+    cache.delete(NOMINATIM_RATE_LIMIT_KEY)
 
-        from trips.utils import rate_limit_check
 
-        cache.set("nominatim_last_request_time", time.time(), 60)
-        start = time.time()
-        rate_limit_check()
-        elapsed = time.time() - start
-        assert elapsed >= 0.99  # Should wait at least ~1 second
+class NominatimRateLimitTests(TestCase):
+    @patch("trips.utils.requests.get")
+    def test_geocode_location_raises_when_token_taken(self, mock_get):
+        """Should not wait nor call the API when the token is already taken."""
+        acquire_nominatim_token()
+
+        with pytest.raises(GeocodingRateLimited) as exc_info:
+            geocode_location("Hotel Busy", "Rome")
 
-    def test_rate_limit_check_no_wait_if_enough_time_passed(self):
-        """Should not sleep if more than 1 second has passed since last request."""
+        assert exc_info.value.retry_after == 1
+        assert not mock_get.called
 
-        from trips.utils import rate_limit_check
+    @patch("trips.utils.requests.get")
+    def test_geocode_location_cached_result_ignores_rate_limit(self, mock_get):
+        """Cached results are served even while the token is taken."""
+        cache.set(generate_cache_key("Hotel Cached", "Rome"), [{"name": "x"}], 60)
+        acquire_nominatim_token()
 
-        cache.set("nominatim_last_request_time", time.time() - 2, 60)
-        start = time.time()
-        rate_limit_check()
-        elapsed = time.time() - start
-        assert elapsed < 0.5  # Should not wait
+        assert geocode_location("Hotel Cached", "Rome") == [{"name": "x"}]
+        assert not mock_get.called
 
 
 class GenerateCacheKeyTests(TestCase):
@@ -136,6 +146,44 @@ class GeocodeLocationTests(TestCase):
         assert addresses == cached_result
         assert not mock_get.called
 
+    @patch("trips.utils.requests.get")
+    def test_geocode_location_returns_stored_result(self, mock_get):
+        stored_result = [{"address": "Via Roma 1, Rome", "lat": 41.9, "lon": 12.5}]
+        GeocodeResult.objects.store(
+            GeocodeResult.Provider.NOMINATIM, "hotel del corso, rome", stored_result
+        )
+
+        addresses = geocode_location("Hotel del Corso", "Rome")
+
+        assert addresses == stored_result
+        assert not mock_get.called
+        # The process cache is warmed for the next lookup
+        assert cache.get(generate_cache_key("Hotel del Corso", "Rome")) == (
+            stored_result
+        )
+
+    @patch("trips.utils.requests.get")
+    def test_geocode_location_saves_result_to_store(self, mock_get):
+        mock_get.return_value.status_code = 200
+        mock_get.return_value.json.return_value = [
+            {
+                "address": {"road": "Via Roma", "city": "Rome"},
+                "lat": "41.9028",
+                "lon": "12.4964",
+                "importance": 0.7,
+                "name": "Hotel Roma",
+            }
+        ]
+
+        addresses = geocode_location("Hotel Stored", "Rome")
+
+        assert (
+            GeocodeResult.objects.lookup(
+                GeocodeResult.Provider.NOMINATIM, "Hotel Stored, Rome"
+            )
+            == addresses
+        )
+
 
 class GeocodeLocationAddressFormatTests(TestCase):
     def test_address_format_with_only_street_and_city(self):
@@ -7,7 +7,10 @@ from unittest.mock import patch
 
 import pytest
 import time_machine
+from django.core.cache import cache
+from django.db import connection
 from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 from pytest_django.asserts import assertTemplateUsed
@@ -16,9 +19,13 @@ from tests.test import TestCase
 from tests.trips.factories import (
     EventFactory,
     ExperienceFactory,
+    MainTransferFactory,
+    SimpleTransferFactory,
     StayFactory,
+    StayTransferFactory,
     TripFactory,
 )
+from trips.models import Event, MainTransfer, Stay, Trip
 
 pytestmark = pytest.mark.django_db
 
@@ -131,6 +138,22 @@ class HomeView(TestCase):
         assert response.context["latest_trip"] is None
         assert len(response.context["other_trips"]) == 0
 
+    def test_get_fixed_number_of_queries(self):
+        user = self.make_user("user")
+        for status in (1, 2, 3, 4, 5):
+            trip = TripFactory(author=user)
+            Trip.objects.filter(pk=trip.pk).update(status=status)
+
+        with self.login(user):
+            # session, user, profile, shown trip with days, events and main
+            # transfers, unpaired events and other trips
+            with self.assertNumQueries(9):
+                response = self.get("trips:home")
+
+        self.response_200(response)
+        assert response.context["latest_trip"].status == 3
+        assert len(response.context["other_trips"]) == 3
+
     def test_get_with_no_profile(self):
         user = self.make_user("user")
         user.profile.delete()
@@ -460,6 +483,174 @@ class TripDetailView(TestCase):
         assert response.context["trip"] == trip
 
 
+class TripMapView(TestCase):
+    """Test cases for the trip overview map"""
+
+    def make_trip(self, user, days):
+        trip = TripFactory(
+            author=user,
+            start_date=date(2026, 5, 1),
+            end_date=date(2026, 5, 1) + datetime.timedelta(days=days - 1),
+        )
+        for day in trip.days.all():
+            StayFactory(day=day, latitude=41.9, longitude=12.5)
+            EventFactory(trip=trip, day=day, latitude=41.89, longitude=12.49)
+            EventFactory(trip=trip, day=day, latitude=41.90, longitude=12.48)
+        MainTransferFactory(trip=trip, direction=MainTransfer.Direction.ARRIVAL)
+        return trip
+
+    def test_trip_detail_loads_one_map_for_all_days(self):
+        """Test the map preference loads a single trip map, not a map per day"""
+        user = self.make_user("user")
+        user.profile.default_map_view = "map"
+        user.profile.save()
+        trip = TripFactory(author=user)
+
+        with self.login(user):
+            response = self.get("trips:trip-detail", pk=trip.pk)
+
+        self.response_200(response)
+        self.assertContains(response, reverse("trips:trip-map", args=[trip.pk]))
+        self.assertNotContains(response, 'hx-trigger="load" hx-target="#day-')
+
+    def test_trip_detail_without_map_preference(self):
+        user = self.make_user("user")
+        trip = TripFactory(author=user)
+
+        with self.login(user):
+            response = self.get("trips:trip-detail", pk=trip.pk)
+
+        self.assertNotContains(response, reverse("trips:trip-map", args=[trip.pk]))
+
+    def test_get_trip_map(self):
+        user = self.make_user("user")
+        trip = self.make_trip(user, days=3)
+
+        with self.login(user):
+            response = self.get("trips:trip-map", pk=trip.pk)
+
+        self.response_200(response)
+        assertTemplateUsed(response, "trips/includes/trip-map.html")
+        assert "Day 3 - 03/05" in response.context["map"]
+
+    def test_get_trip_map_empty(self):
+        user = self.make_user("user")
+        trip = TripFactory(author=user)
+
+        with self.login(user):
+            response = self.get("trips:trip-map", pk=trip.pk)
+
+        self.response_200(response)
+        assert response.context["map"] is None
+
+    def test_get_trip_map_unauthorized(self):
+        trip = TripFactory()
+        user = self.make_user("user")
+
+        with self.login(user):
+            response = self.get("trips:trip-map", pk=trip.pk)
+
+        self.response_404(response)
+
+    def test_query_count_does_not_grow_with_days(self):
+        user = self.make_user("user")
+        short_trip = self.make_trip(user, days=2)
+        long_trip = self.make_trip(user, days=20)
+
+        with self.login(user):
+            with CaptureQueriesContext(connection) as short_queries:
+                self.get("trips:trip-map", pk=short_trip.pk)
+            with self.assertNumQueries(len(short_queries)):
+                response = self.get("trips:trip-map", pk=long_trip.pk)
+
+        self.response_200(response)
+        assert "Day 20 - 20/05" in response.context["map"]
+
+
+class GeojsonViews(TestCase):
+    """Test cases for the GeoJSON map endpoints"""
+
+    def test_day_geojson(self):
+        user = self.make_user("user")
+        trip = TripFactory(author=user)
+        day = trip.days.first()
+        EventFactory(trip=trip, day=day, latitude=41.89, longitude=12.49)
+
+        with self.login(user):
+            response = self.get("trips:day-geojson", pk=day.pk)
+
+        self.response_200(response)
+        assert response["Content-Type"] == "application/geo+json"
+        assert "no-cache" in response["Cache-Control"]
+        data = response.json()
+        assert data["type"] == "FeatureCollection"
+        assert data["features"][0]["properties"]["kind"] == "experience"
+
+    def test_trip_geojson_conditional_get(self):
+        user = self.make_user("user")
+        trip = TripFactory(author=user)
+        EventFactory(trip=trip, latitude=41.89, longitude=12.49)
+
+        with self.login(user):
+            response = self.get("trips:trip-geojson", pk=trip.pk)
+            etag = response["ETag"]
+            not_modified = self.get(
+                "trips:trip-geojson", pk=trip.pk, extra={"HTTP_IF_NONE_MATCH": etag}
+            )
+            EventFactory(trip=trip, latitude=45.46, longitude=9.19)
+            modified = self.get(
+                "trips:trip-geojson", pk=trip.pk, extra={"HTTP_IF_NONE_MATCH": etag}
+            )
+
+        self.response_200(response)
+        assert not_modified.status_code == 304
+        assert not_modified.content == b""
+        self.response_200(modified)
+        assert modified["ETag"] != etag
+
+    def test_geojson_unauthorized(self):
+        trip = TripFactory()
+        user = self.make_user("user")
+
+        with self.login(user):
+            day_response = self.get("trips:day-geojson", pk=trip.days.first().pk)
+            trip_response = self.get("trips:trip-geojson", pk=trip.pk)
+
+        self.response_404(day_response)
+        self.response_404(trip_response)
+
+    @override_settings(MAP_RENDERER="leaflet")
+    def test_leaflet_day_map(self):
+        """Test the leaflet renderer ships the GeoJSON URL instead of folium HTML"""
+        user = self.make_user("user")
+        trip = TripFactory(author=user)
+        day = trip.days.first()
+        EventFactory(trip=trip, day=day, latitude=41.89, longitude=12.49)
+
+        with self.login(user):
+            with patch("trips.views.create_day_map") as mock_map:
+                response = self.get("trips:day-detail", pk=day.pk, data={"view": "map"})
+
+        mock_map.assert_not_called()
+        assert response.context["map_url"] == reverse(
+            "trips:day-geojson", args=[day.pk]
+        )
+        self.assertContains(response, "data-geojson-map")
+
+    @override_settings(MAP_RENDERER="leaflet")
+    def test_leaflet_trip_map(self):
+        user = self.make_user("user")
+        trip = TripFactory(author=user)
+
+        with self.login(user):
+            with patch("trips.views.create_trip_map") as mock_map:
+                response = self.get("trips:trip-map", pk=trip.pk)
+
+        mock_map.assert_not_called()
+        self.assertContains(response, reverse("trips:trip-geojson", args=[trip.pk]))
+        self.assertContains(response, 'data-layers="day"')
+
+
 class TestTripDatesUpdate(TestCase):
     """Test cases for trip dates update view"""
 
@@ -761,6 +952,252 @@ class DayDetailView(TestCase):
         assert response.context["locations"]["last_day"] is True
 
 
+def make_busy_trip(author, days, events):
+    """A trip with a stay per day, timed events chained by transfers"""
+    trip = TripFactory(
+        author=author,
+        start_date=date(2026, 5, 1),
+        end_date=date(2026, 5, 1) + datetime.timedelta(days=days - 1),
+    )
+    trip_days = list(trip.days.all())
+    for day in trip_days:
+        StayFactory(day=day, latitude=41.9, longitude=12.5)
+        day.refresh_from_db()
+        previous = None
+        for hour in range(events):
+            event = EventFactory(
+                trip=trip,
+                day=day,
+                latitude=41.89,
+                longitude=12.49,
+                start_time=datetime.time(8 + hour),
+                end_time=datetime.time(8 + hour, 30),
+            )
+            if previous:
+                SimpleTransferFactory(from_event=previous, to_event=event)
+            previous = event
+    for day, next_day in zip(trip_days, trip_days[1:], strict=False):
+        StayTransferFactory(
+            from_stay=day.stay,
+            to_stay=next_day.stay,
+            from_day=day,
+            to_day=next_day,
+        )
+    MainTransferFactory(trip=trip, direction=MainTransfer.Direction.ARRIVAL)
+    MainTransferFactory(trip=trip, direction=MainTransfer.Direction.DEPARTURE)
+    return trip
+
+
+class DayDetailQueryCount(TestCase):
+    """The day card runs a fixed number of queries, list and map view alike"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = self.make_user("user")
+
+    def assert_constant_queries(self, view, expected):
+        small = make_busy_trip(self.user, days=2, events=1)
+        large = make_busy_trip(self.user, days=10, events=8)
+
+        with self.login(self.user):
+            for trip in (small, large):
+                for day in (trip.days.first(), trip.days.last()):
+                    with self.assertNumQueries(expected):
+                        response = self.get(
+                            "trips:day-detail", pk=day.pk, data={"view": view}
+                        )
+                    self.response_200(response)
+
+    def test_list_view(self):
+        self.assert_constant_queries("list", 7)
+
+    def test_map_view(self):
+        self.assert_constant_queries("map", 7)
+
+    def test_map_view_uses_prefetched_events(self):
+        trip = make_busy_trip(self.user, days=2, events=3)
+        day = trip.days.first()
+
+        with self.login(self.user):
+            response = self.get("trips:day-detail", pk=day.pk, data={"view": "map"})
+
+        locations = response.context["locations"]
+        assert len(locations["events"]) == 3
+        assert locations["arrival_transfer"].direction == MainTransfer.Direction.ARRIVAL
+        assert locations["stay_transfer_out"] == day.stay.transfer_from
+        assert "Add transfer to next event" not in response.content.decode()
+
+
+class TripDetailQueryCount(TestCase):
+    """Trip pages render every day from one timeline in fixed queries"""
+
+    def setUp(self):
+        self.user = self.make_user("user")
+
+    def test_trip_detail(self):
+        small = make_busy_trip(self.user, days=2, events=1)
+        large = make_busy_trip(self.user, days=30, events=4)
+
+        with self.login(self.user):
+            with CaptureQueriesContext(connection) as small_queries:
+                self.get("trips:trip-detail", pk=small.pk)
+            with self.assertNumQueries(len(small_queries)):
+                response = self.get("trips:trip-detail", pk=large.pk)
+
+        self.response_200(response)
+        assert len(response.context["timeline"]) == 30
+        self.assertContains(response, 'hx-trigger="dayModified', count=30)
+
+    def test_home(self):
+        small = make_busy_trip(self.user, days=2, events=1)
+
+        with self.login(self.user):
+            with CaptureQueriesContext(connection) as small_queries:
+                self.get("trips:home")
+            small.delete()
+            make_busy_trip(self.user, days=30, events=4)
+            with self.assertNumQueries(len(small_queries)):
+                response = self.get("trips:home")
+
+        self.response_200(response)
+        assert len(response.context["timeline"]) == 30
+
+
+class GeocodingStatusViews(TestCase):
+    def test_day_status_pending_event_keeps_polling(self):
+        user = self.make_user("user")
+        trip = TripFactory(author=user)
+        day = trip.days.first()
+        event = EventFactory(day=day)
+        Event.objects.filter(pk=event.pk).update(
+            geocoding_pending=True, geocoding_requested_at=timezone.now()
+        )
+
+        with self.login(user):
+            response = self.get("trips:day-geocoding-status", pk=day.pk)
+
+        assert response.status_code == 204
+        assert "HX-Trigger" not in response.headers
+
+    def test_day_status_pending_stay_keeps_polling(self):
+        user = self.make_user("user")
+        trip = TripFactory(author=user)
+        day = trip.days.first()
+        stay = StayFactory()
+        day.stay = stay
+        day.save()
+        Stay.objects.filter(pk=stay.pk).update(
+            geocoding_pending=True, geocoding_requested_at=timezone.now()
+        )
+
+        with self.login(user):
+            response = self.get("trips:day-geocoding-status", pk=day.pk)
+
+        assert response.status_code == 204
+
+    def test_day_status_resolved_stops_polling_and_refreshes_day(self):
+        user = self.make_user("user")
+        trip = TripFactory(author=user)
+        day = trip.days.first()
+        day.stay = StayFactory()
+        day.save()
+        EventFactory(day=day)
+
+        with self.login(user):
+            response = self.get("trips:day-geocoding-status", pk=day.pk)
+
+        assert response.status_code == 286
+        assert response.headers["HX-Trigger"] == f"dayModified{day.pk}"
+
+    def test_day_status_gives_up_on_lost_jobs(self):
+        user = self.make_user("user")
+        trip = TripFactory(author=user)
+        day = trip.days.first()
+        stay = StayFactory()
+        day.stay = stay
+        day.save()
+        event = EventFactory(day=day)
+        requested_at = timezone.now() - datetime.timedelta(hours=1)
+        Stay.objects.filter(pk=stay.pk).update(
+            geocoding_pending=True, geocoding_requested_at=requested_at
+        )
+        Event.objects.filter(pk=event.pk).update(
+            latitude=None,
+            geocoding_pending=True,
+            geocoding_query="colosseum, roma",
+            geocoding_requested_at=requested_at,
+        )
+
+        with self.login(user):
+            response = self.get("trips:day-geocoding-status", pk=day.pk)
+
+        assert response.status_code == 286
+        assert response.headers["HX-Trigger"] == f"dayModified{day.pk}"
+        stay.refresh_from_db()
+        event.refresh_from_db()
+        assert stay.geocoding_pending is False
+        assert event.geocoding_pending is False
+        assert event.geocoding_query == ""
+        assert event.geocoding_requested_at is None
+        assert event.latitude is None
+
+    def test_day_status_other_user_not_found(self):
+        user = self.make_user("user")
+        other = self.make_user("other")
+        day = TripFactory(author=other).days.first()
+
+        with self.login(user):
+            response = self.get("trips:day-geocoding-status", pk=day.pk)
+
+        self.response_404(response)
+
+    def test_trip_status_pending_transfer_keeps_polling(self):
+        user = self.make_user("user")
+        trip = TripFactory(author=user)
+        transfer = MainTransferFactory(
+            trip=trip, direction=MainTransfer.Direction.ARRIVAL
+        )
+        MainTransfer.objects.filter(pk=transfer.pk).update(
+            geocoding_pending=True, geocoding_requested_at=timezone.now()
+        )
+
+        with self.login(user):
+            response = self.get("trips:trip-geocoding-status", trip_id=trip.pk)
+
+        assert response.status_code == 204
+
+    def test_trip_status_gives_up_on_lost_jobs(self):
+        user = self.make_user("user")
+        trip = TripFactory(author=user)
+        transfer = MainTransferFactory(
+            trip=trip, direction=MainTransfer.Direction.ARRIVAL
+        )
+        MainTransfer.objects.filter(pk=transfer.pk).update(
+            geocoding_pending=True,
+            origin_geocoding_query="piazza duomo, milano",
+            geocoding_requested_at=timezone.now() - datetime.timedelta(hours=1),
+        )
+
+        with self.login(user):
+            response = self.get("trips:trip-geocoding-status", trip_id=trip.pk)
+
+        assert response.status_code == 286
+        assert response.headers["HX-Trigger"] == "tripModified"
+        transfer.refresh_from_db()
+        assert transfer.geocoding_pending is False
+        assert transfer.origin_geocoding_query == ""
+
+    def test_trip_status_resolved_stops_polling_and_refreshes_trip(self):
+        user = self.make_user("user")
+        trip = TripFactory(author=user)
+
+        with self.login(user):
+            response = self.get("trips:trip-geocoding-status", trip_id=trip.pk)
+
+        assert response.status_code == 286
+        assert response.headers["HX-Trigger"] == "tripModified"
+
+
 class TestViewLogFile(TestCase):
     """
     Tests for the view_log_file function-based view.
@@ -939,6 +1376,21 @@ class GeocodeAddressViewTests(TestCase):
             b"No address found" in response.content or b"found" not in response.content
         )
 
+    @patch("trips.views.geocode_location")
+    def test_geocode_address_post_rate_limited(self, mock_geocode_location):
+        from django.urls import reverse
+
+        from trips.utils import GeocodingRateLimited
+
+        mock_geocode_location.side_effect = GeocodingRateLimited(retry_after=1)
+        response = self.client.post(
+            reverse("trips:geocode-address"), {"name": "Hotel Roma", "city": "Rome"}
+        )
+        assert response.status_code == 200
+        assert response.headers["Retry-After"] == "1"
+        assert b'hx-trigger="load delay:1s"' in response.content
+        assert b"No address found" not in response.content
+
     def test_geocode_address_post_missing_fields(self):
         from django.urls import reverse
 
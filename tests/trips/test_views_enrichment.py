@@ -3,7 +3,9 @@ from unittest.mock import Mock, patch
 
 import pytest
 import requests
+from django.core.cache import cache
 from django.test import override_settings
+from django.urls import reverse
 
 from tests.test import TestCase
 from tests.trips.factories import (
@@ -12,10 +14,20 @@ from tests.trips.factories import (
     StayFactory,
     TripFactory,
 )
+from trips.enrichment import new_progress, save_progress
+from trips.places import PlacesRateLimited
 
 pytestmark = pytest.mark.django_db
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Places lookups are cached, start every test with a cold cache"""
+    cache.clear()
+    yield
+    cache.clear()
+
+
 class SingleEventViewTest(TestCase):
     """Test cases for single_event view"""
 
@@ -33,8 +45,8 @@ class SingleEventViewTest(TestCase):
         assert response.context["event"] == event
 
 
-@patch("trips.views.requests.get")
-@patch("trips.views.requests.post")
+@patch("trips.places.requests.get")
+@patch("trips.places.requests.post")
 class EnrichEventViewTest(TestCase):
     """Test cases for enrich_event view"""
 
@@ -295,6 +307,30 @@ class EnrichEventViewTest(TestCase):
             "Google Places API request timed out" in response.context["error_message"]
         )
 
+    @patch("trips.places.claim_places_slot")
+    def test_enrich_event_rate_limited(self, mock_claim, mock_post, mock_get):
+        """Test the client is told to retry when no request slot is free"""
+        mock_claim.side_effect = PlacesRateLimited("Too many", retry_after=2)
+
+        user = self.make_user("user")
+        trip = TripFactory(author=user)
+        day = trip.days.first()
+        event = ExperienceFactory(
+            day=day, trip=trip, name="Test Event", address="Test Address"
+        )
+
+        with self.login(user), override_settings(GOOGLE_PLACES_API_KEY="test_key"):
+            response = self.post("trips:enrich-event", event_id=event.pk)
+
+        self.response_200(response)
+        mock_post.assert_not_called()
+        assert response.headers["Retry-After"] == "2"
+        assert response.headers["HX-Reswap"] == "beforeend"
+        self.assertContains(response, 'hx-trigger="load delay:2s"')
+        self.assertContains(
+            response, f'hx-post="{reverse("trips:enrich-event", args=[event.pk])}"'
+        )
+
 
 class ConfirmEnrichEventViewTest(TestCase):
     """Test cases for confirm_enrich_event view"""
@@ -425,8 +461,8 @@ class ConfirmEnrichEventViewTest(TestCase):
         assert event.enriched is False
 
 
-@patch("trips.views.requests.get")
-@patch("trips.views.requests.post")
+@patch("trips.places.requests.get")
+@patch("trips.places.requests.post")
 class EnrichStayViewTest(TestCase):
     """Test cases for enrich_stay view"""
 
@@ -675,6 +711,28 @@ class EnrichStayViewTest(TestCase):
         assert "opening_hours_json" not in response.context["enriched_data"]
         assert response.context["show_preview"] is True
 
+    @patch("trips.places.claim_places_slot")
+    def test_enrich_stay_rate_limited(self, mock_claim, mock_post, mock_get):
+        """Test the client is told to retry when no request slot is free"""
+        mock_claim.side_effect = PlacesRateLimited("Too many", retry_after=2)
+
+        user = self.make_user("user")
+        trip = TripFactory(author=user)
+        day = trip.days.first()
+        stay = StayFactory(name="Test Stay", address="Test Address")
+        stay.days.add(day)
+
+        with self.login(user), override_settings(GOOGLE_PLACES_API_KEY="test_key"):
+            response = self.post("trips:enrich-stay", stay_id=stay.pk)
+
+        self.response_200(response)
+        mock_post.assert_not_called()
+        assert response.headers["Retry-After"] == "2"
+        self.assertContains(response, 'hx-trigger="load delay:2s"')
+        self.assertContains(
+            response, f'hx-post="{reverse("trips:enrich-stay", args=[stay.pk])}"'
+        )
+
 
 class ConfirmEnrichStayViewTest(TestCase):
     """Test cases for confirm_enrich_stay view"""
@@ -803,3 +861,77 @@ class ConfirmEnrichStayViewTest(TestCase):
         self.response_404(response)
         stay.refresh_from_db()
         assert stay.enriched is False
+
+
+@patch("trips.enrichment.async_task")
+class TripEnrichViewTest(TestCase):
+    """Test cases for the whole-trip enrichment views"""
+
+    def test_trip_enrich_enqueues_job(self, mock_async_task):
+        """Test that enriching a trip enqueues the job once and starts polling"""
+        user = self.make_user("user")
+        trip = TripFactory(author=user)
+
+        with self.login(user):
+            response = self.post("trips:trip-enrich", trip_id=trip.pk)
+            self.post("trips:trip-enrich", trip_id=trip.pk)
+
+        self.response_200(response)
+        mock_async_task.assert_called_once()
+        self.assertContains(response, 'hx-trigger="every 2s"')
+
+    def test_trip_enrich_unauthorized(self, mock_async_task):
+        """Test that only the author can enrich a trip"""
+        user = self.make_user("user")
+        other_user = self.make_user("other_user")
+        trip = TripFactory(author=user)
+
+        with self.login(other_user):
+            response = self.post("trips:trip-enrich", trip_id=trip.pk)
+
+        self.response_404(response)
+        mock_async_task.assert_not_called()
+
+    def test_trip_enrich_status_running(self, mock_async_task):
+        """Test that the status keeps polling while the job runs"""
+        user = self.make_user("user")
+        trip = TripFactory(author=user)
+        save_progress(trip.pk, {**new_progress(total=10), "done": 4})
+
+        with self.login(user):
+            response = self.get("trips:trip-enrich-status", trip_id=trip.pk)
+
+        self.response_200(response)
+        self.assertContains(response, 'hx-trigger="every 2s"')
+        self.assertContains(response, "Enriching places: 4 of 10")
+        assert "HX-Trigger" not in response.headers
+
+    def test_trip_enrich_status_finished(self, mock_async_task):
+        """Test that a finished job stops polling and refreshes the trip"""
+        user = self.make_user("user")
+        trip = TripFactory(author=user)
+        progress = {**new_progress(total=3), "done": 3, "enriched": 2, "failed": 1}
+        save_progress(trip.pk, {**progress, "finished": True})
+
+        with self.login(user):
+            response = self.get("trips:trip-enrich-status", trip_id=trip.pk)
+
+        self.response_200(response)
+        self.assertNotContains(response, 'hx-trigger="every 2s"')
+        self.assertContains(response, "2 places enriched, 1 failed")
+        assert response.headers["HX-Trigger"] == "tripModified"
+
+    def test_trip_detail_resumes_running_job(self, mock_async_task):
+        """Test that the trip page polls a running job but hides finished ones"""
+        user = self.make_user("user")
+        trip = TripFactory(author=user)
+        save_progress(trip.pk, new_progress())
+
+        with self.login(user):
+            running = self.get("trips:trip-detail", pk=trip.pk)
+            save_progress(trip.pk, {**new_progress(), "finished": True})
+            finished = self.get("trips:trip-detail", pk=trip.pk)
+
+        assert running.context["enrich_progress"] is not None
+        assert finished.context["enrich_progress"] is None
+        self.assertContains(finished, "Enrich this trip")
@@ -162,6 +162,95 @@ class TestEventSwapModal(TestCase):
         assert len(response.context["swappable_events"]) == 0
 
 
+class TestDayRoute(TestCase):
+    """Test cases for the day route optimizer views"""
+
+    def make_events(self, day):
+        return [
+            EventFactory(
+                trip=day.trip,
+                day=day,
+                latitude=41.9,
+                longitude=longitude,
+                start_time=datetime.time(hour, 0),
+                end_time=datetime.time(hour, 30),
+            )
+            for longitude, hour in ((12.53, 9), (12.51, 10), (12.52, 11))
+        ]
+
+    def test_get_route_proposal(self):
+        user = self.make_user("user")
+        trip = TripFactory(author=user)
+        day = trip.days.first()
+        far, near, middle = self.make_events(day)
+
+        with self.login(user):
+            response = self.get("trips:day-route", pk=day.pk)
+
+        self.response_200(response)
+        assertTemplateUsed(response, "trips/day-route.html")
+        assert response.context["route"]["events"] in (
+            [near, middle, far],
+            [far, middle, near],
+        )
+        self.assertContains(response, "Apply")
+
+    def test_get_route_proposal_not_enough_events(self):
+        user = self.make_user("user")
+        trip = TripFactory(author=user)
+
+        with self.login(user):
+            response = self.get("trips:day-route", pk=trip.days.first().pk)
+
+        self.response_200(response)
+        self.assertNotContains(response, "Apply")
+
+    def test_get_route_proposal_unauthorized(self):
+        trip = TripFactory()
+        user = self.make_user("user")
+
+        with self.login(user):
+            response = self.get("trips:day-route", pk=trip.days.first().pk)
+
+        self.response_404(response)
+
+    def test_apply_route(self):
+        user = self.make_user("user")
+        trip = TripFactory(author=user)
+        day = trip.days.first()
+        far, near, middle = self.make_events(day)
+
+        with self.login(user):
+            response = self.post(
+                "trips:day-route-apply",
+                pk=day.pk,
+                data={"events": [near.pk, middle.pk, far.pk]},
+            )
+
+        self.response_204(response)
+        assert response.headers["HX-Trigger"] == f"dayModified{day.pk}"
+        message = list(get_messages(response.wsgi_request))[0].message
+        assert message == "Route optimized successfully"
+        assert list(day.events.all()) == [near, middle, far]
+
+    def test_apply_route_with_stale_events(self):
+        user = self.make_user("user")
+        trip = TripFactory(author=user)
+        day = trip.days.first()
+        far, near, _ = self.make_events(day)
+
+        with self.login(user):
+            response = self.post(
+                "trips:day-route-apply",
+                pk=day.pk,
+                data={"events": [near.pk, far.pk, "x"]},
+            )
+
+        self.response_400(response)
+        far.refresh_from_db()
+        assert far.start_time == datetime.time(9, 0)
+
+
 class TestEventDetail(TestCase):
     """Test cases for event detail view"""
 
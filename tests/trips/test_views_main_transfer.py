@@ -3,7 +3,7 @@ from django.urls import reverse
 from pytest_django.asserts import assertTemplateUsed
 
 from tests.test import TestCase
-from tests.trips.factories import MainTransferFactory, TripFactory
+from tests.trips.factories import MainTransferFactory, StayFactory, TripFactory
 
 pytestmark = pytest.mark.django_db
 
@@ -187,6 +187,19 @@ class TestMainTransferViews(TestCase):
             assert response.context["found"] is True
             assert len(response.context["stations"]) > 0
 
+    def test_search_stations_post_with_country(self):
+        """Test the country parameter restricts station results"""
+        user = self.make_user("user")
+        url = reverse("trips:search-stations")
+
+        with self.login(user):
+            response = self.client.post(url, {"station_query": "Roma", "country": "IT"})
+
+            assert response.status_code == 200
+            assert response.context["found"] is True
+            stations = response.context["stations"]
+            assert all(station["country"] == "IT" for station in stations)
+
     def test_search_stations_post_no_results_short_query(self):
         """Test searching for stations with query too short"""
         user = self.make_user("user")
@@ -299,6 +312,27 @@ class TestMainTransferViews(TestCase):
             assert response.context["trip"] == trip
             assert response.context["direction"] == "arrival"
 
+    def test_main_transfer_step_arrival_suggests_nearby_airports(self):
+        """Test the arrival form lists airports near the first stay"""
+        user = self.make_user("user")
+        trip = TripFactory(author=user)
+        day = trip.days.first()
+        day.stay = StayFactory(latitude=41.9, longitude=12.5)
+        day.save()
+        url = reverse("trips:main-transfer-step", kwargs={"trip_id": trip.pk})
+
+        with self.login(user):
+            response = self.client.get(
+                url,
+                {"step": "arrival", "transport_type": "plane", "direction": "arrival"},
+            )
+
+            assert response.status_code == 200
+            assertTemplateUsed(response, "trips/includes/airport-results.html")
+            content = response.content.decode()
+            assert 'data-airport-iata="CIA"' in content
+            assert "setAirportFieldsFromButton(this, 'destination')" in content
+
     def test_main_transfer_step_departure_train(self):
         """Test main transfer step - departure with train type"""
         user = self.make_user("user")
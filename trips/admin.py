@@ -3,6 +3,7 @@ from django.contrib import admin
 from .models import (
     Day,
     Experience,
+    GeocodeResult,
     Link,
     Meal,
     SimpleTransfer,
@@ -48,3 +49,10 @@ class MealAdmin(admin.ModelAdmin):
 @admin.register(Stay)
 class StayAdmin(admin.ModelAdmin):
     list_display = ["__str__"]
+
+
+@admin.register(GeocodeResult)
+class GeocodeResultAdmin(admin.ModelAdmin):
+    list_display = ["query", "provider", "hits", "last_used_at"]
+    list_filter = ["provider"]
+    search_fields = ["query"]
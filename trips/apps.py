@@ -1,6 +1,36 @@
+import sys
+from pathlib import Path
+
 from django.apps import AppConfig
+from django.conf import settings
+
+# Management commands whose processes serve requests or run tasks, the only
+# ones that need the datasets preloaded before forking their workers
+PRELOAD_COMMANDS = {"runserver", "qcluster"}
+
+
+def needs_preloaded_datasets(argv):
+    """
+    Check if the process started with argv serves requests or runs tasks: a
+    WSGI/ASGI server or one of PRELOAD_COMMANDS, not migrate, compile_datasets
+    or any other management command.
+    """
+    program = Path(argv[0]) if argv else Path()
+    is_management_command = (
+        program.name in ("manage.py", "django-admin")
+        or program.parent.name == "django"  # python -m django
+    )
+    if not is_management_command:
+        return True
+    return len(argv) > 1 and argv[1] in PRELOAD_COMMANDS
 
 
 class TripsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "trips"
+
+    def ready(self):
+        if settings.PRELOAD_DATASETS and needs_preloaded_datasets(sys.argv):
+            from trips.utils import preload_datasets
+
+            preload_datasets()
@@ -0,0 +1,374 @@
+"""
+Compact, read-only columnar tables for the bundled airport and station
+datasets.
+
+A list of dicts costs one dict plus a handful of str/float objects per row.
+Here every column is a few large buffers instead:
+- text columns: one UTF-8 bytes blob plus an array("I") of offsets
+- category columns (few distinct values, e.g. country): interned strings
+  plus an array("I") of codes
+- float columns: array("d")
+- the optional key index: an open addressing hash table of row numbers
+
+Rows are materialised as plain dicts only when read. Since a table is a
+handful of objects that are never written again, forked workers (qcluster,
+granian) keep sharing its memory pages instead of copying them on the first
+reference count change.
+
+Tables can be saved to a versioned binary file (see the compile_datasets
+command) and memory-mapped back: every buffer is then a memoryview over the
+file, so opening a table costs no parsing at all. The file records the size,
+modification time and digest of its source CSV: the source is only hashed
+again when its size or modification time changed.
+"""
+
+import gc
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from collections.abc import Sequence
+
+FORMAT_MAGIC = b"OIDS"
+FORMAT_VERSION = 2
+# Magic, format version, header length
+_PREAMBLE = struct.Struct("<4sII")
+_ALIGNMENT = 8
+
+
+def file_digest(path):
+    """Return the SHA-256 hex digest of a file, used to detect stale tables"""
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def file_signature(path):
+    """Return the size and modification time of a file, checked before hashing"""
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _is_source_unchanged(source, path):
+    """Check if the source file is the one a table was saved from"""
+    if source["signature"] == file_signature(path):
+        return True
+    return source["digest"] == file_digest(path)
+
+
+class _TextColumn:
+    kind = "text"
+
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+
+    @classmethod
+    def from_values(cls, values):
+        encoded = [value.encode() for value in values]
+        offsets = array("I", [0])
+        total = 0
+        for value in encoded:
+            total += len(value)
+            offsets.append(total)
+        return cls(b"".join(encoded), offsets)
+
+    def buffers(self):
+        return {"blob": self.blob, "offsets": self.offsets}
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        return str(self.blob[self.offsets[index] : self.offsets[index + 1]], "utf-8")
+
+
+class _CategoryColumn:
+    kind = "category"
+
+    def __init__(self, labels, codes):
+        self.labels = [sys.intern(label) for label in labels]
+        self.codes = codes
+
+    @classmethod
+    def from_values(cls, values):
+        labels = []
+        positions = {}
+        codes = array("I")
+        for value in values:
+            code = positions.get(value)
+            if code is None:
+                code = positions[value] = len(labels)
+                labels.append(value)
+            codes.append(code)
+        return cls(labels, codes)
+
+    def buffers(self):
+        return {"codes": self.codes}
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, index):
+        return self.labels[self.codes[index]]
+
+
+class _FloatColumn:
+    kind = "float"
+
+    def __init__(self, values):
+        self.values = values
+
+    @classmethod
+    def from_values(cls, values):
+        return cls(array("d", values))
+
+    def buffers(self):
+        return {"values": self.values}
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, index):
+        return self.values[index]
+
+
+class _KeyIndex:
+    """
+    Open addressing hash table mapping a normalized key to its first row.
+    Slots hold row + 1 (0 marks an empty slot) and are probed linearly.
+    """
+
+    def __init__(self, column, normalize_key, slots):
+        self.column = column
+        self.normalize_key = normalize_key
+        self.slots = slots
+        self.mask = len(slots) - 1
+
+    @classmethod
+    def build(cls, column, normalize_key):
+        size = 8
+        while size < 2 * len(column):
+            size *= 2
+        index = cls(column, normalize_key, array("I", bytes(4 * size)))
+        for row in range(len(column)):
+            key = normalize_key(column[row])
+            if key and index.find(key) is None:
+                slot = index._home(key)
+                while index.slots[slot]:
+                    slot = (slot + 1) & index.mask
+                index.slots[slot] = row + 1
+        return index
+
+    def _home(self, key):
+        # crc32 rather than hash(): str hashes are randomized per process
+        return zlib.crc32(key.encode()) & self.mask
+
+    def find(self, key):
+        """Return the first row with this normalized key, or None"""
+        slot = self._home(key)
+        while row := self.slots[slot]:
+            if self.normalize_key(self.column[row - 1]) == key:
+                return row - 1
+            slot = (slot + 1) & self.mask
+        return None
+
+
+class ColumnarTable(Sequence):
+    """
+    Read-only table stored column by column, indexable like a list of dicts.
+
+    Args:
+        rows: Iterable of dicts with every column as key
+        text_columns: Columns with mostly distinct values (names, codes)
+        category_columns: Columns with few distinct values (countries)
+        float_columns: Numeric columns (coordinates)
+        key_column: Optional column indexed for O(1) lookup()
+        normalize_key: Function applied to keys when indexing and looking up
+    """
+
+    def __init__(
+        self,
+        rows,
+        text_columns=(),
+        category_columns=(),
+        float_columns=(),
+        key_column=None,
+        normalize_key=str,
+    ):
+        rows = list(rows)
+        columns = {}
+        for names, kind in (
+            (text_columns, _TextColumn),
+            (category_columns, _CategoryColumn),
+            (float_columns, _FloatColumn),
+        ):
+            for name in names:
+                columns[name] = kind.from_values(row[name] for row in rows)
+        self._setup(columns, len(rows), key_column, normalize_key)
+
+    def _setup(self, columns, length, key_column, normalize_key, key_slots=None):
+        self._columns = columns
+        self._names = tuple(columns)
+        self._length = length
+        self._key_column = key_column
+        self._normalize_key = normalize_key
+        self._keys = None
+        if key_column:
+            column = columns[key_column]
+            self._keys = (
+                _KeyIndex.build(column, normalize_key)
+                if key_slots is None
+                else _KeyIndex(column, normalize_key, key_slots)
+            )
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("table index out of range")
+        return {name: self._columns[name][index] for name in self._names}
+
+    def column(self, name):
+        """Return the raw column storage (supports len() and indexing)"""
+        return self._columns[name]
+
+    def lookup(self, key):
+        """
+        Return the first row whose key column matches, in O(1).
+
+        Args:
+            key: Key value, normalized like the indexed keys
+
+        Returns:
+            Row dict or None if not found
+        """
+        if self._keys is None:
+            return None
+        position = self._keys.find(self._normalize_key(key))
+        return None if position is None else self[position]
+
+    def save(self, path, source_path):
+        """
+        Write the table to a binary file that open() can memory-map.
+
+        Args:
+            path: Destination file
+            source_path: File the table was built from, checked by open()
+        """
+        sections = []
+        offset = 0
+
+        def add_section(buffer):
+            nonlocal offset
+            data = bytes(buffer)
+            padding = b"\0" * (-len(data) % _ALIGNMENT)
+            sections.append(data + padding)
+            bounds = [offset, len(data)]
+            offset += len(data) + len(padding)
+            return bounds
+
+        columns = []
+        for name, column in self._columns.items():
+            spec = {"name": name, "kind": column.kind}
+            spec["buffers"] = {
+                key: add_section(buffer) for key, buffer in column.buffers().items()
+            }
+            if column.kind == "category":
+                spec["labels"] = column.labels
+            columns.append(spec)
+
+        header = {
+            "source": {
+                "signature": file_signature(source_path),
+                "digest": file_digest(source_path),
+            },
+            "byteorder": sys.byteorder,
+            "length": self._length,
+            "columns": columns,
+            "key_column": self._key_column,
+            "key_slots": add_section(self._keys.slots) if self._keys else None,
+        }
+        encoded = json.dumps(header).encode()
+        encoded += b" " * (-(_PREAMBLE.size + len(encoded)) % _ALIGNMENT)
+
+        with open(path, "wb") as f:
+            f.write(_PREAMBLE.pack(FORMAT_MAGIC, FORMAT_VERSION, len(encoded)))
+            f.write(encoded)
+            f.writelines(sections)
+
+    @classmethod
+    def open(cls, path, source_path, normalize_key=str):
+        """
+        Memory-map a table written by save().
+
+        Args:
+            path: Binary file
+            source_path: File the table must have been built from
+            normalize_key: Key normalization used when the table was saved
+
+        Returns:
+            ColumnarTable, or None when the file is missing, from another
+            format version or byte order, or compiled from other source data
+        """
+        try:
+            with open(path, "rb") as f:
+                data = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+            magic, version, header_length = _PREAMBLE.unpack_from(data)
+            start = _PREAMBLE.size + header_length
+            if magic != FORMAT_MAGIC or version != FORMAT_VERSION:
+                return None
+            header = json.loads(bytes(data[_PREAMBLE.size : start]))
+            if header["byteorder"] != sys.byteorder or not _is_source_unchanged(
+                header["source"], source_path
+            ):
+                return None
+        except (OSError, ValueError, struct.error):
+            return None
+
+        def section(bounds, typecode):
+            view = data[start + bounds[0] : start + bounds[0] + bounds[1]]
+            return view.cast(typecode)
+
+        columns = {}
+        for spec in header["columns"]:
+            buffers = spec["buffers"]
+            if spec["kind"] == "text":
+                columns[spec["name"]] = _TextColumn(
+                    section(buffers["blob"], "B"), section(buffers["offsets"], "I")
+                )
+            elif spec["kind"] == "category":
+                columns[spec["name"]] = _CategoryColumn(
+                    spec["labels"], section(buffers["codes"], "I")
+                )
+            else:
+                columns[spec["name"]] = _FloatColumn(section(buffers["values"], "d"))
+
+        table = cls.__new__(cls)
+        key_slots = header["key_slots"]
+        table._setup(
+            columns,
+            header["length"],
+            header["key_column"],
+            normalize_key,
+            key_slots=section(key_slots, "I") if key_slots else None,
+        )
+        return table
+
+
+def freeze_shared_memory():
+    """
+    Move every object allocated so far to the permanent GC generation, so
+    garbage collections in forked workers don't touch (and copy) the pages
+    of the preloaded tables.
+    """
+    gc.collect()
+    gc.freeze()
@@ -0,0 +1,149 @@
+"""
+Enrichment of a whole trip with Google Places data, as a background job.
+
+The job looks up every unenriched stay and event of the trip on a bounded
+thread pool: the threads only talk to Google (through the cached, rate
+limited trips.places client) while the job thread collects the results,
+reports progress in the cache and writes everything with bulk_update.
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.core.cache import cache
+from django_q.tasks import async_task
+
+from trips.models import Event, Stay
+from trips.places import PlacesError, PlacesRateLimited, enrich_place
+
+logger = logging.getLogger(__name__)
+
+ENRICH_TRIP_MAX_WORKERS = 4
+# Lookups answered 429 are retried after 1s, 2s, ...
+ENRICH_TRIP_MAX_ATTEMPTS = 3
+# Keep the progress of a finished job around for the status polling
+ENRICH_TRIP_PROGRESS_TIMEOUT = 60 * 60
+
+ENRICHED_FIELDS = ["place_id", "website", "phone_number", "opening_hours", "enriched"]
+
+
+def enrich_trip_key(trip_id):
+    """Cache key of the progress of the enrichment job of a trip"""
+    return f"enrich_trip_{trip_id}"
+
+
+def get_enrichment_progress(trip_id):
+    """
+    Progress of the enrichment job of a trip.
+
+    Returns:
+        Dict with total, done, enriched, failed and finished, or None when
+        no job ran recently
+    """
+    return cache.get(enrich_trip_key(trip_id))
+
+
+def new_progress(total=0):
+    """Progress of a job that has not looked up anything yet"""
+    return {"total": total, "done": 0, "enriched": 0, "failed": 0, "finished": False}
+
+
+def save_progress(trip_id, progress):
+    """Store the progress of the enrichment job of a trip"""
+    cache.set(enrich_trip_key(trip_id), progress, ENRICH_TRIP_PROGRESS_TIMEOUT)
+
+
+def enqueue_trip_enrichment(trip):
+    """
+    Enqueue a django-q2 job to enrich the stays and events of a trip, unless
+    one is already queued or running for it.
+
+    Returns:
+        bool: True if a new job was enqueued, False if one is in progress
+    """
+    key = enrich_trip_key(trip.pk)
+    progress = cache.get(key)
+    if progress and progress["finished"]:
+        cache.delete(key)
+    if not cache.add(key, new_progress(), ENRICH_TRIP_PROGRESS_TIMEOUT):
+        logger.debug(f"Enrichment already in progress for trip {trip.pk}")
+        return False
+
+    async_task("trips.tasks.enrich_trip", trip.pk, task_name=f"enrich trip {trip.pk}")
+    return True
+
+
+def unenriched_places(trip):
+    """Stays and events of a trip that can be enriched but were not yet"""
+    stays = (
+        Stay.objects.filter(days__trip=trip, enriched=False)
+        .exclude(name="")
+        .exclude(address="")
+        .distinct()
+    )
+    events = (
+        Event.objects.filter(trip=trip, enriched=False)
+        .exclude(name="")
+        .exclude(address="")
+    )
+    return list(stays) + list(events)
+
+
+def lookup_place(name, address):
+    """enrich_place, retried with a growing delay while Google answers 429"""
+    attempt = 1
+    while True:
+        try:
+            return enrich_place(name, address, wait=True)
+        except PlacesRateLimited:
+            if attempt >= ENRICH_TRIP_MAX_ATTEMPTS:
+                raise
+            time.sleep(attempt)
+            attempt += 1
+
+
+def enrich_trip_places(trip):
+    """
+    Enrich the unenriched stays and events of a trip, updating the progress
+    after every lookup. A place that cannot be looked up is left as is.
+
+    Args:
+        trip: Trip object
+
+    Returns:
+        Final progress dict
+    """
+    places = unenriched_places(trip)
+    progress = new_progress(total=len(places))
+    save_progress(trip.pk, progress)
+
+    enriched = {Stay: [], Event: []}
+    with ThreadPoolExecutor(max_workers=ENRICH_TRIP_MAX_WORKERS) as executor:
+        futures = {
+            executor.submit(lookup_place, place.name, place.address): place
+            for place in places
+        }
+        for future in as_completed(futures):
+            place = futures[future]
+            try:
+                data = future.result()
+            except PlacesError as e:
+                logger.warning(f"Could not enrich {place!r}: {e}")
+                progress["failed"] += 1
+            else:
+                place.place_id = data["place_id"]
+                place.website = data["website"]
+                place.phone_number = data["phone_number"]
+                place.opening_hours = data["opening_hours"]
+                place.enriched = True
+                enriched[Stay if isinstance(place, Stay) else Event].append(place)
+                progress["enriched"] += 1
+            progress["done"] += 1
+            save_progress(trip.pk, progress)
+
+    for model, objs in enriched.items():
+        model.objects.bulk_update(objs, ENRICHED_FIELDS, batch_size=100)
+    progress["finished"] = True
+    save_progress(trip.pk, progress)
+    return progress
@@ -8,6 +8,7 @@ from django.core.exceptions import ValidationError
 from django.core.validators import RegexValidator
 from django.db import models
 from django.urls import reverse
+from django.utils.functional import cached_property
 from django.utils.translation import get_language
 from django.utils.translation import gettext_lazy as _
 
@@ -24,6 +25,8 @@ from .models import (
     StayTransfer,
     Trip,
 )
+from .stays import assign_stay
+from .utils import get_trip_stay_coordinates, nearest_airports, nearest_train_stations
 from .widgets import TransportModeRadioSelect
 
 
@@ -724,6 +727,7 @@ class StayForm(forms.ModelForm):
     def __init__(self, trip, *args, **kwargs):
         geocode = kwargs.pop("geocode", False)
         super().__init__(*args, **kwargs)
+        self.trip = trip
         layout_fields = []
         if geocode:
             geocode_url = reverse("trips:geocode-address")
@@ -790,10 +794,7 @@ class StayForm(forms.ModelForm):
         stay = super().save(commit=False)
         if commit:  # pragma: no cover
             stay.save()
-        days = self.cleaned_data["apply_to_days"]
-        for day in days:
-            day.stay = stay
-            day.save()
+        assign_stay(self.trip, stay, self.cleaned_data["apply_to_days"])
         return stay
 
 
@@ -974,6 +975,43 @@ class MainTransferBaseForm(forms.ModelForm):
         """
         return {}
 
+    def find_nearby(self, latitude, longitude):
+        """
+        Override in child forms to suggest places near a point.
+        Returns a list of place dicts, nearest first.
+        """
+        return []
+
+    @cached_property
+    def nearby_suggestions(self):
+        """
+        Places near the trip's stays, offered before anything is typed: near
+        the first stay for an arrival destination, near the last stay for a
+        departure origin.
+
+        Returns:
+            Dict with field_type ("origin"/"destination") and results, or
+            None when editing, when pre-filled from the arrival or when no
+            stay has coordinates
+        """
+        if not self.trip or self.is_bound or self.instance.pk:
+            return None
+        if getattr(self, "prefilled_from_arrival", False):
+            return None
+
+        departure = self.initial.get("direction") == MainTransfer.Direction.DEPARTURE
+        coordinates = get_trip_stay_coordinates(self.trip, last=departure)
+        if coordinates is None:
+            return None
+
+        results = self.find_nearby(*coordinates)
+        if not results:
+            return None
+        return {
+            "field_type": "origin" if departure else "destination",
+            "results": results,
+        }
+
 
 class FlightMainTransferForm(MainTransferBaseForm):
     """Form for flight main transfers with airport autocomplete"""
@@ -1176,6 +1214,9 @@ class FlightMainTransferForm(MainTransferBaseForm):
 
         return instance
 
+    def find_nearby(self, latitude, longitude):
+        return nearest_airports(latitude, longitude)
+
     def get_type_specific_data(self):
         """Populate flight-specific fields in JSONField"""
         data = {}
@@ -1410,6 +1451,9 @@ class TrainMainTransferForm(MainTransferBaseForm):
 
         return instance
 
+    def find_nearby(self, latitude, longitude):
+        return nearest_train_stations(latitude, longitude)
+
     def get_type_specific_data(self):
         """Populate train-specific fields in JSONField"""
         data = {}
@@ -0,0 +1,117 @@
+"""
+Cache of rendered day, event and main transfer fragments.
+
+A fragment is cached under the versions of the scopes it reads: its trip
+(status, days and stays, shown by every day through its neighbours), its
+day (events and transfers) or the trip's main transfers. FRAGMENT_DEPENDENCIES
+maps each model shown in the fragments to the scopes a change of one of its
+rows invalidates; the receivers in trips.models and the bulk writes move
+those scopes to a new version, so fragments of unchanged days stay cached.
+"""
+
+import uuid
+
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.utils.translation import get_language
+
+FRAGMENT_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def _version_key(scope, pk):
+    return f"fragment_version_{scope}_{pk}"
+
+
+def _stay_scopes(stay):
+    trip_ids = set(stay.days.values_list("trip_id", flat=True))
+    return [("trip", trip_id) for trip_id in trip_ids]
+
+
+def _event_scopes(event):
+    # An event moved to another day, or unpaired, changes its old day too
+    day_ids = {event.day_id, getattr(event, "_saved_day_id", None)} - {None}
+    # Main transfer connections show the name of the event they lead to
+    return [("day", day_id) for day_id in day_ids] + [("transfers", event.trip_id)]
+
+
+# Scopes a saved or deleted row invalidates, by model label
+FRAGMENT_DEPENDENCIES = {
+    "trips.Trip": lambda trip: [("trip", trip.pk)],
+    "trips.Day": lambda day: [("trip", day.trip_id)],
+    "trips.Stay": _stay_scopes,
+    "trips.Event": _event_scopes,
+    "trips.Experience": _event_scopes,
+    "trips.Meal": _event_scopes,
+    "trips.SimpleTransfer": lambda transfer: [("day", transfer.day_id)],
+    "trips.StayTransfer": lambda transfer: [
+        ("day", transfer.from_day_id),
+        ("day", transfer.to_day_id),
+    ],
+    "trips.MainTransfer": lambda transfer: [("transfers", transfer.trip_id)],
+    "trips.MainTransferConnection": lambda connection: [
+        ("transfers", connection.main_transfer.trip_id)
+    ],
+}
+
+
+def fragment_version(*scopes):
+    """
+    Combined version of scopes given as (scope, pk) pairs. Fragments are
+    cached under it, so a change of any of the scopes drops them.
+    """
+    keys = [_version_key(scope, pk) for scope, pk in scopes]
+    versions = cache.get_many(keys)
+    return "-".join(
+        versions.get(key) or cache.get_or_set(key, lambda: uuid.uuid4().hex, None)
+        for key in keys
+    )
+
+
+def invalidate_fragments(*scopes):
+    """Move scopes to a new version; old fragments simply expire"""
+    cache.set_many({_version_key(*scope): uuid.uuid4().hex for scope in scopes}, None)
+
+
+def invalidate_instance_fragments(*instances):
+    """Drop the cached fragments showing any of the rows, see FRAGMENT_DEPENDENCIES"""
+    scopes = {
+        scope
+        for instance in instances
+        for scope in FRAGMENT_DEPENDENCIES[instance._meta.label](instance)
+    }
+    if scopes:
+        invalidate_fragments(*scopes)
+
+
+def day_fragment_version(day):
+    """Version of a day card and of the events listed in it"""
+    return fragment_version(("trip", day.trip_id), ("day", day.pk))
+
+
+def event_fragment_version(event):
+    """Version of an event listed in its day, which shows overlaps and transfers"""
+    return fragment_version(("trip", event.trip_id), ("day", event.day_id))
+
+
+def transfers_fragment_version(trip):
+    """Version of the main transfers section of a trip"""
+    return fragment_version(("trip", trip.pk), ("transfers", trip.pk))
+
+
+def day_fragment_key(day):
+    """Cache key of the day card in the active language, as the template sets it"""
+    return make_template_fragment_key(
+        "day", [day.pk, day_fragment_version(day), get_language()]
+    )
+
+
+def transfers_fragment_key(trip):
+    """Cache key of the main transfers section in the active language"""
+    return make_template_fragment_key(
+        "main-transfers", [trip.pk, transfers_fragment_version(trip), get_language()]
+    )
+
+
+def fragment_cache_context():
+    """Template context for the {% cache %} tags of day and transfer fragments"""
+    return {"fragment_cache_timeout": FRAGMENT_CACHE_TIMEOUT}
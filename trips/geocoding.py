@@ -0,0 +1,114 @@
+"""Background geocoding helpers shared by models and tasks."""
+
+import hashlib
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django_q.tasks import async_task
+
+from trips.fragment_cache import invalidate_instance_fragments
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_address(address):
+    """Normalize an address for comparison: lower case, single spaces, no edges"""
+    return " ".join(address.lower().split())
+
+
+def geocode_job_timeout():
+    """
+    Seconds a geocoding job may take from enqueue to completion: django-q
+    re-delivers an unacknowledged task every `retry` seconds, up to
+    `max_attempts` times, and each attempt runs for at most `timeout` seconds.
+    """
+    q_cluster = settings.Q_CLUSTER
+    attempts = max(q_cluster.get("max_attempts", 1), 1)
+    return q_cluster.get("retry", 60) * attempts + q_cluster.get("timeout", 60)
+
+
+def geocode_job_key(address):
+    """Cache key used to dedupe queued geocoding jobs for the same address"""
+    normalized = normalize_address(address)
+    digest = hashlib.md5(normalized.encode(), usedforsecurity=False).hexdigest()
+    return f"geocode_job_{digest}"
+
+
+def enqueue_geocoding_job(address):
+    """
+    Enqueue a django-q2 job to geocode the address, unless one is already queued.
+    Jobs are deduped per normalized address: a single job resolves every pending
+    row sharing that address, so a second one would be redundant.
+
+    Returns:
+        bool: True if a new job was enqueued, False if one is already queued
+    """
+    # Keep the dedupe marker for the whole retry window, so a job still waiting
+    # in the queue is never enqueued twice for the same address
+    if not cache.add(geocode_job_key(address), True, geocode_job_timeout()):
+        logger.debug(f"Geocoding job already queued for '{address}'")
+        return False
+
+    async_task(
+        "trips.tasks.geocode_pending_locations",
+        address,
+        task_name=f"geocode {normalize_address(address)}"[:100],
+    )
+    return True
+
+
+def schedule_geocoding(address):
+    """
+    Schedule background geocoding for the address once the current transaction
+    commits, so the job never runs before the pending row is visible.
+    """
+    if not address or not address.strip():
+        return
+
+    transaction.on_commit(lambda: enqueue_geocoding_job(address))
+
+
+def expire_stale_geocoding(queryset):
+    """
+    Give up on the pending rows whose job should have finished by now, because
+    it was lost, timed out or ran out of retries. They are left without
+    coordinates, like a failed geocoding, so their cards stop polling; a late
+    job still fills the geocode store for the next save.
+
+    Args:
+        queryset: Stay, Event or MainTransfer rows to check
+
+    Returns:
+        int: Number of rows given up on
+    """
+    cutoff = timezone.now() - timedelta(seconds=geocode_job_timeout())
+    stale = list(
+        queryset.filter(
+            Q(geocoding_requested_at__lt=cutoff)
+            | Q(geocoding_requested_at__isnull=True),
+            geocoding_pending=True,
+        )
+    )
+    if not stale:
+        return 0
+
+    model = queryset.model
+    query_fields = [
+        field.name
+        for field in model._meta.get_fields()
+        if field.name.endswith("geocoding_query")
+    ]
+    model.objects.filter(pk__in=[obj.pk for obj in stale]).update(
+        geocoding_pending=False,
+        geocoding_requested_at=None,
+        **dict.fromkeys(query_fields, ""),
+    )
+    # The UPDATE sends no signals, cached fragments still show them pending
+    invalidate_instance_fragments(*stale)
+    logger.warning(f"Gave up geocoding {len(stale)} {model.__name__} rows")
+    return len(stale)
@@ -0,0 +1,232 @@
+"""
+GeoJSON for day and trip maps.
+
+A thin Leaflet layer (static/js/maps.js) draws these collections in the
+browser, instead of the server rendering folium HTML. Every feature has a
+"kind" property, used by the client for colors:
+- points: experience, meal, stay, arrival, departure
+- lines: transfer (between events), stay_transfer, main_transfer
+
+Features also carry the "day" number they belong to, used to split a trip
+into one layer per day. Each collection has a "bbox" to fit the map.
+"""
+
+from django.db.models import Prefetch
+
+from trips.models import Day, Event, MainTransfer, SimpleTransfer, StayTransfer
+
+EVENT_KINDS = {
+    Event.Category.EXPERIENCE: "experience",
+    Event.Category.MEAL: "meal",
+}
+
+
+def _located(latitude, longitude):
+    return latitude is not None and longitude is not None
+
+
+def _point(latitude, longitude, kind, name, day=None, **properties):
+    return {
+        "type": "Feature",
+        "geometry": {"type": "Point", "coordinates": [longitude, latitude]},
+        "properties": {"kind": kind, "name": name, "day": day, **properties},
+    }
+
+
+def _line(start, end, kind, name, day=None):
+    return {
+        "type": "Feature",
+        "geometry": {
+            "type": "LineString",
+            "coordinates": [[start[1], start[0]], [end[1], end[0]]],
+        },
+        "properties": {"kind": kind, "name": name, "day": day},
+    }
+
+
+def feature_collection(features):
+    """
+    Wrap features in a FeatureCollection with its bounding box.
+
+    Returns:
+        GeoJSON dict; "bbox" is [west, south, east, north] or None if empty
+    """
+    coordinates = []
+    for feature in features:
+        geometry = feature["geometry"]
+        if geometry["type"] == "Point":
+            coordinates.append(geometry["coordinates"])
+        else:
+            coordinates.extend(geometry["coordinates"])
+    bbox = None
+    if coordinates:
+        longitudes, latitudes = zip(*coordinates, strict=True)
+        bbox = [min(longitudes), min(latitudes), max(longitudes), max(latitudes)]
+    return {"type": "FeatureCollection", "bbox": bbox, "features": features}
+
+
+def _event_features(events, day):
+    return [
+        _point(
+            event.latitude,
+            event.longitude,
+            EVENT_KINDS.get(event.category, "experience"),
+            event.name,
+            day,
+        )
+        for event in events
+        if _located(event.latitude, event.longitude)
+    ]
+
+
+def _stay_feature(stay, day, **properties):
+    if stay is None or not _located(stay.latitude, stay.longitude):
+        return []
+    return [_point(stay.latitude, stay.longitude, "stay", stay.name, day, **properties)]
+
+
+def _simple_transfer_features(transfers):
+    features = []
+    for transfer in transfers:
+        start, end = transfer.from_event, transfer.to_event
+        if _located(start.latitude, start.longitude) and _located(
+            end.latitude, end.longitude
+        ):
+            features.append(
+                _line(
+                    (start.latitude, start.longitude),
+                    (end.latitude, end.longitude),
+                    "transfer",
+                    f"{start.name} → {end.name}",
+                    transfer.day.number,
+                )
+            )
+    return features
+
+
+def _stay_transfer_features(transfers):
+    features = []
+    for transfer in transfers:
+        start, end = transfer.from_stay, transfer.to_stay
+        if _located(start.latitude, start.longitude) and _located(
+            end.latitude, end.longitude
+        ):
+            features.append(
+                _line(
+                    (start.latitude, start.longitude),
+                    (end.latitude, end.longitude),
+                    "stay_transfer",
+                    f"{start.name} → {end.name}",
+                    transfer.from_day.number,
+                )
+            )
+    return features
+
+
+def _main_transfer_features(transfers, first_day, last_day):
+    """Arrival/departure markers on the trip side, plus the journey line"""
+    features = []
+    for transfer in transfers:
+        origin = (transfer.origin_latitude, transfer.origin_longitude)
+        destination = (transfer.destination_latitude, transfer.destination_longitude)
+        if transfer.direction == MainTransfer.Direction.ARRIVAL:
+            kind, day, location, name = (
+                "arrival",
+                first_day,
+                destination,
+                transfer.destination_name,
+            )
+        else:
+            kind, day, location, name = (
+                "departure",
+                last_day,
+                origin,
+                transfer.origin_name,
+            )
+        if day is None or not _located(*location):
+            continue
+        features.append(_point(*location, kind, name, day, transport=transfer.type))
+        if _located(*origin) and _located(*destination):
+            journey = f"{transfer.origin_name} → {transfer.destination_name}"
+            features.append(_line(origin, destination, "main_transfer", journey, day))
+    return features
+
+
+def day_geojson(day):
+    """
+    GeoJSON of a day: its events and stay, the next day's stay when it
+    changes, the day's transfers and, on the first and last day, the arrival
+    and departure.
+
+    Args:
+        day: Day object
+
+    Returns:
+        FeatureCollection dict
+    """
+    days = {
+        other.number: other
+        for other in Day.objects.filter(
+            trip_id=day.trip_id, number__in=(day.number, day.number + 1)
+        ).select_related("stay")
+    }
+    day = days[day.number]
+    next_day = days.get(day.number + 1)
+    is_last = next_day is None
+
+    features = _event_features(
+        Event.objects.filter(day=day).order_by("start_time"), day.number
+    )
+    features += _stay_feature(day.stay, day.number)
+    if next_day and next_day.stay_id != day.stay_id:
+        features += _stay_feature(next_day.stay, day.number, next_day=True)
+    features += _simple_transfer_features(
+        SimpleTransfer.objects.filter(day=day).select_related(
+            "day", "from_event", "to_event"
+        )
+    )
+    features += _stay_transfer_features(
+        StayTransfer.objects.filter(from_day=day).select_related(
+            "from_day", "from_stay", "to_stay"
+        )
+    )
+    if day.number == 1 or is_last:
+        features += _main_transfer_features(
+            MainTransfer.objects.filter(trip_id=day.trip_id),
+            day.number if day.number == 1 else None,
+            day.number if is_last else None,
+        )
+    return feature_collection(features)
+
+
+def trip_geojson(trip):
+    """
+    GeoJSON of a whole trip, every feature tagged with its day number.
+    Runs a fixed number of queries whatever the length of the trip.
+
+    Args:
+        trip: Trip object
+
+    Returns:
+        FeatureCollection dict
+    """
+    days = list(
+        trip.days.select_related("stay").prefetch_related(
+            Prefetch("events", queryset=Event.objects.order_by("start_time"))
+        )
+    )
+    features = []
+    for day in days:
+        features += _event_features(day.events.all(), day.number)
+        features += _stay_feature(day.stay, day.number)
+    features += _simple_transfer_features(
+        trip.simple_transfers.select_related("day", "from_event", "to_event")
+    )
+    features += _stay_transfer_features(
+        trip.stay_transfers.select_related("from_day", "from_stay", "to_stay")
+    )
+    if days:
+        features += _main_transfer_features(
+            trip.main_transfers.all(), days[0].number, days[-1].number
+        )
+    return feature_collection(features)
@@ -0,0 +1,227 @@
+"""
+Background processing of trip covers.
+
+Choosing an Unsplash photo only records its id on the trip, marked pending,
+and enqueues a django-q2 job once the trip is committed. The job downloads
+the photo (tracking the download, as the Unsplash terms require), processes
+it and stores it, while the trip shows its placeholder image meanwhile.
+
+Every stored cover then gets its renditions: resized AVIF and WebP copies
+stored next to the original and listed in image_metadata["renditions"], so
+pages showing a small card or thumbnail can pick them with srcset instead
+of downloading the full cover. The renditions of a replaced or deleted
+cover are deleted with it.
+"""
+
+import logging
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django_q.tasks import async_task
+from PIL import Image
+
+from trips.models import Trip
+from trips.page_cache import invalidate_user_pages
+from trips.utils import download_unsplash_photo, get_unsplash_photo, process_trip_image
+
+logger = logging.getLogger(__name__)
+
+# Width of each rendition; covers are 3:2 so the height follows
+IMAGE_RENDITIONS = {"thumb": 320, "card": 640, "hero": 1200}
+# Formats of the renditions, best compression first, with their save options
+IMAGE_FORMATS = {
+    "avif": {"quality": 55},
+    "webp": {"quality": 75, "method": 4},
+}
+
+
+def pending_unsplash_metadata(photo_id, previous=None):
+    """
+    image_metadata of a trip whose Unsplash cover is not ingested yet.
+
+    Args:
+        photo_id: Id of the chosen Unsplash photo
+        previous: image_metadata of the trip's current cover, restored if the
+            photo cannot be ingested
+    """
+    previous = previous or {}
+    if previous.get("pending"):
+        # Picked again before the ingestion: keep the cover that is stored
+        previous = previous.get("previous", {})
+    return {
+        "source": "unsplash",
+        "unsplash_id": photo_id,
+        "pending": True,
+        "previous": previous,
+    }
+
+
+def schedule_image_processing(trip, query=""):
+    """
+    Enqueue the background processing the cover of a saved trip still needs
+    once the current transaction commits: the ingestion of a pending
+    Unsplash photo, or the renditions of a cover that has none.
+
+    Args:
+        trip: Saved Trip object
+        query: Image search query the photo was picked from, to reuse the
+            cached search results
+    """
+    if trip.image_pending:
+        photo_id = trip.image_metadata["unsplash_id"]
+        transaction.on_commit(
+            lambda: async_task(
+                "trips.tasks.ingest_trip_image",
+                trip.pk,
+                photo_id,
+                query,
+                task_name=f"trip {trip.pk} image {photo_id}"[:100],
+            )
+        )
+    elif trip.image and "renditions" not in trip.image_metadata:
+        image_name = trip.image.name
+        transaction.on_commit(
+            lambda: async_task(
+                "trips.tasks.render_trip_image",
+                trip.pk,
+                image_name,
+                task_name=f"trip {trip.pk} renditions"[:100],
+            )
+        )
+
+
+def ingest_unsplash_photo(trip_id, photo_id, query=""):
+    """
+    Download, process and store an Unsplash photo as the cover of a trip.
+    Nothing is stored when the trip got another cover in the meantime; when
+    the photo cannot be ingested the trip goes back to its previous cover.
+
+    Returns:
+        bool: True if the photo is now the cover of the trip
+    """
+    pending = Trip.objects.filter(
+        pk=trip_id,
+        image_metadata__unsplash_id=photo_id,
+        image_metadata__pending=True,
+    )
+    trip = pending.first()
+    if trip is None:
+        logger.info(f"Trip {trip_id} no longer waits for Unsplash photo {photo_id}")
+        return False
+
+    processed_image = None
+    photo_data = get_unsplash_photo(photo_id, query)
+    if photo_data:
+        image_content, metadata = download_unsplash_photo(photo_data)
+        if image_content:
+            processed_image = process_trip_image(image_content)
+    if processed_image is None:
+        pending.update(image_metadata=trip.image_metadata.get("previous", {}))
+        invalidate_user_pages(trip.author_id)
+        return False
+
+    replaced_image = trip.image.name
+    trip.image.save(f"trip_{trip_id}_{photo_id}.jpg", processed_image, save=False)
+    # Conditional update, a cover uploaded during the download wins
+    if not pending.update(image=trip.image.name, image_metadata=metadata):
+        trip.image.storage.delete(trip.image.name)
+        return False
+    delete_image_renditions(replaced_image)
+    invalidate_user_pages(trip.author_id)
+    create_image_renditions(trip_id, trip.image.name)
+    return True
+
+
+def rendition_name(image_name, rendition, image_format):
+    """Storage name of a rendition, next to the original image"""
+    root, _ext = os.path.splitext(image_name)
+    return f"{root}.{rendition}.{image_format}"
+
+
+def delete_image_renditions(image_name):
+    """
+    Delete the renditions stored next to a cover that is no longer used.
+
+    Returns:
+        int: Number of rendition files deleted
+    """
+    if not image_name:
+        return 0
+    storage = Trip._meta.get_field("image").storage
+    deleted = 0
+    for rendition in IMAGE_RENDITIONS:
+        for image_format in IMAGE_FORMATS:
+            name = rendition_name(image_name, rendition, image_format)
+            if storage.exists(name):
+                storage.delete(name)
+                deleted += 1
+    return deleted
+
+
+def discard_image_renditions(image_name):
+    """Delete the renditions of a replaced cover once the transaction commits"""
+    if image_name:
+        transaction.on_commit(lambda: delete_image_renditions(image_name))
+
+
+def create_image_renditions(trip_id, image_name):
+    """
+    Create the AVIF and WebP renditions of a trip cover and record them in
+    image_metadata["renditions"]. Renditions are never wider than the
+    original. Nothing is recorded when the trip got another cover meanwhile.
+
+    Args:
+        trip_id: Id of the trip
+        image_name: Storage name of the cover the renditions are made from
+
+    Returns:
+        int: Number of rendition files stored
+    """
+    trip = Trip.objects.filter(pk=trip_id, image=image_name).first()
+    if trip is None:
+        return 0
+
+    storage = trip.image.storage
+    renditions = {}
+    with trip.image.open("rb") as image_file, Image.open(image_file) as img:
+        img.load()
+        for rendition, max_width in IMAGE_RENDITIONS.items():
+            width = min(max_width, img.width)
+            height = max(1, round(img.height * width / img.width))
+            resized = img
+            if width < img.width:
+                resized = img.resize((width, height), Image.Resampling.LANCZOS)
+            renditions[rendition] = {"width": width, "height": height}
+            for image_format, options in IMAGE_FORMATS.items():
+                output = BytesIO()
+                resized.save(output, format=image_format.upper(), **options)
+                name = rendition_name(image_name, rendition, image_format)
+                if storage.exists(name):
+                    storage.delete(name)
+                renditions[rendition][image_format] = storage.save(
+                    name, ContentFile(output.getvalue())
+                )
+
+    stored = [
+        rendition[image_format]
+        for rendition in renditions.values()
+        for image_format in IMAGE_FORMATS
+    ]
+    with transaction.atomic():
+        trip = (
+            Trip.objects.select_for_update()
+            .filter(pk=trip_id, image=image_name)
+            .first()
+        )
+        if trip is None:
+            for name in stored:
+                storage.delete(name)
+            return 0
+        Trip.objects.filter(pk=trip_id).update(
+            image_metadata={**trip.image_metadata, "renditions": renditions}
+        )
+    invalidate_user_pages(trip.author_id)
+    logger.info(f"Stored {len(stored)} renditions of {image_name}")
+    return len(stored)
@@ -0,0 +1,80 @@
+"""
+Django management command to benchmark the day route optimizer on random
+stops.
+Usage: python manage.py benchmark_route [--stops N ...] [--repeat N]
+"""
+
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from trips.routing import (
+    haversine_matrix,
+    nearest_neighbor_route,
+    route_length,
+    two_opt,
+)
+
+DEFAULT_STOPS = [50, 100, 200]
+
+
+def random_stops(count, seed=0):
+    """Random points within about 10 km of the center of Rome"""
+    rng = random.Random(seed)
+    return (
+        [41.9 + rng.uniform(-0.09, 0.09) for _ in range(count)],
+        [12.5 + rng.uniform(-0.12, 0.12) for _ in range(count)],
+    )
+
+
+def time_ms(func, repeat):
+    """Average milliseconds per call of func, and its last result"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+class Command(BaseCommand):
+    help = "Benchmark the day route optimizer on random stops"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--stops",
+            type=int,
+            action="append",
+            help="Number of stops, can be repeated (default: 50, 100, 200)",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Number of runs averaged for each size (default: 5)",
+        )
+
+    def handle(self, *args, **options):
+        for count in options["stops"] or DEFAULT_STOPS:
+            self.benchmark(count, options["repeat"])
+
+    def benchmark(self, count, repeat):
+        latitudes, longitudes = random_stops(count)
+        matrix_ms, matrix = time_ms(
+            lambda: haversine_matrix(latitudes, longitudes), repeat
+        )
+        nn_ms, nn_route = time_ms(
+            lambda: nearest_neighbor_route(matrix, 0, count - 1), repeat
+        )
+        opt_ms, opt_route = time_ms(lambda: two_opt(matrix, nn_route), repeat)
+
+        self.stdout.write(f"{count} stops:")
+        self.stdout.write(f"  distance matrix:  {matrix_ms:8.2f} ms")
+        self.stdout.write(f"  nearest neighbor: {nn_ms:8.2f} ms")
+        self.stdout.write(f"  2-opt:            {opt_ms:8.2f} ms")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"  route: {route_length(matrix, range(count)):.1f} km in input "
+                f"order, {route_length(matrix, nn_route):.1f} km nearest "
+                f"neighbor, {route_length(matrix, opt_route):.1f} km after 2-opt"
+            )
+        )
@@ -0,0 +1,113 @@
+"""
+Django management command to benchmark airport and station search against a
+linear scan.
+Usage: python manage.py benchmark_search [--repeat N] [--query Q ...]
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from trips.utils import (
+    get_airport_index,
+    get_station_index,
+    load_airports,
+    load_train_stations,
+)
+
+DEFAULT_AIRPORT_QUERIES = ["fco", "rome", "ma", "lon", "fiumicino", "new york", "zzz"]
+DEFAULT_STATION_QUERIES = ["ma", "roma", "milano c", "berlin hbf", "stat", "zzz"]
+
+
+def scan_airports(airports, query, limit=10):
+    """Linear substring scan, as search_airports worked before the index"""
+    query_lower = query.lower()
+    results = []
+    for airport in airports:
+        if (
+            query_lower in airport["iata_code"].lower()
+            or query_lower in airport["name"].lower()
+            or query_lower in airport["city"].lower()
+        ):
+            results.append(airport)
+            if len(results) >= limit:
+                break
+    return results
+
+
+def scan_stations(stations, query, limit=10):
+    """Linear substring scan, as search_train_stations worked before the index"""
+    query_lower = query.lower()
+    results = []
+    for station in stations:
+        if (
+            query_lower in station["name"].lower()
+            or query_lower in station["country"].lower()
+        ):
+            results.append(station)
+            if len(results) >= limit:
+                break
+    return results
+
+
+def time_per_call(func, queries, repeat):
+    """Average microseconds per call of func over all queries"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for query in queries:
+            func(query)
+    return (time.perf_counter() - start) / (repeat * len(queries)) * 1_000_000
+
+
+class Command(BaseCommand):
+    help = "Benchmark indexed airport search against a linear scan"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=50,
+            help="Number of times each query is run (default: 50)",
+        )
+        parser.add_argument(
+            "--query",
+            action="append",
+            dest="queries",
+            help="Query to benchmark, can be repeated (default: a built-in set)",
+        )
+
+    def handle(self, *args, **options):
+        repeat = options["repeat"]
+
+        self.benchmark(
+            "Airports",
+            load_airports(),
+            get_airport_index,
+            scan_airports,
+            options["queries"] or DEFAULT_AIRPORT_QUERIES,
+            repeat,
+        )
+        self.benchmark(
+            "Stations",
+            load_train_stations(),
+            get_station_index,
+            scan_stations,
+            options["queries"] or DEFAULT_STATION_QUERIES,
+            repeat,
+        )
+
+    def benchmark(self, label, rows, get_index, scan, queries, repeat):
+        start = time.perf_counter()
+        index = get_index()
+        build_ms = (time.perf_counter() - start) * 1000
+        self.stdout.write(
+            f"{label}: {len(rows)} rows, index ready in {build_ms:.1f} ms"
+        )
+
+        scan_us = time_per_call(lambda q: scan(rows, q), queries, repeat)
+        index_us = time_per_call(index.search, queries, repeat)
+        self.stdout.write(f"  linear scan: {scan_us:10.1f} us/query")
+        self.stdout.write(f"  index:       {index_us:10.1f} us/query")
+        self.stdout.write(
+            self.style.SUCCESS(f"  speedup:     {scan_us / index_us:10.1f}x")
+        )
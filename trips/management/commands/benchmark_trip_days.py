@@ -0,0 +1,86 @@
+"""
+Django management command to benchmark how trip saves update the days.
+Runs inside a transaction that is rolled back, so no data is kept.
+Usage: python manage.py benchmark_trip_days [--days N] [--repeat N]
+"""
+
+import itertools
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from trips.management.commands.benchmark_route import time_ms
+from trips.models import Trip
+
+WEEK = timedelta(days=7)
+
+# Scenario name and the (start, end) shift applied on every other save
+SCENARIOS = [
+    ("status only", None),
+    ("shift by a week", (WEEK, WEEK)),
+    ("extend by a week", (timedelta(0), WEEK)),
+    ("shorten by a week", (timedelta(0), -WEEK)),
+]
+
+
+class Command(BaseCommand):
+    help = "Benchmark the day updates of trip saves on a long trip"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=90,
+            help="Length of the trip in days (default: 90)",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Number of saves averaged for each scenario (default: 5)",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            user = get_user_model().objects.create_user(
+                email="benchmark-trip-days@example.com", password=None
+            )
+            start = date.today() + timedelta(days=30)
+            trip = Trip.objects.create(
+                author=user,
+                title="Benchmark",
+                destination="Benchmark",
+                start_date=start,
+                end_date=start + timedelta(days=options["days"] - 1),
+            )
+            self.stdout.write(f"{options['days']} days trip:")
+            for name, shift in SCENARIOS:
+                self.benchmark(trip, name, shift, options["repeat"])
+            transaction.set_rollback(True)
+
+    def benchmark(self, trip, name, shift, repeat):
+        original = (trip.start_date, trip.end_date)
+        saves = itertools.count()
+
+        def save():
+            # Alternate between the shifted and the original dates
+            if shift and next(saves) % 2 == 0:
+                trip.start_date = original[0] + shift[0]
+                trip.end_date = original[1] + shift[1]
+            elif shift:
+                trip.start_date, trip.end_date = original
+            trip.save()
+
+        with CaptureQueriesContext(connection) as queries:
+            save()
+        elapsed_ms, _ = time_ms(save, repeat)
+        trip.start_date, trip.end_date = original
+        trip.save()
+
+        self.stdout.write(
+            f"  {name + ':':20}{elapsed_ms:8.2f} ms, {len(queries)} queries, "
+            f"{trip.days.count()} days"
+        )
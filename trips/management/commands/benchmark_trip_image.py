@@ -0,0 +1,113 @@
+"""
+Django management command to benchmark the processing of uploaded trip
+covers against decoding them at full size.
+Usage: python manage.py benchmark_trip_image [--megapixels MP ...] [--repeat N]
+"""
+
+import multiprocessing
+import resource
+import tempfile
+import time
+from io import BytesIO
+from pathlib import Path
+
+from django.core.files import File
+from django.core.management.base import BaseCommand
+from PIL import Image
+
+from trips.utils import TRIP_IMAGE_SIZE, process_trip_image
+
+DEFAULT_MEGAPIXELS = [12, 24, 48]
+
+
+def photo_jpeg(megapixels):
+    """A 4:3 JPEG of about the given megapixels, compressing like a photo"""
+    width = int((megapixels * 1_000_000 * 4 / 3) ** 0.5)
+    size = (width, width * 3 // 4)
+    bands = (
+        Image.linear_gradient("L").resize(size),
+        Image.radial_gradient("L").resize(size),
+        Image.effect_noise((256, 256), 48).resize(size),
+    )
+    output = BytesIO()
+    Image.merge("RGB", bands).save(output, format="JPEG", quality=90)
+    return size, output.getvalue()
+
+
+def full_decode(path):
+    """Decode, convert and resize at full size, as uploads were processed"""
+    img = Image.open(path)
+    img = img.convert("RGB")
+    img.thumbnail(TRIP_IMAGE_SIZE, Image.Resampling.LANCZOS, reducing_gap=None)
+    img.save(BytesIO(), format="JPEG", quality=85, optimize=True)
+
+
+def draft_decode(path):
+    """Process the file as an upload with process_trip_image"""
+    with open(path, "rb") as image_file:
+        processed = process_trip_image(File(image_file, name=path.name))
+    processed.close()
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process so far, in MB"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(func, path, repeat):
+    """Average seconds per run and peak memory growth in MB of func(path)"""
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(path)
+    return (time.perf_counter() - start) / repeat, peak_rss_mb() - baseline
+
+
+def in_child(func, *args):
+    """
+    Run func in a fresh process, so each peak starts from the same base and
+    no large photo is held by the process being forked
+    """
+    with multiprocessing.get_context("fork").Pool(1) as pool:
+        return pool.apply(func, args)
+
+
+class Command(BaseCommand):
+    help = "Benchmark trip cover processing against a full-size decode"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--megapixels",
+            type=int,
+            action="append",
+            help="Size of the photo, can be repeated (default: 12, 24 and 48)",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=3,
+            help="Number of times each photo is processed (default: 3)",
+        )
+
+    def handle(self, *args, **options):
+        repeat = options["repeat"]
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for megapixels in options["megapixels"] or DEFAULT_MEGAPIXELS:
+                (width, height), content = in_child(photo_jpeg, megapixels)
+                path = Path(tmp_dir) / f"photo_{megapixels}mp.jpg"
+                path.write_bytes(content)
+                self.stdout.write(
+                    f"{megapixels} MP photo: {width}x{height}, "
+                    f"{len(content) / (1024 * 1024):.1f} MB JPEG"
+                )
+                for label, func in (
+                    ("full decode: ", full_decode),
+                    ("draft decode:", draft_decode),
+                ):
+                    seconds, peak_mb = in_child(measure, func, path, repeat)
+                    self.stdout.write(
+                        f"  {label} {seconds * 1000:8.1f} ms, "
+                        f"{seconds * 1000 / megapixels:6.1f} ms/MP, "
+                        f"peak +{peak_mb:6.1f} MB"
+                    )
@@ -0,0 +1,35 @@
+"""
+Django management command to compile the bundled airport and station CSVs
+into memory-mappable binary tables, loaded without any parsing.
+Usage: python manage.py compile_datasets [--dataset NAME ...]
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from trips.utils import DATASETS, compile_dataset
+
+
+class Command(BaseCommand):
+    help = "Compile the bundled CSV datasets into memory-mappable binary files"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dataset",
+            action="append",
+            dest="datasets",
+            choices=sorted(DATASETS),
+            help="Dataset to compile, can be repeated (default: all)",
+        )
+
+    def handle(self, *args, **options):
+        for name in options["datasets"] or DATASETS:
+            start = time.perf_counter()
+            path, rows = compile_dataset(name)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{name}: {rows} rows -> {path.name} in {elapsed_ms:.0f} ms"
+                )
+            )
@@ -0,0 +1,45 @@
+"""Cache of rendered day maps, shared by models (invalidation) and utils."""
+
+import hashlib
+import json
+import uuid
+
+from django.core.cache import cache
+
+DAY_MAP_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+
+
+def _version_key(trip_id):
+    return f"day_map_version_{trip_id}"
+
+
+def map_version(trip_id):
+    """
+    Current map version of a trip. It is part of every cached map key, so
+    changing it drops all the trip's maps at once.
+    """
+    if trip_id is None:
+        return ""
+    return cache.get_or_set(_version_key(trip_id), lambda: uuid.uuid4().hex, None)
+
+
+def invalidate_trip_maps(*trip_ids):
+    """Move trips to a new map version; old entries simply expire"""
+    cache.set_many(
+        {_version_key(trip_id): uuid.uuid4().hex for trip_id in trip_ids}, None
+    )
+
+
+def day_map_cache_key(trip_id, markers):
+    """
+    Content-addressed cache key for a day map.
+
+    Args:
+        trip_id: Trip of the day, or None for a map not tied to a trip
+        markers: JSON-serializable description of everything drawn on the map
+
+    Returns:
+        Cache key made of the trip's map version and a hash of the markers
+    """
+    payload = json.dumps([map_version(trip_id), markers], sort_keys=True)
+    return f"day_map_{hashlib.sha256(payload.encode()).hexdigest()}"
@@ -0,0 +1,33 @@
+# Generated by Django 6.1.2 on 2026-10-17 03:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("trips", "0006_maintransferconnection"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="event",
+            name="geocoding_pending",
+            field=models.BooleanField(
+                default=False, help_text="Coordinates are being resolved in background"
+            ),
+        ),
+        migrations.AddField(
+            model_name="maintransfer",
+            name="geocoding_pending",
+            field=models.BooleanField(
+                default=False, help_text="Coordinates are being resolved in background"
+            ),
+        ),
+        migrations.AddField(
+            model_name="stay",
+            name="geocoding_pending",
+            field=models.BooleanField(
+                default=False, help_text="Coordinates are being resolved in background"
+            ),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 6.1.2 on 2026-10-17 05:25
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("trips", "0008_geocoderesult"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="trip",
+            index=models.Index(
+                fields=["start_date"], name="trips_trip_start_d_d83967_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="trip",
+            index=models.Index(
+                fields=["end_date"], name="trips_trip_end_dat_f9a5f1_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 6.1.2 on 2026-10-17 07:08
+
+from django.db import migrations, models
+
+
+def normalize_address(address):
+    """Frozen copy of trips.geocoding.normalize_address at this migration"""
+    return " ".join(address.lower().split())
+
+
+def fill_geocoding_queries(apps, schema_editor):
+    """Key the rows already waiting for a geocoding job by their address"""
+    for model_name in ("Stay", "Event"):
+        model = apps.get_model("trips", model_name)
+        for obj in model.objects.filter(geocoding_pending=True):
+            address = f"{obj.address}, {obj.city}" if obj.city else obj.address
+            obj.geocoding_query = normalize_address(address)
+            obj.save(update_fields=["geocoding_query"])
+
+    MainTransfer = apps.get_model("trips", "MainTransfer")
+    for transfer in MainTransfer.objects.filter(geocoding_pending=True):
+        if transfer.origin_address and transfer.origin_latitude is None:
+            transfer.origin_geocoding_query = normalize_address(transfer.origin_address)
+        if transfer.destination_address and transfer.destination_latitude is None:
+            transfer.destination_geocoding_query = normalize_address(
+                transfer.destination_address
+            )
+        transfer.save(
+            update_fields=["origin_geocoding_query", "destination_geocoding_query"]
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("trips", "0009_trip_date_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="event",
+            name="geocoding_query",
+            field=models.CharField(
+                blank=True, db_index=True, editable=False, max_length=500
+            ),
+        ),
+        migrations.AddField(
+            model_name="maintransfer",
+            name="destination_geocoding_query",
+            field=models.CharField(
+                blank=True, db_index=True, editable=False, max_length=500
+            ),
+        ),
+        migrations.AddField(
+            model_name="maintransfer",
+            name="origin_geocoding_query",
+            field=models.CharField(
+                blank=True, db_index=True, editable=False, max_length=500
+            ),
+        ),
+        migrations.AddField(
+            model_name="stay",
+            name="geocoding_query",
+            field=models.CharField(
+                blank=True, db_index=True, editable=False, max_length=500
+            ),
+        ),
+        migrations.RunPython(fill_geocoding_queries, migrations.RunPython.noop),
+    ]
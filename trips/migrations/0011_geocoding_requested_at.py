@@ -0,0 +1,37 @@
+# Generated by Django 6.1.2 on 2026-10-17 14:02
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def fill_geocoding_requested_at(apps, schema_editor):
+    """Start the geocoding window of the rows already pending now"""
+    now = timezone.now()
+    for model_name in ("Stay", "Event", "MainTransfer"):
+        model = apps.get_model("trips", model_name)
+        model.objects.filter(geocoding_pending=True).update(geocoding_requested_at=now)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("trips", "0010_geocoding_query"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="event",
+            name="geocoding_requested_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="maintransfer",
+            name="geocoding_requested_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="stay",
+            name="geocoding_requested_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(fill_geocoding_requested_at, migrations.RunPython.noop),
+    ]
@@ -1,14 +1,21 @@
 from datetime import date, timedelta
 from urllib.parse import quote
 
-import geocoder
 from django.conf import settings
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.db import models
-from django.db.models.signals import post_save, pre_save
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
 from django.dispatch import receiver
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from trips.fragment_cache import invalidate_instance_fragments
+from trips.geocoding import normalize_address, schedule_geocoding
+from trips.map_cache import invalidate_trip_maps
+from trips.page_cache import invalidate_user_pages
+
 
 def days_between(start_date, end_date):
     delta = end_date - start_date
@@ -43,10 +50,30 @@ class Trip(models.Model):
 
     class Meta:
         ordering = ("status",)
+        # Date boundaries scanned by the nightly status task
+        indexes = [
+            models.Index(fields=["start_date"]),
+            models.Index(fields=["end_date"]),
+        ]
 
     def __str__(self) -> str:
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values, **kwargs):
+        instance = super().from_db(db, field_names, values, **kwargs)
+        # Remember the stored dates, so update_trip_days can skip unchanged ones
+        instance._saved_dates = (
+            instance.__dict__.get("start_date"),
+            instance.__dict__.get("end_date"),
+        )
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using, fields, from_queryset)
+        if fields is None or {"start_date", "end_date"} <= set(fields):
+            self._saved_dates = (self.start_date, self.end_date)
+
     def save(self, *args, **kwargs):
         today = date.today()
         seven_days_after = today + timedelta(days=7)
@@ -70,15 +97,24 @@ class Trip(models.Model):
 
         super().save(*args, **kwargs)
 
+    @property
+    def image_pending(self):
+        """Check if a chosen Unsplash photo is still being ingested"""
+        return self.image_metadata.get("pending", False)
+
     @property
     def get_image_url(self):
-        """Get image URL for template use"""
+        """Get image URL for template use, None shows the placeholder"""
+        if self.image_pending:
+            return None
         return self.image.url if self.image else None
 
     @property
     def needs_attribution(self):
         """Check if Unsplash attribution required"""
-        return self.image_metadata.get("source") == "unsplash"
+        return (
+            self.image_metadata.get("source") == "unsplash" and not self.image_pending
+        )
 
     def get_attribution_text(self):
         """Get formatted attribution text"""
@@ -89,42 +125,179 @@ class Trip(models.Model):
 
 
 @receiver(post_save, sender=Trip)
-def update_trip_days(sender, instance, **kwargs):
+def update_trip_days(sender, instance, created=False, update_fields=None, **kwargs):
     """
     Update the days for a trip when start_date or end_date changes.
     Retain the order of days and shift existing days and their related objects accordingly.
+
+    Saves that leave the dates untouched (status updates, title edits) are
+    skipped. Otherwise the diff against the stored days is applied with one
+    delete, one bulk_update and one bulk_create.
     """
     if not instance.start_date or not instance.end_date:
         return
+    dates = (instance.start_date, instance.end_date)
+    if update_fields is not None and not {"start_date", "end_date"} & set(
+        update_fields
+    ):
+        return
+    if not created and getattr(instance, "_saved_dates", None) == dates:
+        return
 
     days_total = days_between(instance.start_date, instance.end_date) + 1
     desired_dates = [instance.start_date + timedelta(days=i) for i in range(days_total)]
+    numbers = {day_date: idx + 1 for idx, day_date in enumerate(desired_dates)}
+
+    # Skip the trip's prefetch cache, which may predate the new dates
+    current_days = list(Day.objects.filter(trip=instance))
+    current_dates = set()
+    to_delete = []
+    to_update = []
+    for day in current_days:
+        if day.date not in numbers:
+            to_delete.append(day.pk)
+            continue
+        current_dates.add(day.date)
+        if day.number != numbers[day.date]:
+            day.number = numbers[day.date]
+            to_update.append(day)
+
+    if to_delete:
+        Day.objects.filter(pk__in=to_delete).delete()
+    if to_update:
+        Day.objects.bulk_update(to_update, ["number"])
+    Day.objects.bulk_create(
+        Day(trip=instance, number=number, date=day_date)
+        for day_date, number in numbers.items()
+        if day_date not in current_dates
+    )
+    instance._saved_dates = dates
 
-    # Build a mapping of current days by date
-    current_days_by_date = {day.date: day for day in instance.days.all()}
-    # Delete days outside the new range
-    for day in instance.days.all():
-        if day.date not in desired_dates:
-            day.delete()
-
-    # Get all days ordered by date (after deletion)
-    list(instance.days.order_by("date"))
-
-    # For each desired date, either update an existing day or create a new one
-    for idx, day_date in enumerate(desired_dates):
-        if day_date in current_days_by_date:
-            # Update number if needed
-            day = current_days_by_date[day_date]
-            if day.number != idx + 1:
-                day.number = idx + 1
-                day.save(update_fields=["number"])
-        else:
-            # Insert a new day at the correct position
-            Day.objects.create(
-                trip=instance,
-                number=idx + 1,
-                date=day_date,
+
+class GeocodeResultManager(models.Manager):
+    """
+    Persistent geocode store shared by model saves, background jobs and the
+    address search. Entries expire after STORE_TTL and the scheduled
+    prune_geocode_store task trims the table to the MAX_ENTRIES most recently
+    used rows.
+    """
+
+    MAX_ENTRIES = 5000
+    STORE_TTL = timedelta(days=90)
+    # Last use is only written back once older than this, so most hits are
+    # plain reads; plenty for an LRU over days
+    LAST_USED_RESOLUTION = timedelta(hours=1)
+    HITS_KEY = "geocode_store_hits"
+    MISSES_KEY = "geocode_store_misses"
+
+    def lookup(self, provider, query):
+        """
+        Return the stored result for the query, or None if missing or expired.
+        A hit refreshes the entry's last use, which drives the LRU eviction,
+        once it is older than LAST_USED_RESOLUTION.
+        """
+        query = normalize_address(query)
+        now = timezone.now()
+        entry = (
+            self.filter(
+                provider=provider,
+                query=query,
+                created_at__gte=now - self.STORE_TTL,
+            )
+            .only("pk", "result", "last_used_at")
+            .first()
+        )
+        if entry is None:
+            self._count(self.MISSES_KEY)
+            return None
+
+        if entry.last_used_at < now - self.LAST_USED_RESOLUTION:
+            self.filter(pk=entry.pk).update(hits=F("hits") + 1, last_used_at=now)
+        self._count(self.HITS_KEY)
+        return entry.result
+
+    def store(self, provider, query, result):
+        """Save a result for the query"""
+        self.update_or_create(
+            provider=provider,
+            query=normalize_address(query),
+            defaults={
+                "result": result,
+                "created_at": timezone.now(),
+                "last_used_at": timezone.now(),
+            },
+        )
+
+    def lookup_latlng(self, address):
+        """Return the stored Mapbox coordinates for the address, if any"""
+        result = self.lookup(GeocodeResult.Provider.MAPBOX, address)
+        return tuple(result) if result else None
+
+    def store_latlng(self, address, latlng):
+        """Store Mapbox coordinates for the address"""
+        self.store(GeocodeResult.Provider.MAPBOX, address, list(latlng))
+
+    def evict(self):
+        """
+        Drop expired entries and the least recently used ones over the limit.
+
+        Returns:
+            int: Number of deleted entries
+        """
+        deleted, _ = self.filter(
+            created_at__lt=timezone.now() - self.STORE_TTL
+        ).delete()
+        stale = self.order_by("-last_used_at").values_list("pk", flat=True)[
+            self.MAX_ENTRIES :
+        ]
+        stale_pks = list(stale)
+        if stale_pks:
+            deleted += self.filter(pk__in=stale_pks).delete()[0]
+        return deleted
+
+    def stats(self):
+        """Return hit and miss counters along with the current store size"""
+        return {
+            "hits": cache.get(self.HITS_KEY, 0),
+            "misses": cache.get(self.MISSES_KEY, 0),
+            "size": self.count(),
+        }
+
+    def _count(self, key):
+        cache.add(key, 0, None)
+        try:
+            cache.incr(key)
+        except ValueError:  # evicted between add and incr
+            cache.set(key, 1, None)
+
+
+class GeocodeResult(models.Model):
+    """Geocoding result for a normalized address, reused across the app"""
+
+    class Provider(models.TextChoices):
+        MAPBOX = "mapbox", "Mapbox"
+        NOMINATIM = "nominatim", "Nominatim"
+
+    provider = models.CharField(max_length=20, choices=Provider.choices)
+    query = models.CharField(max_length=400)
+    result = models.JSONField()
+    # Counted when the last use is refreshed, see LAST_USED_RESOLUTION
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(default=timezone.now)
+    last_used_at = models.DateTimeField(default=timezone.now)
+
+    objects = GeocodeResultManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["provider", "query"], name="unique_geocode_query"
             )
+        ]
+        indexes = [models.Index(fields=["last_used_at"])]
+
+    def __str__(self) -> str:
+        return f"{self.query} ({self.get_provider_display()})"
 
 
 class Stay(models.Model):
@@ -142,49 +315,52 @@ class Stay(models.Model):
     place_id = models.CharField(max_length=255, blank=True)
     opening_hours = models.JSONField(blank=True, null=True)
     enriched = models.BooleanField(default=False)
+    geocoding_pending = models.BooleanField(
+        default=False, help_text="Coordinates are being resolved in background"
+    )
+    # Normalized address the pending geocoding job looks the row up by
+    geocoding_query = models.CharField(
+        max_length=500, blank=True, db_index=True, editable=False
+    )
+    # When the pending geocoding job was scheduled, to give up on lost jobs
+    geocoding_requested_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    @property
+    def complete_address(self):
+        """Address used for geocoding, including the city when available"""
+        if self.city:
+            return f"{self.address}, {self.city}"
+        return self.address
 
     def save(self, *args, **kwargs):
         """
-        Convert address to coordinates for displaying on the map,
+        Schedule background geocoding for displaying on the map,
         only if the address has changed or coordinates are not set.
         """
         old = type(self).objects.get(pk=self.pk) if self.pk else None
         address_changed = old and old.address != self.address
         coords_missing = self.latitude is None or self.longitude is None
-        complete_address = self.address
-        if self.city:
-            complete_address = f"{self.address}, {self.city}"
-
-        if address_changed or coords_missing:
-            g = geocoder.mapbox(
-                complete_address, access_token=settings.MAPBOX_ACCESS_TOKEN
+        needs_geocoding = bool(self.address) and (address_changed or coords_missing)
+
+        if needs_geocoding:
+            latlng = GeocodeResult.objects.lookup_latlng(self.complete_address)
+            self.latitude, self.longitude = latlng or (None, None)
+            self.geocoding_pending = needs_geocoding = latlng is None
+            self.geocoding_query = (
+                normalize_address(self.complete_address) if needs_geocoding else ""
             )
-            if g.latlng:
-                self.latitude, self.longitude = g.latlng
+            self.geocoding_requested_at = timezone.now() if needs_geocoding else None
 
         super().save(*args, **kwargs)
 
+        if needs_geocoding:
+            schedule_geocoding(self.complete_address)
+
     def __str__(self) -> str:
         first_day = self.days.first()
         return f"{self.name} - {first_day.trip.title}" if first_day else self.name
 
 
-@receiver(post_save, sender=Stay)
-def update_stay_days(sender, instance, **kwargs):
-    """
-    When days are assigned to a stay, remove those days from any previous stays
-    """
-    # Get all days that are now assigned to this stay
-    related_days = instance.days.all()
-
-    # For each day, remove any other stay relationships
-    for day in related_days:
-        # Find other stays linked to this day (excluding the current stay)
-        Day.objects.filter(stay__isnull=False, pk=day.pk).exclude(stay=instance).update(
-            stay=None
-        )
-
-
 class MainTransfer(models.Model):
     """
     Main transfers (arrival/departure) for a trip.
@@ -254,6 +430,18 @@ class MainTransfer(models.Model):
         blank=True,
         help_text="Type-specific fields: company, flight_number, train_number, etc.",
     )
+    geocoding_pending = models.BooleanField(
+        default=False, help_text="Coordinates are being resolved in background"
+    )
+    # Normalized addresses the pending geocoding jobs look the row up by
+    origin_geocoding_query = models.CharField(
+        max_length=500, blank=True, db_index=True, editable=False
+    )
+    destination_geocoding_query = models.CharField(
+        max_length=500, blank=True, db_index=True, editable=False
+    )
+    # When the pending geocoding jobs were scheduled, to give up on lost jobs
+    geocoding_requested_at = models.DateTimeField(null=True, blank=True, editable=False)
 
     # Metadata
     created_at = models.DateTimeField(auto_now_add=True)
@@ -304,32 +492,46 @@ class MainTransfer(models.Model):
                 )
 
     def save(self, *args, **kwargs):
-        """Override save for automatic geocoding (car/other only)"""
+        """Override save for automatic background geocoding (car/other only)"""
 
         # Geocoding for CAR/OTHER (like events)
+        addresses_to_geocode = []
         if self.type in [self.Type.CAR, self.Type.OTHER]:
             # Origin geocoding
             if self.origin_address and not (
                 self.origin_latitude and self.origin_longitude
             ):
-                g = geocoder.mapbox(
-                    self.origin_address, access_token=settings.MAPBOX_ACCESS_TOKEN
-                )
-                if g.latlng:
-                    self.origin_latitude, self.origin_longitude = g.latlng
+                latlng = GeocodeResult.objects.lookup_latlng(self.origin_address)
+                if latlng:
+                    self.origin_latitude, self.origin_longitude = latlng
+                    self.origin_geocoding_query = ""
+                else:
+                    addresses_to_geocode.append(self.origin_address)
+                    self.origin_geocoding_query = normalize_address(self.origin_address)
 
             # Destination geocoding
             if self.destination_address and not (
                 self.destination_latitude and self.destination_longitude
             ):
-                g = geocoder.mapbox(
-                    self.destination_address, access_token=settings.MAPBOX_ACCESS_TOKEN
-                )
-                if g.latlng:
-                    self.destination_latitude, self.destination_longitude = g.latlng
+                latlng = GeocodeResult.objects.lookup_latlng(self.destination_address)
+                if latlng:
+                    self.destination_latitude, self.destination_longitude = latlng
+                    self.destination_geocoding_query = ""
+                else:
+                    addresses_to_geocode.append(self.destination_address)
+                    self.destination_geocoding_query = normalize_address(
+                        self.destination_address
+                    )
+
+        if addresses_to_geocode:
+            self.geocoding_pending = True
+            self.geocoding_requested_at = timezone.now()
 
         super().save(*args, **kwargs)
 
+        for address in addresses_to_geocode:
+            schedule_geocoding(address)
+
     # Properties for type-specific field access
 
     # Common (all types)
@@ -383,6 +585,8 @@ class Day(models.Model):
     @property
     def next_day(self):
         """Get next day using prefetched data"""
+        if hasattr(self, "timeline"):
+            return self.timeline.next_day
         days = [d for d in self.trip.days.all()]
         try:
             current_index = days.index(self)
@@ -393,6 +597,8 @@ class Day(models.Model):
     @property
     def prev_day(self):
         """Get previous day using prefetched data"""
+        if hasattr(self, "timeline"):
+            return self.timeline.prev_day
         days = [d for d in self.trip.days.all()]
         try:
             current_index = days.index(self)
@@ -445,6 +651,15 @@ class Event(models.Model):
     phone_number = models.CharField(max_length=50, blank=True)
     opening_hours = models.JSONField(blank=True, null=True)
     enriched = models.BooleanField(default=False)
+    geocoding_pending = models.BooleanField(
+        default=False, help_text="Coordinates are being resolved in background"
+    )
+    # Normalized address the pending geocoding job looks the row up by
+    geocoding_query = models.CharField(
+        max_length=500, blank=True, db_index=True, editable=False
+    )
+    # When the pending geocoding job was scheduled, to give up on lost jobs
+    geocoding_requested_at = models.DateTimeField(null=True, blank=True, editable=False)
 
     class Meta:
         ordering = ["start_time"]
@@ -452,24 +667,33 @@ class Event(models.Model):
             models.Index(fields=["day_id", "start_time"]),
         ]
 
+    @property
+    def complete_address(self):
+        """Address used for geocoding, including the city when available"""
+        if self.city:
+            return f"{self.address}, {self.city}"
+        return self.address
+
     def save(self, *args, **kwargs):
         """
-        Convert address to coordinates for displaying on the map,
+        Schedule background geocoding for displaying on the map,
         only if the address has changed or coordinates are not set.
         """
         old = type(self).objects.get(pk=self.pk) if self.pk else None
+        # Remember the stored day, whose cached fragments a move also changes
+        self._saved_day_id = old.day_id if old else None
         address_changed = old and old.address != self.address
         coords_missing = self.latitude is None or self.longitude is None
-        complete_address = self.address
-        if self.city:
-            complete_address = f"{self.address}, {self.city}"
-
-        if address_changed or coords_missing:
-            g = geocoder.mapbox(
-                complete_address, access_token=settings.MAPBOX_ACCESS_TOKEN
+        needs_geocoding = bool(self.address) and (address_changed or coords_missing)
+
+        if needs_geocoding:
+            latlng = GeocodeResult.objects.lookup_latlng(self.complete_address)
+            self.latitude, self.longitude = latlng or (None, None)
+            self.geocoding_pending = needs_geocoding = latlng is None
+            self.geocoding_query = (
+                normalize_address(self.complete_address) if needs_geocoding else ""
             )
-            if g.latlng:
-                self.latitude, self.longitude = g.latlng
+            self.geocoding_requested_at = timezone.now() if needs_geocoding else None
 
         # Ensure trip is set from day if not already set
         if self.day and not self.trip_id:
@@ -477,6 +701,9 @@ class Event(models.Model):
 
         super().save(*args, **kwargs)
 
+        if needs_geocoding:
+            schedule_geocoding(self.complete_address)
+
     def __str__(self) -> str:
         return f"{self.name} ({self.start_time})"
 
@@ -506,6 +733,10 @@ class Event(models.Model):
         if not self.day or not self.start_time:
             return False
 
+        # Latest start of the day, annotated by utils.annotate_last_start
+        if hasattr(self, "day_last_start"):
+            return self.start_time < self.day_last_start
+
         return Event.objects.filter(
             day=self.day, start_time__gt=self.start_time
         ).exists()
@@ -768,11 +999,14 @@ class StayTransfer(models.Model):
                 raise ValidationError(_("Both stays must belong to the same trip"))
 
     def save(self, *args, **kwargs):
-        """Auto-populate days and trip from stays"""
-        # Get last day for from_stay (departure day - last day of the stay)
-        self.from_day = self.from_stay.days.order_by("date").last()
-        # Get first day for to_stay (arrival day - first day of the stay)
-        self.to_day = self.to_stay.days.order_by("date").first()
+        """
+        Auto-populate days and trip from stays, unless the days are given:
+        a stay visited twice has a boundary for each visit
+        """
+        if self.from_day_id is None or self.to_day_id is None:
+            # Last day of from_stay (departure) and first day of to_stay (arrival)
+            self.from_day = self.from_stay.days.order_by("date").last()
+            self.to_day = self.to_stay.days.order_by("date").first()
         # Set trip from from_day
         self.trip = self.from_day.trip
         super().save(*args, **kwargs)
@@ -952,3 +1186,69 @@ class Meal(Event):
         """autosave category for meal"""
         self.category = self.Category.MEAL
         return super().save(*args, **kwargs)
+
+
+@receiver([post_save, post_delete], sender=Event)
+@receiver([post_save, post_delete], sender=Experience)
+@receiver([post_save, post_delete], sender=Meal)
+@receiver([post_save, post_delete], sender=MainTransfer)
+def invalidate_event_maps(sender, instance, **kwargs):
+    """
+    Drop the cached day maps of the trip an event or main transfer belongs to
+    """
+    invalidate_trip_maps(instance.trip_id)
+
+
+@receiver([post_save, pre_delete], sender=Stay)
+def invalidate_stay_maps(sender, instance, **kwargs):
+    """
+    Drop the cached day maps of every trip with a day at this stay.
+    On delete this runs before the days lose their stay.
+    """
+    trip_ids = set(instance.days.values_list("trip_id", flat=True))
+    if trip_ids:
+        invalidate_trip_maps(*trip_ids)
+
+
+@receiver([post_save, post_delete], sender=Trip)
+def invalidate_trip_pages(sender, instance, **kwargs):
+    """Drop the cached trip list and home fragments of the trip's author"""
+    invalidate_user_pages(instance.author_id)
+
+
+@receiver(post_delete, sender=Trip)
+def discard_trip_image_renditions(sender, instance, **kwargs):
+    """Delete the renditions of a deleted trip's cover"""
+    from trips.images import discard_image_renditions
+
+    discard_image_renditions(instance.image.name)
+
+
+@receiver([post_save, post_delete], sender="accounts.Profile")
+def invalidate_profile_pages(sender, instance, **kwargs):
+    """
+    Drop the cached trip list and home fragments of the profile's user, as
+    they depend on the favourite trip and the sort preference
+    """
+    invalidate_user_pages(instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=Trip)
+@receiver(post_save, sender=Day)
+@receiver([post_save, pre_delete], sender=Stay)
+@receiver([post_save, post_delete], sender=Event)
+@receiver([post_save, post_delete], sender=Experience)
+@receiver([post_save, post_delete], sender=Meal)
+@receiver(post_save, sender=SimpleTransfer)
+@receiver(post_save, sender=StayTransfer)
+@receiver([post_save, post_delete], sender=MainTransfer)
+@receiver([post_save, post_delete], sender=MainTransferConnection)
+def invalidate_fragments_on_change(sender, instance, **kwargs):
+    """
+    Drop the cached day, event and main transfer fragments showing the row.
+    A stay is handled before delete, while its days still point to it.
+    Days and transfers keep Django's fast delete: they cascade from trips,
+    stays and events, which drop the fragments, and the views deleting a
+    transfer drop its fragments themselves.
+    """
+    invalidate_instance_fragments(instance)
@@ -0,0 +1,43 @@
+"""Cache of rendered trip list and home fragments, versioned per user."""
+
+import uuid
+
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.utils.translation import get_language
+
+PAGE_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def _version_key(user_id):
+    return f"trip_pages_version_{user_id}"
+
+
+def pages_version(user_id):
+    """
+    Current pages version of a user. Fragments are cached under it with the
+    active language, so changing it drops all the user's fragments at once.
+    """
+    return cache.get_or_set(_version_key(user_id), lambda: uuid.uuid4().hex, None)
+
+
+def invalidate_user_pages(*user_ids):
+    """Move users to a new pages version; old fragments simply expire"""
+    cache.set_many(
+        {_version_key(user_id): uuid.uuid4().hex for user_id in user_ids}, None
+    )
+
+
+def home_trip_fragment_key(user):
+    """Cache key of the shown trip header of the home page, as the template sets it"""
+    return make_template_fragment_key(
+        "home-trip", [pages_version(user.pk), get_language()]
+    )
+
+
+def pages_cache_context(user):
+    """Template context for the {% cache %} tags of the user's fragments"""
+    return {
+        "pages_version": pages_version(user.pk),
+        "pages_cache_timeout": PAGE_CACHE_TIMEOUT,
+    }
@@ -0,0 +1,214 @@
+"""
+Google Places (New) client shared by the stay and event enrichment.
+
+Lookups go through two caches:
+- text query -> place_id, kept for long since place ids are stable
+- place_id -> details (website, phone, opening hours), refreshed daily
+
+so previewing then confirming, or enriching the same place for another
+trip, costs no round-trip to Google. Requests that do go out are spaced by
+a rate limiter shared by all threads and workers: the background job waits
+for a free slot, web requests never sleep and are retried by the client.
+"""
+
+import hashlib
+import time
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+
+from trips.geocoding import normalize_address
+from trips.utils import convert_google_opening_hours
+
+SEARCH_URL = "https://places.googleapis.com/v1/places:searchText"
+DETAILS_URL = "https://places.googleapis.com/v1/places/{place_id}"
+DETAILS_FIELD_MASK = "websiteUri,internationalPhoneNumber,regularOpeningHours"
+REQUEST_TIMEOUT = 5
+
+PLACE_ID_CACHE_TIMEOUT = 60 * 60 * 24 * 30
+DETAILS_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Google allows 600 requests per minute for each Places method, keep all of
+# them together under that
+PLACES_REQUESTS_PER_SECOND = 10
+PLACES_SLOT_KEY = "places_slot_{slot}"
+PLACES_SLOT_TIMEOUT = 60
+# Seconds after which a web request that found no free slot is retried
+PLACES_RETRY_AFTER = 1
+
+
+class PlacesError(Exception):
+    """Raised when a place cannot be looked up; the message is user facing"""
+
+
+class PlacesRateLimited(PlacesError):
+    """
+    Raised when Google answers 429 or, for a web request, when the current
+    request slot is taken; the request can be retried after retry_after
+    seconds
+    """
+
+    def __init__(self, message, retry_after=PLACES_RETRY_AFTER):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _claim_slot(slot):
+    return cache.add(PLACES_SLOT_KEY.format(slot=slot), True, PLACES_SLOT_TIMEOUT)
+
+
+def wait_for_places_slot():
+    """
+    Block until this process may send a Places request, for background jobs.
+    Time is cut in slots of 1/PLACES_REQUESTS_PER_SECOND seconds and each
+    request claims the first free one with cache.add, an atomic SET NX on
+    Redis, so concurrent threads and workers never share a slot.
+    """
+    interval = 1 / PLACES_REQUESTS_PER_SECOND
+    slot = int(time.time() / interval)
+    while not _claim_slot(slot):
+        slot += 1
+    delay = slot * interval - time.time()
+    if delay > 0:
+        time.sleep(delay)
+
+
+def claim_places_slot():
+    """
+    Claim a free request slot within the next second without waiting, for
+    web requests: the request goes out at once and the booked slot is skipped
+    by the other callers, so the rate still evens out over the second.
+
+    Raises:
+        PlacesRateLimited: the next second is fully booked, the client should
+            retry
+    """
+    slot = int(time.time() * PLACES_REQUESTS_PER_SECOND)
+    for candidate in range(slot, slot + PLACES_REQUESTS_PER_SECOND):
+        if _claim_slot(candidate):
+            return
+    raise PlacesRateLimited(_("Too many place lookups, retrying shortly."))
+
+
+def _api_key():
+    api_key = settings.GOOGLE_PLACES_API_KEY
+    if not api_key:
+        raise PlacesError(_("Google Places API key is not configured."))
+    return api_key
+
+
+def _request(method, url, wait=False, **kwargs):
+    """
+    Call the Places API and return the JSON body, or raise PlacesError.
+    With wait the call blocks for a free request slot, otherwise it raises
+    PlacesRateLimited when the current one is taken.
+    """
+    if wait:
+        wait_for_places_slot()
+    else:
+        claim_places_slot()
+    try:
+        response = method(url, timeout=REQUEST_TIMEOUT, **kwargs)
+        response.raise_for_status()
+        return response.json()
+    except requests.exceptions.Timeout as e:
+        raise PlacesError(_("Google Places API request timed out.")) from e
+    except requests.RequestException as e:
+        if e.response is not None:
+            if e.response.status_code == 429:
+                raise PlacesRateLimited(f"API Error: {e.response.text}") from e
+            raise PlacesError(f"API Error: {e.response.text}") from e
+        raise PlacesError(f"Error calling Google Places API: {e}") from e
+
+
+def _search_key(query):
+    digest = hashlib.sha256(normalize_address(query).encode()).hexdigest()
+    return f"places_search_{digest}"
+
+
+def _details_key(place_id):
+    return f"places_details_{place_id}"
+
+
+def find_place_id(query, wait=False):
+    """
+    Place id of the best match for a text query.
+    wait: block for a free request slot, see _request
+
+    Raises:
+        PlacesError: missing API key, request failure or no match
+    """
+    key = _search_key(query)
+    place_id = cache.get(key)
+    if place_id is not None:
+        return place_id
+
+    data = _request(
+        requests.post,
+        SEARCH_URL,
+        wait=wait,
+        json={"textQuery": query},
+        headers={
+            "Content-Type": "application/json",
+            "X-Goog-Api-Key": _api_key(),
+            "X-Goog-FieldMask": "places.id",
+        },
+    )
+    if not data.get("places"):
+        raise PlacesError(_("Could not find a matching place."))
+    place_id = data["places"][0]["id"]
+    cache.set(key, place_id, PLACE_ID_CACHE_TIMEOUT)
+    return place_id
+
+
+def place_details(place_id, wait=False):
+    """
+    Raw Places details (website, phone, regular opening hours) of a place.
+    wait: block for a free request slot, see _request
+
+    Raises:
+        PlacesError: missing API key or request failure
+    """
+    key = _details_key(place_id)
+    details = cache.get(key)
+    if details is not None:
+        return details
+
+    details = _request(
+        requests.get,
+        DETAILS_URL.format(place_id=place_id),
+        wait=wait,
+        headers={
+            "X-Goog-Api-Key": _api_key(),
+            "X-Goog-FieldMask": DETAILS_FIELD_MASK,
+        },
+    )
+    cache.set(key, details, DETAILS_CACHE_TIMEOUT)
+    return details
+
+
+def enrich_place(name, address, wait=False):
+    """
+    Enrichment data for a stay or event, from cache when possible. Only
+    background jobs pass wait, web requests must never sleep.
+
+    Returns:
+        Dict with place_id, website, phone_number and opening_hours (in the
+        format of convert_google_opening_hours)
+
+    Raises:
+        PlacesError: with a message to show to the user
+    """
+    _api_key()
+    place_id = find_place_id(f"{name} {address}", wait=wait)
+    details = place_details(place_id, wait=wait)
+    return {
+        "place_id": place_id,
+        "website": details.get("websiteUri", ""),
+        "phone_number": details.get("internationalPhoneNumber", ""),
+        "opening_hours": convert_google_opening_hours(
+            details.get("regularOpeningHours", None)
+        ),
+    }
@@ -0,0 +1,206 @@
+"""
+Route optimization for the events of a day.
+
+Events are visited as an open path that leaves from the day's stay and ends
+at the stay of the next day (back at the same stay when the trip does not
+move). Finding the shortest such path is a travelling salesman problem, so
+the order is built with a nearest-neighbour pass and then improved with
+2-opt moves until no reversal of a stretch of the route shortens it. Both
+work on a haversine distance matrix computed in one vectorized NumPy pass.
+
+Days without a geocoded stay get a free start (or end): a virtual node at
+distance zero from everything, so the route may begin at any event.
+"""
+
+import numpy as np
+from django.db import transaction
+
+from trips.fragment_cache import invalidate_instance_fragments
+from trips.models import Event
+from trips.spatial_index import EARTH_RADIUS_KM
+
+# Gains smaller than this (km) are float noise, not improvements
+_MIN_GAIN_KM = 1e-9
+
+
+def haversine_matrix(latitudes, longitudes):
+    """
+    Return the great-circle distance between every pair of points.
+
+    Args:
+        latitudes: Sequence of latitudes in degrees
+        longitudes: Sequence of longitudes in degrees
+
+    Returns:
+        (n, n) NumPy array of distances in kilometers
+    """
+    lat = np.radians(np.asarray(latitudes, dtype=float))
+    lon = np.radians(np.asarray(longitudes, dtype=float))
+    half_dlat = (lat[:, None] - lat[None, :]) / 2
+    half_dlon = (lon[:, None] - lon[None, :]) / 2
+    a = (
+        np.sin(half_dlat) ** 2
+        + np.cos(lat)[:, None] * np.cos(lat)[None, :] * np.sin(half_dlon) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def route_length(matrix, route):
+    """Total length of a route (list of node indexes) over a distance matrix"""
+    route = np.asarray(route)
+    return float(matrix[route[:-1], route[1:]].sum())
+
+
+def nearest_neighbor_route(matrix, start, end):
+    """
+    Build a route from start to end, always moving to the closest node not
+    visited yet.
+
+    Args:
+        matrix: (n, n) distance matrix
+        start: Index of the first node
+        end: Index of the last node (may equal start for a round trip)
+
+    Returns:
+        List of node indexes, starting with start and ending with end
+    """
+    visited = np.zeros(len(matrix), dtype=bool)
+    visited[[start, end]] = True
+    route = [start]
+    current = start
+    for _ in range(int((~visited).sum())):
+        current = int(np.where(visited, np.inf, matrix[current]).argmin())
+        visited[current] = True
+        route.append(current)
+    route.append(end)
+    return route
+
+
+def two_opt(matrix, route):
+    """
+    Improve a route with 2-opt moves, keeping both ends in place.
+
+    Reversing route[i:j + 1] replaces the edges (i - 1, i) and (j, j + 1)
+    with (i - 1, j) and (i, j + 1). For each i the gain of every j is
+    computed at once, and the best reversal is applied until none helps.
+
+    Args:
+        matrix: (n, n) distance matrix
+        route: Initial route, e.g. from nearest_neighbor_route()
+
+    Returns:
+        Improved route as a list of node indexes
+    """
+    route = np.array(route)
+    improved = True
+    while improved:
+        improved = False
+        for i in range(1, len(route) - 2):
+            a, b = route[i - 1], route[i]
+            c, d = route[i + 1 : -1], route[i + 2 :]
+            delta = matrix[a, c] + matrix[b, d] - matrix[a, b] - matrix[c, d]
+            best = int(delta.argmin())
+            if delta[best] < -_MIN_GAIN_KM:
+                j = i + 1 + best
+                route[i : j + 1] = route[i : j + 1][::-1].copy()
+                improved = True
+    return route.tolist()
+
+
+def optimize_route(matrix, start, end):
+    """Nearest-neighbour route from start to end, improved with 2-opt"""
+    return two_opt(matrix, nearest_neighbor_route(matrix, start, end))
+
+
+def _coordinates(place):
+    if place is None or place.latitude is None or place.longitude is None:
+        return None
+    return (place.latitude, place.longitude)
+
+
+def propose_day_route(day):
+    """
+    Propose a shorter visiting order for the geocoded events of a day.
+
+    The route leaves from the day's stay and ends at the next day's stay, or
+    back at the day's stay when there is no next one. Events without
+    coordinates keep their place and are not part of the proposal.
+
+    Args:
+        day: Day object
+
+    Returns:
+        Dict with the proposed "events" order, the "start" and "end" stays
+        used as anchors (None when not geocoded) and the route length in km
+        for the "current" and "proposed" order
+    """
+    events = list(
+        Event.objects.filter(
+            day=day, latitude__isnull=False, longitude__isnull=False
+        ).order_by("start_time", "end_time", "pk")
+    )
+    start = day.stay if _coordinates(day.stay) else None
+    next_day = day.next_day
+    next_stay = next_day.stay if next_day else None
+    end = next_stay if _coordinates(next_stay) else start
+
+    # Node 0 is the start anchor, node n + 1 the end anchor, events in between
+    points = [_coordinates(start) or (0.0, 0.0)]
+    points += [(event.latitude, event.longitude) for event in events]
+    points.append(_coordinates(end) or (0.0, 0.0))
+    latitudes, longitudes = zip(*points, strict=True)
+    matrix = haversine_matrix(latitudes, longitudes)
+    last = len(points) - 1
+    # A missing anchor is free: zero distance to (and from) every event
+    if start is None:
+        matrix[0, :] = matrix[:, 0] = 0.0
+    if end is None:
+        matrix[last, :] = matrix[:, last] = 0.0
+
+    current = list(range(last + 1))
+    proposed = optimize_route(matrix, 0, last)
+    return {
+        "events": [events[node - 1] for node in proposed[1:-1]],
+        "start": start,
+        "end": end,
+        "current_km": route_length(matrix, current),
+        "proposed_km": route_length(matrix, proposed),
+    }
+
+
+def apply_day_route(day, event_ids):
+    """
+    Reorder the geocoded events of a day in a single transaction.
+
+    Events keep the day's existing time slots: the earliest slot goes to the
+    first event of the new order, and so on, as if they had been swapped one
+    pair at a time.
+
+    Args:
+        day: Day object
+        event_ids: Primary keys of the day's geocoded events, in the new order
+
+    Returns:
+        List of the reordered events
+
+    Raises:
+        ValueError: If event_ids are not exactly the day's geocoded events
+    """
+    with transaction.atomic():
+        events = {
+            event.pk: event
+            for event in Event.objects.select_for_update().filter(
+                day=day, latitude__isnull=False, longitude__isnull=False
+            )
+        }
+        if len(event_ids) != len(events) or set(event_ids) != set(events):
+            raise ValueError("The day's events changed, please try again")
+
+        slots = sorted((event.start_time, event.end_time) for event in events.values())
+        ordered = [events[pk] for pk in event_ids]
+        for event, (start_time, end_time) in zip(ordered, slots, strict=True):
+            event.start_time = start_time
+            event.end_time = end_time
+        Event.objects.bulk_update(ordered, ["start_time", "end_time"])
+    invalidate_instance_fragments(*ordered)
+    return ordered
@@ -0,0 +1,182 @@
+"""
+In-memory search indexes over the bundled airport and station datasets.
+
+Indexes are built once per process, the first time a search needs them, and
+replace the linear substring scans done on every autocomplete keystroke.
+"""
+
+import re
+import sys
+import unicodedata
+from array import array
+
+_WORD_SEPARATORS = re.compile(r"[\W_]+")
+
+
+def fold_text(value):
+    """Fold text for matching: no accents, case folded, words split by a space"""
+    decomposed = unicodedata.normalize("NFKD", value)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return _WORD_SEPARATORS.sub(" ", stripped.casefold()).strip()
+
+
+def _ngrams(text, size):
+    return {text[i : i + size] for i in range(len(text) - size + 1)}
+
+
+def _add_posting(postings, key, position):
+    posting = postings.get(key)
+    if posting is None:
+        postings[key] = posting = array("I")
+    posting.append(position)
+
+
+class TextIndex:
+    """
+    Ranked text index over a list of records.
+
+    Records are numbered by static rank (length of the display field, then
+    dataset order), so every posting list is already sorted best first
+    and a query stops as soon as it has enough results: candidates from the
+    most selective posting are verified against the folded text one by one,
+    best first. Postings are compact array("I") of record positions, keyed by:
+    - exact keys: the whole folded value of exact_fields (e.g. IATA codes)
+    - word prefixes: the first one to three letters of every word
+    - bigrams and trigrams of the folded fields, for substring matches
+
+    Results are ranked by match tier (exact key, whole word, word prefix,
+    substring), then by static rank. An optional group field (e.g. country)
+    restricts results to one group.
+    """
+
+    def __init__(
+        self, records, fields, exact_fields=(), display_field=None, group_field=None
+    ):
+        self.source = records
+        display_field = display_field or fields[0]
+        names = list(dict.fromkeys((*fields, *exact_fields, display_field)))
+        if group_field:
+            names.append(group_field)
+        # Read each record once, keeping only the fields the index needs
+        columns = {name: [] for name in names}
+        for record in records:
+            for name in names:
+                columns[name].append(record[name])
+        display = columns[display_field]
+        # Position in the index -> row in the source records
+        self._order = array(
+            "I", sorted(range(len(records)), key=lambda i: (len(display[i]), i))
+        )
+        self._groups = (
+            [sys.intern(fold_text(columns[group_field][i])) for i in self._order]
+            if group_field
+            else None
+        )
+        self._haystacks = []
+        self._exact = {}
+        self._prefixes = {}
+        self._grams = {}
+
+        for position, row in enumerate(self._order):
+            for field in exact_fields:
+                key = fold_text(columns[field][row])
+                if key:
+                    _add_posting(self._exact, key, position)
+
+            values = [fold_text(columns[field][row]) for field in fields]
+            words = {word for value in values for word in value.split()}
+            for prefix in {word[:size] for word in words for size in (1, 2, 3)}:
+                _add_posting(self._prefixes, prefix, position)
+
+            # Spaces mark word boundaries, NUL keeps fields apart
+            haystack = "\x00".join(f" {value} " for value in values)
+            self._haystacks.append(haystack)
+            for gram in _ngrams(haystack, 2) | _ngrams(haystack, 3):
+                if "\x00" not in gram:
+                    _add_posting(self._grams, gram, position)
+
+    def _gram_candidates(self, query):
+        """
+        Positions that may contain the query, sorted by static rank: the
+        shortest posting among the query's trigrams (bigram for two letters).
+        """
+        if len(query) < 2:
+            return range(len(self._haystacks))
+        if len(query) <= 3:
+            return self._grams.get(query, ())
+
+        shortest = ()
+        for gram in _ngrams(query, 3):
+            posting = self._grams.get(gram)
+            if posting is None:
+                return ()
+            if not shortest or len(posting) < len(shortest):
+                shortest = posting
+        return shortest
+
+    def _tiers(self, query):
+        """Yield candidate positions tier by tier, lazily verified"""
+        haystacks = self._haystacks
+        word_candidates = (
+            self._prefixes.get(query, ())
+            if len(query) <= 3
+            else self._gram_candidates(query)
+        )
+
+        yield self._exact.get(query, ())
+        whole_word = f" {query} "
+        yield (
+            position
+            for position in word_candidates
+            if whole_word in haystacks[position]
+        )
+        word_start = f" {query}"
+        yield (
+            position
+            for position in word_candidates
+            if word_start in haystacks[position]
+        )
+
+        yield (
+            position
+            for position in self._gram_candidates(query)
+            if query in haystacks[position]
+        )
+
+    def ranked_positions(self, query, limit=10, group=None):
+        """
+        Return record positions matching the query, best matches first.
+
+        Args:
+            query: Search text
+            limit: Maximum number of results
+            group: Only return records of this group (e.g. a country code)
+
+        Returns:
+            List of record positions
+        """
+        query = fold_text(query)
+        if not query or limit <= 0:
+            return []
+        group = fold_text(group) if group and self._groups else None
+
+        results = []
+        seen = set()
+        for candidates in self._tiers(query):
+            for position in candidates:
+                if position in seen:
+                    continue
+                if group and self._groups[position] != group:
+                    continue
+                seen.add(position)
+                results.append(position)
+                if len(results) >= limit:
+                    return results
+        return results
+
+    def search(self, query, limit=10, group=None):
+        """Return the records matching the query, best matches first"""
+        return [
+            self.source[self._order[position]]
+            for position in self.ranked_positions(query, limit, group)
+        ]
@@ -0,0 +1,151 @@
+"""
+In-memory nearest-neighbour index over the bundled airport and station
+datasets.
+
+Points are projected onto the unit sphere and bucketed in a uniform 3D grid.
+A query visits grid cells in growing cubic shells around the query point and
+stops as soon as no unvisited cell can hold anything closer than the k-th
+best match, or lies beyond the search radius. Straight-line (chord) distance
+on the unit sphere grows with the great-circle distance, so comparing chords
+ranks points exactly like comparing distances on the ground.
+"""
+
+import heapq
+import math
+from array import array
+from functools import cache
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def _unit_vector(latitude, longitude):
+    lat = math.radians(latitude)
+    lon = math.radians(longitude)
+    cos_lat = math.cos(lat)
+    return cos_lat * math.cos(lon), cos_lat * math.sin(lon), math.sin(lat)
+
+
+def _chord(distance_km):
+    return 2 * math.sin(min(distance_km / EARTH_RADIUS_KM, math.pi) / 2)
+
+
+def _distance_km(chord):
+    return 2 * EARTH_RADIUS_KM * math.asin(min(chord / 2, 1.0))
+
+
+@cache
+def _shell_offsets(radius):
+    """Cell offsets at Chebyshev distance `radius` from the center cell"""
+    span = range(-radius, radius + 1)
+    return tuple(
+        (dx, dy, dz)
+        for dx in span
+        for dy in span
+        for dz in span
+        if max(abs(dx), abs(dy), abs(dz)) == radius
+    )
+
+
+class SpatialIndex:
+    """
+    Grid index answering "k nearest records to (lat, lon)".
+
+    Args:
+        records: Sequence of dicts with latitude and longitude
+        cell_km: Grid cell size; about the typical distance between records
+            keeps each query to a few dozen cells
+        where: Optional predicate, records failing it are not indexed
+    """
+
+    def __init__(self, records, cell_km=25, where=None):
+        self.source = records
+        self._cell = _chord(cell_km)
+
+        cells = {}
+        for row, record in enumerate(records):
+            if where and not where(record):
+                continue
+            point = _unit_vector(record["latitude"], record["longitude"])
+            cells.setdefault(self._cell_of(*point), []).append((row, *point))
+
+        # Points grouped by cell in flat arrays, each cell a (start, stop) slice
+        self._rows = array("I")
+        self._x = array("d")
+        self._y = array("d")
+        self._z = array("d")
+        self._cells = {}
+        for key, points in cells.items():
+            start = len(self._rows)
+            for row, x, y, z in points:
+                self._rows.append(row)
+                self._x.append(x)
+                self._y.append(y)
+                self._z.append(z)
+            self._cells[key] = (start, len(self._rows))
+
+    def _cell_of(self, x, y, z):
+        cell = self._cell
+        return (math.floor(x / cell), math.floor(y / cell), math.floor(z / cell))
+
+    def nearest_positions(self, latitude, longitude, k=5, max_km=100):
+        """
+        Return the k nearest record positions within max_km.
+
+        Args:
+            latitude: Query latitude
+            longitude: Query longitude
+            k: Maximum number of results
+            max_km: Search radius in kilometers
+
+        Returns:
+            List of (distance_km, position) tuples, nearest first
+        """
+        if k <= 0:
+            return []
+        qx, qy, qz = _unit_vector(latitude, longitude)
+        cx, cy, cz = self._cell_of(qx, qy, qz)
+        limit = _chord(max_km) ** 2
+        xs, ys, zs, rows, cells = self._x, self._y, self._z, self._rows, self._cells
+
+        # Max-heap of the best k as (-squared chord, position)
+        best = []
+        radius = 0
+        while True:
+            for dx, dy, dz in _shell_offsets(radius):
+                bounds = cells.get((cx + dx, cy + dy, cz + dz))
+                if bounds is None:
+                    continue
+                for i in range(*bounds):
+                    ex = xs[i] - qx
+                    ey = ys[i] - qy
+                    ez = zs[i] - qz
+                    squared = ex * ex + ey * ey + ez * ez
+                    if squared > limit:
+                        continue
+                    if len(best) < k:
+                        heapq.heappush(best, (-squared, rows[i]))
+                    elif squared < -best[0][0]:
+                        heapq.heapreplace(best, (-squared, rows[i]))
+
+            # Every cell outside the visited shells is at least this far away
+            reach = (radius * self._cell) ** 2
+            if reach > limit or (len(best) == k and -best[0][0] <= reach):
+                break
+            radius += 1
+
+        return [
+            (_distance_km(math.sqrt(-squared)), row)
+            for squared, row in sorted(best, key=lambda item: (-item[0], item[1]))
+        ]
+
+    def nearest(self, latitude, longitude, k=5, max_km=100):
+        """
+        Return the k nearest records within max_km, nearest first, each with
+        its distance as "distance_km".
+        """
+        results = []
+        for distance, row in self.nearest_positions(latitude, longitude, k, max_km):
+            record = dict(self.source[row])
+            record["distance_km"] = round(distance, 1)
+            results.append(record)
+        return results
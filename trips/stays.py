@@ -0,0 +1,105 @@
+"""
+Assignment of stays to the days of a trip.
+
+A day has at most one stay, so assigning a stay to any set of days is a
+single UPDATE. Stay transfers hang off a change of stay between two
+consecutive days, the last day of a stay and the first day of the next one:
+after every assignment the trip's transfers are moved to the new boundary
+days, or deleted when their stays no longer follow each other, in the same
+transaction.
+"""
+
+from django.db import transaction
+from django.db.models import QuerySet
+
+from trips.fragment_cache import invalidate_instance_fragments
+from trips.models import Day, StayTransfer
+
+
+def repair_stay_transfers(trip):
+    """
+    Realign the StayTransfers of a trip with the days of their stays.
+
+    The days are walked in order and every change of stay between two
+    consecutive days is a boundary, so a stay visited twice (A, B, A) has a
+    boundary for each leg. A transfer keeps its boundary when its stays still
+    meet there, moves to the first boundary between its stays otherwise, and
+    is deleted when there is none.
+
+    Args:
+        trip: Trip object
+
+    Returns:
+        Tuple of (moved, deleted) transfer counts
+    """
+    boundaries = {}
+    previous = None
+    for day in (
+        Day.objects.filter(trip=trip).only("id", "number", "stay_id").order_by("number")
+    ):
+        if (
+            previous is not None
+            and previous.stay_id is not None
+            and day.stay_id is not None
+            and previous.stay_id != day.stay_id
+        ):
+            boundaries.setdefault((previous.stay_id, day.stay_id), []).append(
+                (previous.pk, day.pk)
+            )
+        previous = day
+
+    moved = []
+    broken = []
+    for transfer in StayTransfer.objects.filter(trip=trip):
+        legs = boundaries.get((transfer.from_stay_id, transfer.to_stay_id))
+        if not legs:
+            broken.append(transfer.pk)
+        elif (transfer.from_day_id, transfer.to_day_id) not in legs:
+            transfer.from_day_id, transfer.to_day_id = legs[0]
+            moved.append(transfer)
+
+    if moved:
+        StayTransfer.objects.bulk_update(moved, ["from_day", "to_day"])
+    deleted = 0
+    if broken:
+        deleted = StayTransfer.objects.filter(pk__in=broken).delete()[0]
+    return len(moved), deleted
+
+
+def assign_stay(trip, stay, days):
+    """
+    Assign a stay to days of a trip with one UPDATE and repair the
+    transfers it breaks.
+
+    Args:
+        trip: Trip object the days belong to
+        stay: Stay object, or None to clear the days
+        days: Days as a QuerySet, Day objects or ids; for a date range pass
+            trip.days.filter(date__range=(start, end))
+
+    Returns:
+        Number of days updated
+    """
+    if not isinstance(days, QuerySet):
+        days = [getattr(day, "pk", day) for day in days]
+    with transaction.atomic():
+        updated = Day.objects.filter(trip=trip, pk__in=days).update(stay=stay)
+        repair_stay_transfers(trip)
+    # The UPDATE sends no signals, every day shows its neighbours' stays
+    invalidate_instance_fragments(trip)
+    return updated
+
+
+def reassign_stay(trip, old_stay, new_stay):
+    """
+    Move all the days of a trip from one stay to another with one UPDATE,
+    e.g. before deleting old_stay, and repair the transfers.
+
+    Returns:
+        Number of days updated
+    """
+    with transaction.atomic():
+        updated = Day.objects.filter(trip=trip, stay=old_stay).update(stay=new_stay)
+        repair_stay_transfers(trip)
+    invalidate_instance_fragments(trip)
+    return updated
@@ -3,12 +3,25 @@
 import logging
 from datetime import date, timedelta
 
+import geocoder
 from django.conf import settings
 from django.contrib.sessions.models import Session
 from django.core import management
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, Count, Q, Value, When
 from django.utils import timezone
 
-from trips.models import Trip
+from trips.enrichment import (
+    enrich_trip_places,
+    get_enrichment_progress,
+    save_progress,
+)
+from trips.fragment_cache import invalidate_instance_fragments
+from trips.geocoding import geocode_job_key, normalize_address
+from trips.images import create_image_renditions, ingest_unsplash_photo
+from trips.models import Event, GeocodeResult, MainTransfer, Stay, Trip
+from trips.page_cache import invalidate_user_pages
 
 logger = logging.getLogger("task")
 
@@ -35,6 +48,24 @@ def populate_trips():
         raise
 
 
+# Day of the last check_trips_status run, to only look at trips whose
+# date boundaries were crossed since then
+TRIPS_STATUS_LAST_RUN_KEY = "check_trips_status_last_run"
+
+
+def trip_status_case(today):
+    """Status a trip should have today, as a database expression"""
+    return Case(
+        When(end_date__lt=today, then=Value(Trip.Status.COMPLETED)),
+        When(start_date__lte=today, then=Value(Trip.Status.IN_PROGRESS)),
+        When(
+            start_date__lt=today + timedelta(days=7),
+            then=Value(Trip.Status.IMPENDING),
+        ),
+        default=Value(Trip.Status.NOT_STARTED),
+    )
+
+
 def check_trips_status():
     """
     Check and update trip status based on dates.
@@ -46,49 +77,64 @@ def check_trips_status():
     - COMPLETED (4): After end date
     - ARCHIVED (5): Manually archived (no auto-update)
 
+    Runs set-based: one grouped query counts the transitions and a single
+    UPDATE with a CASE on the dates applies them, without loading trips or
+    firing their save signals. After a first run, only trips with a
+    boundary (6 days before start, start, day after end) crossed since the
+    last run are considered; date edits already set the status on save.
+
     Returns:
-        str: Summary of checked and modified trips
+        str: Summary of checked and modified trips, with counts per transition
     """
     try:
         logger.info("Starting check_trips_status task")
-        trips = Trip.objects.all()
-        trips_count = 0
-        modified_trips_count = 0
         today = date.today()
-        seven_days_after = today + timedelta(days=7)
-
-        for trip in trips:
-            trips_count += 1
-            original_status = trip.status
-
-            # Skip archived trips (status 5)
-            if trip.status == 5:
-                continue
-
-            if trip.start_date and trip.end_date:
-                # After end date
-                if trip.end_date < today:
-                    trip.status = 4
-                # Between start date and end date
-                elif trip.start_date <= today <= trip.end_date:
-                    trip.status = 3
-                # Less than 7 days from start date
-                elif today < trip.start_date < seven_days_after:
-                    trip.status = 2
-                # More than 7 days from start date
-                elif trip.start_date >= seven_days_after:
-                    trip.status = 1
-
-                if trip.status != original_status:
-                    modified_trips_count += 1
-                    trip.save(update_fields=["status"])
-                    logger.debug(
-                        f"Trip '{trip.title}' status changed from {original_status} to {trip.status}"
-                    )
+        last_run = cache.get(TRIPS_STATUS_LAST_RUN_KEY)
+
+        trips = Trip.objects.filter(
+            start_date__isnull=False, end_date__isnull=False
+        ).exclude(status=Trip.Status.ARCHIVED)
+        if last_run is not None and last_run <= today:
+            trips = trips.filter(
+                # Became impending: start within 6 days
+                Q(start_date__gt=last_run + timedelta(days=6))
+                & Q(start_date__lte=today + timedelta(days=6))
+                # Started
+                | Q(start_date__gt=last_run) & Q(start_date__lte=today)
+                # Ended
+                | Q(end_date__gte=last_run) & Q(end_date__lt=today)
+            )
+
+        status = trip_status_case(today)
+        with transaction.atomic():
+            trips_count = trips.count()
+            changed = trips.exclude(status=status)
+            # Grouped by author too, to know whose fragments to drop
+            transitions = {}
+            author_ids = set()
+            for row in (
+                changed.annotate(new_status=status)
+                .values("status", "new_status", "author_id")
+                .annotate(count=Count("pk"))
+                .order_by("status", "new_status")
+            ):
+                transition = (row["status"], row["new_status"])
+                transitions[transition] = transitions.get(transition, 0) + row["count"]
+                author_ids.add(row["author_id"])
+            modified_trips_count = changed.update(status=status)
+        cache.set(TRIPS_STATUS_LAST_RUN_KEY, today, None)
+        # Set-based updates fire no signals, drop the authors' fragments here
+        if author_ids:
+            invalidate_user_pages(*author_ids)
 
         result_msg = (
             f"{trips_count} trips checked, {modified_trips_count} trips modified"
         )
+        if transitions:
+            counts = ", ".join(
+                f"{old} -> {new}: {count}" for (old, new), count in transitions.items()
+            )
+            result_msg += f" ({counts})"
         logger.info(f"check_trips_status completed: {result_msg}")
         return result_msg
 
@@ -122,6 +168,26 @@ def cleanup_old_sessions():
         raise
 
 
+def prune_geocode_store():
+    """
+    Drop expired geocode store entries and the least recently used ones over
+    the size limit.
+
+    Returns:
+        str: Summary of deleted entries
+    """
+    try:
+        logger.info("Starting prune_geocode_store task")
+        deleted_count = GeocodeResult.objects.evict()
+        result_msg = f"Deleted {deleted_count} geocode store entries"
+        logger.info(result_msg)
+        return result_msg
+
+    except Exception as e:
+        logger.error(f"Error in prune_geocode_store task: {e}", exc_info=True)
+        raise
+
+
 def backup_database():
     """
     Backup database using django-dbbackup.
@@ -139,3 +205,176 @@ def backup_database():
     except Exception as e:
         logger.error(f"Error in backup_database task: {e}", exc_info=True)
         raise
+
+
+def geocode_pending_locations(address):
+    """
+    Geocode an address with Mapbox and store the coordinates on every Stay,
+    Event and MainTransfer still waiting for that (normalized) address.
+
+    Args:
+        address: Address to geocode, as scheduled by the model save
+
+    Returns:
+        str: Summary of the resolved rows
+    """
+    try:
+        # Release the dedupe marker before collecting rows, so a row saved from
+        # now on schedules a new job instead of being missed by this one
+        cache.delete(geocode_job_key(address))
+        target = normalize_address(address)
+
+        latlng = GeocodeResult.objects.lookup_latlng(address)
+        if latlng is None:
+            g = geocoder.mapbox(address, access_token=settings.MAPBOX_ACCESS_TOKEN)
+            if g.latlng:
+                latlng = g.latlng
+                GeocodeResult.objects.store_latlng(address, latlng)
+        latitude, longitude = latlng or (None, None)
+
+        # Pending rows are keyed by their normalized address on save, so only
+        # the rows waiting for this job are loaded
+        resolved_count = 0
+        for model in (Stay, Event):
+            resolved = list(
+                model.objects.filter(geocoding_pending=True, geocoding_query=target)
+            )
+            resolved_count += model.objects.filter(
+                pk__in=[obj.pk for obj in resolved]
+            ).update(
+                latitude=latitude,
+                longitude=longitude,
+                geocoding_pending=False,
+                geocoding_query="",
+                geocoding_requested_at=None,
+            )
+            # The UPDATE sends no signals, cached days still show them pending
+            invalidate_instance_fragments(*resolved)
+
+        for transfer in MainTransfer.objects.filter(
+            Q(origin_geocoding_query=target) | Q(destination_geocoding_query=target),
+            geocoding_pending=True,
+        ):
+            update_fields = []
+            if transfer.origin_geocoding_query == target:
+                transfer.origin_latitude = latitude
+                transfer.origin_longitude = longitude
+                transfer.origin_geocoding_query = ""
+                update_fields += [
+                    "origin_latitude",
+                    "origin_longitude",
+                    "origin_geocoding_query",
+                ]
+            if transfer.destination_geocoding_query == target:
+                transfer.destination_latitude = latitude
+                transfer.destination_longitude = longitude
+                transfer.destination_geocoding_query = ""
+                update_fields += [
+                    "destination_latitude",
+                    "destination_longitude",
+                    "destination_geocoding_query",
+                ]
+
+            # Stay pending while the other address is still waiting for its job
+            transfer.geocoding_pending = bool(
+                transfer.origin_geocoding_query or transfer.destination_geocoding_query
+            )
+            if not transfer.geocoding_pending:
+                transfer.geocoding_requested_at = None
+            MainTransfer.objects.filter(pk=transfer.pk).update(
+                geocoding_pending=transfer.geocoding_pending,
+                geocoding_requested_at=transfer.geocoding_requested_at,
+                **{field: getattr(transfer, field) for field in update_fields},
+            )
+            invalidate_instance_fragments(transfer)
+            resolved_count += 1
+
+        result_msg = f"Geocoded '{address}': {resolved_count} rows resolved"
+        if latitude is None:
+            result_msg = (
+                f"Geocoding failed for '{address}': {resolved_count} rows cleared"
+            )
+        logger.info(result_msg)
+        return result_msg
+
+    except Exception as e:
+        logger.error(f"Error in geocode_pending_locations task: {e}", exc_info=True)
+        raise
+
+
+def enrich_trip(trip_id):
+    """
+    Enrich the unenriched stays and events of a trip with Google Places data.
+
+    Args:
+        trip_id: Id of the trip, as enqueued by enqueue_trip_enrichment
+
+    Returns:
+        str: Summary of the enriched and failed places
+    """
+    try:
+        logger.info(f"Starting enrich_trip task for trip {trip_id}")
+        progress = enrich_trip_places(Trip.objects.get(pk=trip_id))
+        result_msg = (
+            f"Trip {trip_id}: {progress['enriched']} of {progress['total']} "
+            f"places enriched, {progress['failed']} failed"
+        )
+        logger.info(result_msg)
+        return result_msg
+
+    except Exception as e:
+        # Let the user start a new job instead of polling a dead one
+        progress = get_enrichment_progress(trip_id)
+        if progress is not None:
+            save_progress(trip_id, {**progress, "finished": True, "error": True})
+        logger.error(f"Error in enrich_trip task: {e}", exc_info=True)
+        raise
+
+
+def ingest_trip_image(trip_id, photo_id, query=""):
+    """
+    Ingest the Unsplash photo chosen as cover of a trip.
+
+    Args:
+        trip_id: Id of the trip
+        photo_id: Unsplash photo id
+        query: Image search query the photo was picked from
+
+    Returns:
+        str: Summary of the ingestion
+    """
+    try:
+        logger.info(f"Starting ingest_trip_image task for trip {trip_id}")
+        if ingest_unsplash_photo(trip_id, photo_id, query):
+            result_msg = f"Trip {trip_id}: Unsplash photo {photo_id} ingested"
+        else:
+            result_msg = f"Trip {trip_id}: Unsplash photo {photo_id} not ingested"
+        logger.info(result_msg)
+        return result_msg
+
+    except Exception as e:
+        logger.error(f"Error in ingest_trip_image task: {e}", exc_info=True)
+        raise
+
+
+def render_trip_image(trip_id, image_name):
+    """
+    Create the AVIF and WebP renditions of the cover of a trip.
+
+    Args:
+        trip_id: Id of the trip
+        image_name: Storage name of the cover
+
+    Returns:
+        str: Summary of the renditions
+    """
+    try:
+        logger.info(f"Starting render_trip_image task for trip {trip_id}")
+        stored = create_image_renditions(trip_id, image_name)
+        result_msg = f"Trip {trip_id}: {stored} renditions of {image_name} stored"
+        logger.info(result_msg)
+        return result_msg
+
+    except Exception as e:
+        logger.error(f"Error in render_trip_image task: {e}", exc_info=True)
+        raise
@@ -5,7 +5,13 @@ from django.core.exceptions import ObjectDoesNotExist
 from django.utils.html import format_html, format_html_join
 
 from trips.data.phone_prefixes import ITALIAN_PREFIXES
-from trips.models import StayTransfer
+from trips.fragment_cache import (
+    day_fragment_version,
+    event_fragment_version,
+    transfers_fragment_version,
+)
+from trips.images import IMAGE_FORMATS
+from trips.utils import stay_transfers
 
 register = template.Library()
 
@@ -15,21 +21,39 @@ def stay_transfer_out(day):
     """Get the StayTransfer from this day's stay (if any).
     Only returns the transfer if this is the last day of the stay.
     """
+    timeline = getattr(day, "timeline", None)
+    if timeline:
+        return timeline.transfer_out
     if not day.stay:
         return None
     # Only show transfer on the last day of the stay
     next_day = day.next_day
     if next_day and next_day.stay and next_day.stay == day.stay:
         return None
-    return StayTransfer.objects.filter(from_stay=day.stay).first()
+    transfer = stay_transfers(day.stay)[0]
+    # A stay visited twice only leaves from one of its last days
+    if transfer is None or transfer.from_day_id != day.pk:
+        return None
+    return transfer
 
 
 @register.filter
 def stay_transfer_in(day):
     """Get the StayTransfer to this day's stay (if any)"""
+    timeline = getattr(day, "timeline", None)
+    if timeline:
+        return timeline.transfer_in
     if not day.stay:
         return None
-    return StayTransfer.objects.filter(to_stay=day.stay).first()
+    return stay_transfers(day.stay)[1]
+
+
+@register.filter
+def has_pending_geocoding(day):
+    """Check if the day's stay or events are waiting for background geocoding"""
+    if day.stay and day.stay.geocoding_pending:
+        return True
+    return any(event.geocoding_pending for event in day.events.all())
 
 
 @register.filter
@@ -93,6 +117,9 @@ def format_opening_hours(hours_data):
 
 @register.filter
 def next_day(day):
+    timeline = getattr(day, "timeline", None)
+    if timeline:
+        return timeline.next_day
     days = list(day.trip.days.all())
     try:
         current_index = days.index(day)
@@ -103,6 +130,9 @@ def next_day(day):
 
 @register.filter
 def prev_day(day):
+    timeline = getattr(day, "timeline", None)
+    if timeline:
+        return timeline.prev_day
     days = list(day.trip.days.all())
     try:
         current_index = days.index(day)
@@ -113,6 +143,9 @@ def prev_day(day):
 
 @register.filter
 def is_last_day(day):
+    timeline = getattr(day, "timeline", None)
+    if timeline:
+        return timeline.is_last
     try:
         days = list(day.trip.days.all())
         current_index = days.index(day)
@@ -132,6 +165,9 @@ def has_different_stay(day1, day2):
 def is_first_day_of_stay(day):
     if not day.stay:
         return False
+    timeline = getattr(day, "timeline", None)
+    if timeline:
+        return timeline.stay_starts
     prev_day = day.prev_day
     return not prev_day or prev_day.stay != day.stay
 
@@ -139,6 +175,9 @@ def is_first_day_of_stay(day):
 @register.filter
 def is_first_day_of_trip(day):
     """Check if the given day is the first day of its trip using prefetched data"""
+    timeline = getattr(day, "timeline", None)
+    if timeline:
+        return timeline.is_first
     try:
         days = [d for d in day.trip.days.all()]
         first_day = min(days, key=lambda d: d.number) if days else None
@@ -261,3 +300,34 @@ def event_type_icon(event):
         return meal_icons.get(event.type, "ph-fork-knife")
 
     return "ph-question"
+
+
+@register.filter
+def image_sources(trip):
+    """Get the srcset of the cover renditions of a trip, one per format.
+    Returns an empty list while the trip has no renditions.
+    """
+    renditions = trip.image_metadata.get("renditions")
+    if not renditions or not trip.get_image_url:
+        return []
+    storage = trip.image.storage
+    sources = []
+    for image_format in IMAGE_FORMATS:
+        srcset = {}
+        for rendition in renditions.values():
+            srcset.setdefault(rendition["width"], storage.url(rendition[image_format]))
+        sources.append(
+            {
+                "type": f"image/{image_format}",
+                "srcset": ", ".join(
+                    f"{url} {width}w" for width, url in sorted(srcset.items())
+                ),
+            }
+        )
+    return sources
+
+
+# Versions the {% cache %} tags of day, event and main transfer fragments vary on
+register.filter(day_fragment_version)
+register.filter(event_fragment_version)
+register.filter(transfers_fragment_version)
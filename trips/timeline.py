@@ -0,0 +1,105 @@
+"""
+Timeline of a trip: its days in order, each with its neighbours, the
+boundaries of its stay and the stay transfers attached to it.
+
+Built once per request from prefetched days, so templates walking a trip
+read neighbours in constant time instead of searching trip.days for every
+filter call. Each day gets its entry as `day.timeline`, which the Day
+properties and the trip_tags filters use when present.
+"""
+
+from django.db.models import Q
+
+from trips.models import StayTransfer
+
+
+class TimelineDay:
+    """A day of the timeline with everything computed from its neighbours"""
+
+    def __init__(self, day, prev_day, next_day, transfer_from, transfer_to):
+        self.day = day
+        self.prev_day = prev_day
+        self.next_day = next_day
+        self.is_first = prev_day is None
+        self.is_last = next_day is None
+        has_stay = day.stay_id is not None
+        # First and last day of a run of days spent in the same stay
+        self.stay_starts = has_stay and (
+            prev_day is None or prev_day.stay_id != day.stay_id
+        )
+        self.stay_ends = has_stay and (
+            next_day is None or next_day.stay_id != day.stay_id
+        )
+        # The transfer out only shows on the day it leaves from, the last day
+        # of a visit of the stay
+        self.transfer_out = (
+            transfer_from
+            if self.stay_ends
+            and transfer_from is not None
+            and transfer_from.from_day_id == day.pk
+            else None
+        )
+        self.transfer_in = transfer_to
+
+
+class Timeline:
+    """
+    Ordered TimelineDay entries of a trip.
+
+    Args:
+        days: Days of the trip in order, with their stay loaded
+        stay_transfers: StayTransfers between the stays of those days
+    """
+
+    def __init__(self, days, stay_transfers=()):
+        days = list(days)
+        transfers_from = {}
+        transfers_to = {}
+        for transfer in stay_transfers:
+            transfers_from[transfer.from_stay_id] = transfer
+            transfers_to[transfer.to_stay_id] = transfer
+
+        self.entries = []
+        for index, day in enumerate(days):
+            entry = TimelineDay(
+                day,
+                days[index - 1] if index > 0 else None,
+                days[index + 1] if index + 1 < len(days) else None,
+                transfers_from.get(day.stay_id),
+                transfers_to.get(day.stay_id),
+            )
+            day.timeline = entry
+            self.entries.append(entry)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+
+def build_timeline(trip):
+    """
+    Timeline of a trip from its prefetched days, with one query for the
+    stay transfers (none when no day has a stay).
+
+    Args:
+        trip: Trip object with days (and their stay) prefetched
+
+    Returns:
+        Timeline
+    """
+    days = list(trip.days.all())
+    stays = {day.stay_id: day.stay for day in days if day.stay_id}
+    transfers = []
+    if stays:
+        transfers = list(
+            StayTransfer.objects.filter(
+                Q(from_stay_id__in=stays) | Q(to_stay_id__in=stays)
+            )
+        )
+        # Reuse the days' stays, google_maps_url reads both addresses
+        for transfer in transfers:
+            transfer.from_stay = stays.get(transfer.from_stay_id) or transfer.from_stay
+            transfer.to_stay = stays.get(transfer.to_stay_id) or transfer.to_stay
+    return Timeline(days, transfers)
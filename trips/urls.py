@@ -138,7 +138,33 @@ htmx_urlpatterns = [
         views.delete_main_transfer_connection,
         name="delete-main-transfer-connection",
     ),
+    path("trips/<int:pk>/map", views.trip_map, name="trip-map"),
+    path("trips/<int:pk>/map.geojson", views.trip_geojson_view, name="trip-geojson"),
+    path("days/<int:pk>/map.geojson", views.day_geojson_view, name="day-geojson"),
     path("days/<int:pk>/detail", views.day_detail, name="day-detail"),
+    path("days/<int:pk>/route", views.day_route, name="day-route"),
+    path("days/<int:pk>/route/apply", views.day_route_apply, name="day-route-apply"),
+    path(
+        "days/<int:pk>/geocoding-status",
+        views.day_geocoding_status,
+        name="day-geocoding-status",
+    ),
+    path(
+        "trips/<int:trip_id>/geocoding-status",
+        views.trip_geocoding_status,
+        name="trip-geocoding-status",
+    ),
+    path(
+        "trips/<int:trip_id>/image-status",
+        views.trip_image_status,
+        name="trip-image-status",
+    ),
+    path("trips/<int:trip_id>/enrich/", views.trip_enrich, name="trip-enrich"),
+    path(
+        "trips/<int:trip_id>/enrich/status",
+        views.trip_enrich_status,
+        name="trip-enrich-status",
+    ),
     path("validate/dates/", views.validate_dates, name="validate-dates"),
     # NOTES
     path("notes/<int:event_id>/", views.event_notes, name="event-notes"),
@@ -1,7 +1,7 @@
 import csv
 import hashlib
 import logging
-import time
+import math
 from io import BytesIO
 from pathlib import Path
 
@@ -9,14 +9,41 @@ import folium
 import requests
 from django.conf import settings
 from django.core.cache import cache
-from django.core.files.uploadedfile import InMemoryUploadedFile
-from django.db.models import BooleanField, Case, F, Max, Min, Prefetch, Q, When, Window
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.db.models import (
+    BooleanField,
+    Case,
+    F,
+    Max,
+    Prefetch,
+    Q,
+    Value,
+    When,
+    Window,
+    prefetch_related_objects,
+)
 from django.db.models.functions import Lag, Lead
 from django.http import Http404
-from PIL import Image
+from PIL import ExifTags, Image, ImageOps
 
 from accounts.models import Profile
-from trips.models import Event, MainTransfer, SimpleTransfer, StayTransfer, Trip
+from trips.datasets import ColumnarTable, freeze_shared_memory
+from trips.fragment_cache import day_fragment_key, transfers_fragment_key
+from trips.map_cache import DAY_MAP_CACHE_TIMEOUT, day_map_cache_key
+from trips.models import (
+    Day,
+    Event,
+    GeocodeResult,
+    MainTransfer,
+    SimpleTransfer,
+    Stay,
+    StayTransfer,
+    Trip,
+)
+from trips.page_cache import home_trip_fragment_key
+from trips.search_index import TextIndex
+from trips.spatial_index import SpatialIndex
+from trips.timeline import Timeline, build_timeline
 
 logger = logging.getLogger(__name__)
 
@@ -49,92 +76,216 @@ def annotate_event_overlaps(queryset):
     )
 
 
+def annotate_last_start(queryset):
+    """
+    Annotates events with the latest start time of their day, so
+    Event.has_next_event can answer without a query per event.
+    """
+    return queryset.annotate(
+        day_last_start=Window(expression=Max("start_time"), partition_by="day_id")
+    )
+
+
+def day_detail_queryset():
+    """
+    Days with everything the day card needs, list and map view alike:
+    trip and author, stay with its transfers, the trip's days (for
+    next_day/prev_day) and main transfers, events with overlap and transfer
+    data, and the day's simple transfers. Loading one day costs the same
+    number of queries however many events, transfers or days the trip has.
+    """
+    return Day.objects.select_related(
+        "trip__author", "stay__transfer_from__to_stay", "stay__transfer_to"
+    ).prefetch_related(*day_detail_prefetches())
+
+
+def day_detail_prefetches():
+    """
+    Prefetches of day_detail_queryset, to complete with prefetch_related_objects
+    a day loaded by it without them
+    """
+    return [
+        Prefetch("trip__days", queryset=Day.objects.select_related("stay")),
+        "trip__main_transfers",
+        Prefetch(
+            "events",
+            queryset=annotate_last_start(
+                annotate_event_overlaps(
+                    Event.objects.select_related("transfer_from__to_event")
+                )
+            ).order_by("start_time"),
+        ),
+        Prefetch(
+            "simple_transfers",
+            queryset=SimpleTransfer.objects.select_related("from_event", "to_event"),
+        ),
+    ]
+
+
+def trip_detail_prefetches():
+    """
+    Prefetches of trip_detail_queryset, to complete with prefetch_related_objects
+    a trip loaded by it without them
+    """
+    return [
+        Prefetch("days", queryset=Day.objects.select_related("stay")),
+        Prefetch(
+            "days__events",
+            queryset=annotate_last_start(
+                annotate_event_overlaps(
+                    Event.objects.select_related("transfer_from__to_event")
+                )
+            ).order_by("start_time"),
+        ),
+        "main_transfers",
+    ]
+
+
+def trip_detail_queryset():
+    """
+    Trips with everything the trip page renders for its days: days with
+    their stay, events with overlap and transfer data, and main transfers.
+    Pair with trips.timeline.build_timeline to walk the days.
+    """
+    return Trip.objects.select_related("author").prefetch_related(
+        *trip_detail_prefetches()
+    )
+
+
+def home_fragments_cached(user, trip, show_map):
+    """
+    Whether the home page can render the trip from cached fragments only:
+    its header, main transfers and, in the list view, every day card.
+
+    Args:
+        trip: Trip object with its days prefetched
+    """
+    if show_map:
+        return False
+    keys = [home_trip_fragment_key(user)]
+    if trip.status != Trip.Status.ARCHIVED:
+        keys.append(transfers_fragment_key(trip))
+    keys += [day_fragment_key(day) for day in trip.days.all()]
+    return len(cache.get_many(keys)) == len(keys)
+
+
+def stay_transfers(stay):
+    """
+    Outgoing and incoming StayTransfer of a stay, as a (from, to) tuple.
+    Uses the one-to-one caches when they were selected, queries otherwise.
+    """
+    if stay is None:
+        return None, None
+    transfers = []
+    for relation, field in (("transfer_from", "from_stay"), ("transfer_to", "to_stay")):
+        if getattr(Stay, relation).is_cached(stay):
+            transfers.append(getattr(stay, relation, None))
+        else:
+            transfers.append(StayTransfer.objects.filter(**{field: stay}).first())
+    return tuple(transfers)
+
+
+def main_transfer(trip, direction):
+    """The trip's main transfer in a direction, from prefetched data if loaded"""
+    return next(
+        (
+            transfer
+            for transfer in trip.main_transfers.all()
+            if transfer.direction == direction
+        ),
+        None,
+    )
+
+
 def get_trips(user):
-    """Get the trips for the home page with favourite trip and latest/others"""
-    profile = Profile.objects.get(user=user)
-    fav_trip = profile.fav_trip
+    """
+    Get the trips for the home page with favourite trip and latest/others.
+    The shown trip is picked by one annotated query: the favourite trip,
+    else IN_PROGRESS > IMPENDING (by start_date) > others by status. Its
+    events and transfers are only prefetched when one of its fragments is
+    not cached.
+
+    Returns:
+        dict: Home page context, empty when the user has no profile
+    """
+    # Cached on the user, so the templates reuse it
+    try:
+        profile = user.profile
+    except Profile.DoesNotExist:
+        return {}
 
     # Check user preference for default view
-    default_view = profile.default_map_view
-    show_map = default_view == "map"
-
-    # If there's a favorite trip, fetch it with full prefetch for detail view
-    if fav_trip:
-        fav_trip = (
-            Trip.objects.prefetch_related(
-                Prefetch(
-                    "days__events",
-                    queryset=annotate_event_overlaps(Event.objects.all()).order_by(
-                        "start_time"
-                    ),
-                ),
-                "days__stay",
-                "main_transfers",
-            )
-            .select_related("author")
-            .get(pk=fav_trip.pk)
-        )
-        unpaired_events = fav_trip.all_events.filter(day__isnull=True)
-    else:
-        unpaired_events = None
+    show_map = profile.default_map_view == "map"
 
     # Base queryset: all user trips excluding archived
     base_qs = Trip.objects.filter(author=user).exclude(status=Trip.Status.ARCHIVED)
-    if fav_trip:
-        base_qs = base_qs.exclude(pk=fav_trip.pk)
-
-    # Determine "latest trip" with smart logic only if NO favorite
-    latest_trip = None
-    if not fav_trip and base_qs.exists():
-        # Queryset with prefetch for the detail view
-        latest_qs = base_qs.prefetch_related(
-            Prefetch(
-                "days__events",
-                queryset=annotate_event_overlaps(Event.objects.all()).order_by(
-                    "start_time"
-                ),
-            ),
-            "days__stay",
-            "main_transfers",
-        ).select_related("author")
-
-        # Priority: IN_PROGRESS > IMPENDING (by start_date) > others
-        latest_trip = (
-            latest_qs.filter(status=Trip.Status.IN_PROGRESS).first()
-            or latest_qs.filter(status=Trip.Status.IMPENDING)
-            .order_by("start_date")
-            .first()
-            or latest_qs.order_by("status", "start_date").first()
-        )
+    candidates = Q(pk__in=base_qs)
+    priorities = [
+        When(status=Trip.Status.IN_PROGRESS, then=Value(1)),
+        When(status=Trip.Status.IMPENDING, then=Value(2)),
+    ]
+    if profile.fav_trip_id:
+        candidates |= Q(pk=profile.fav_trip_id)
+        priorities.insert(0, When(pk=profile.fav_trip_id, then=Value(0)))
+    shown_trip = (
+        Trip.objects.select_related("author")
+        .filter(candidates)
+        .annotate(priority=Case(*priorities, default=Value(3)))
+        .order_by("priority", "status", "start_date")
+        .first()
+    )
 
-        unpaired_events = latest_trip.all_events.filter(day__isnull=True)
-        other_trips = base_qs.exclude(pk=latest_trip.pk).order_by(
-            "status", "start_date"
-        )
-    else:
-        other_trips = base_qs.order_by("status", "start_date")
+    fav_trip = latest_trip = unpaired_events = timeline = None
+    other_trips = base_qs.order_by("status", "start_date")
+    if shown_trip:
+        days_prefetch, *detail_prefetches = trip_detail_prefetches()
+        prefetch_related_objects([shown_trip], days_prefetch)
+        if home_fragments_cached(user, shown_trip, show_map):
+            # Only the cache keys are read from the days
+            timeline = Timeline(shown_trip.days.all())
+        else:
+            prefetch_related_objects([shown_trip], *detail_prefetches)
+            timeline = build_timeline(shown_trip)
+        if shown_trip.pk == profile.fav_trip_id:
+            fav_trip = shown_trip
+        else:
+            latest_trip = shown_trip
+        unpaired_events = shown_trip.all_events.filter(day__isnull=True)
+        other_trips = other_trips.exclude(pk=shown_trip.pk)
 
     return {
         "fav_trip": fav_trip,
         "latest_trip": latest_trip,
+        "timeline": timeline,
         "other_trips": other_trips,
         "unpaired_events": unpaired_events,
         "show_map": show_map,
     }
 
 
-def rate_limit_check():
-    """Rate limiting for Nominatim - max 1 request per second"""
-    last_request_time = cache.get("nominatim_last_request_time", 0)
-    current_time = time.time()
+# Nominatim usage policy allows at most one request per second
+NOMINATIM_RATE_LIMIT_KEY = "nominatim_rate_limit"
+NOMINATIM_RATE_LIMIT_WINDOW = 1
+
+
+class GeocodingRateLimited(Exception):
+    """Raised when the Nominatim request slot for this second is already taken"""
+
+    def __init__(self, retry_after=NOMINATIM_RATE_LIMIT_WINDOW):
+        super().__init__(f"Nominatim rate limit reached, retry in {retry_after}s")
+        self.retry_after = retry_after
 
-    # Wait if the last request was less than 1 second ago
-    time_diff = current_time - last_request_time
-    if time_diff < 1:
-        time.sleep(1 - time_diff)
 
-    # Update the last request time in cache
-    cache.set("nominatim_last_request_time", time.time(), 60)
+def acquire_nominatim_token():
+    """
+    Take the Nominatim request token for the current window without waiting.
+    The bucket holds a single token refilled every second: cache.add is an
+    atomic SET NX with expiry on Redis, so concurrent workers never share it.
+
+    Returns:
+        bool: True if the token was acquired, False if the caller must retry
+    """
+    return cache.add(NOMINATIM_RATE_LIMIT_KEY, True, NOMINATIM_RATE_LIMIT_WINDOW)
 
 
 def generate_cache_key(name, city):
@@ -148,7 +299,10 @@ def generate_cache_key(name, city):
 
 
 def geocode_location(name, city):
-    """Geocoding using Nominatim OpenStreetMap with cache and rate limiting. Returns a list of addresses ordered by importance."""
+    """
+    Geocoding using Nominatim OpenStreetMap with cache and rate limiting. Returns a list of addresses ordered by importance.
+    Raises GeocodingRateLimited when a request would exceed the Nominatim rate limit.
+    """
     if not name or not city:
         return None
 
@@ -158,12 +312,19 @@ def geocode_location(name, city):
     if cached_result:
         return cached_result
 
-    # Rate limit check to avoid hitting Nominatim too fast
-    rate_limit_check()
+    # Then the persistent store, shared across processes and restarts
+    query = f"{name}, {city}"
+    stored_result = GeocodeResult.objects.lookup(
+        GeocodeResult.Provider.NOMINATIM, query
+    )
+    if stored_result:
+        cache.set(cache_key, stored_result, 3600)
+        return stored_result
+
+    # Never wait in the request thread: the caller asks the client to retry
+    if not acquire_nominatim_token():
+        raise GeocodingRateLimited()
 
-    time.sleep(
-        1
-    )  # Ensure at least 1 second between requests for showing a meaningfiul indicator on the frontend
     url = "https://nominatim.openstreetmap.org/search"
     params = {
         "q": f"{name.strip()}, {city.strip()}",
@@ -230,6 +391,9 @@ def geocode_location(name, city):
             # Order the list by importance descending
             address_list.sort(key=lambda x: x["importance"], reverse=True)
             cache.set(cache_key, address_list, 3600)
+            GeocodeResult.objects.store(
+                GeocodeResult.Provider.NOMINATIM, query, address_list
+            )
             return address_list
 
     except Exception as e:
@@ -290,7 +454,40 @@ def select_best_result(results, name, city):
     return scored_results[0][1] if scored_results else results[0]
 
 
-def search_unsplash_photos(query, per_page=3, orientation="landscape"):
+UNSPLASH_SEARCH_PER_PAGE = 3
+
+
+def unsplash_search_cache_key(query, per_page, orientation):
+    """Cache key of an Unsplash search"""
+    cache_data = f"unsplash_{query}_{per_page}_{orientation}"
+    return hashlib.md5(cache_data.encode(), usedforsecurity=False).hexdigest()
+
+
+def unsplash_photo_data(result):
+    """Fields of an Unsplash API photo used to show, download and credit it"""
+    return {
+        "id": result["id"],
+        "urls": {
+            "regular": result["urls"]["regular"],
+            "small": result["urls"]["small"],
+            "thumb": result["urls"]["thumb"],
+        },
+        "user": {
+            "name": result["user"]["name"],
+            "username": result["user"]["username"],
+            "profile": result["user"]["links"]["html"],
+        },
+        "links": {
+            "html": result["links"]["html"],
+            "download_location": result["links"]["download_location"],
+        },
+        "alt_description": result.get("alt_description", ""),
+    }
+
+
+def search_unsplash_photos(
+    query, per_page=UNSPLASH_SEARCH_PER_PAGE, orientation="landscape"
+):
     """
     Search Unsplash for photos with caching.
 
@@ -304,11 +501,8 @@ def search_unsplash_photos(query, per_page=3, orientation="landscape"):
     """
     from django.conf import settings
 
-    # Generate cache key
-    cache_data = f"unsplash_{query}_{per_page}_{orientation}"
-    cache_key = hashlib.md5(cache_data.encode(), usedforsecurity=False).hexdigest()
-
     # Check cache
+    cache_key = unsplash_search_cache_key(query, per_page, orientation)
     cached_result = cache.get(cache_key)
     if cached_result:
         logger.info(f"Unsplash cache hit for query: {query}")
@@ -332,28 +526,7 @@ def search_unsplash_photos(query, per_page=3, orientation="landscape"):
         data = response.json()
 
         # Extract relevant fields
-        photos = []
-        for result in data.get("results", []):
-            photos.append(
-                {
-                    "id": result["id"],
-                    "urls": {
-                        "regular": result["urls"]["regular"],
-                        "small": result["urls"]["small"],
-                        "thumb": result["urls"]["thumb"],
-                    },
-                    "user": {
-                        "name": result["user"]["name"],
-                        "username": result["user"]["username"],
-                        "profile": result["user"]["links"]["html"],
-                    },
-                    "links": {
-                        "html": result["links"]["html"],
-                        "download_location": result["links"]["download_location"],
-                    },
-                    "alt_description": result.get("alt_description", ""),
-                }
-            )
+        photos = [unsplash_photo_data(result) for result in data.get("results", [])]
 
         # Cache for 6 hours (21600 seconds)
         cache.set(cache_key, photos, 21600)
@@ -368,6 +541,49 @@ def search_unsplash_photos(query, per_page=3, orientation="landscape"):
     return None
 
 
+def get_unsplash_photo(photo_id, query=None):
+    """
+    Data of an Unsplash photo, as returned by search_unsplash_photos.
+    Photos picked from the image search are read back from its cached
+    results; otherwise, or once the cache expired, the photo is fetched.
+
+    Args:
+        photo_id: Unsplash photo id
+        query: Query of the image search the photo was picked from
+
+    Returns:
+        Photo dict or None on error
+    """
+    from django.conf import settings
+
+    if query:
+        cache_key = unsplash_search_cache_key(
+            query, UNSPLASH_SEARCH_PER_PAGE, "landscape"
+        )
+        for photo in cache.get(cache_key) or []:
+            if photo["id"] == photo_id:
+                return photo
+
+    api_key = settings.UNSPLASH_ACCESS_KEY
+    if not api_key:
+        logger.error("Unsplash API key not configured")
+        return None
+
+    try:
+        response = requests.get(
+            f"https://api.unsplash.com/photos/{photo_id}",
+            headers={"Authorization": f"Client-ID {api_key}", "Accept-Version": "v1"},
+            timeout=5,
+        )
+        response.raise_for_status()
+        return unsplash_photo_data(response.json())
+
+    except requests.RequestException as e:
+        logger.error(f"Unsplash API error: {e}")
+
+    return None
+
+
 def download_unsplash_photo(photo_data):
     """
     Download photo from Unsplash and return file content.
@@ -417,24 +633,37 @@ def download_unsplash_photo(photo_data):
         return None, None
 
 
+# Largest cover stored, in landscape
+TRIP_IMAGE_SIZE = (1200, 800)
+# Uploads with more pixels are rejected before decoding, well below the
+# decompression bomb limit of Pillow but above 48 MP phone cameras
+TRIP_IMAGE_MAX_PIXELS = 64_000_000
+
+
 def process_trip_image(image_file, max_size_mb=2):
     """
-    Process uploaded image: validate size, resize if needed, ensure landscape.
+    Process uploaded image: validate size, downscale it while decoding,
+    apply its EXIF orientation and crop portraits to landscape.
+
+    JPEGs are decoded straight at a reduced scale and other formats are
+    reduced before the final resampling, so a large phone photo never
+    needs its full-size bitmap in memory. The result is written to a
+    temporary file rather than kept in memory.
 
     Args:
         image_file: UploadedFile or bytes
         max_size_mb: Maximum file size in MB
 
     Returns:
-        Processed InMemoryUploadedFile or None if invalid
+        Processed TemporaryUploadedFile or None if invalid
     """
     try:
         # Handle bytes vs UploadedFile
         if isinstance(image_file, bytes):
-            img = Image.open(BytesIO(image_file))
+            source = BytesIO(image_file)
             original_name = "unsplash_photo.jpg"
         else:
-            img = Image.open(image_file)
+            source = image_file
             original_name = image_file.name
 
             # Check file size
@@ -446,53 +675,57 @@ def process_trip_image(image_file, max_size_mb=2):
                 logger.warning(f"Image too large: {size_mb:.2f}MB > {max_size_mb}MB")
                 # Continue to resize instead of rejecting
 
+        # Opening only reads the header, nothing is decoded yet
+        img = Image.open(source)
+        width, height = img.size
+        if width * height > TRIP_IMAGE_MAX_PIXELS:
+            logger.warning(f"Image has too many pixels: {width}x{height}")
+            return None
+
+        # Width and height swap when the EXIF orientation is a quarter turn
+        orientation = img.getexif().get(ExifTags.Base.Orientation, 1)
+        quarter_turn = orientation in (5, 6, 7, 8)
+        if quarter_turn:
+            width, height = height, width
+
+        # Target max dimensions: 1200x800, portraits are cropped to landscape
+        # afterwards so only their width is limited
+        max_width, max_height = TRIP_IMAGE_SIZE
+        if height > width:
+            max_height = math.ceil(max_width * height / width)
+        box = (max_height, max_width) if quarter_turn else (max_width, max_height)
+
+        # Decodes JPEGs at 1/2, 1/4 or 1/8 scale (draft), reduces any other
+        # format by an integer factor, then resamples with LANCZOS from at
+        # least 1.5 times the target size
+        original_width, original_height = img.size
+        img.thumbnail(box, Image.Resampling.LANCZOS, reducing_gap=1.5)
+        if img.size != (original_width, original_height):
+            logger.info(
+                f"Resized image from {original_width}x{original_height} "
+                f"to {img.width}x{img.height}"
+            )
+        img = ImageOps.exif_transpose(img)
+
         # Convert to RGB if needed (handle RGBA, grayscale, etc)
         if img.mode not in ("RGB", "L"):
             img = img.convert("RGB")
 
-        # Ensure landscape orientation (width > height)
+        # Ensure landscape orientation (width > height) keeping the center
         width, height = img.size
         if height > width:
-            # Rotate to landscape
-            img = img.rotate(90, expand=True)
-            width, height = img.size
-
-        # Calculate target dimensions maintaining aspect ratio
-        # Target max dimensions: 1200x800 for landscape
-        target_width = 1200
-        target_height = 800
-        aspect_ratio = width / height
-
-        if aspect_ratio > (target_width / target_height):
-            # Image is wider than target
-            new_width = target_width
-            new_height = int(target_width / aspect_ratio)
-        else:
-            # Image is taller than target
-            new_height = target_height
-            new_width = int(target_height * aspect_ratio)
-
-        # Resize if larger than target
-        if width > new_width or height > new_height:
-            img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-            logger.info(
-                f"Resized image from {width}x{height} to {new_width}x{new_height}"
-            )
-
-        # Save to BytesIO
-        output = BytesIO()
-        img.save(output, format="JPEG", quality=85, optimize=True)
-        output.seek(0)
-
-        # Create InMemoryUploadedFile
-        processed_file = InMemoryUploadedFile(
-            output,
-            "ImageField",
-            original_name,
-            "image/jpeg",
-            output.getbuffer().nbytes,
-            None,
+            crop_height = round(width * TRIP_IMAGE_SIZE[1] / TRIP_IMAGE_SIZE[0])
+            top = (height - crop_height) // 2
+            img = img.crop((0, top, width, top + crop_height))
+
+        # Stream the JPEG to a temporary file, storages move it into place;
+        # the output is always JPEG, whatever the uploaded extension
+        processed_file = TemporaryUploadedFile(
+            f"{Path(original_name).stem}.jpg", "image/jpeg", 0, None
         )
+        img.save(processed_file, format="JPEG", quality=85, optimize=True)
+        processed_file.size = processed_file.tell()
+        processed_file.seek(0)
 
         return processed_file
 
@@ -501,136 +734,111 @@ def process_trip_image(image_file, max_size_mb=2):
         return None
 
 
-def create_day_map(events_with_location, stay, next_day_stay, day=None):
+MAP_TILES = "https://{s}.basemaps.cartocdn.com/light_all/{z}/{x}/{y}{r}.png"
+MAP_ATTRIBUTION = '&copy; <a href="https://www.openstreetmap.org/copyright">OpenStreetMap</a> contributors &copy; <a href="https://carto.com/attributions">CARTO</a>'
+
+
+def _transfer_icon_name(transport_type):
+    """Font Awesome icon for a main transfer type"""
+    if transport_type == MainTransfer.Type.PLANE:
+        return "plane"
+    if transport_type == MainTransfer.Type.TRAIN:
+        return "train"
+    if transport_type == MainTransfer.Type.CAR:
+        return "car"
+    return "person-walking"
+
+
+def _day_map_markers(events_with_location, stay, next_day_stay, day=None):
     """
-    Create a map for a given day with events, stay, and next day stay.
+    Collect everything drawn on a day map as plain data.
 
-    Args:
-        events_with_location: QuerySet of events with coordinates
-        stay: Stay object for the current day
-        next_day_stay: Stay object for the next day (if different)
-        day: Optional Day object (for main transfer integration)
+    Returns:
+        Dict of events, stays and main transfer markers, or None if there is
+        nothing to show
     """
     # Check if there's anything to show on the map
     if not events_with_location and (not stay or not stay.latitude):
         return None
 
-    # Aggregate event locations
-    bounds = events_with_location.aggregate(
-        min_lat=Min("latitude"),
-        max_lat=Max("latitude"),
-        min_lon=Min("longitude"),
-        max_lon=Max("longitude"),
-    )
-
-    # Include stay location in bounds calculation
+    markers = {
+        "events": [
+            [event.name, event.latitude, event.longitude, event.category]
+            for event in events_with_location
+            if event.latitude is not None and event.longitude is not None
+        ],
+        "stay": None,
+        "next_day_stay": None,
+        "transfers": [],
+    }
     if stay and stay.latitude and stay.longitude:
-        bounds["min_lat"] = min(bounds["min_lat"] or stay.latitude, stay.latitude)
-        bounds["max_lat"] = max(bounds["max_lat"] or stay.latitude, stay.latitude)
-        bounds["min_lon"] = min(bounds["min_lon"] or stay.longitude, stay.longitude)
-        bounds["max_lon"] = max(bounds["max_lon"] or stay.longitude, stay.longitude)
-
-    # Include next day's stay in bounds calculation if different
-    if next_day_stay and next_day_stay != stay and next_day_stay.latitude:
-        bounds["min_lat"] = min(
-            bounds["min_lat"] or next_day_stay.latitude, next_day_stay.latitude
-        )
-        bounds["max_lat"] = max(
-            bounds["max_lat"] or next_day_stay.latitude, next_day_stay.latitude
-        )
-        bounds["min_lon"] = min(
-            bounds["min_lon"] or next_day_stay.longitude, next_day_stay.longitude
-        )
-        bounds["max_lon"] = max(
-            bounds["max_lon"] or next_day_stay.longitude, next_day_stay.longitude
-        )
+        markers["stay"] = [stay.name, stay.latitude, stay.longitude]
+
+    # Next day's stay only if different
+    if (
+        next_day_stay
+        and next_day_stay != stay
+        and next_day_stay.latitude
+        and next_day_stay.longitude
+    ):
+        markers["next_day_stay"] = [
+            next_day_stay.name,
+            next_day_stay.latitude,
+            next_day_stay.longitude,
+        ]
 
     # Include main transfers if this is the first or last day
-    main_transfer_markers = []
     if day:
         trip = day.trip
-        total_days = trip.days.count()
 
         # First day: include ARRIVAL transfer destination
         if day.number == 1:
-            arrival = trip.main_transfers.filter(
-                direction=MainTransfer.Direction.ARRIVAL
-            ).first()
-
+            arrival = main_transfer(trip, MainTransfer.Direction.ARRIVAL)
             if (
                 arrival
                 and arrival.destination_latitude
                 and arrival.destination_longitude
             ):
-                # Include in bounds
-                bounds["min_lat"] = min(
-                    bounds["min_lat"] or arrival.destination_latitude,
-                    arrival.destination_latitude,
-                )
-                bounds["max_lat"] = max(
-                    bounds["max_lat"] or arrival.destination_latitude,
-                    arrival.destination_latitude,
-                )
-                bounds["min_lon"] = min(
-                    bounds["min_lon"] or arrival.destination_longitude,
-                    arrival.destination_longitude,
-                )
-                bounds["max_lon"] = max(
-                    bounds["max_lon"] or arrival.destination_longitude,
-                    arrival.destination_longitude,
-                )
-
-                # Store for marker creation later
-                main_transfer_markers.append(
-                    {
-                        "lat": arrival.destination_latitude,
-                        "lon": arrival.destination_longitude,
-                        "name": arrival.destination_name,
-                        "type": "arrival",
-                        "transport_type": arrival.type,
-                    }
+                markers["transfers"].append(
+                    [
+                        f"Arrival: {arrival.destination_name}",
+                        arrival.destination_latitude,
+                        arrival.destination_longitude,
+                        arrival.type,
+                    ]
                 )
 
         # Last day: include DEPARTURE transfer origin
-        if day.number == total_days:
-            departure = trip.main_transfers.filter(
-                direction=MainTransfer.Direction.DEPARTURE
-            ).first()
-
+        if day.number == trip.days.count():
+            departure = main_transfer(trip, MainTransfer.Direction.DEPARTURE)
             if departure and departure.origin_latitude and departure.origin_longitude:
-                # Include in bounds
-                bounds["min_lat"] = min(
-                    bounds["min_lat"] or departure.origin_latitude,
-                    departure.origin_latitude,
-                )
-                bounds["max_lat"] = max(
-                    bounds["max_lat"] or departure.origin_latitude,
-                    departure.origin_latitude,
-                )
-                bounds["min_lon"] = min(
-                    bounds["min_lon"] or departure.origin_longitude,
-                    departure.origin_longitude,
-                )
-                bounds["max_lon"] = max(
-                    bounds["max_lon"] or departure.origin_longitude,
-                    departure.origin_longitude,
+                markers["transfers"].append(
+                    [
+                        f"Departure: {departure.origin_name}",
+                        departure.origin_latitude,
+                        departure.origin_longitude,
+                        departure.type,
+                    ]
                 )
 
-                # Store for marker creation later
-                main_transfer_markers.append(
-                    {
-                        "lat": departure.origin_latitude,
-                        "lon": departure.origin_longitude,
-                        "name": departure.origin_name,
-                        "type": "departure",
-                        "transport_type": departure.type,
-                    }
-                )
+    if not any(markers.values()):
+        return None
+    return markers
+
+
+def _render_day_map(markers):
+    """Build the folium map for the markers of a day and return its HTML"""
+    points = [(lat, lon) for _, lat, lon, _ in markers["events"]]
+    for key in ("stay", "next_day_stay"):
+        if markers[key]:
+            points.append((markers[key][1], markers[key][2]))
+    points += [(lat, lon) for _, lat, lon, _ in markers["transfers"]]
+    latitudes, longitudes = zip(*points, strict=True)
 
     # Create a map
     m = folium.Map(
-        tiles="https://{s}.basemaps.cartocdn.com/light_all/{z}/{x}/{y}{r}.png",
-        attr='&copy; <a href="https://www.openstreetmap.org/copyright">OpenStreetMap</a> contributors &copy; <a href="https://carto.com/attributions">CARTO</a>',
+        tiles=MAP_TILES,
+        attr=MAP_ATTRIBUTION,
         subdomains="abcd",
         width="100%",
         height="100%",
@@ -638,8 +846,8 @@ def create_day_map(events_with_location, stay, next_day_stay, day=None):
     # Add a bias
     bias = 0.005
     fit_bounds_payload = [
-        [bounds["min_lat"] - bias, bounds["min_lon"] - bias],
-        [bounds["max_lat"] + bias, bounds["max_lon"] + bias],
+        [min(latitudes) - bias, min(longitudes) - bias],
+        [max(latitudes) + bias, max(longitudes) + bias],
     ]
     m.fit_bounds(fit_bounds_payload)
 
@@ -649,65 +857,181 @@ def create_day_map(events_with_location, stay, next_day_stay, day=None):
     stay_icon = folium.Icon(prefix="fa", color="blue", icon="bed")
 
     # Add markers for each event
-    for event in events_with_location:
-        icon = experience_icon if event.category == 2 else meal_icon
+    for name, latitude, longitude, category in markers["events"]:
+        icon = experience_icon if category == 2 else meal_icon
         folium.Marker(
-            [event.latitude, event.longitude],
-            popup=event.name,
-            tooltip=event.name,
+            [latitude, longitude],
+            popup=name,
+            tooltip=name,
             icon=icon,
         ).add_to(m)
 
     # Add marker for the stay
-    if stay and stay.latitude and stay.longitude:
+    if markers["stay"]:
+        name, latitude, longitude = markers["stay"]
         folium.Marker(
-            [stay.latitude, stay.longitude],
-            popup=stay.name,
-            tooltip=stay.name,
+            [latitude, longitude],
+            popup=name,
+            tooltip=name,
             icon=stay_icon,
         ).add_to(m)
 
     # Add marker for the next day's stay if it's different
-    if (
-        next_day_stay
-        and next_day_stay != stay
-        and next_day_stay.latitude
-        and next_day_stay.longitude
-    ):
+    if markers["next_day_stay"]:
+        name, latitude, longitude = markers["next_day_stay"]
         folium.Marker(
-            [next_day_stay.latitude, next_day_stay.longitude],
-            popup=next_day_stay.name,
-            tooltip=f"Next day: {next_day_stay.name}",
+            [latitude, longitude],
+            popup=name,
+            tooltip=f"Next day: {name}",
             icon=stay_icon,
         ).add_to(m)
 
     # Add markers for main transfers (arrival/departure)
-    for marker_data in main_transfer_markers:
-        label = "Arrival" if marker_data["type"] == "arrival" else "Departure"
-
-        # Choose icon based on transport type
-        transport_type = marker_data.get("transport_type")
-        if transport_type == MainTransfer.Type.PLANE:
-            icon_name = "plane"
-        elif transport_type == MainTransfer.Type.TRAIN:
-            icon_name = "train"
-        elif transport_type == MainTransfer.Type.CAR:
-            icon_name = "car"
-        else:  # OTHER
-            icon_name = "person-walking"
-
-        icon = folium.Icon(prefix="fa", color="red", icon=icon_name)
-
+    for label, latitude, longitude, transport_type in markers["transfers"]:
+        icon = folium.Icon(
+            prefix="fa",
+            color="red",
+            icon=_transfer_icon_name(transport_type),
+        )
         folium.Marker(
-            [marker_data["lat"], marker_data["lon"]],
-            popup=f"{label}: {marker_data['name']}",
-            tooltip=f"{label}: {marker_data['name']}",
+            [latitude, longitude],
+            popup=label,
+            tooltip=label,
             icon=icon,
         ).add_to(m)
 
     return m._repr_html_()
 
 
+def create_day_map(events_with_location, stay, next_day_stay, day=None):
+    """
+    Create a map for a given day with events, stay, and next day stay.
+
+    The HTML is cached under a hash of everything drawn on the map, so
+    repeat views of an unchanged day skip folium entirely. Saving or deleting
+    an event, stay or main transfer also drops the trip's cached maps.
+
+    Args:
+        events_with_location: Events with coordinates, a QuerySet or a list
+        stay: Stay object for the current day
+        next_day_stay: Stay object for the next day (if different)
+        day: Optional Day object (for main transfer integration)
+    """
+    markers = _day_map_markers(events_with_location, stay, next_day_stay, day)
+    if markers is None:
+        return None
+
+    cache_key = day_map_cache_key(day.trip_id if day else None, markers)
+    map_html = cache.get(cache_key)
+    if map_html is None:
+        map_html = _render_day_map(markers)
+        cache.set(cache_key, map_html, DAY_MAP_CACHE_TIMEOUT)
+    return map_html
+
+
+def create_trip_map(trip):
+    """
+    Create a single map for the whole trip, with one layer per day that can
+    be toggled from the layer control.
+
+    Works on prefetched data only: trip.days (with stay) and their events,
+    plus trip.main_transfers, so the map costs no queries of its own.
+
+    Args:
+        trip: Trip object with days, days__events and main_transfers prefetched
+
+    Returns:
+        Map HTML, or None if nothing in the trip has coordinates
+    """
+    days = list(trip.days.all())
+    points = []
+    layers = []
+    for day in days:
+        events = [
+            event
+            for event in day.events.all()
+            if event.latitude is not None and event.longitude is not None
+        ]
+        stay = day.stay if day.stay and day.stay.latitude is not None else None
+        if not events and not stay:
+            continue
+        points += [(event.latitude, event.longitude) for event in events]
+        if stay:
+            points.append((stay.latitude, stay.longitude))
+        layers.append((day, events, stay))
+
+    transfers = []
+    for transfer in trip.main_transfers.all():
+        if transfer.direction == MainTransfer.Direction.ARRIVAL:
+            label = "Arrival"
+            name = transfer.destination_name
+            location = (transfer.destination_latitude, transfer.destination_longitude)
+        else:
+            label = "Departure"
+            name = transfer.origin_name
+            location = (transfer.origin_latitude, transfer.origin_longitude)
+        if None not in location:
+            points.append(location)
+            transfers.append((location, f"{label}: {name}", transfer.type))
+
+    if not points:
+        return None
+
+    m = folium.Map(
+        tiles=MAP_TILES,
+        attr=MAP_ATTRIBUTION,
+        subdomains="abcd",
+        width="100%",
+        height="100%",
+    )
+    bias = 0.005
+    latitudes, longitudes = zip(*points, strict=True)
+    m.fit_bounds(
+        [
+            [min(latitudes) - bias, min(longitudes) - bias],
+            [max(latitudes) + bias, max(longitudes) + bias],
+        ]
+    )
+
+    for day, events, stay in layers:
+        layer = folium.FeatureGroup(name=f"Day {day.number} - {day.date:%d/%m}")
+        for event in events:
+            folium.Marker(
+                [event.latitude, event.longitude],
+                popup=event.name,
+                tooltip=event.name,
+                icon=folium.Icon(
+                    prefix="fa",
+                    color="green" if event.category == 2 else "orange",
+                    icon="images" if event.category == 2 else "utensils",
+                ),
+            ).add_to(layer)
+        if stay:
+            folium.Marker(
+                [stay.latitude, stay.longitude],
+                popup=stay.name,
+                tooltip=stay.name,
+                icon=folium.Icon(prefix="fa", color="blue", icon="bed"),
+            ).add_to(layer)
+        layer.add_to(m)
+
+    if transfers:
+        layer = folium.FeatureGroup(name="Arrival and departure")
+        for location, label, transport_type in transfers:
+            folium.Marker(
+                list(location),
+                popup=label,
+                tooltip=label,
+                icon=folium.Icon(
+                    prefix="fa", color="red", icon=_transfer_icon_name(transport_type)
+                ),
+            ).add_to(layer)
+        layer.add_to(m)
+
+    folium.LayerControl(collapsed=False).add_to(m)
+    return m._repr_html_()
+
+
 def convert_google_opening_hours(google_hours):
     if not google_hours or "periods" not in google_hours:
         return None
@@ -755,74 +1079,161 @@ def get_event_instance(event):
 # Cache for CSV data (lazy loading)
 _AIRPORTS_CACHE = None
 _STATIONS_CACHE = None
+_AIRPORT_INDEX = None
+_STATION_INDEX = None
+_AIRPORT_SPATIAL_INDEX = None
+_STATION_SPATIAL_INDEX = None
 
 
-def load_airports():
-    """
-    Load airports from CSV (with cache).
-    Returns list of airport dicts with: iata_code, name, city, latitude, longitude
-    """
-    global _AIRPORTS_CACHE
-
-    if _AIRPORTS_CACHE is not None:
-        return _AIRPORTS_CACHE
+def _read_airport_rows(csv_path):
+    with open(csv_path, encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            yield {
+                "iata_code": row["iata_code"],
+                "name": row["name"],
+                "city": row["city"],
+                "latitude": float(row["latitude"]),
+                "longitude": float(row["longitude"]),
+            }
 
-    airports = []
-    csv_path = Path(settings.BASE_DIR) / "trips" / "data" / "airports_simple.csv"
 
+def _read_station_rows(csv_path):
     with open(csv_path, encoding="utf-8") as f:
         reader = csv.DictReader(f)
         for row in reader:
-            airports.append(
-                {
-                    "iata_code": row["iata_code"],
+            # Skip stations without coordinates
+            if not row.get("latitude") or not row.get("longitude"):
+                continue
+
+            try:
+                yield {
+                    "id": row["id"],
                     "name": row["name"],
-                    "city": row["city"],
+                    "country": row["country"],
                     "latitude": float(row["latitude"]),
                     "longitude": float(row["longitude"]),
                 }
-            )
+            except (ValueError, KeyError):
+                # Skip rows with invalid data
+                continue
 
-    _AIRPORTS_CACHE = airports
-    return airports
 
+# Bundled datasets: CSV file, row reader and ColumnarTable layout
+DATASETS = {
+    "airports": {
+        "csv": "airports_simple.csv",
+        "read_rows": _read_airport_rows,
+        "table": {
+            "text_columns": ("iata_code", "name"),
+            "category_columns": ("city",),
+            "float_columns": ("latitude", "longitude"),
+            "key_column": "iata_code",
+            "normalize_key": str.upper,
+        },
+    },
+    "stations": {
+        "csv": "stations_simplified.csv",
+        "read_rows": _read_station_rows,
+        "table": {
+            "text_columns": ("id", "name"),
+            "category_columns": ("country",),
+            "float_columns": ("latitude", "longitude"),
+            "key_column": "id",
+        },
+    },
+}
+
+
+def dataset_paths(name):
+    """Return the (CSV, compiled binary) paths of a bundled dataset"""
+    csv_path = Path(settings.BASE_DIR) / "trips" / "data" / DATASETS[name]["csv"]
+    return csv_path, csv_path.with_suffix(".bin")
+
+
+def compile_dataset(name):
+    """
+    Parse a dataset CSV and save it as a memory-mappable binary table.
 
-def load_train_stations():
+    Args:
+        name: Dataset name, a key of DATASETS
+
+    Returns:
+        Tuple of (binary path, number of rows)
     """
-    Load train stations from CSV (with cache).
-    Returns list of station dicts with: id, name, country, latitude, longitude
+    dataset = DATASETS[name]
+    csv_path, compiled_path = dataset_paths(name)
+    table = ColumnarTable(dataset["read_rows"](csv_path), **dataset["table"])
+    table.save(compiled_path, csv_path)
+    return compiled_path, len(table)
+
+
+def load_dataset(name):
     """
-    global _STATIONS_CACHE
+    Open a dataset from its compiled binary, with no parsing. Falls back to
+    parsing the CSV when the binary is missing or stale (compiled from a
+    different CSV or by another format version).
 
-    if _STATIONS_CACHE is not None:
-        return _STATIONS_CACHE
+    Args:
+        name: Dataset name, a key of DATASETS
 
-    stations = []
-    csv_path = Path(settings.BASE_DIR) / "trips" / "data" / "stations_simplified.csv"
+    Returns:
+        ColumnarTable
+    """
+    dataset = DATASETS[name]
+    csv_path, compiled_path = dataset_paths(name)
+    table = ColumnarTable.open(
+        compiled_path,
+        csv_path,
+        normalize_key=dataset["table"].get("normalize_key", str),
+    )
+    if table is None:
+        logger.info(f"No up-to-date {compiled_path.name}, parsing {csv_path.name}")
+        table = ColumnarTable(dataset["read_rows"](csv_path), **dataset["table"])
+    return table
 
-    with open(csv_path, encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            # Skip stations without coordinates
-            if not row.get("latitude") or not row.get("longitude"):
-                continue
 
-            try:
-                stations.append(
-                    {
-                        "id": row["id"],
-                        "name": row["name"],
-                        "country": row["country"],
-                        "latitude": float(row["latitude"]),
-                        "longitude": float(row["longitude"]),
-                    }
-                )
-            except (ValueError, KeyError):
-                # Skip rows with invalid data
-                continue
+def load_airports():
+    """
+    Load airports (with cache), from the compiled binary when up to date.
+    Returns a read-only ColumnarTable of airport dicts with: iata_code, name,
+    city, latitude, longitude
+    """
+    global _AIRPORTS_CACHE
 
-    _STATIONS_CACHE = stations
-    return stations
+    if _AIRPORTS_CACHE is None:
+        _AIRPORTS_CACHE = load_dataset("airports")
+    return _AIRPORTS_CACHE
+
+
+def load_train_stations():
+    """
+    Load train stations (with cache), from the compiled binary when up to date.
+    Returns a read-only ColumnarTable of station dicts with: id, name, country,
+    latitude, longitude
+    """
+    global _STATIONS_CACHE
+
+    if _STATIONS_CACHE is None:
+        _STATIONS_CACHE = load_dataset("stations")
+    return _STATIONS_CACHE
+
+
+def get_airport_index():
+    """
+    Return the airport search index, built on first use and kept per process.
+    Indexes IATA code, name and city; an exact IATA code ranks first.
+    """
+    global _AIRPORT_INDEX
+
+    if _AIRPORT_INDEX is None or _AIRPORT_INDEX.source is not load_airports():
+        _AIRPORT_INDEX = TextIndex(
+            load_airports(),
+            fields=("iata_code", "name", "city"),
+            exact_fields=("iata_code",),
+            display_field="name",
+        )
+    return _AIRPORT_INDEX
 
 
 def search_airports(query, limit=10):
@@ -834,50 +1245,126 @@ def search_airports(query, limit=10):
         limit: Maximum number of results
 
     Returns:
-        List of airports matching the query
+        List of airports matching the query, ranked: exact IATA code first,
+        then prefix matches, then substring matches
     """
-    airports = load_airports()
-    query_lower = query.lower()
+    return get_airport_index().search(query, limit)
 
-    results = []
-    for airport in airports:
-        if (
-            query_lower in airport["iata_code"].lower()
-            or query_lower in airport["name"].lower()
-            or query_lower in airport["city"].lower()
-        ):
-            results.append(airport)
-            if len(results) >= limit:
-                break
 
-    return results
+def get_station_index():
+    """
+    Return the train station search index, built on first use and kept per
+    process. Indexes accent folded names, grouped by country.
+    """
+    global _STATION_INDEX
+
+    if _STATION_INDEX is None or _STATION_INDEX.source is not load_train_stations():
+        _STATION_INDEX = TextIndex(
+            load_train_stations(),
+            fields=("name",),
+            group_field="country",
+        )
+    return _STATION_INDEX
 
 
-def search_train_stations(query, limit=10):
+def search_train_stations(query, limit=10, country=None):
     """
-    Search train stations by name or country.
+    Search train stations by name.
 
     Args:
-        query: Search text
+        query: Search text, accents are ignored ("malaga" finds "Málaga")
         limit: Maximum number of results
+        country: Optional country code to restrict results to (e.g. 'IT')
 
     Returns:
-        List of stations matching the query
+        List of stations matching the query, ranked: whole word matches first
+        (shortest names first, so an exact name leads), then word prefix and
+        substring matches
     """
+    return get_station_index().search(query, limit, group=country)
+
+
+def is_iata_code(code):
+    """Return True for a three letter IATA code (the CSV uses \\N for none)"""
+    return len(code) == 3 and code.isalnum()
+
+
+def get_airport_spatial_index():
+    """Return the airport nearest-neighbour index, built on first use"""
+    global _AIRPORT_SPATIAL_INDEX
+
+    airports = load_airports()
+    if _AIRPORT_SPATIAL_INDEX is None or _AIRPORT_SPATIAL_INDEX.source is not airports:
+        # Only airports with an IATA code can be picked for a flight
+        _AIRPORT_SPATIAL_INDEX = SpatialIndex(
+            airports,
+            cell_km=50,
+            where=lambda airport: is_iata_code(airport["iata_code"]),
+        )
+    return _AIRPORT_SPATIAL_INDEX
+
+
+def get_station_spatial_index():
+    """Return the train station nearest-neighbour index, built on first use"""
+    global _STATION_SPATIAL_INDEX
+
     stations = load_train_stations()
-    query_lower = query.lower()
+    if _STATION_SPATIAL_INDEX is None or _STATION_SPATIAL_INDEX.source is not stations:
+        _STATION_SPATIAL_INDEX = SpatialIndex(stations, cell_km=10)
+    return _STATION_SPATIAL_INDEX
 
-    results = []
-    for station in stations:
-        if (
-            query_lower in station["name"].lower()
-            or query_lower in station["country"].lower()
-        ):
-            results.append(station)
-            if len(results) >= limit:
-                break
 
-    return results
+def nearest_airports(latitude, longitude, limit=5, max_km=150):
+    """
+    Find the airports nearest to a point.
+
+    Args:
+        latitude: Point latitude
+        longitude: Point longitude
+        limit: Maximum number of results
+        max_km: Search radius in kilometers
+
+    Returns:
+        List of airport dicts with an extra distance_km, nearest first
+    """
+    return get_airport_spatial_index().nearest(latitude, longitude, limit, max_km)
+
+
+def nearest_train_stations(latitude, longitude, limit=5, max_km=30):
+    """
+    Find the train stations nearest to a point.
+
+    Args:
+        latitude: Point latitude
+        longitude: Point longitude
+        limit: Maximum number of results
+        max_km: Search radius in kilometers
+
+    Returns:
+        List of station dicts with an extra distance_km, nearest first
+    """
+    return get_station_spatial_index().nearest(latitude, longitude, limit, max_km)
+
+
+def get_trip_stay_coordinates(trip, last=False):
+    """
+    Return the coordinates of the first (or last) geocoded stay of a trip.
+
+    Args:
+        trip: Trip object
+        last: Return the stay of the latest day instead of the earliest
+
+    Returns:
+        (latitude, longitude) tuple or None if no stay has coordinates
+    """
+    return (
+        Stay.objects.filter(
+            days__trip=trip, latitude__isnull=False, longitude__isnull=False
+        )
+        .order_by("-days__number" if last else "days__number")
+        .values_list("latitude", "longitude")
+        .first()
+    )
 
 
 def get_airport_by_iata(iata_code):
@@ -890,11 +1377,7 @@ def get_airport_by_iata(iata_code):
     Returns:
         Airport dict or None if not found
     """
-    airports = load_airports()
-    for airport in airports:
-        if airport["iata_code"].upper() == iata_code.upper():
-            return airport
-    return None
+    return load_airports().lookup(iata_code)
 
 
 def get_station_by_id(station_id):
@@ -907,11 +1390,20 @@ def get_station_by_id(station_id):
     Returns:
         Station dict or None if not found
     """
-    stations = load_train_stations()
-    for station in stations:
-        if station["id"] == str(station_id):
-            return station
-    return None
+    return load_train_stations().lookup(station_id)
+
+
+def preload_datasets():
+    """
+    Load the airport and station tables and their search indexes, then freeze
+    them out of garbage collection. Called at startup when PRELOAD_DATASETS is
+    set, so forked workers share one copy instead of loading their own.
+    """
+    get_airport_index()
+    get_station_index()
+    get_airport_spatial_index()
+    get_station_spatial_index()
+    freeze_shared_memory()
 
 
 # ============================================================================
@@ -1,20 +1,23 @@
+import hashlib
 import json
 from datetime import date, timedelta
 
-import requests
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required, user_passes_test
+from django.core.cache import cache
 from django.db import transaction
-from django.db.models import Prefetch
-from django.http import Http404, HttpResponse
+from django.db.models import Prefetch, prefetch_related_objects
+from django.http import Http404, HttpResponse, JsonResponse
 from django.shortcuts import get_object_or_404
 from django.template.response import TemplateResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
 from django.utils.html import format_html
 from django.utils.translation import gettext_lazy as _
 from django.views.decorators.http import require_http_methods
 
-from accounts.models import Profile
+from trips.enrichment import enqueue_trip_enrichment, get_enrichment_progress
 from trips.forms import (
     AddNoteToStayForm,
     CarMainTransferForm,
@@ -33,6 +36,18 @@ from trips.forms import (
     TripDateUpdateForm,
     TripForm,
 )
+from trips.fragment_cache import (
+    day_fragment_key,
+    fragment_cache_context,
+    invalidate_instance_fragments,
+)
+from trips.geocoding import expire_stale_geocoding
+from trips.geojson import day_geojson, trip_geojson
+from trips.images import (
+    discard_image_renditions,
+    pending_unsplash_metadata,
+    schedule_image_processing,
+)
 from trips.models import (
     Day,
     Event,
@@ -42,19 +57,29 @@ from trips.models import (
     StayTransfer,
     Trip,
 )
+from trips.page_cache import pages_cache_context
+from trips.places import PlacesError, PlacesRateLimited, enrich_place
+from trips.routing import apply_day_route, propose_day_route
+from trips.stays import reassign_stay
+from trips.timeline import build_timeline
 from trips.utils import (
-    annotate_event_overlaps,
-    convert_google_opening_hours,
+    UNSPLASH_SEARCH_PER_PAGE,
+    GeocodingRateLimited,
     create_day_map,
-    download_unsplash_photo,
+    create_trip_map,
+    day_detail_prefetches,
+    day_detail_queryset,
     geocode_location,
     get_event_instance,
     get_next_events,
     get_trips,
+    main_transfer,
     process_trip_image,
     search_airports,
     search_train_stations,
     search_unsplash_photos,
+    stay_transfers,
+    trip_detail_queryset,
 )
 
 
@@ -62,10 +87,12 @@ def home(request):
     """Home page"""
     context = {}
     if request.user.is_authenticated:
-        if Profile.objects.filter(user=request.user).exists():
-            context = get_trips(request.user)
+        context = get_trips(request.user)
+        if context:
             # Check if user wants to see the guide (default: hidden for users with trips)
             context["show_guide"] = request.session.get("show_guide", False)
+            context.update(pages_cache_context(request.user))
+            context.update(fragment_cache_context())
     return TemplateResponse(request, "trips/index.html", context)
 
 
@@ -108,6 +135,7 @@ def trip_list(request):
     context = {
         "active_trips": active_trips,
         "archived_trips": archived_trips,
+        **pages_cache_context(request.user),
     }
     return TemplateResponse(request, template, context)
 
@@ -117,41 +145,36 @@ def trip_detail(request, pk):
     """
     Detail Page for the selected trip.
     Uses window functions to efficiently detect event overlaps within each day.
+    Days are rendered from a timeline built once, so the page runs a fixed
+    number of queries and stays linear in the number of days.
     """
-
-    qs = Trip.objects.prefetch_related(
-        Prefetch(
-            "days__events",
-            queryset=annotate_event_overlaps(Event.objects.all()).order_by(
-                "start_time"
-            ),
-        ),
-        "days__stay",
-    ).select_related("author")
-
-    trip = get_object_or_404(qs, pk=pk, author=request.user)
+    trip = get_object_or_404(trip_detail_queryset(), pk=pk, author=request.user)
     unpaired_events = trip.all_events.filter(day__isnull=True)
 
     # Get main transfers
-    arrival_transfer = MainTransfer.objects.filter(
-        trip=trip, direction=MainTransfer.Direction.ARRIVAL
-    ).first()
-    departure_transfer = MainTransfer.objects.filter(
-        trip=trip, direction=MainTransfer.Direction.DEPARTURE
-    ).first()
+    arrival_transfer = main_transfer(trip, MainTransfer.Direction.ARRIVAL)
+    departure_transfer = main_transfer(trip, MainTransfer.Direction.DEPARTURE)
 
     # Check user preference for default view
     default_view = request.user.profile.default_map_view
     show_map = default_view == "map"
 
+    # Resume polling a running enrichment job, finished ones are not shown
+    enrich_progress = get_enrichment_progress(trip.pk)
+    if enrich_progress and enrich_progress["finished"]:
+        enrich_progress = None
+
     context = {
         "trip": trip,
+        "timeline": build_timeline(trip),
         "unpaired_events": unpaired_events,
         "arrival_transfer": arrival_transfer,
         "departure_transfer": departure_transfer,
         "both_transfers_exist": arrival_transfer is not None
         and departure_transfer is not None,
         "show_map": show_map,
+        "enrich_progress": enrich_progress,
+        **fragment_cache_context(),
     }
     if request.htmx:
         template = "trips/trip-detail.html#days"
@@ -160,25 +183,63 @@ def trip_detail(request, pk):
     return TemplateResponse(request, template, context)
 
 
+@login_required
+def trip_map(request, pk):
+    """
+    Overview map of the whole trip with a layer per day.
+    Days, stays, events and main transfers are loaded in a fixed number of
+    queries, whatever the length of the trip.
+    """
+    qs = Trip.objects.prefetch_related(
+        Prefetch("days", queryset=Day.objects.select_related("stay")),
+        Prefetch("days__events", queryset=Event.objects.order_by("start_time")),
+        "main_transfers",
+    )
+    trip = get_object_or_404(qs, pk=pk, author=request.user)
+    context = {"trip": trip}
+    if settings.MAP_RENDERER == "leaflet":
+        context["map_url"] = reverse("trips:trip-geojson", args=[trip.pk])
+    else:
+        context["map"] = create_trip_map(trip)
+    return TemplateResponse(request, "trips/includes/trip-map.html", context)
+
+
+def geojson_response(request, data):
+    """
+    GeoJSON response with an ETag of its content. The browser revalidates on
+    every use and gets an empty 304 Not Modified while the map is unchanged.
+    """
+    response = JsonResponse(data, content_type="application/geo+json")
+    response["ETag"] = f'"{hashlib.sha256(response.content).hexdigest()}"'
+    patch_cache_control(response, private=True, no_cache=True)
+    return get_conditional_response(request, etag=response["ETag"], response=response)
+
+
+@login_required
+@require_http_methods(["GET"])
+def trip_geojson_view(request, pk):
+    """Markers, bounds and transfer lines of the whole trip as GeoJSON"""
+    trip = get_object_or_404(Trip, pk=pk, author=request.user)
+    return geojson_response(request, trip_geojson(trip))
+
+
+@login_required
+@require_http_methods(["GET"])
+def day_geojson_view(request, pk):
+    """Markers, bounds and transfer lines of a day as GeoJSON"""
+    day = get_object_or_404(Day, pk=pk, trip__author=request.user)
+    return geojson_response(request, day_geojson(day))
+
+
 @login_required
 def day_detail(request, pk):
     """
     Detail Page for the selected day.
     Uses window functions to efficiently detect event overlaps within the day.
+    Everything is loaded by day_detail_queryset, so the page runs a fixed
+    number of queries however many events, transfers and days there are.
+    In list view a day card already cached is served without the prefetches.
     """
-    qs = Day.objects.prefetch_related(
-        Prefetch(
-            "events",
-            queryset=annotate_event_overlaps(
-                Event.objects.prefetch_related("transfer_from__to_event")
-            ).order_by("start_time"),
-        ),
-        "stay",
-        "trip__main_transfers",
-    ).select_related("trip__author")
-
-    day = get_object_or_404(qs, pk=pk, trip__author=request.user)
-
     # Check for forced view from query parameter, otherwise use user preference
     force_view = request.GET.get("view")
     if force_view in ["list", "map"]:
@@ -187,38 +248,37 @@ def day_detail(request, pk):
         default_view = request.user.profile.default_map_view
         show_map = default_view == "map"
 
-    # Get SimpleTransfers for this day
-    simple_transfers = day.simple_transfers.select_related(
-        "from_event", "to_event"
-    ).all()
+    # Use wrapper template for HTMX requests to include OOB message swap
+    template = (
+        "trips/day-detail-wrapper.html" if request.htmx else "trips/includes/day.html"
+    )
+
+    day = get_object_or_404(
+        day_detail_queryset().prefetch_related(None), pk=pk, trip__author=request.user
+    )
+    if not show_map and cache.has_key(day_fragment_key(day)):
+        context = {"day": day, "show_map": False, **fragment_cache_context()}
+        return TemplateResponse(request, template, context)
+    prefetch_related_objects([day], *day_detail_prefetches())
+
+    # SimpleTransfers for this day, prefetched with their events
+    simple_transfers = day.simple_transfers.all()
 
-    # Check if there's a StayTransfer from this day to the next
-    # Use explicit DB query to avoid Django's reverse relation caching issues
     # Only show transfer_out on the last day of the stay (when next day has different stay)
     next_day = day.next_day
+    prev_day = day.prev_day
     is_last_day_of_stay = not next_day or not next_day.stay or next_day.stay != day.stay
-    stay_transfer_out = (
-        StayTransfer.objects.filter(from_stay=day.stay).first()
-        if day.stay and is_last_day_of_stay
-        else None
-    )
-
-    # Check if there's a StayTransfer to this day from the previous
-    stay_transfer_in = (
-        StayTransfer.objects.filter(to_stay=day.stay).first() if day.stay else None
-    )
+    transfer_from, stay_transfer_in = stay_transfers(day.stay)
+    stay_transfer_out = transfer_from if is_last_day_of_stay else None
 
     # Check if can add StayTransfer (next day exists, both have stays, different stays)
-    can_add_stay_transfer = False
-    if (
+    can_add_stay_transfer = bool(
         next_day
         and day.stay
-        and hasattr(next_day, "stay")
         and next_day.stay
         and day.stay != next_day.stay
         and not stay_transfer_out
-    ):
-        can_add_stay_transfer = True
+    )
 
     context = {
         "day": day,
@@ -228,14 +288,13 @@ def day_detail(request, pk):
         "stay_transfer_in": stay_transfer_in,
         "can_add_stay_transfer": can_add_stay_transfer,
         "next_day": next_day,
+        **fragment_cache_context(),
     }
 
     # If map view is preferred, prepare map context
     if show_map:
-        events = day.events.exclude(category=1)
+        events = list(day.events.all())
         stay = day.stay
-        next_day = day.next_day
-        prev_day = day.prev_day
         next_day_stay = None
         if next_day and next_day.stay and next_day.stay != stay:
             next_day_stay = next_day.stay
@@ -246,9 +305,11 @@ def day_detail(request, pk):
         arrival_transfer = None
         departure_transfer = None
         if is_first_day:
-            arrival_transfer = day.trip.main_transfers.filter(direction=1).first()
+            arrival_transfer = main_transfer(day.trip, MainTransfer.Direction.ARRIVAL)
         if is_last_day:
-            departure_transfer = day.trip.main_transfers.filter(direction=2).first()
+            departure_transfer = main_transfer(
+                day.trip, MainTransfer.Direction.DEPARTURE
+            )
 
         locations = {
             "stay": stay,
@@ -265,21 +326,105 @@ def day_detail(request, pk):
             locations["first_day"] = True
 
         # Filter out events without latitude or longitude
-        events_with_location = events.filter(
-            latitude__isnull=False, longitude__isnull=False
-        )
-
-        map_obj = create_day_map(events_with_location, stay, next_day_stay, day=day)
-        context["map"] = map_obj
+        events_with_location = [
+            event
+            for event in events
+            if event.latitude is not None and event.longitude is not None
+        ]
+
+        if settings.MAP_RENDERER == "leaflet":
+            context["map_url"] = reverse("trips:day-geojson", args=[day.pk])
+        else:
+            context["map"] = create_day_map(
+                events_with_location, stay, next_day_stay, day=day
+            )
         context["locations"] = locations
 
-    # Use wrapper template for HTMX requests to include OOB message swap
-    template = (
-        "trips/day-detail-wrapper.html" if request.htmx else "trips/includes/day.html"
-    )
     return TemplateResponse(request, template, context)
 
 
+# HTMX stops polling when the response status is 286
+HTMX_STOP_POLLING = 286
+
+
+@login_required
+def day_geocoding_status(request, pk):
+    """
+    HTMX polling endpoint: keeps polling while the day's stay or events wait
+    for background geocoding, then refreshes the day once coordinates arrive
+    or the jobs are given up on.
+    """
+    day = get_object_or_404(Day, pk=pk, trip__author=request.user)
+    expire_stale_geocoding(day.events.all())
+    if day.stay_id is not None:
+        expire_stale_geocoding(Stay.objects.filter(pk=day.stay_id))
+    pending = day.events.filter(geocoding_pending=True).exists() or (
+        day.stay_id is not None
+        and Stay.objects.filter(pk=day.stay_id, geocoding_pending=True).exists()
+    )
+    if pending:
+        return HttpResponse(status=204)
+    return HttpResponse(
+        status=HTMX_STOP_POLLING, headers={"HX-Trigger": f"dayModified{day.pk}"}
+    )
+
+
+@login_required
+def trip_geocoding_status(request, trip_id):
+    """
+    HTMX polling endpoint: keeps polling while the trip's main transfers wait
+    for background geocoding, then refreshes the trip once coordinates arrive
+    or the jobs are given up on.
+    """
+    trip = get_object_or_404(Trip, pk=trip_id, author=request.user)
+    expire_stale_geocoding(trip.main_transfers.all())
+    if trip.main_transfers.filter(geocoding_pending=True).exists():
+        return HttpResponse(status=204)
+    return HttpResponse(
+        status=HTMX_STOP_POLLING, headers={"HX-Trigger": "tripModified"}
+    )
+
+
+@login_required
+def trip_image_status(request, trip_id):
+    """
+    HTMX polling endpoint: keeps polling while the trip's Unsplash cover is
+    ingested in the background, then reloads the page to show it.
+    """
+    trip = get_object_or_404(Trip, pk=trip_id, author=request.user)
+    if trip.image_pending:
+        return HttpResponse(status=204)
+    return HttpResponse(status=HTMX_STOP_POLLING, headers={"HX-Refresh": "true"})
+
+
+@login_required
+@require_http_methods(["POST"])
+def trip_enrich(request, trip_id):
+    """
+    Enqueue a background job enriching every unenriched stay and event of
+    the trip with Google Places data, and show its progress.
+    """
+    trip = get_object_or_404(Trip, pk=trip_id, author=request.user)
+    enqueue_trip_enrichment(trip)
+    context = {"trip": trip, "enrich_progress": get_enrichment_progress(trip.pk)}
+    return TemplateResponse(request, "trips/includes/trip-enrich.html", context)
+
+
+@login_required
+def trip_enrich_status(request, trip_id):
+    """
+    HTMX polling endpoint: shows the progress of the trip enrichment job and
+    refreshes the trip once it is finished.
+    """
+    trip = get_object_or_404(Trip, pk=trip_id, author=request.user)
+    progress = get_enrichment_progress(trip.pk)
+    context = {"trip": trip, "enrich_progress": progress}
+    response = TemplateResponse(request, "trips/includes/trip-enrich.html", context)
+    if progress is None or progress["finished"]:
+        response["HX-Trigger"] = "tripModified"
+    return response
+
+
 @login_required
 def trip_create(request):
     if request.method == "POST":
@@ -288,25 +433,10 @@ def trip_create(request):
             trip = form.save(commit=False)
             trip.author = request.user
 
-            # Handle Unsplash photo selection
+            # Handle Unsplash photo selection: ingested in the background
             selected_photo_id = form.cleaned_data.get("selected_photo_id")
             if selected_photo_id:
-                # Search Unsplash to get photo data
-                query = trip.destination
-                photos = search_unsplash_photos(query, per_page=10)
-                if photos:
-                    photo_data = next(
-                        (p for p in photos if p["id"] == selected_photo_id), None
-                    )
-                    if photo_data:
-                        # Download and process image
-                        image_content, metadata = download_unsplash_photo(photo_data)
-                        if image_content:
-                            processed_image = process_trip_image(image_content)
-                            if processed_image:
-                                filename = f"trip_{selected_photo_id}.jpg"
-                                trip.image.save(filename, processed_image, save=False)
-                                trip.image_metadata = metadata
+                trip.image_metadata = pending_unsplash_metadata(selected_photo_id)
 
             # Process uploaded image if present (overrides Unsplash)
             if request.FILES.get("image"):  # pragma: no cover
@@ -316,6 +446,7 @@ def trip_create(request):
                     trip.image_metadata = {"source": "upload"}
 
             trip.save()
+            schedule_image_processing(trip, trip.destination)
             messages.add_message(
                 request,
                 messages.SUCCESS,
@@ -350,30 +481,18 @@ def trip_delete(request, pk):
 @login_required
 def trip_update(request, pk):
     trip = get_object_or_404(Trip, pk=pk, author=request.user)
+    previous_image = trip.image.name
     if request.method == "POST":
         form = TripForm(request.POST, request.FILES, instance=trip)
         if form.is_valid():
             trip = form.save(commit=False)
 
-            # Handle Unsplash photo selection
+            # Handle Unsplash photo selection: ingested in the background
             selected_photo_id = form.cleaned_data.get("selected_photo_id")
             if selected_photo_id:
-                # Search Unsplash to get photo data
-                query = trip.destination
-                photos = search_unsplash_photos(query, per_page=10)
-                if photos:
-                    photo_data = next(
-                        (p for p in photos if p["id"] == selected_photo_id), None
-                    )
-                    if photo_data:
-                        # Download and process image
-                        image_content, metadata = download_unsplash_photo(photo_data)
-                        if image_content:
-                            processed_image = process_trip_image(image_content)
-                            if processed_image:
-                                filename = f"trip_{trip.pk}_{selected_photo_id}.jpg"
-                                trip.image.save(filename, processed_image, save=False)
-                                trip.image_metadata = metadata
+                trip.image_metadata = pending_unsplash_metadata(
+                    selected_photo_id, trip.image_metadata
+                )
 
             # Process uploaded image if present (overrides Unsplash)
             if request.FILES.get("image"):  # pragma: no cover
@@ -383,6 +502,9 @@ def trip_update(request, pk):
                     trip.image_metadata = {"source": "upload"}
 
             trip.save()
+            if trip.image.name != previous_image:
+                discard_image_renditions(previous_image)
+            schedule_image_processing(trip, trip.destination)
             messages.add_message(
                 request,
                 messages.SUCCESS,
@@ -594,17 +716,17 @@ def stay_delete(request, pk):
     other_stays = Stay.objects.filter(days__trip=trip).exclude(pk=pk).distinct()
 
     if request.method == "POST":
-        if other_stays.count() == 1:
-            # Automatically reassign to the only remaining stay
-            new_stay = other_stays.first()
-            stay.days.update(stay=new_stay)
-        else:
-            new_stay_id = request.POST.get("new_stay")
-            if new_stay_id:
-                new_stay = Stay.objects.get(pk=new_stay_id)
-                stay.days.update(stay=new_stay)
+        with transaction.atomic():
+            if other_stays.count() == 1:
+                # Automatically reassign to the only remaining stay
+                reassign_stay(trip, stay, other_stays.first())
+            else:
+                new_stay_id = request.POST.get("new_stay")
+                if new_stay_id:
+                    new_stay = Stay.objects.get(pk=new_stay_id)
+                    reassign_stay(trip, stay, new_stay)
 
-        stay.delete()
+            stay.delete()
         messages.add_message(
             request,
             messages.ERROR,
@@ -733,6 +855,7 @@ def delete_stay_transfer(request, pk):
     from_day_id = stay_transfer.from_day.pk
     to_day_id = stay_transfer.to_day.pk
     stay_transfer.delete()
+    invalidate_instance_fragments(stay_transfer)
     messages.add_message(
         request,
         messages.SUCCESS,
@@ -838,6 +961,7 @@ def main_transfers_section(request, trip_id):
         "departure_transfer": departure_transfer,
         "both_transfers_exist": arrival_transfer is not None
         and departure_transfer is not None,
+        **fragment_cache_context(),
     }
 
     return TemplateResponse(request, "trips/includes/main-transfers.html", context)
@@ -1014,6 +1138,7 @@ def delete_simple_transfer(request, pk):
     simple_transfer = get_object_or_404(qs, pk=pk, day__trip__author=request.user)
     day_id = simple_transfer.day.pk
     simple_transfer.delete()
+    invalidate_instance_fragments(simple_transfer)
     messages.add_message(
         request,
         messages.SUCCESS,
@@ -1376,6 +1501,9 @@ def single_event(request, pk):
     event = get_object_or_404(Event, pk=pk, day__trip__author=request.user)
     context = {
         "event": event,
+        # As in the day list, which caches the same fragment
+        "day": event.day,
+        **fragment_cache_context(),
     }
     return TemplateResponse(
         request, "trips/includes/day-list-content.html#single_event", context
@@ -1400,6 +1528,40 @@ def event_swap_modal(request, pk):
     return TemplateResponse(request, "trips/event-swap.html", context)
 
 
+@login_required
+def day_route(request, pk):
+    """
+    Propose a shorter order for the day's geocoded events, from the day's
+    stay to the next day's stay.
+    """
+    day = get_object_or_404(
+        Day.objects.select_related("stay", "trip"), pk=pk, trip__author=request.user
+    )
+    context = {"day": day, "route": propose_day_route(day)}
+    return TemplateResponse(request, "trips/day-route.html", context)
+
+
+@login_required
+@require_http_methods(["POST"])
+def day_route_apply(request, pk):
+    """
+    Apply a proposed route: the posted events take the day's time slots in
+    the given order, all in one transaction.
+    """
+    day = get_object_or_404(Day, pk=pk, trip__author=request.user)
+    event_ids = [
+        int(value) for value in request.POST.getlist("events") if value.isdigit()
+    ]
+    try:
+        apply_day_route(day, event_ids)
+    except ValueError as e:
+        messages.error(request, str(e))
+        return HttpResponse(status=400)
+
+    messages.success(request, _("Route optimized successfully"))
+    return HttpResponse(status=204, headers={"HX-Trigger": f"dayModified{day.pk}"})
+
+
 @user_passes_test(lambda u: u.is_staff)
 def view_log_file(request, filename):
     """
@@ -1475,7 +1637,16 @@ def geocode_address(request):
         city = request.POST.get("city", "").strip()
 
         if name and city:
-            results = geocode_location(name, city)
+            try:
+                results = geocode_location(name, city)
+            except GeocodingRateLimited as e:
+                # Let the client retry the search instead of holding the worker
+                return TemplateResponse(
+                    request,
+                    "trips/includes/address-results.html",
+                    {"retry_after": e.retry_after},
+                    headers={"Retry-After": str(e.retry_after)},
+                )
             if results:
                 return TemplateResponse(
                     request,
@@ -1731,14 +1902,27 @@ def stay_note_delete(request, stay_id):
     return HttpResponse(status=204, headers={"HX-Trigger": json.dumps(day_triggers)})
 
 
+def enrich_retry_response(request, enrich_url, retry_after):
+    """
+    Let the client post the enrichment again instead of holding the worker:
+    the retry is appended to the open dialog, which stays as it is.
+    """
+    return TemplateResponse(
+        request,
+        "trips/includes/enrich-retry.html",
+        {"enrich_url": enrich_url, "retry_after": retry_after},
+        headers={"Retry-After": str(retry_after), "HX-Reswap": "beforeend"},
+    )
+
+
 @login_required
 @require_http_methods(["POST"])
 def enrich_stay(request, stay_id):
     """
     Enrich a stay's details using the new Google Places API.
     Shows a preview of enriched data without saving it.
-    - Find Place ID using places:searchText.
-    - Use Place ID to get details (website, phone, opening hours).
+    - Find Place ID and its details (website, phone, opening hours),
+      both cached by trips.places.
     - Return preview for user confirmation.
     """
     stay = get_object_or_404(
@@ -1753,71 +1937,16 @@ def enrich_stay(request, stay_id):
         context["stay"] = stay
         return TemplateResponse(request, "trips/stay-detail.html", context)
 
-    api_key = settings.GOOGLE_PLACES_API_KEY
-
-    if not api_key:
-        context["error_message"] = _("Google Places API key is not configured.")
-    else:
-        # 1. Find Place ID
-        search_url = "https://places.googleapis.com/v1/places:searchText"
-        search_payload = {"textQuery": f"{stay.name} {stay.address}"}
-        search_headers = {
-            "Content-Type": "application/json",
-            "X-Goog-Api-Key": api_key,
-            "X-Goog-FieldMask": "places.id",
-        }
-
-        place_id = None
-        try:
-            response = requests.post(
-                search_url, json=search_payload, headers=search_headers, timeout=5
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            if data.get("places"):
-                place_id = data["places"][0]["id"]
-            else:
-                context["error_message"] = _("Could not find a matching place.")
-
-        except requests.exceptions.Timeout:
-            context["error_message"] = _("Google Places API request timed out.")
-        except requests.RequestException as e:
-            error_message = f"Error calling Google Places API: {e}"
-            if e.response is not None:
-                error_message = f"API Error: {e.response.text}"
-            context["error_message"] = error_message
-
     # Store enriched data in context without saving to database
     enriched_data = {}
-    if "error_message" not in context and place_id:
-        # 2. Get Place Details
-        details_url = f"https://places.googleapis.com/v1/places/{place_id}"
-        details_headers = {
-            "X-Goog-Api-Key": api_key,
-            "X-Goog-FieldMask": "websiteUri,internationalPhoneNumber,regularOpeningHours",
-        }
-
-        try:
-            response = requests.get(details_url, headers=details_headers, timeout=5)
-            response.raise_for_status()
-            data = response.json()
-
-            enriched_data["place_id"] = place_id
-            enriched_data["website"] = data.get("websiteUri", "")
-            enriched_data["phone_number"] = data.get("internationalPhoneNumber", "")
-            google_opening_hours = data.get("regularOpeningHours", None)
-            enriched_data["opening_hours"] = convert_google_opening_hours(
-                google_opening_hours
-            )
-
-        except requests.exceptions.Timeout:
-            context["error_message"] = _("Google Places API request timed out.")
-        except requests.RequestException as e:
-            error_message = f"Error calling Google Places API: {e}"
-            if e.response is not None:
-                error_message = f"API Error: {e.response.text}"
-            context["error_message"] = error_message
+    try:
+        enriched_data = enrich_place(stay.name, stay.address)
+    except PlacesRateLimited as e:
+        return enrich_retry_response(
+            request, reverse("trips:enrich-stay", args=[stay.pk]), e.retry_after
+        )
+    except PlacesError as e:
+        context["error_message"] = str(e)
 
     # Serialize opening_hours to JSON string for form submission
     if enriched_data and enriched_data.get("opening_hours"):
@@ -1913,8 +2042,8 @@ def enrich_event(request, event_id):
     """
     Enrich an event's details using the new Google Places API.
     Shows a preview of enriched data without saving it.
-    - Find Place ID using places:searchText.
-    - Use Place ID to get details (website, phone, opening hours).
+    - Find Place ID and its details (website, phone, opening hours),
+      both cached by trips.places.
     - Return preview for user confirmation.
     """
     qs = Event.objects.select_related("trip__author", "experience", "meal")
@@ -1930,71 +2059,16 @@ def enrich_event(request, event_id):
         context["event"] = event
         return TemplateResponse(request, "trips/event-detail.html", context)
 
-    api_key = settings.GOOGLE_PLACES_API_KEY
-
-    if not api_key:
-        context["error_message"] = _("Google Places API key is not configured.")
-    else:
-        # 1. Find Place ID
-        search_url = "https://places.googleapis.com/v1/places:searchText"
-        search_payload = {"textQuery": f"{event.name} {event.address}"}
-        search_headers = {
-            "Content-Type": "application/json",
-            "X-Goog-Api-Key": api_key,
-            "X-Goog-FieldMask": "places.id",
-        }
-
-        place_id = None
-        try:
-            response = requests.post(
-                search_url, json=search_payload, headers=search_headers, timeout=5
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            if data.get("places"):
-                place_id = data["places"][0]["id"]
-            else:
-                context["error_message"] = _("Could not find a matching place.")
-
-        except requests.exceptions.Timeout:
-            context["error_message"] = _("Google Places API request timed out.")
-        except requests.RequestException as e:
-            error_message = f"Error calling Google Places API: {e}"
-            if e.response is not None:
-                error_message = f"API Error: {e.response.text}"
-            context["error_message"] = error_message
-
     # Store enriched data in context without saving to database
     enriched_data = {}
-    if "error_message" not in context and place_id:
-        # 2. Get Place Details
-        details_url = f"https://places.googleapis.com/v1/places/{place_id}"
-        details_headers = {
-            "X-Goog-Api-Key": api_key,
-            "X-Goog-FieldMask": "websiteUri,internationalPhoneNumber,regularOpeningHours",
-        }
-
-        try:
-            response = requests.get(details_url, headers=details_headers, timeout=5)
-            response.raise_for_status()
-            data = response.json()
-
-            enriched_data["place_id"] = place_id
-            enriched_data["website"] = data.get("websiteUri", "")
-            enriched_data["phone_number"] = data.get("internationalPhoneNumber", "")
-            google_opening_hours = data.get("regularOpeningHours", None)
-            enriched_data["opening_hours"] = convert_google_opening_hours(
-                google_opening_hours
-            )
-
-        except requests.exceptions.Timeout:
-            context["error_message"] = _("Google Places API request timed out.")
-        except requests.RequestException as e:
-            error_message = f"Error calling Google Places API: {e}"
-            if e.response is not None:
-                error_message = f"API Error: {e.response.text}"
-            context["error_message"] = error_message
+    try:
+        enriched_data = enrich_place(event.name, event.address)
+    except PlacesRateLimited as e:
+        return enrich_retry_response(
+            request, reverse("trips:enrich-event", args=[event.pk]), e.retry_after
+        )
+    except PlacesError as e:
+        context["error_message"] = str(e)
 
     event = get_event_instance(event)
 
@@ -2069,7 +2143,7 @@ def search_trip_images(request):
             )
 
         # Search Unsplash
-        photos = search_unsplash_photos(query, per_page=3)
+        photos = search_unsplash_photos(query, per_page=UNSPLASH_SEARCH_PER_PAGE)
 
         if photos is None:
             return TemplateResponse(
@@ -2141,7 +2215,7 @@ def search_airports_view(request):
 def search_stations(request):
     """
     HTMX endpoint for train station autocomplete.
-    Searches stations by name or country from CSV.
+    Searches stations by name from CSV, optionally within one country.
     """
     if request.method == "POST":
         query = request.POST.get("station_query", "").strip()
@@ -2149,8 +2223,10 @@ def search_stations(request):
             "field_type", request.POST.get("field_type", "origin")
         )
 
+        country = request.POST.get("country", "").strip() or None
+
         if query and len(query) >= 2:
-            results = search_train_stations(query, limit=10)
+            results = search_train_stations(query, limit=10, country=country)
             if results:
                 return TemplateResponse(
                     request,